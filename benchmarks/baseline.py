@@ -0,0 +1,49 @@
+import json
+import os
+from typing import Dict, List
+
+# Direction per metric: +1 higher is better, -1 lower is better
+METRICS = {
+    "events_per_s": +1,
+    "p50_ms": -1,
+    "p99_ms": -1,
+    "alloc_kb_per_1k": -1,
+    "alloc_peak_kb": -1,
+    "peak_rss_mb": -1,
+}
+
+# Tail latency swings more run to run; it gets this multiple of the tolerance
+TOLERANCE_FACTOR = {"p99_ms": 2.0}
+
+# Differences smaller than this are noise whatever the ratio (sub-10 us latencies etc.)
+MIN_ABS_CHANGE = {"p50_ms": 0.01, "p99_ms": 0.05, "alloc_kb_per_1k": 1.0, "alloc_peak_kb": 16.0, "peak_rss_mb": 2.0}
+
+
+def save(results: dict, path: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(current: Dict[str, dict], baseline: Dict[str, dict], tolerance: float = 0.2) -> List[str]:
+    """Regressions of `current` stages against `baseline` beyond a relative tolerance."""
+    regressions = []
+    for stage, metrics in current.items():
+        base = baseline.get(stage)
+        if not base:
+            continue
+        for name, direction in METRICS.items():
+            new, old = metrics.get(name), base.get(name)
+            if new is None or old is None or old == 0:
+                continue
+            change = (new - old) / abs(old)
+            if direction * change < -tolerance * TOLERANCE_FACTOR.get(name, 1.0) and abs(new - old) >= MIN_ABS_CHANGE.get(name, 0.0):
+                regressions.append(f"{stage}.{name}: {old:g} -> {new:g} ({change:+.0%})")
+    return regressions
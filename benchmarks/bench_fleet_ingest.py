@@ -0,0 +1,165 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import datetime
+import logging
+import random
+import tempfile
+import threading
+import time
+
+from src.core.tracing import LatencyHistogram
+from src.core.wire_format import encode_batch
+from src.shore.fleet_ingest import FleetIngestServer, FleetStore
+from src.uplink.uplink_client import UplinkBusy, UplinkClient
+from workload import make_events
+
+# Load generator: N nodes come back online together after a long offline stretch and
+# each drains its whole backlog. Batches are encoded before the start, so in-process
+# runs measure the shore side rather than the simulated nodes' encoding.
+
+
+def node_backlog(node: int, args):
+    """Wire-format batches for one node: events_per_node spread over offline_days."""
+    per_day = max(1, args.events_per_node // args.offline_days)
+    start = datetime.datetime(2026, 1, 6) - datetime.timedelta(days=args.offline_days)
+    events = []
+    for day in range(args.offline_days):
+        n = per_day if day < args.offline_days - 1 else args.events_per_node - len(events)
+        # Same seed on every node: colliding event ids must still be stored once per node
+        events += make_events(n, seed=args.seed + day, start=start + datetime.timedelta(days=day))
+    return [encode_batch(events[i:i + args.batch], compression=args.compression)
+            for i in range(0, len(events), args.batch)]
+
+
+class Node(threading.Thread):
+    def __init__(self, node_id: str, url: str, frames, barrier: threading.Barrier,
+                 retransmit: float, seed: int, latency: LatencyHistogram):
+        super().__init__(daemon=True)
+        self.client = UplinkClient(url, timeout=60, node_id=node_id) # The node's own uplink path
+        self.node_id = node_id
+        self.frames = frames
+        self.barrier = barrier
+        self.retransmit = retransmit
+        self.rng = random.Random(seed)
+        self.latency = latency
+        self.sent = 0
+        self.duplicates = 0
+        self.busy_retries = 0
+        self.errors = 0
+
+    def _post(self, frame):
+        while True:
+            started = time.perf_counter()
+            try:
+                reply = self.client.send_frame(frame)
+            except UplinkBusy as e:
+                self.busy_retries += 1
+                time.sleep(1 if e.retry_after is None else e.retry_after)
+                continue
+            self.latency.record(time.perf_counter() - started)
+            return reply
+
+    def run(self):
+        self.barrier.wait()
+        try:
+            for frame in self.frames:
+                reply = self._post(frame)
+                self.sent += len(reply["accepted"])
+                self.duplicates += reply["duplicates"]
+                if self.rng.random() < self.retransmit:
+                    # Acknowledgement "lost": the node sends the same batch again
+                    self.duplicates += self._post(frame)["duplicates"]
+        except Exception as e:
+            self.errors += 1
+            logging.getLogger("FleetLoad").error(f"{self.node_id}: {e}")
+        finally:
+            self.client.close()
+
+
+def run(args, url=None, store=None) -> dict:
+    frames = [node_backlog(i, args) for i in range(args.nodes)]
+    barrier = threading.Barrier(args.nodes + 1)
+    latency = LatencyHistogram()
+    nodes = [Node(f"OV_NODE_{i + 1:03d}", url, frames[i], barrier, args.retransmit, args.seed + i, latency)
+             for i in range(args.nodes)]
+    for n in nodes:
+        n.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for n in nodes:
+        n.join()
+    elapsed = time.perf_counter() - started
+
+    events = sum(n.sent for n in nodes)
+    result = {
+        "nodes": args.nodes,
+        "events": events,
+        "elapsed_s": elapsed,
+        "events_per_s": events / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": (latency.quantile(0.5) or 0) * 1000,
+        "p99_ms": (latency.quantile(0.99) or 0) * 1000,
+        "duplicates": sum(n.duplicates for n in nodes),
+        "busy_retries": sum(n.busy_retries for n in nodes),
+        "errors": sum(n.errors for n in nodes),
+    }
+    if store is not None:
+        result["stored"] = store.count()
+        result["partitions"] = len(store.partition_names())
+        result["commits"] = store.commits
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Many nodes reconnecting at once against the fleet ingest service")
+    parser.add_argument("--nodes", type=int, default=50)
+    parser.add_argument("--events-per-node", type=int, default=2000)
+    parser.add_argument("--offline-days", type=int, default=3, help="Backlog spread over this many days")
+    parser.add_argument("--batch", type=int, default=200, help="Events per uplink batch")
+    parser.add_argument("--compression", default="zlib", choices=["none", "zlib", "lzma"])
+    parser.add_argument("--retransmit", type=float, default=0.05, help="Share of batches sent twice (lost acks)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--url", help="Target a running service (python -m src.shore.fleet_ingest) "
+                                      "instead of an in-process one")
+    parser.add_argument("--min-events-per-s", type=float, default=0.0, help="Fail below this ingest rate")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.url:
+        r = run(args, url=args.url)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            server = FleetIngestServer(FleetStore(os.path.join(tmp, "fleet.db")))
+            server.start()
+            try:
+                r = run(args, url=server.url, store=server.store)
+            finally:
+                server.stop()
+
+    print(f"{r['nodes']} nodes x {args.events_per_node} events, batches of {args.batch} ({args.compression})")
+    print(f"{'events':>10}{'seconds':>9}{'events/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'dups':>7}{'503s':>6}{'errors':>7}")
+    print(f"{r['events']:>10}{r['elapsed_s']:>9.2f}{r['events_per_s']:>10.0f}{r['p50_ms']:>9.1f}"
+          f"{r['p99_ms']:>9.1f}{r['duplicates']:>7}{r['busy_retries']:>6}{r['errors']:>7}")
+
+    status = 0
+    expected = args.nodes * args.events_per_node
+    if "stored" in r:
+        print(f"Stored {r['stored']} in {r['partitions']} partitions over {r['commits']} commits")
+        if r["stored"] != expected:
+            print(f"MISMATCH: expected {expected} stored events")
+            status = 1
+    if r["errors"]:
+        status = 1
+    if r["events_per_s"] < args.min_events_per_s:
+        print(f"BELOW TARGET: {r['events_per_s']:.0f} < {args.min_events_per_s:.0f} events/s")
+        status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import gc
+import logging
+import multiprocessing
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:  # Not on Windows
+    resource = None
+
+from src.core.event_bus import EventBus
+from src.core.tracing import LatencyHistogram
+from src.core.types import NetworkStatus
+from src.agents.bioconfirm_agent import BioConfirmAgent
+from src.agents.risk_agent import RiskAgent
+from src.agents.sync_agent import SyncAgent
+from src.database.storage import StorageManager
+from src.shore.ingest_server import IngestServer
+from src.uplink.uplink_client import UplinkClient
+from bench_sync_throughput import PROFILES
+from workload import make_detection_stream, make_events
+import baseline
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "pipeline.json")
+
+
+# --- Stages: each returns (handler, items, cleanup) on fresh state ---
+
+def stage_bioconfirm(args, workdir, n=None):
+    agent = BioConfirmAgent(EventBus())
+    frames = args.frames if n is None else max(1, n // args.objects)
+    return agent.on_vision_detection, make_detection_stream(args.objects, frames, seed=args.seed), None
+
+
+def stage_risk(args, workdir, n=None):
+    agent = RiskAgent(EventBus())
+    return agent.assess_risk, make_events(n or args.events, seed=args.seed), None
+
+
+def stage_storage(args, workdir, n=None):
+    storage = StorageManager(os.path.join(workdir, f"storage_{time.monotonic_ns()}.db"))
+    return storage.save_event, make_events(n or args.events, seed=args.seed), None
+
+
+def stage_sync(args, workdir, n=None):
+    # Storage write + sync decision + (rate-limited) uplink, as handle_final_event runs them
+    status = NetworkStatus[args.network]
+    storage = StorageManager(os.path.join(workdir, f"sync_{time.monotonic_ns()}.db"))
+    server = client = None
+    if status != NetworkStatus.OFFLINE:
+        server = IngestServer(profile=PROFILES[status], seed=1)
+        server.start()
+        client = UplinkClient(server.url, timeout=10)
+    agent = SyncAgent(EventBus(), storage, uplink=client)
+    agent.network_status = status
+
+    def cleanup():
+        if client:
+            client.close()
+            server.stop()
+    return agent.handle_final_event, make_events(n or args.events, seed=args.seed), cleanup
+
+
+STAGES = {
+    "bioconfirm": stage_bioconfirm,
+    "risk": stage_risk,
+    "storage": stage_storage,
+    "sync": stage_sync,
+}
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024  # bytes on macOS, KiB on Linux
+
+
+def timed_pass(name, args, workdir):
+    handler, items, cleanup = STAGES[name](args, workdir)
+    hist = LatencyHistogram(min_s=1e-6)
+    period = 1.0 / args.rate if args.rate else 0.0
+    gc.collect()
+    try:
+        started = next_due = time.perf_counter()
+        for item in items:
+            if period:
+                next_due += period
+                delay = next_due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            t0 = time.perf_counter()
+            handler(item)
+            hist.record(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - started
+    finally:
+        if cleanup:
+            cleanup()
+    return hist, elapsed
+
+
+def run_stage(name, args, workdir):
+    # Median of --repeat runs by throughput; single runs of I/O stages swing by 20-30%
+    passes = sorted((timed_pass(name, args, workdir) for _ in range(args.repeat)),
+                    key=lambda p: p[0].count / p[1] if p[1] > 0 else 0.0)
+    hist, elapsed = passes[len(passes) // 2]
+
+    # Allocation pass on fresh state: tracemalloc slows everything, so it is kept out of the timing
+    handler, items, cleanup = STAGES[name](args, workdir, n=args.alloc_sample)
+    items = items[:args.alloc_sample]
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for item in items:
+            handler(item)
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        if cleanup:
+            cleanup()
+
+    summary = hist.summary()
+    return {
+        "events": summary["count"],
+        "events_per_s": round(summary["count"] / elapsed, 1) if elapsed > 0 else None,
+        "p50_ms": round(hist.quantile(0.5) * 1000, 4),
+        "p99_ms": round(hist.quantile(0.99) * 1000, 4),
+        "max_ms": summary["max_ms"],
+        "alloc_kb_per_1k": round((after - before) / 1024 / len(items) * 1000, 2) if items else None,
+        "alloc_peak_kb": round((peak - before) / 1024, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1) if resource else None,
+    }
+
+
+def _stage_process(name, args, workdir) -> dict:
+    logging.basicConfig(level=logging.WARNING)
+    return run_stage(name, args, workdir)
+
+
+def run(args) -> dict:
+    # Each stage runs in a fresh process: peak RSS is a process-lifetime high-water mark,
+    # so in one process every stage would report the largest of those before it
+    stages = {}
+    spawn = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in args.stages.split(","):
+            with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                stages[name.strip()] = pool.submit(_stage_process, name.strip(), args, workdir).result()
+    params = {k: getattr(args, k) for k in ("events", "objects", "frames", "rate", "network", "seed")}
+    return {"params": params, "stages": stages}
+
+
+def print_table(results: dict):
+    print(f"Params: {results['params']}")
+    print(f"{'stage':<12}{'events':>9}{'events/s':>12}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+          f"{'KiB/1k ev':>11}{'peak KiB':>10}{'RSS MiB':>9}")
+    for name, r in results["stages"].items():
+        print(f"{name:<12}{r['events']:>9}{r['events_per_s'] or 0:>12.0f}{r['p50_ms'] or 0:>9.3f}"
+              f"{r['p99_ms'] or 0:>9.3f}{r['max_ms']:>9.2f}{r['alloc_kb_per_1k'] or 0:>11.1f}"
+              f"{r['alloc_peak_kb']:>10.1f}{r['peak_rss_mb'] or 0:>9.1f}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Per-stage pipeline benchmark with baseline regression check")
+    parser.add_argument("--stages", default=",".join(STAGES))
+    parser.add_argument("--events", type=int, default=5000, help="Events for the risk/storage/sync stages")
+    parser.add_argument("--objects", type=int, default=20, help="Simultaneous targets for bioconfirm")
+    parser.add_argument("--frames", type=int, default=250, help="Frames of detections for bioconfirm")
+    parser.add_argument("--rate", type=float, default=0.0, help="Events/s fed to each stage (0 = as fast as possible)")
+    parser.add_argument("--network", default="ONLINE", choices=[s.name for s in NetworkStatus])
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage; the median is reported")
+    parser.add_argument("--alloc-sample", type=int, default=1000, help="Events run under tracemalloc")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, metavar="PATH")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, metavar="PATH")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Relative change counted as a regression")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+
+    results = run(args)
+    print_table(results)
+
+    status = 0
+    if args.compare:
+        reference = baseline.load(args.compare)
+        if reference.get("params") != results["params"]:
+            print(f"Warning: baseline params differ: {reference.get('params')}")
+        regressions = baseline.compare(results["stages"], reference["stages"], args.tolerance)
+        if regressions:
+            print(f"REGRESSIONS (> {args.tolerance:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            status = 1
+        else:
+            print(f"No regressions beyond {args.tolerance:.0%} against {args.compare}")
+    if args.save_baseline:
+        baseline.save(results, args.save_baseline)
+        print(f"Baseline saved: {args.save_baseline}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import logging
+import tempfile
+import time
+
+from src.core.event_bus import EventBus
+from src.core.types import NetworkStatus, RiskLevel
+from src.database.storage import StorageManager
+from src.agents.sync_agent import SyncAgent
+from src.shore.ingest_server import IngestServer, LinkProfile
+from src.uplink.uplink_client import UplinkClient
+from workload import iter_event_batches
+
+# Link profiles replayed per NetworkStatus.
+# ONLINE ~ port Wi-Fi / LTE, INTERMITTENT ~ degraded VSAT.
+PROFILES = {
+    NetworkStatus.ONLINE: LinkProfile(bandwidth_bps=20_000_000, latency_s=0.03, loss_rate=0.0),
+    NetworkStatus.INTERMITTENT: LinkProfile(bandwidth_bps=256_000, latency_s=0.6, loss_rate=0.1),
+    NetworkStatus.OFFLINE: LinkProfile(),
+}
+
+
+def seed_backlog(db_path: str, count: int) -> StorageManager:
+    storage = StorageManager(db_path)
+    for batch in iter_event_batches(count):
+        storage.save_events(batch)
+    return storage
+
+
+def run_profile(status: NetworkStatus, count: int, max_seconds: float):
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        storage = seed_backlog(os.path.join(tmp, "bench.db"), count)
+        seed_s = time.perf_counter() - t0
+
+        server = IngestServer(profile=PROFILES[status], seed=1)
+        server.start()
+        client = UplinkClient(server.url)
+        agent = SyncAgent(EventBus(), storage, uplink=client)
+        agent.network_status = status
+
+        totals = {"events": 0, "bytes": 0, "batches": 0, "retries": 0}
+        t0 = time.perf_counter()
+        while time.perf_counter() - t0 < max_seconds:
+            stats = agent.drain_backlog(max_batches=10)
+            for k in totals:
+                totals[k] += stats[k]
+            if stats["batches"] == 0 and stats["retries"] == 0:
+                break
+        elapsed = time.perf_counter() - t0
+
+        # What this profile is allowed to drain (INTERMITTENT ships HIGH only)
+        eligible_levels = [RiskLevel.HIGH] if status == NetworkStatus.INTERMITTENT else None
+        pending = storage.count_pending_sync(eligible_levels)
+        client.close()
+        server.stop()
+
+    eps = totals["events"] / elapsed if elapsed > 0 else 0.0
+    bps = totals["bytes"] / elapsed if elapsed > 0 else 0.0
+    if status == NetworkStatus.OFFLINE:
+        drain_s = None
+    elif pending == 0:
+        drain_s = elapsed
+    else:
+        drain_s = elapsed + pending / eps if eps else None
+    return {
+        "status": status.name,
+        "seed_s": seed_s,
+        "events": totals["events"],
+        "retries": totals["retries"],
+        "elapsed_s": elapsed,
+        "events_per_s": eps,
+        "bytes_per_s": bps,
+        "bytes_per_event": totals["bytes"] / totals["events"] if totals["events"] else 0.0,
+        "pending": pending,
+        "drain_s": drain_s,
+        "server_duplicates": server.duplicates,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SyncAgent backlog drain throughput against a loopback ingest stand-in")
+    parser.add_argument("--events", type=int, default=10_000, help="Stored backlog size (10k-1M)")
+    parser.add_argument("--profiles", default="ONLINE,INTERMITTENT,OFFLINE")
+    parser.add_argument("--max-seconds", type=float, default=60.0,
+                        help="Wall-clock cap per profile; drain time is projected beyond it")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    print(f"Backlog: {args.events} events")
+    print(f"{'profile':<14}{'sent':>10}{'retries':>9}{'events/s':>12}{'bytes/s':>12}{'B/event':>9}{'remaining':>10}{'drain s':>10}")
+    for name in args.profiles.split(","):
+        r = run_profile(NetworkStatus[name.strip()], args.events, args.max_seconds)
+        drain = f"{r['drain_s']:.1f}" if r["drain_s"] is not None else "never"
+        print(f"{r['status']:<14}{r['events']:>10}{r['retries']:>9}{r['events_per_s']:>12.0f}"
+              f"{r['bytes_per_s']:>12.0f}{r['bytes_per_event']:>9.1f}{r['pending']:>10}{drain:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import time
+
+from src.core.wire_format import encode_batch, decode_batch, json_size
+from workload import make_events
+
+
+def run(count: int):
+    events = make_events(count)
+    json_bytes = sum(json_size(e) for e in events)
+    print(f"Events: {count}")
+    print(f"{'format':<12}{'bytes':>12}{'bytes/event':>14}{'vs json':>10}{'encode ms':>12}{'decode ms':>12}")
+    print(f"{'json':<12}{json_bytes:>12}{json_bytes / count:>14.1f}{1.0:>10.2f}{'-':>12}{'-':>12}")
+
+    for codec in ("none", "zlib", "lzma"):
+        t0 = time.perf_counter()
+        frame = encode_batch(events, compression=codec)
+        t1 = time.perf_counter()
+        decode_batch(frame)
+        t2 = time.perf_counter()
+        print(f"{'ovb+' + codec:<12}{len(frame):>12}{len(frame) / count:>14.1f}"
+              f"{len(frame) / json_bytes:>10.2f}{(t1 - t0) * 1000:>12.1f}{(t2 - t1) * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bytes per event: JSON vs binary wire format")
+    parser.add_argument("--events", type=int, default=1000)
+    args = parser.parse_args()
+    run(args.events)
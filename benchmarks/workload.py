@@ -0,0 +1,83 @@
+import datetime
+import random
+import uuid
+
+from src.core.types import OceanEvent, EventType, RiskLevel, Evidence, VisionLabel
+
+
+def make_events(count: int, seed: int = 7, start: datetime.datetime = None):
+    """Synthetic events shaped like VisionAgent/BioConfirm output."""
+    rng = random.Random(seed)
+    labels = [l.value for l in VisionLabel]
+    risks = [RiskLevel.LOW, RiskLevel.MEDIUM, RiskLevel.HIGH]
+    ts = start or datetime.datetime(2026, 1, 6, 12, 0, 0)
+    frame_id = 100000
+    box = [100, 100, 260, 260]
+    events = []
+    for _ in range(count):
+        ts += datetime.timedelta(milliseconds=rng.randint(30, 400))
+        frame_id += rng.randint(1, 4)
+        box = [b + 2 for b in box]
+        events.append(OceanEvent(
+            event_id=f"DET_{uuid.UUID(int=rng.getrandbits(128)).hex[:12]}",
+            timestamp=ts,
+            event_type=EventType.UNKNOWN,
+            risk_level=rng.choice(risks),
+            confidence=round(rng.uniform(0.5, 0.99), 2),
+            evidence=Evidence(image_paths=["/tmp/mock_det.jpg"]),
+            label=rng.choice(labels),
+            box=box,
+            motion=(2.0, 2.0),
+            frame_id=frame_id,
+            evidence_frames=rng.randint(2, 20),
+        ))
+    return events
+
+
+def iter_event_batches(total: int, batch_size: int = 50_000, seed: int = 7):
+    """Yield `total` synthetic events in batches, without holding them all in memory."""
+    start = datetime.datetime(2026, 1, 6, 12, 0, 0)
+    produced = 0
+    while produced < total:
+        n = min(batch_size, total - produced)
+        batch = make_events(n, seed=seed + produced, start=start)
+        start = batch[-1].timestamp
+        produced += n
+        yield batch
+
+
+def make_detection_stream(objects: int, frames: int, seed: int = 7):
+    """VisionAgent-style detections: `objects` targets moving smoothly for `frames` frames.
+
+    Targets sit on a 250 px grid so each stays associated with its own
+    track; per frame, detections come out in a shuffled order.
+    """
+    rng = random.Random(seed)
+    labels = [VisionLabel.LARGE_MARINE_LIFE.value, VisionLabel.SMALL_MARINE_LIFE.value]
+    side = max(1, int(objects ** 0.5 + 0.999))
+    targets = []
+    for i in range(objects):
+        x, y = 250 * (i % side), 250 * (i // side)
+        w = rng.choice([60, 120, 200])
+        targets.append({"box": [x, y, x + w, y + w // 2], "motion": [rng.uniform(-2, 2), rng.uniform(-2, 2)],
+                        "label": rng.choice(labels)})
+
+    stream = []
+    ts = datetime.datetime(2026, 1, 6, 12, 0, 0)
+    for frame_id in range(1, frames + 1):
+        ts += datetime.timedelta(milliseconds=33)
+        rng.shuffle(targets)
+        for t in targets:
+            dx, dy = t["motion"]
+            t["box"] = [t["box"][0] + dx, t["box"][1] + dy, t["box"][2] + dx, t["box"][3] + dy]
+            stream.append(OceanEvent(
+                event_id=f"DET_{uuid.UUID(int=rng.getrandbits(128)).hex[:8]}",
+                timestamp=ts,
+                event_type=EventType.UNKNOWN,
+                risk_level=RiskLevel.UNKNOWN,
+                confidence=round(rng.uniform(0.6, 0.99), 2),
+                evidence=Evidence(image_paths=["/tmp/mock_det.jpg"]),
+                label=t["label"], box=[round(v, 1) for v in t["box"]],
+                motion=(round(dx, 2), round(dy, 2)), frame_id=frame_id,
+            ))
+    return stream
@@ -24,3 +24,94 @@ AUTO_CONFIRM_FRAMES = 5 # Number of consistent frames required for high confiden
 KEEP_LOGS_DAYS = 30
 KEEP_EVIDENCE_DAYS = 7 # Rolling window for non-critical
 KEEP_CRITICAL_FOREVER = True # Until manual offload
+EVIDENCE_STORE_FRACTION = 0.8 # Share of MAX_STORAGE_GB for the evidence store
+LOW_EVENT_SAMPLE_EVERY = 5 # "events_only" storage policy keeps 1 in N LOW risk events
+
+# --- Incident Recording ---
+PRE_EVENT_SECONDS = 10 # Frames kept in memory ahead of a HIGH risk event
+POST_EVENT_SECONDS = 5 # Frames appended after it
+PRE_EVENT_BUFFER_MB = 64 # Hard memory cap for the rolling buffer
+INCIDENT_CLIP_MB = 128 # Frames held by an open incident; it closes early at this size
+
+# --- Evidence Transcoding ---
+TRANSCODE_WORKERS = 2 # Process pool size (upper bound; strategy mode may lower it)
+TRANSCODE_NICENESS = 10 # Workers yield CPU to inference
+THUMBNAIL_MAX_EDGE = 160
+PREVIEW_MAX_EDGE = 640
+
+# --- Re-identification ---
+EMBEDDING_DIM = 64
+REID_INDEX_PATH = "ocean_data.reid.npz" # Saved next to the SQLite database
+REID_SIMILARITY = 0.85 # Cosine similarity to call two sightings the same individual
+REID_MERGE_WINDOW_SECONDS = 600 # Resurfacing within this window merges into the earlier track
+
+# --- Energy ---
+BATTERY_STATE_FILE = "battery_state.json" # Written by the power system (or by hand for tests)
+BATTERY_CAPACITY_WH = 2400
+ENDURANCE_TARGET_HOURS = 36 # e.g. time until next port call
+ENERGY_BASELINE_W = 12.0 # Compute board, camera and radio idle
+ENERGY_J_PER_INFERENCE = {"tiny": 0.4, "medium": 1.5, "large": 5.0}
+ENERGY_J_PER_FRAME = 0.2 # Capture + encode
+ENERGY_J_PER_UPLINK_BYTE = 5e-6 # Satellite modem transmit
+
+# --- Resource Monitoring ---
+THERMAL_ZONE_PATH = "/sys/class/thermal/thermal_zone0/temp"
+STORAGE_WARN_FREE_PCT = 10 # resource_warning below this, cleared above STORAGE_WARN_FREE_PCT + 2
+THERMAL_WARN_C = 80 # resource_warning above this, cleared below THERMAL_WARN_C - 5
+
+# --- Network Probing ---
+# Uplinks probed concurrently; empty -> simulated pings. Example:
+# [{"name": "satellite", "url": "http://shore.example:8080/probe", "cost": 3},
+#  {"name": "lte", "url": "http://10.0.0.1:8080/probe", "cost": 2}]
+PROBE_LINKS = []
+PROBE_INTERVAL_SECONDS = 1.0
+PROBE_TIMEOUT_SECONDS = 3.0
+BANDWIDTH_PROBE_EVERY = 10 # Every Nth probe also downloads BANDWIDTH_PROBE_BYTES
+BANDWIDTH_PROBE_BYTES = 32 * 1024
+
+# --- Logging ---
+LOG_FILE = "oceanviewer.log" # JSON lines, written by a background thread
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+LOG_RING_CAPACITY = 8192 # Records buffered before the oldest are overwritten
+# Keep 1 in N structured (per-frame / per-ping) records per logger; warnings always kept
+LOG_SAMPLE_EVERY = {"VisionAgent": 10, "BioConfirmAgent": 5, "NetStatusAgent": 10}
+
+# --- Tracing ---
+TRACE_MAX_LIVE = 4096 # Frames followed at once; the oldest are forgotten first
+TRACE_REPORT_SECONDS = 60
+ALERT_LATENCY_BUDGET_MS = 1000 # Frame capture -> bridge alert
+
+# --- Metrics ---
+METRICS_HOST = "0.0.0.0" # Scraped by the ship's monitoring box over the LAN
+METRICS_PORT = 9108 # 0 disables the endpoint
+
+# --- Profiling ---
+PROFILE_DIR = "profiles" # Collapsed-stack output (flamegraph.pl / speedscope)
+PROFILE_SECONDS = 30 # Window per trigger (SIGUSR2 or "profile" on the control socket)
+PROFILE_INTERVAL_MS = 10
+PROFILER_SOCKET = "oceanviewer.ctl" # Local Unix socket; empty disables
+
+# --- Supervision ---
+SHUTDOWN_DEADLINE_SECONDS = 20 # Drain queues, stop agents and flush storage within this
+SHUTDOWN_BATTERY_PCT = 3 # Orderly shutdown when discharging at or below this (before the power system cuts out)
+
+# --- Cameras ---
+# One inference process per camera; empty -> a single in-process camera. Example:
+# [{"id": "bow"}, {"id": "port"}, {"id": "starboard"}, {"id": "thermal", "cpus": [3]}]
+CAMERAS = []
+CAMERA_PIN_CPUS = True # Pin each camera process to its own CPU (round-robin unless "cpus" given)
+CAMERA_HANDOFF_SECONDS = 5.0 # A confirmed target reappearing on another camera within this keeps its identity
+
+# --- Uplink ---
+UPLINK_URL = "" # Shore fleet ingest, e.g. "http://shore.example:8080/ingest"; empty keeps every event local
+UPLINK_TIMEOUT_SECONDS = 30
+BACKLOG_DRAIN_SECONDS = 30 # While a link is up, stored unsynced events are retried this often
+EVIDENCE_UPLOAD_DB = "evidence_upload.db" # Chunk plan and progress; uploads resume after a reboot
+
+# --- Shore (fleet ingest) ---
+# Run on shore: python -m src.shore.fleet_ingest; nodes are told apart by SYSTEM_ID
+FLEET_INGEST_HOST = "0.0.0.0"
+FLEET_INGEST_PORT = 8080
+FLEET_DB_PATH = "fleet_events.db"
+FLEET_EVIDENCE_DIR = "fleet_evidence" # Chunked evidence uploads, reassembled per file
@@ -1,74 +1,155 @@
+import argparse
 import time
 import logging
+import signal
 import sys
+import tempfile
 import threading
 from src.core.event_bus import EventBus
 from src.core.types import NetworkStatus
 from src.database.storage import StorageManager
 from src.agents.net_status_agent import NetStatusAgent
 from src.agents.vision_agent import VisionAgent
+from src.agents.camera_manager import CameraManager, parse_cameras
 from src.agents.bioconfirm_agent import BioConfirmAgent
 from src.agents.risk_agent import RiskAgent
 from src.agents.sync_agent import SyncAgent
 from src.agents.strategy_agent import StrategyAgent
 from src.agents.alert_agent import AlertAgent
+from src.agents.resource_monitor import ResourceMonitor
 from src.database.storage import StorageManager
+from src.database.retention import RetentionEngine
+from src.database.evidence_store import EvidenceStore
+from src.database.reid_index import ReIdIndex
+from src.database.ingest_filter import IngestFilter
+from src.core.energy import EnergyModel, EnergyPlanner, FileBatterySource
+from src.agents.incident_recorder import IncidentRecorder
+from src.agents.transcode_agent import TranscodeAgent
+from src.uplink.uplink_client import UplinkClient
+from src.uplink.evidence_upload import ChunkedUploader, HttpEvidenceTransport
+from src.core.structured_log import setup_logging
+from src.core.tracing import tracer
+from src.core.metrics import MetricsServer, registry
+from src.core.profiler import ProfilerControl
+from src.core.supervisor import Supervisor
 import config
 
-# Setup Logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(name)s] %(levelname)s: %(message)s',
-    handlers=[
-        logging.FileHandler("oceanviewer.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger("Main")
+log_writer = None
 
 def main():
     logger.info("Starting OceanViewer 0.1.0-MVP - System ID: OV_NODE_001")
     
     # Core
     event_bus = EventBus()
-    storage = StorageManager() # Init Storage
+    evidence_store = EvidenceStore("evidence_store") # Deduplicated frames/clips, budgeted
+    storage = StorageManager(evidence_store=evidence_store) # Init Storage; retains the evidence its events reference
+    evidence_store.attach(event_bus)
+    retention = RetentionEngine(storage, event_bus, evidence_store=evidence_store) # Enforces KEEP_*_DAYS / MAX_STORAGE_GB
+    cameras = [c.id for c in parse_cameras(config.CAMERAS)]
+    # Pre/post-event clips for HIGH risk (one recorder per camera, each clipping its own events)
+    incident_recorders = {cam: IncidentRecorder(event_bus, evidence_store, storage, camera_id=cam) for cam in cameras} \
+        or {None: IncidentRecorder(event_bus, evidence_store, storage)}
+    transcoder = TranscodeAgent(event_bus, evidence_store, storage) # Thumbnail/preview renditions off the inference thread
     
     # Agents (Init)
     # Order implies dependency graph roughly:
     # NetStatus -> Strategy
     # Vision -> BioConfirm -> Risk -> Alert -> Strategy -> Vision (Feedback)
     
-    net_agent = NetStatusAgent(event_bus)
-    vision_agent = VisionAgent(event_bus)
-    bio_agent = BioConfirmAgent(event_bus)
+    net_agent = NetStatusAgent(event_bus, links=config.PROBE_LINKS)
+    if cameras:
+        # One inference process per camera, pinned to its own CPU
+        vision_agent = CameraManager(event_bus, config.CAMERAS, evidence_store, frame_sinks=incident_recorders)
+    else:
+        vision_agent = VisionAgent(event_bus, evidence_store, frame_sink=incident_recorders[None])
+    reid_index = ReIdIndex.load(config.REID_INDEX_PATH, config.EMBEDDING_DIM) # Known individuals
+    bio_agent = BioConfirmAgent(event_bus, reid_index)
     risk_agent = RiskAgent(event_bus)
     alert_agent = AlertAgent(event_bus) # New Alert System
-    sync_agent = SyncAgent(event_bus, storage) # Pass Storage
-    strategy_agent = StrategyAgent(event_bus) # Strategy Controller init last to catch up
+    ingest_filter = IngestFilter(event_bus, evidence_store) # Follows SystemStrategy.storage_policy
+    battery_source = FileBatterySource()
+    energy_planner = EnergyPlanner(EnergyModel(), battery_source) # Endurance target
+    uplink, evidence_uploader = None, None
+    if config.UPLINK_URL:
+        # Both count their transmitted bytes into the energy model's uplink draw
+        uplink = UplinkClient(config.UPLINK_URL, timeout=config.UPLINK_TIMEOUT_SECONDS,
+                              energy=energy_planner.model) # Event batches to shore
+        evidence_uploader = ChunkedUploader(config.EVIDENCE_UPLOAD_DB, # Resumable evidence upload, same host
+                                            HttpEvidenceTransport(config.UPLINK_URL, config.UPLINK_TIMEOUT_SECONDS,
+                                                                  energy=energy_planner.model),
+                                            evidence_store=evidence_store)
+    sync_agent = SyncAgent(event_bus, storage, evidence_uploader=evidence_uploader, uplink=uplink,
+                           ingest_filter=ingest_filter) # Sends on its own thread; drains the backlog while idle
+    strategy_agent = StrategyAgent(event_bus, energy_planner=energy_planner, cameras=cameras) # Strategy Controller init last to catch up
+    resource_monitor = ResourceMonitor(event_bus, battery_source=battery_source)
+    metrics_server = MetricsServer(registry, config.METRICS_HOST, config.METRICS_PORT) if config.METRICS_PORT else None
+    profiler_control = ProfilerControl(event_bus) # On-demand sampling profile: SIGUSR2 or control socket
 
-    # Start
+    # Supervision: dependency-ordered parallel start, health checks, bounded shutdown
+    supervisor = Supervisor(event_bus)
+    supervisor.add("retention", retention, stale_after=3 * retention.PASS_INTERVAL_SECONDS)
+    recorder_names = [f"incident_recorder_{cam}" if cam else "incident_recorder" for cam in incident_recorders]
+    for name, recorder in zip(recorder_names, incident_recorders.values()):
+        supervisor.add(name, recorder, stale_after=10)
+    supervisor.add("transcoder", transcoder) # Thumbnail/preview renditions; drained on shutdown
+    supervisor.add("alert", alert_agent)
+    supervisor.add("sync", sync_agent) # Uplink sends and backlog drain; queued sends drained on shutdown
+    if evidence_uploader:
+        supervisor.add("evidence_upload", evidence_uploader)
+    supervisor.add("resource_monitor", resource_monitor, stale_after=10) # Cached probes; publishes resource_update only on change
+    supervisor.add("net", net_agent, stale_after=15)
+    # Producers last: every consumer of frames and events is up before the first frame
+    supervisor.add("vision", vision_agent, after=("transcoder", "alert", "sync", *recorder_names), stale_after=10)
+    if metrics_server:
+        supervisor.add("metrics", metrics_server, restart=False) # Prometheus text on /metrics
+    supervisor.add("profiler", profiler_control, restart=False)
+    supervisor.on_shutdown("reid_index", reid_index.save)
+    supervisor.on_shutdown("evidence_store", evidence_store.close)
+
+    signal.signal(signal.SIGTERM, lambda *_: supervisor.request_shutdown("SIGTERM")) # Power system / service manager
     try:
-        net_agent.start()
-        vision_agent.start()
-        bio_agent.start() # Runs internal loop
-        sync_agent.start()
-        alert_agent.start()
-        
-        # Resource agent logic is mostly event-driven but has a check loop
-        # We can add a periodic resource check to the main loop or dedicated thread
-        # For MVP, let's just trigger it once
-        strategy_agent.check_resources()
+        supervisor.start()
+        profiler_control.install_signal()
         
-        while True:
-            time.sleep(1)
-            strategy_agent.check_resources() # Periodic System Check
+        last_report = time.monotonic()
+        while not supervisor.wait_for_shutdown(1):
+            if time.monotonic() - last_report >= config.TRACE_REPORT_SECONDS:
+                tracer.log_summary() # Per-stage p50/p99, warns when alerts run over budget
+                last_report = time.monotonic()
             
     except KeyboardInterrupt:
         logger.info("Shutdown signal received.")
-        logger.info("Stopping agents...")
-        vision_agent.stop()
-        net_agent.stop()
-        logger.info("System halted.")
+    logger.info("Stopping agents...")
+    supervisor.shutdown() # Producers first, queues drained, storage flushed, within SHUTDOWN_DEADLINE_SECONDS
+    logger.info("System halted.")
+    log_writer.stop() # Flush what is still in the ring
+
+def headless(hours: float, workdir: str, report_hours: float, seed=None):
+    from src.headless import HeadlessRun
+    logger.info(f"Headless soak: {hours} simulated hours on a virtual clock, data in {workdir}")
+    run = HeadlessRun(workdir, seed=seed)
+    try:
+        for report in run.run(hours, report_every=report_hours * 3600):
+            print(report)
+    finally:
+        run.close()
+        log_writer.stop()
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="OceanViewer edge node")
+    parser.add_argument("--headless", action="store_true",
+                        help="Run the pipeline on a virtual clock, as fast as the CPU allows (soak tests)")
+    parser.add_argument("--hours", type=float, default=24.0, help="Simulated hours (headless)")
+    parser.add_argument("--report-hours", type=float, default=1.0, help="Simulated hours between soak reports")
+    parser.add_argument("--workdir", help="Database/evidence directory (headless; default: a temp dir)")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    # Setup Logging (ring buffer + background writer; hot paths never touch the file).
+    # Here, not at import: camera processes re-import this module and must not open the log.
+    log_writer = setup_logging()
+    if args.headless:
+        headless(args.hours, args.workdir or tempfile.mkdtemp(prefix="oceanviewer-soak-"),
+                 args.report_hours, args.seed)
+    else:
+        main()
@@ -1,19 +1,24 @@
 import logging
 import json
-import time
 from src.core.event_bus import EventBus
 from src.core.types import RiskLevel
+from src.core.tracing import tracer
+from src.core.metrics import registry
+from src.core.clock import Clock, SYSTEM_CLOCK
 
 logger = logging.getLogger("AlertAgent")
 
+alerts_raised = registry.counter("alerts_total", "Alerts raised to the bridge", ["level"])
+alerts_suppressed = registry.counter("alerts_suppressed_total", "Duplicate alerts held back by the cooldown")
+
 class AlertAgent:
-    def __init__(self, event_bus: EventBus):
+    def __init__(self, event_bus: EventBus, clock: Clock = SYSTEM_CLOCK):
         self.bus = event_bus
+        self.clock = clock
         self.bus.subscribe("risk_assessment", self.process_risk)
         
-        # Deduplication state
-        self.last_alert_time = 0
-        self.last_alert_key = None # (risk_level, reason)
+        # Deduplication state: (risk_level, reason, target) -> time of its last alert
+        self.recent_alerts = {}
         self.COOLDOWN_SECONDS = 10 
 
     def start(self):
@@ -40,13 +45,17 @@ class AlertAgent:
             if risk_level not in [RiskLevel.HIGH, RiskLevel.MEDIUM]:
                 return
 
-            # Deduplication
-            current_key = (risk_level, reason)
-            now = time.time()
+            # Deduplication per target: one individual handed between cameras is one alert;
+            # without an identity, per camera (the same hazard on two cameras is two alerts)
+            camera_id = payload.get("camera_id")
+            current_key = (risk_level, reason, payload.get("individual_id") or camera_id)
+            now = self.clock.time()
+            self.recent_alerts = {k: t for k, t in self.recent_alerts.items()
+                                  if now - t < self.COOLDOWN_SECONDS}
             
-            if current_key == self.last_alert_key:
-                if (now - self.last_alert_time) < self.COOLDOWN_SECONDS:
-                    return # Suppress duplicate
+            if current_key in self.recent_alerts:
+                alerts_suppressed.inc()
+                return # Suppress duplicate
             
             # Actionable Mapping
             alert_type = "NAVIGATION_WARNING"
@@ -61,19 +70,24 @@ class AlertAgent:
             # Generate Alert Message
             # reason comes from RiskAgent, e.g., "Large organic target in close proximity."
             full_message = f"{reason} {recommendation}"
+            if camera_id:
+                full_message = f"[{camera_id}] {full_message}"
             
             # Log for UI/Crew (keep human readable log)
             logger.warning(f"[{level}] {full_message}")
             
             # Update state
-            self.last_alert_time = now
-            self.last_alert_key = current_key
+            self.recent_alerts[current_key] = now
             
+            alerts_raised.labels(level).inc()
+            tracer.mark(payload.get("trace_id"), "alert", after="risk")
+
             # Publish for UI consumption
             self.bus.publish("alert_event", {
                 "alert_type": alert_type,
                 "level": level,
                 "message": full_message,
+                "camera_id": camera_id,
                 "timestamp": now
             })
 
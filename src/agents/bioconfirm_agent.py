@@ -1,25 +1,51 @@
 from src.core.event_bus import EventBus
 from src.core.types import OceanEvent, RiskLevel, VisionLabel
+from src.core.tracing import tracer
+from src.core.metrics import registry
+from src.core.clock import Clock, SYSTEM_CLOCK
 import logging
-import time
 import math
-import json
+import uuid
+import config
 from collections import deque
 
 logger = logging.getLogger("BioConfirmAgent")
 
+tracks_alive = registry.gauge("tracks_alive", "Candidate and confirmed tracks currently followed")
+confirmations = registry.counter("confirmations_total", "Tracks confirmed as living targets")
+detections_dropped = registry.counter("detections_dropped_total", "Detections whose track expired unconfirmed")
+handoffs = registry.counter("camera_handoffs_total", "Confirmed targets carried over to another camera's track")
+
+def _cosine(a, b):
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
 class TrackCandidate:
-    def __init__(self, metadata, first_timestamp):
-        self.id = metadata.get('frame_id', 0) # Use frame_id as temp initial ID, or strictly internal uuid
-        self.history = deque(maxlen=20)
-        self.history.append(metadata)
+    def __init__(self, event, first_timestamp):
+        self.id = event.frame_id or 0 # Use frame_id as temp initial ID, or strictly internal uuid
+        self.camera_id = event.camera_id # Boxes are only comparable within one camera
+        self.history = deque(maxlen=20) # The detection events themselves (immutable, so kept as is)
+        self.history.append(event)
         self.first_seen = first_timestamp
         self.last_seen = first_timestamp
         self.confirmed = False
+        self.individual_id = None # Set on confirmation or re-identification
+        self.embeddings = deque(maxlen=20)
         
-    def add_observation(self, metadata, timestamp):
-        self.history.append(metadata)
+    def add_observation(self, event, timestamp):
+        self.history.append(event)
         self.last_seen = timestamp
+
+    def add_embedding(self, vector):
+        if vector:
+            self.embeddings.append(vector)
+
+    def mean_embedding(self):
+        if not self.embeddings:
+            return None
+        n = len(self.embeddings)
+        return [sum(col) / n for col in zip(*self.embeddings)]
         
     def check_consistency(self, min_frames):
         # 1. Multi-frame requirement
@@ -28,7 +54,7 @@ class TrackCandidate:
             
         # 2. Motion Consistency
         # Calculate variance of motion vectors
-        motions = [h.get('motion', [0,0]) for h in self.history]
+        motions = [h.motion or (0, 0) for h in self.history]
         dxs = [m[0] for m in motions]
         dys = [m[1] for m in motions]
         
@@ -50,24 +76,37 @@ class TrackCandidate:
         # 3. Exclude "Non-Living" labels specifically if we want, but user said "Is it living?"
         # The Vision agent outputs "non_living_object", we should theoretically filter that out upstream 
         # OR handle here. If Vision says "non_living", we probably shouldn't confirm it as "Bio".
-        latest_label = self.history[-1].get('raw_label')
+        latest_label = self.history[-1].label
         if latest_label == "non_living_object":
             return False
 
         return True
 
 class BioConfirmAgent:
-    def __init__(self, event_bus: EventBus):
+    def __init__(self, event_bus: EventBus, reid_index=None, clock: Clock = SYSTEM_CLOCK):
         self.bus = event_bus
+        self.clock = clock
+        self.reid_index = reid_index # Optional ReIdIndex: recognises individuals seen before
         self.bus.subscribe("vision_detection", self.on_vision_detection)
         self.bus.subscribe("system_strategy_update", self.on_strategy_update)
         
         self.tracks = [] 
+        tracks_alive.set_function(lambda: len(self.tracks))
         self.required_consecutive_frames = 4 # Default
         
         # Config
         self.MATCH_THRESHOLD = 50 
         self.MAX_DROPOUT = 2.0 
+        self.REID_SIMILARITY = config.REID_SIMILARITY
+        self.REID_MERGE_WINDOW = config.REID_MERGE_WINDOW_SECONDS
+        self.HANDOFF_SECONDS = config.CAMERA_HANDOFF_SECONDS
+
+        # Confirmed tracks that ended recently, still eligible for a camera handoff
+        self.ended = deque(maxlen=32)
+
+        # Stats
+        self.merged_tracks = 0
+        self.handoffs = 0
 
     def on_strategy_update(self, strategy: dict):
         new_frames = strategy.get("confirm_frames", 4)
@@ -77,15 +116,17 @@ class BioConfirmAgent:
 
     def on_vision_detection(self, event: OceanEvent):
         # Determine if this detection matches an existing track
-        det_box = event.metadata.get("box")
+        det_box = event.box
         det_center = ((det_box[0] + det_box[2])/2, (det_box[1] + det_box[3])/2)
-        timestamp = time.time()
+        timestamp = self.clock.time()
+        camera_id = event.camera_id
         
         matched_track = None
         for track in self.tracks:
+            if track.camera_id != camera_id:
+                continue
             # Get last known center
-            last_meta = track.history[-1]
-            last_box = last_meta.get("box")
+            last_box = track.history[-1].box
             last_center = ((last_box[0] + last_box[2])/2, (last_box[1] + last_box[3])/2)
             
             dist = math.hypot(det_center[0] - last_center[0], det_center[1] - last_center[1])
@@ -95,36 +136,104 @@ class BioConfirmAgent:
                 break
         
         if matched_track:
-            # Inject confidence into metadata for history tracking
-            meta_with_conf = event.metadata.copy()
-            meta_with_conf['confidence'] = event.confidence
-            matched_track.add_observation(meta_with_conf, timestamp)
+            matched_track.add_observation(event, timestamp)
+            matched_track.add_embedding(event.evidence.feature_vectors)
             
             # Re-evaluate
             if not matched_track.confirmed:
-                if matched_track.check_consistency(self.required_consecutive_frames):
+                if self._handoff(matched_track, timestamp) or self._reidentify(matched_track, timestamp):
+                    # Known target, so no re-confirmation; its box and motion here still need
+                    # assessing (tagged with its individual_id, so alerts dedupe)
+                    self._publish_confirmation(event, matched_track)
+                elif matched_track.check_consistency(self.required_consecutive_frames):
                     matched_track.confirmed = True
                     self._publish_confirmation(event, matched_track)
                 else:
-                    logger.info(f"BioConfirm: Track {matched_track.id} updated but Unconfirmed (Frames: {len(matched_track.history)})")
+                    logger.info("track_unconfirmed", extra={"fields": {
+                        "track_id": matched_track.id, "frames": len(matched_track.history)}})
         else:
             # Single frame cannot be confirmed
-            logger.info(f"BioConfirm: New Candidate initialized (Unconfirmed)")
+            logger.info("track_candidate", extra={"fields": {"frames": 1}})
             
-            meta_with_conf = event.metadata.copy()
-            meta_with_conf['confidence'] = event.confidence
-            new_track = TrackCandidate(meta_with_conf, timestamp)
+            new_track = TrackCandidate(event, timestamp)
+            new_track.add_embedding(event.evidence.feature_vectors)
             self.tracks.append(new_track)
+            if self._handoff(new_track, timestamp) or self._reidentify(new_track, timestamp):
+                self._publish_confirmation(event, new_track)
 
         # Cleanup old tracks
-        self.tracks = [t for t in self.tracks if timestamp - t.last_seen < self.MAX_DROPOUT]
+        active = []
+        for t in self.tracks:
+            if timestamp - t.last_seen < self.MAX_DROPOUT:
+                active.append(t)
+            else:
+                if not t.confirmed:
+                    detections_dropped.inc(len(t.history))
+                elif t.camera_id:
+                    self.ended.append(t)
+                if t.individual_id and self.reid_index is not None:
+                    # Track ended: remember its appearance for the next resurfacing
+                    self._remember(t)
+        self.tracks = active
+
+    def _remember(self, track):
+        embedding = track.mean_embedding()
+        if embedding:
+            self.reid_index.add(track.individual_id, embedding, track.last_seen)
+
+    def _handoff(self, track, timestamp) -> bool:
+        """Carry a target confirmed on another camera over to this track (it crossed fields of view)."""
+        if not track.camera_id:
+            return False
+        embedding = track.mean_embedding()
+        if not embedding:
+            return False
+        best, best_similarity = None, self.REID_SIMILARITY
+        for other in list(self.tracks) + list(self.ended):
+            if not other.confirmed or other.camera_id in (None, track.camera_id) \
+                    or timestamp - other.last_seen > self.HANDOFF_SECONDS:
+                continue
+            other_embedding = other.mean_embedding()
+            if not other_embedding:
+                continue
+            similarity = _cosine(embedding, other_embedding)
+            if similarity >= best_similarity:
+                best, best_similarity = other, similarity
+        if best is None:
+            return False
+        track.confirmed = True
+        track.individual_id = best.individual_id
+        self.handoffs += 1
+        handoffs.inc()
+        logger.info(f"BioConfirm: Track {track.id} on {track.camera_id} continues track {best.id} "
+                    f"from {best.camera_id} (similarity {best_similarity:.2f}); handed off")
+        return True
+
+    def _reidentify(self, track, timestamp) -> bool:
+        """Merge an unconfirmed track into a recently seen individual, skipping re-confirmation."""
+        if self.reid_index is None:
+            return False
+        embedding = track.mean_embedding()
+        if not embedding:
+            return False
+        matches = self.reid_index.query(embedding, k=1, min_similarity=self.REID_SIMILARITY,
+                                        since=timestamp - self.REID_MERGE_WINDOW)
+        if not matches:
+            return False
+        individual_id, similarity, last_seen = matches[0]
+        track.individual_id = individual_id
+        track.confirmed = True
+        self.merged_tracks += 1
+        logger.info(f"BioConfirm: Track {track.id} re-identified as {individual_id} "
+                    f"(similarity {similarity:.2f}, last seen {timestamp - last_seen:.0f}s ago); merged")
+        return True
 
     def _publish_confirmation(self, original_event, track):
         # Calculate average confidence
-        avg_confidence = sum([m.get("confidence", 0) for m in track.history]) / len(track.history)
+        avg_confidence = sum([h.confidence for h in track.history]) / len(track.history)
         
         # Latest category
-        category = track.history[-1].get("raw_label", "unknown")
+        category = track.history[-1].label or "unknown"
         
         output_payload = {
             "confirmed": True,
@@ -133,11 +242,21 @@ class BioConfirmAgent:
             "evidence_frames": len(track.history)
         }
         
-        # STRICT JSON OUTPUT
-        logger.info(json.dumps(output_payload))
+        # STRICT JSON OUTPUT (serialized by the log writer thread)
+        logger.info("confirmed", extra={"fields": output_payload})
         
-        # Retain original ID or assign a persistent Track ID? 
-        # For now, pass the event downstream as "Confirmed"
-        # We might want to enrich the event metadata with the evidence count
-        original_event.metadata["evidence_frames"] = len(track.history)
-        self.bus.publish("confirmed_event", original_event)
+        # Pass a confirmed copy downstream, enriched with the evidence count
+        # (the detection itself is shared with the other vision_detection subscribers)
+        # Every confirmed target gets an individual id; a handed-off track keeps the one it carries
+        new_individual = track.individual_id is None
+        if new_individual:
+            track.individual_id = f"IND_{uuid.uuid4().hex[:8]}"
+        changes = {"evidence_frames": len(track.history), "individual_id": track.individual_id}
+        if self.reid_index is not None:
+            changes["evidence"] = original_event.evidence.replace(feature_vectors=track.mean_embedding())
+            if new_individual:
+                self._remember(track)
+        confirmed_event = original_event.replace(**changes)
+        confirmations.inc()
+        tracer.mark(confirmed_event.trace_id, "bioconfirm", after="vision")
+        self.bus.publish("confirmed_event", confirmed_event)
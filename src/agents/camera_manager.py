@@ -0,0 +1,233 @@
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import config
+from src.core.event_bus import EventBus
+from src.core.tracing import tracer
+from src.database.evidence_store import EvidenceStore
+from src.agents.vision_agent import (VisionAgent, build_detection_event, detections_total,
+                                     frames_late, frames_processed)
+
+logger = logging.getLogger("CameraManager")
+
+
+@dataclass
+class CameraConfig:
+    id: str  # e.g. "bow", "port", "starboard", "thermal"
+    cpus: Optional[Tuple[int, ...]] = None  # Pinned CPUs; None = assigned round-robin
+
+
+def parse_cameras(entries: List) -> List[CameraConfig]:
+    """CameraConfigs from config.CAMERAS entries (ids, dicts or CameraConfig)."""
+    cameras = []
+    for e in entries:
+        if isinstance(e, str):
+            e = CameraConfig(e)
+        elif isinstance(e, dict):
+            e = CameraConfig(**e)
+        if e.cpus is not None:
+            e.cpus = tuple(e.cpus)
+        cameras.append(e)
+    return cameras
+
+
+def assign_cpus(cameras: Sequence[CameraConfig], available: Sequence[int]) -> Dict[str, Tuple[int, ...]]:
+    """One CPU per camera without an explicit set; the first CPU stays with the main process if spare."""
+    available = sorted(available)
+    pool = available[1:] if len(available) > len(cameras) else available
+    out, i = {}, 0
+    for cam in cameras:
+        if cam.cpus is not None:
+            out[cam.id] = cam.cpus
+        elif pool:
+            out[cam.id] = (pool[i % len(pool)],)
+            i += 1
+    return out
+
+
+class _FrameForwarder:
+    def __init__(self, camera_id: str, out):
+        self.camera_id = camera_id
+        self.out = out
+
+    def add_frame(self, frame_id: int, data: bytes, ts: Optional[float] = None):
+        self.out.put(("frame", self.camera_id, frame_id, data, ts))
+
+
+class _WorkerVisionAgent(VisionAgent):
+    """VisionAgent inside a camera process: detections go to the parent, not a bus."""
+
+    def __init__(self, camera_id: str, out, forward_frames: bool):
+        super().__init__(EventBus(), frame_sink=_FrameForwarder(camera_id, out) if forward_frames else None,
+                         camera_id=camera_id)
+        self.out = out
+        self.bus.subscribe("pipeline_metrics", lambda m: out.put(("metrics", camera_id, m)))
+
+    def _publish_internal_event(self, primary_detection, frame: Optional[bytes] = None,
+                                captured_at: Optional[float] = None):
+        frame = frame or self._capture_frame([primary_detection])  # The parent stores the evidence
+        self.out.put(("detection", self.camera_id, self.frame_id, primary_detection, frame,
+                      captured_at, self.clock.time()))
+
+
+def _camera_worker(camera_id: str, cpus, out, control, strategy: dict, forward_frames: bool):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # The parent decides when cameras stop
+    if cpus and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, cpus)
+        except OSError as e:
+            logger.warning(f"Camera {camera_id}: could not pin to CPUs {cpus}: {e}")
+    agent = _WorkerVisionAgent(camera_id, out, forward_frames)
+    if strategy:
+        agent.on_strategy_update(strategy)
+    agent.start()
+    try:
+        while True:
+            message = control.get()
+            if message is None:
+                break
+            agent.on_strategy_update(message)
+    finally:
+        agent.stop()
+
+
+class CameraManager:
+    """Runs one inference process per camera, each pinned to its own CPUs.
+
+    Workers are VisionAgents in spawned processes; their detections, frames
+    and pipeline_metrics come back over one bounded queue (a stalled parent
+    backs the cameras up instead of growing memory). The parent stores the
+    evidence, tags events and metrics with the camera id and publishes them,
+    so the rest of the pipeline is unchanged. Strategy updates are forwarded
+    to every worker, which picks its own entry from strategy["cameras"].
+    """
+
+    def __init__(self, event_bus: EventBus, cameras: Sequence, evidence_store: Optional[EvidenceStore] = None,
+                 frame_sinks: Optional[Dict[str, object]] = None, pin_cpus: bool = config.CAMERA_PIN_CPUS):
+        self.bus = event_bus
+        self.cameras = parse_cameras(cameras)
+        self.evidence_store = evidence_store
+        self.frame_sinks = frame_sinks or {}  # camera id -> e.g. IncidentRecorder
+        available = os.sched_getaffinity(0) if hasattr(os, "sched_getaffinity") else []
+        self.cpus = assign_cpus(self.cameras, available) if pin_cpus else {}
+
+        self._ctx = multiprocessing.get_context("spawn")
+        self._out = None
+        self._workers: Dict[str, tuple] = {}  # camera id -> (process, control queue)
+        self._strategy: dict = {}  # Latest strategy, replayed to workers that (re)start
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.heartbeat = None
+
+        # Config
+        self.QUEUE_SIZE = 1000
+        self.POLL_SECONDS = 0.5
+        self.STOP_TIMEOUT = 5.0
+
+        # Stats
+        self.detections: Dict[str, int] = {c.id: 0 for c in self.cameras}
+
+        self.bus.subscribe("system_strategy_update", self.on_strategy_update)
+
+    # --- Lifecycle ---
+
+    def start(self):
+        self._stop_event.clear()
+        self._out = self._ctx.Queue(self.QUEUE_SIZE)
+        for cam in self.cameras:
+            self._start_worker(cam)
+        self._thread = threading.Thread(target=self._receive_loop, name="CameraManager", daemon=True)
+        self._thread.start()
+        logger.info(f"Camera workers started: " +
+                    ", ".join(f"{c.id} (cpus {list(self.cpus.get(c.id, [])) or 'any'})" for c in self.cameras))
+
+    def _start_worker(self, cam: CameraConfig):
+        control = self._ctx.Queue()
+        process = self._ctx.Process(
+            target=_camera_worker, name=f"camera-{cam.id}", daemon=True,
+            args=(cam.id, self.cpus.get(cam.id), self._out, control, self._strategy,
+                  cam.id in self.frame_sinks))
+        process.start()
+        self._workers[cam.id] = (process, control)
+
+    def stop(self):
+        for process, control in self._workers.values():
+            if process.is_alive():
+                control.put(None)
+        deadline = time.monotonic() + self.STOP_TIMEOUT
+        for camera_id, (process, _) in self._workers.items():
+            process.join(max(deadline - time.monotonic(), 0.0))
+            if process.is_alive():
+                logger.warning(f"Camera {camera_id} worker did not stop; terminating")
+                process.terminate()
+                process.join(1.0)
+        # Workers are gone: whatever they queued is the last input
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join()
+        self._workers = {}
+
+    def is_alive(self) -> bool:
+        return bool(self._thread and self._thread.is_alive()) and \
+            all(process.is_alive() for process, _ in self._workers.values())
+
+    # --- Control ---
+
+    def on_strategy_update(self, strategy: dict):
+        self._strategy = strategy
+        for process, control in list(self._workers.values()):
+            if process.is_alive():
+                control.put(strategy)
+
+    # --- Results ---
+
+    def _receive_loop(self):
+        while True:
+            try:
+                message = self._out.get(timeout=self.POLL_SECONDS)
+            except queue.Empty:
+                if self._stop_event.is_set():
+                    return
+                continue
+            self.heartbeat = time.monotonic()
+            try:
+                self._dispatch(message)
+            except Exception as e:
+                logger.error(f"Camera message {message[0]} from {message[1]} failed: {e}")
+
+    def _dispatch(self, message):
+        kind, camera_id = message[0], message[1]
+        if kind == "detection":
+            _, _, frame_id, detection, frame, captured_at, ts = message
+            self._publish_detection(camera_id, frame_id, detection, frame, captured_at, ts)
+        elif kind == "frame":
+            _, _, frame_id, data, ts = message
+            sink = self.frame_sinks.get(camera_id)
+            if sink:
+                sink.add_frame(frame_id, data, ts)
+        elif kind == "metrics":
+            metrics = message[2]
+            frames_processed.inc(metrics.get("frames", 0))
+            frames_late.inc(metrics.get("backlog", 0))
+            self.bus.publish("pipeline_metrics", metrics)
+
+    def _publish_detection(self, camera_id: str, frame_id: int, detection: dict, frame: Optional[bytes],
+                           captured_at: Optional[float], ts: float):
+        if self.evidence_store and frame:
+            image_path = self.evidence_store.put(frame)
+        else:
+            image_path = "/tmp/mock_det.jpg"
+        event = build_detection_event(detection, frame_id, image_path, datetime.fromtimestamp(ts), camera_id)
+        self.detections[camera_id] += 1
+        detections_total.inc()
+        tracer.start(event.trace_id, at=captured_at)  # CLOCK_MONOTONIC is system-wide
+        tracer.mark(event.trace_id, "vision")
+        self.bus.publish("vision_detection", event)
@@ -0,0 +1,227 @@
+from src.core.event_bus import EventBus
+from src.core.types import OceanEvent, RiskLevel
+from src.database.evidence_store import EvidenceStore
+from src.database.storage import StorageManager
+from src.core.clock import Clock, SYSTEM_CLOCK
+from collections import deque
+from typing import List, Optional
+import config
+import logging
+import queue
+import struct
+import threading
+import time
+
+logger = logging.getLogger("IncidentRecorder")
+
+CLIP_MAGIC = b"OVCLIP1\n"
+
+
+def encode_clip(frames) -> bytes:
+    """Pack (timestamp, frame_id, bytes) frames into a simple MJPEG-style container."""
+    parts = [CLIP_MAGIC, struct.pack("<I", len(frames))]
+    for ts, frame_id, data in frames:
+        parts.append(struct.pack("<dqI", ts, frame_id, len(data)))
+        parts.append(data)
+    return b"".join(parts)
+
+
+def decode_clip(blob: bytes):
+    if not blob.startswith(CLIP_MAGIC):
+        raise ValueError("Not an OceanViewer clip")
+    pos = len(CLIP_MAGIC)
+    (count,) = struct.unpack_from("<I", blob, pos)
+    pos += 4
+    frames = []
+    for _ in range(count):
+        ts, frame_id, length = struct.unpack_from("<dqI", blob, pos)
+        pos += struct.calcsize("<dqI")
+        frames.append((ts, frame_id, blob[pos:pos + length]))
+        pos += length
+    return frames
+
+
+class FrameRing:
+    """Recent encoded frames, bounded by age and by total bytes."""
+
+    def __init__(self, max_seconds: float, max_bytes: int):
+        self.max_seconds = max_seconds
+        self.max_bytes = max_bytes
+        self._frames = deque()
+        self.bytes = 0
+
+    def append(self, ts: float, frame_id: int, data: bytes):
+        self._frames.append((ts, frame_id, data))
+        self.bytes += len(data)
+        while self._frames and (self.bytes > self.max_bytes or ts - self._frames[0][0] > self.max_seconds):
+            self.bytes -= len(self._frames.popleft()[2])
+
+    def since(self, ts: float) -> List[tuple]:
+        return [f for f in self._frames if f[0] >= ts]
+
+    def __len__(self):
+        return len(self._frames)
+
+
+class _Incident:
+    def __init__(self, event: OceanEvent, frames, deadline: float):
+        self.events = [event]
+        self.frames = frames
+        self.bytes = sum(len(f[2]) for f in frames)
+        self.deadline = deadline
+        self.started = frames[0][0] if frames else deadline
+
+
+class IncidentRecorder:
+    """Captures the frames around a HIGH risk event as a clip.
+
+    The vision loop hands every encoded frame to add_frame(); the last
+    PRE_EVENT_SECONDS live in a memory-bounded ring. When a HIGH event is
+    stored (event_stored, so the storage policy has kept it) the ring is
+    snapshotted, POST_EVENT_SECONDS more
+    frames are appended, and a worker thread packs the clip into the
+    evidence store and fills Evidence.clip_path. HIGH events arriving while a
+    clip is still open join it instead of starting another. An open clip
+    closes early at MAX_CLIP_SECONDS or max_clip_bytes.
+    """
+
+    def __init__(self, event_bus: EventBus, evidence_store: EvidenceStore,
+                 storage: Optional[StorageManager] = None,
+                 seconds_before: float = config.PRE_EVENT_SECONDS,
+                 seconds_after: float = config.POST_EVENT_SECONDS,
+                 max_buffer_bytes: int = config.PRE_EVENT_BUFFER_MB * 1024 * 1024,
+                 max_clip_bytes: int = config.INCIDENT_CLIP_MB * 1024 * 1024,
+                 clock: Clock = SYSTEM_CLOCK, camera_id: Optional[str] = None):
+        self.bus = event_bus
+        self.clock = clock
+        self.camera_id = camera_id # With several cameras: one recorder each, clipping its own events
+        self.evidence_store = evidence_store
+        self.storage = storage
+        self.seconds_before = seconds_before
+        self.seconds_after = seconds_after
+        self.max_clip_bytes = max_clip_bytes
+
+        self.ring = FrameRing(seconds_before, max_buffer_bytes)
+        self._lock = threading.Lock()
+        self._incident: Optional[_Incident] = None
+        self._flush_queue = queue.Queue()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self.heartbeat = None
+
+        # Config
+        self.MAX_CLIP_SECONDS = 120 # Joined incidents never grow a clip past this
+        self.TICK_SECONDS = 0.5
+
+        self.bus.subscribe("event_stored", self.on_event_stored, instance=camera_id or "")
+
+    def start(self):
+        logger.info(f"Incident recorder armed ({self.seconds_before}s before / {self.seconds_after}s after).")
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        # Close any open incident with what we have
+        with self._lock:
+            incident, self._incident = self._incident, None
+        if incident:
+            self._flush_queue.put(incident)
+        self._stop_event.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
+
+    # --- Producer side (vision thread) ---
+
+    def add_frame(self, frame_id: int, data: bytes, ts: Optional[float] = None):
+        ts = self.clock.time() if ts is None else ts
+        with self._lock:
+            self.ring.append(ts, frame_id, data)
+            incident = self._incident
+            if incident:
+                incident.frames.append((ts, frame_id, data))
+                incident.bytes += len(data)
+                if ts >= incident.deadline or incident.bytes >= self.max_clip_bytes:
+                    self._incident = None
+                    self._flush_queue.put(incident)
+
+    # --- Trigger ---
+
+    def on_event_stored(self, event: OceanEvent):
+        if event.risk_level != RiskLevel.HIGH:
+            return
+        if self.camera_id and event.camera_id != self.camera_id:
+            return
+        now = self.clock.time()
+        with self._lock:
+            if self._incident:
+                incident = self._incident
+                incident.events.append(event)
+                incident.deadline = min(now + self.seconds_after,
+                                        incident.started + self.MAX_CLIP_SECONDS)
+                return
+            self._incident = _Incident(event, self.ring.since(now - self.seconds_before),
+                                       now + self.seconds_after)
+        logger.info(f"Incident clip opened for {event.event_id}")
+
+    # --- Flush (worker thread) ---
+
+    def _flush_loop(self):
+        while not self._stop_event.is_set() or not self._flush_queue.empty():
+            self.heartbeat = time.monotonic()
+            try:
+                incident = self._flush_queue.get(timeout=self.TICK_SECONDS)
+            except queue.Empty:
+                # Frames may have stopped (low FPS, vision paused): close by the clock
+                incident = self._close_expired()
+                if not incident:
+                    continue
+            self._flush_safely(incident)
+
+    def tick(self) -> float:
+        """Close an overdue incident and write every queued clip inline (headless runs)."""
+        incident = self._close_expired()
+        if incident:
+            self._flush_safely(incident)
+        while True:
+            try:
+                incident = self._flush_queue.get_nowait()
+            except queue.Empty:
+                return self.TICK_SECONDS
+            self._flush_safely(incident)
+
+    def _close_expired(self) -> Optional[_Incident]:
+        with self._lock:
+            incident = self._incident
+            if incident and self.clock.time() >= incident.deadline:
+                self._incident = None
+                return incident
+        return None
+
+    def _flush_safely(self, incident: _Incident):
+        try:
+            self._flush(incident)
+        except Exception as e:
+            logger.error(f"Incident clip flush failed: {e}")
+
+    def _flush(self, incident: _Incident):
+        if not incident.frames:
+            logger.warning("Incident closed without frames; no clip written.")
+            return
+        clip_ref = self.evidence_store.put(encode_clip(incident.frames), RiskLevel.HIGH)
+        attached = 0
+        for event in incident.events:
+            if self.storage and not self.storage.set_clip_path(event.event_id, clip_ref, event.timestamp):
+                continue # Deleted while the clip was recording
+            event.evidence.clip_path = clip_ref
+            attached += 1
+            self.bus.publish("incident_clip_ready", {"event_id": event.event_id, "clip_path": clip_ref})
+        if not attached:
+            self.evidence_store.discard(clip_ref)
+            return
+        duration = incident.frames[-1][0] - incident.frames[0][0]
+        logger.info(f"Incident clip stored: {len(incident.frames)} frames, {duration:.1f}s, "
+                    f"{len(incident.events)} event(s)")
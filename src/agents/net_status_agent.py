@@ -1,24 +1,34 @@
 from src.core.event_bus import EventBus
 from src.core.types import NetworkStatus
-import time
 import threading
+import time
 import logging
 import random
-from collections import deque
-import json
+from src.core.rolling_stats import RollingWindow
+from src.core.clock import Clock, SYSTEM_CLOCK
+from src.uplink.link_probe import ProbeEngine, parse_links
+from typing import Optional, Sequence
 
 logger = logging.getLogger("NetStatusAgent")
 
 class NetStatusAgent:
-    def __init__(self, event_bus: EventBus):
+    def __init__(self, event_bus: EventBus, links: Optional[Sequence] = None,
+                 clock: Clock = SYSTEM_CLOCK):
         self.bus = event_bus
+        self.clock = clock
         self.current_status = NetworkStatus.OFFLINE
         self._stop_event = threading.Event()
-        self._thread = threading.Thread(target=self._monitor_loop)
+        self._thread = threading.Thread(target=self._monitor_loop, daemon=True)
+        self.heartbeat = None # time.monotonic() of the last ping, for the supervisor
+
+        # Real uplinks: the probe engine drives the state machine (one result per round)
+        self.probe_engine = None
+        if links:
+            self.probe_engine = ProbeEngine(event_bus, parse_links(links), on_round=self._evaluate_state)
         
         # Stability Configuration
         self.history_window = 10
-        self.ping_history = deque(maxlen=self.history_window)
+        self.ping_history = RollingWindow(self.history_window) # 1 = success; mean is the success ratio
         self.consecutive_failures = 0
         self.consecutive_successes = 0
         
@@ -27,14 +37,26 @@ class NetStatusAgent:
         self.RECOVERY_THRESHOLD_SUCCESS = 8   # Strict recovery: need 8 good pings to leave OFFLINE
         self.INTERMITTENT_RATIO_MIN = 0.3     # At least 30% success to be Intermittent (vs Offline)
         self.ONLINE_RATIO_MIN = 0.9          # 90% success to be strict ONLINE
+        self.PING_INTERVAL_SECONDS = 1.0     # Faster ping rate for more reactive (but smoothed) state
 
     def start(self):
         logger.info("Starting NetStatusAgent (Stable Mode)...")
-        self._thread.start()
+        if self.probe_engine:
+            self.probe_engine.start()
+        else:
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._monitor_loop, daemon=True)
+            self._thread.start()
 
     def stop(self):
         self._stop_event.set()
-        self._thread.join()
+        if self.probe_engine:
+            self.probe_engine.stop()
+        elif self._thread.is_alive():
+            self._thread.join()
+
+    def is_alive(self) -> bool:
+        return self.probe_engine.is_alive() if self.probe_engine else self._thread.is_alive()
 
     def _mock_ping(self) -> bool:
         # Simulate environment: 
@@ -47,7 +69,8 @@ class NetStatusAgent:
         return status_roll > 0.7 # 30% chance of success (Poor connection)
 
     def _evaluate_state(self, ping_result: bool):
-        self.ping_history.append(ping_result)
+        self.heartbeat = time.monotonic()
+        self.ping_history.add(1.0 if ping_result else 0.0)
         
         if ping_result:
             self.consecutive_successes += 1
@@ -57,7 +80,7 @@ class NetStatusAgent:
             self.consecutive_successes = 0
 
         # Calculate metrics
-        success_ratio = sum(self.ping_history) / len(self.ping_history) if self.ping_history else 0
+        success_ratio = self.ping_history.mean
         
         new_status = self.current_status
         confidence = 0.0
@@ -94,16 +117,18 @@ class NetStatusAgent:
             "net_status": self.current_status.name,
             "confidence": round(confidence, 2)
         }
-        logger.info(json.dumps(output))
+        logger.info("net_status", extra={"fields": output})
 
         if new_status != self.current_status:
             # logger.info(f"State Transition: ...") # Suppressed for brevity
             self.current_status = new_status
             self.bus.publish("network_status_change", self.current_status)
 
+    def step(self) -> float:
+        """One mock ping; returns seconds until the next."""
+        self._evaluate_state(self._mock_ping())
+        return self.PING_INTERVAL_SECONDS
+
     def _monitor_loop(self):
         while not self._stop_event.is_set():
-            result = self._mock_ping()
-            self._evaluate_state(result)
-            # Faster ping rate for more reactive (but smoothed) state
-            time.sleep(1) 
+            self.clock.sleep(self.step())
@@ -0,0 +1,165 @@
+from src.core.event_bus import EventBus
+from src.core.energy import BatterySource
+from src.core.clock import Clock, SYSTEM_CLOCK
+from typing import Callable, Dict, Optional
+import config
+import logging
+import shutil
+import threading
+import time
+
+logger = logging.getLogger("ResourceMonitor")
+
+
+class CachedProbe:
+    """A system reading that is re-taken at most once per ttl seconds."""
+
+    def __init__(self, read: Callable, ttl: float):
+        self.read = read
+        self.ttl = ttl
+        self.value = None
+        self.reads = 0
+        self._taken_at = None
+
+    def get(self, now: float, force: bool = False):
+        if force or self._taken_at is None or now - self._taken_at >= self.ttl:
+            try:
+                self.value = self.read()
+            except (OSError, ValueError) as e:
+                logger.debug(f"Probe failed: {e}")
+                self.value = None
+            self.reads += 1
+            self._taken_at = now
+        return self.value
+
+
+class ResourceMonitor:
+    """Disk, battery and CPU temperature, published only when they change.
+
+    Each probe is cached for its own TTL, so a tick costs no syscalls for
+    readings that are still fresh. resource_update goes out when a reading
+    moves past its deadband since the last publish, or crosses one of the
+    thresholds the strategy acts on however small the step; resource_warning fires
+    once per threshold crossing and re-arms only after the value recovers
+    past a separate clear level.
+    """
+
+    def __init__(self, event_bus: EventBus, storage_path: str = "./",
+                 battery_source: Optional[BatterySource] = None,
+                 thermal_path: str = config.THERMAL_ZONE_PATH,
+                 clock: Clock = SYSTEM_CLOCK):
+        self.bus = event_bus
+        self.clock = clock
+        self.storage_path = storage_path
+        self.battery_source = battery_source
+        self.thermal_path = thermal_path
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._monitor_loop, daemon=True)
+        self.heartbeat = None
+
+        # Config
+        self.TICK_SECONDS = 1.0
+        self.DEADBAND = {"disk_free_pct": 1.0, "battery_level": 1.0, "cpu_temp_c": 2.0}
+        self.THRESHOLDS = {"disk_free_pct": config.STORAGE_WARN_FREE_PCT,
+                           "battery_level": config.MIN_BATTERY_LEVEL,
+                           "cpu_temp_c": config.THERMAL_WARN_C} # Always published when crossed
+        self.STORAGE_WARN_PCT = config.STORAGE_WARN_FREE_PCT
+        self.STORAGE_CLEAR_PCT = config.STORAGE_WARN_FREE_PCT + 2
+        self.THERMAL_WARN_C = config.THERMAL_WARN_C
+        self.THERMAL_CLEAR_C = config.THERMAL_WARN_C - 5
+
+        self.probes = {
+            "disk_free_pct": CachedProbe(self._read_disk, ttl=30.0),
+            "battery": CachedProbe(self._read_battery, ttl=10.0),
+            "cpu_temp_c": CachedProbe(self._read_thermal, ttl=5.0),
+        }
+        self.published: Dict[str, float] = {}
+        self._warnings = {"storage": False, "thermal": False}
+
+        # Stats
+        self.updates_published = 0
+
+    def start(self):
+        logger.info("Resource monitor started.")
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._monitor_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def _monitor_loop(self):
+        force = True
+        while True:
+            self.heartbeat = time.monotonic()
+            try:
+                self.poll(force=force)
+                force = False
+            except Exception as e:
+                logger.error(f"Resource poll failed: {e}")
+            if self._stop_event.wait(self.TICK_SECONDS):
+                break
+
+    # --- Probes ---
+
+    def _read_disk(self) -> float:
+        total, used, free = shutil.disk_usage(self.storage_path)
+        return free / total * 100
+
+    def _read_battery(self):
+        return self.battery_source.read() if self.battery_source else None
+
+    def _read_thermal(self) -> Optional[float]:
+        with open(self.thermal_path) as f:
+            return int(f.read().strip()) / 1000.0
+
+    # --- Change detection ---
+
+    def poll(self, now: Optional[float] = None, force: bool = False) -> Optional[dict]:
+        """Take due readings; publish and return a snapshot only if something moved."""
+        now = self.clock.monotonic() if now is None else now
+        battery = self.probes["battery"].get(now, force)
+        readings = {
+            "disk_free_pct": self.probes["disk_free_pct"].get(now, force),
+            "battery_level": battery.level_pct if battery else None,
+            "cpu_temp_c": self.probes["cpu_temp_c"].get(now, force),
+        }
+
+        self._check_warning("storage", readings["disk_free_pct"],
+                            lambda v: v < self.STORAGE_WARN_PCT, lambda v: v > self.STORAGE_CLEAR_PCT)
+        self._check_warning("thermal", readings["cpu_temp_c"],
+                            lambda v: v > self.THERMAL_WARN_C, lambda v: v < self.THERMAL_CLEAR_C)
+
+        changed = force or any(
+            value is not None and self._moved(key, value) for key, value in readings.items())
+        if not changed:
+            return None
+
+        self.published = {k: v for k, v in readings.items() if v is not None}
+        snapshot = dict(self.published, battery=battery)
+        self.updates_published += 1
+        self.bus.publish("resource_update", snapshot)
+        return snapshot
+
+    def _moved(self, key: str, value: float) -> bool:
+        last = self.published.get(key)
+        if last is None or abs(value - last) >= self.DEADBAND[key]:
+            return True
+        threshold = self.THRESHOLDS.get(key)
+        return threshold is not None and (last < threshold) != (value < threshold)
+
+    def _check_warning(self, kind: str, value: Optional[float], enter, clear):
+        if value is None:
+            return
+        if not self._warnings[kind] and enter(value):
+            self._warnings[kind] = True
+            logger.warning(f"{kind.capitalize()} warning: {value:.1f}")
+            self.bus.publish("resource_warning", {"type": kind, "level": "critical", "value": value})
+        elif self._warnings[kind] and clear(value):
+            self._warnings[kind] = False
+            logger.info(f"{kind.capitalize()} recovered: {value:.1f}")
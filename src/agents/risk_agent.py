@@ -1,7 +1,7 @@
-import json
 import logging
 from src.core.event_bus import EventBus
 from src.core.types import OceanEvent, RiskLevel
+from src.core.tracing import tracer
 
 logger = logging.getLogger("RiskAgent")
 
@@ -24,7 +24,7 @@ class RiskAgent:
         
         try:
             # Extract data
-            detections = event.metadata.get("detections", [])
+            detections = event.extra.get("detections", [])
             # In confirmed event, we might have specific 'bbox' and 'motion' in metadata 
             # or we need to look at the 'latest_observation' which bio agent should have passed.
             # BioConfirm passes the *Event* object. 
@@ -38,8 +38,8 @@ class RiskAgent:
             # We explicitly check the 'motion' and 'bbox' keys if injected by BioConfirm, 
             # otherwise fall back to raw detection list.
             
-            bbox = event.metadata.get("bbox") or event.metadata.get("box")
-            motion = event.metadata.get("motion")
+            bbox = event.extra.get("bbox") or event.box
+            motion = event.motion
             
             # Fallback if BioConfirm didn't inject flat keys
             if not bbox and detections:
@@ -75,7 +75,7 @@ class RiskAgent:
                     uncertainty = False
             else:
                  # Check if explicitly "Bio Confirmed" but missing motion data
-                 if event.metadata.get("confirmed"):
+                 if event.extra.get("confirmed"):
                      risk_level = RiskLevel.MEDIUM
                      reason = "Confirmed living entity but motion data unavailable."
                      uncertainty = True
@@ -86,8 +86,8 @@ class RiskAgent:
                  reason = "Potential high risk but confidence low. Downgraded."
                  uncertainty = True
 
-            # Update Event
-            event.risk_level = risk_level
+            # Assessed copy (the confirmed event may be held by other subscribers)
+            event = event.replace(risk_level=risk_level)
             
             # Calculate uncertainty float
             uncertainty_score = round(1.0 - event.confidence, 2)
@@ -98,24 +98,28 @@ class RiskAgent:
             result = {
                 "risk_level": risk_level.name,
                 "reason": reason,
-                "uncertainty": uncertainty_score
+                "uncertainty": uncertainty_score,
+                "trace_id": event.trace_id
             }
+            if event.camera_id:
+                result["camera_id"] = event.camera_id
+            if event.individual_id:
+                result["individual_id"] = event.individual_id # One target seen by several cameras
+            tracer.mark(event.trace_id, "risk", after="bioconfirm")
             
-            logger.info(json.dumps(result))
+            logger.info("risk", extra={"fields": result})
             
             # Publish Dict for AlertAgent/StrategyAgent (Lightweight)
             self.bus.publish("risk_assessment", result)
             
             # Publish Full Event for SyncAgent (Heavyweight)
-            # The event object has been updated in place (event.risk_level = ...)
             self.bus.publish("risk_assessed_event", event)
             
         except Exception as e:
             logger.error(f"Risk Assessment Failed: {e}")
             # Fail safe
-            event.risk_level = RiskLevel.MEDIUM
-            logger.info(json.dumps({
+            logger.info("risk", extra={"fields": {
                 "risk_level": "MEDIUM", 
                 "reason": "Internal Error - Failsafe", 
                 "uncertainty": 1.0
-            }))
+            }})
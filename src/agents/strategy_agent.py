@@ -3,13 +3,19 @@ from src.core.event_bus import EventBus
 import logging
 import shutil
 from src.core.types import RiskLevel, NetworkStatus, SystemStrategy, SystemMode
+from src.core.fps_controller import FpsController, ModeBounds
+from src.core.energy import EnergyPlanner
+from typing import Optional, Sequence
 
 logger = logging.getLogger("StrategyAgent")
 
 class StrategyAgent:
-    def __init__(self, event_bus: EventBus, storage_path: str = "./"):
+    def __init__(self, event_bus: EventBus, storage_path: str = "./",
+                 energy_planner: Optional[EnergyPlanner] = None, cameras: Optional[Sequence[str]] = None):
         self.bus = event_bus
         self.storage_path = storage_path
+        self.energy_planner = energy_planner # Optional: plan for endurance, not just the <20% cutoff
+        self.cameras = list(cameras or []) # Camera ids, each with its own inference process and budget
         
         # State
         self.battery_level = 100
@@ -18,10 +24,26 @@ class StrategyAgent:
         self.current_uncertainty = 0.0  # Track uncertainty from RiskAgent
         
         self.current_strategy: SystemStrategy = None
+        self.current_mode = "UNKNOWN"
+        self.focus_camera = None # Camera whose detection raised the risk
+        self._focus_applied = None
+
+        # Config: FPS / model range the controller may use in each mode (preferred model first)
+        self.MODE_BOUNDS = {
+            "CRITICAL_POWER": ModeBounds(1, 1, ("tiny",)),
+            "HIGH_UNCERTAINTY": ModeBounds(2, 5, ("medium", "tiny")),
+            "HIGH_RISK": ModeBounds(10, 30, ("large", "medium")),
+            "OFFLINE_CONSERVATIVE": ModeBounds(2, 5, ("medium", "tiny")),
+            "ONLINE_BALANCED": ModeBounds(5, 15, ("medium", "tiny")),
+        }
+        self.fps_controller = FpsController()
+        self.camera_controllers = {cam: FpsController() for cam in self.cameras}
 
         # Subscribe
         self.bus.subscribe("network_status_change", self.on_network_status)
         self.bus.subscribe("risk_assessment", self.on_risk_assessment)
+        self.bus.subscribe("pipeline_metrics", self.on_pipeline_metrics)
+        self.bus.subscribe("resource_update", self.on_resource_update)
         
         # Initial Strategy Calc
         self.update_strategy()
@@ -46,10 +68,31 @@ class StrategyAgent:
         # Capture uncertainty for conservative strategy
         uncertainty = payload.get("uncertainty", 0.0)
         self.current_uncertainty = uncertainty
+        if self.current_risk == RiskLevel.HIGH and payload.get("camera_id") in self.camera_controllers:
+            self.focus_camera = payload["camera_id"]
         
         self.update_strategy()
 
-    def update_strategy(self, force_publish=False):
+    def on_resource_update(self, payload: dict):
+        # ResourceMonitor publishes only on change, so this re-plans without polling
+        if payload.get("battery_level") is not None:
+            self.battery_level = payload["battery_level"]
+        if self.energy_planner and payload.get("battery"):
+            self.energy_planner.refresh(payload["battery"])
+        self.update_strategy()
+
+    def on_pipeline_metrics(self, metrics: dict):
+        if self.energy_planner:
+            self.energy_planner.model.record_frames(metrics.get("frames", 0), metrics.get("model_type", "medium"))
+        # VisionAgent reports measured load; the controller trims FPS/model within the mode's bounds
+        camera_id = metrics.get("camera_id")
+        controller = self.camera_controllers.get(camera_id, self.fps_controller)
+        if controller.observe(metrics):
+            source = f"{camera_id} " if camera_id in self.camera_controllers else ""
+            self.update_strategy(reason=f"Measured {source}load (latency {metrics.get('latency_ms', 0):.0f} ms, "
+                                        f"cpu {metrics.get('cpu_util', 0):.0%}, backlog {metrics.get('backlog', 0)})")
+
+    def update_strategy(self, force_publish=False, reason=None):
         # 1. Power Check (Priority 1: Hard Constraint)
         new_strategy = None
         mode = "UNKNOWN"
@@ -58,12 +101,7 @@ class StrategyAgent:
         if self.battery_level < 20:
             mode = "CRITICAL_POWER"
             decision_reason = "Battery critical (<20%)"
-            new_strategy = SystemStrategy(
-                fps=1,
-                model_type="tiny", 
-                confirm_frames=6,
-                storage_policy="critical_only"
-            )
+            new_strategy = self._critical_power_strategy()
         # 2. Uncertainty Check (Priority 2: Stability Protection)
         # If uncertainty > 0.7, DO NOT boost performance - stay conservative
         elif self.current_uncertainty > 0.7:
@@ -106,6 +144,45 @@ class StrategyAgent:
                 storage_policy="events_only"
             )
 
+        # 5. Energy budget: cap the mode to what the remaining battery pays for until the deadline
+        # (split evenly between the cameras)
+        bounds = self.MODE_BOUNDS[mode]
+        streams = len(self.cameras) or 1
+        if self.energy_planner and mode != "CRITICAL_POWER":
+            capped = self.energy_planner.cap(bounds, streams)
+            if capped is None:
+                # Not even the mode's floor fits: hold the floor rather than drop the mode
+                # (HIGH_RISK keeps at least what the calmer modes get)
+                decision_reason = f"Energy budget ({self.energy_planner.budget_w():.0f} W) below {mode} " \
+                                  f"minimum; holding its floor"
+                capped = ModeBounds(bounds.min_fps, bounds.min_fps, (bounds.models[-1],))
+                new_strategy.fps, new_strategy.model_type = capped.min_fps, capped.models[0]
+            if self.energy_planner.is_tight(new_strategy.fps, new_strategy.model_type, streams) \
+                    and new_strategy.storage_policy == "all":
+                new_strategy.storage_policy = "events_only"
+            bounds = capped
+
+        # Mode sets the starting point; afterwards the controller owns FPS and model
+        reset = mode != self.current_mode or self.focus_camera != self._focus_applied
+        controllers = [(self.fps_controller, bounds)] + \
+            [(c, self._camera_bounds(cam, mode, bounds)) for cam, c in self.camera_controllers.items()]
+        for controller, controller_bounds in controllers:
+            if reset:
+                controller.reset(controller_bounds, new_strategy.fps, new_strategy.model_type)
+            else:
+                controller.set_bounds(controller_bounds)
+        self.current_mode = mode
+        self._focus_applied = self.focus_camera
+        new_strategy.fps = self.fps_controller.fps
+        new_strategy.model_type = self.fps_controller.model
+        if self.camera_controllers:
+            new_strategy.cameras = {cam: {"fps": c.fps, "model_type": c.model}
+                                    for cam, c in self.camera_controllers.items()}
+            busiest = max(new_strategy.cameras.values(), key=lambda s: s["fps"])
+            new_strategy.fps, new_strategy.model_type = busiest["fps"], busiest["model_type"]
+        if reason:
+            decision_reason = reason
+
         if self.current_strategy != new_strategy or force_publish:
             # Calculate Decision Payload (only if there was a previous strategy)
             if self.current_strategy:
@@ -130,9 +207,29 @@ class StrategyAgent:
 
             self.current_strategy = new_strategy
             logger.info(f"Strategy Update [{mode}]: {self.current_strategy.to_dict()}")
-            self.bus.publish("system_strategy_update", self.current_strategy.to_dict())
+            self.bus.publish("system_strategy_update", {**self.current_strategy.to_dict(), "mode": mode})
+
+    def _camera_bounds(self, camera_id: str, mode: str, bounds: ModeBounds) -> ModeBounds:
+        # High risk seen by one camera: the others idle at the mode's floor to give it the compute
+        if mode == "HIGH_RISK" and self.focus_camera and camera_id != self.focus_camera:
+            return ModeBounds(bounds.min_fps, bounds.min_fps, (bounds.models[-1],))
+        return bounds
+
+    def _critical_power_strategy(self) -> SystemStrategy:
+        return SystemStrategy(
+            fps=1,
+            model_type="tiny", 
+            confirm_frames=6,
+            storage_policy="critical_only"
+        )
 
     def check_resources(self):
+        # Check Battery (real reading replaces the default when a source is configured)
+        if self.energy_planner:
+            state = self.energy_planner.refresh()
+            if state:
+                self.battery_level = state.level_pct
+
         # Check Disk
         total, used, free = shutil.disk_usage(self.storage_path)
         percent_free = (free / total) * 100
@@ -141,6 +238,11 @@ class StrategyAgent:
         self.update_strategy(force_publish=True)
         
         logger.info(f"Storage: {percent_free:.1f}% free | Battery: {self.battery_level}%")
+        if self.energy_planner and self.current_strategy:
+            hours = self.energy_planner.endurance_hours(self.current_strategy.fps, self.current_strategy.model_type)
+            if hours is not None:
+                logger.info(f"Energy: {self.energy_planner.model.total_joules() / 3600:.1f} Wh used | "
+                            f"~{hours:.1f} h left at current strategy")
 
         if percent_free < 10:
              self.bus.publish("resource_warning", {"type": "storage", "level": "critical"})
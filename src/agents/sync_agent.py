@@ -1,19 +1,111 @@
 from src.core.event_bus import EventBus
 from src.core.types import OceanEvent, NetworkStatus, RiskLevel
 from src.database.storage import StorageManager
+from src.database.ingest_filter import IngestFilter
+from src.uplink.evidence_upload import ChunkedUploader
+from src.uplink.uplink_client import UplinkBusy, UplinkClient
+from src.core.wire_format import select_compression
+from src.core.rolling_stats import Ewma
+from src.core.tracing import tracer
+from src.core.metrics import registry
+from src.core.clock import Clock, SYSTEM_CLOCK
+from collections import deque
+from typing import List, Optional
+import config
 import logging
+import random
+import threading
 import time
 
 logger = logging.getLogger("SyncAgent")
 
+sync_decisions = registry.counter("sync_decisions_total", "Per-event sync decisions", ["decision"])
+
 class SyncAgent:
-    def __init__(self, event_bus: EventBus, storage: StorageManager):
+    """Decides which events go ashore and ships them.
+
+    Decisions are made in the bus handler; the sending happens on a worker
+    thread (start()), which batches whatever the handler queued and, while
+    idle, drains the stored backlog every DRAIN_INTERVAL_SECONDS. Without an
+    uplink, allowed events are only marked synced. Incident clips closed
+    while not ONLINE wait for the first backlog drain back ONLINE.
+    """
+
+    def __init__(self, event_bus: EventBus, storage: StorageManager,
+                 evidence_uploader: Optional[ChunkedUploader] = None,
+                 uplink: Optional[UplinkClient] = None,
+                 ingest_filter: Optional[IngestFilter] = None,
+                 clock: Clock = SYSTEM_CLOCK):
         self.bus = event_bus
+        self.clock = clock
         self.storage = storage
+        self.ingest_filter = ingest_filter
+        self.evidence_uploader = evidence_uploader
+        self.uplink = uplink
         self.network_status = NetworkStatus.OFFLINE
+        self.link_bandwidth_bps: Optional[float] = None  # Best link's measured bandwidth, if probed
+        self.bytes_per_event = Ewma(0.3)
+        self.heartbeat = None # time.monotonic() of the worker's last pass, for the supervisor
+
+        self._outbox = deque()  # Allowed events waiting for the worker
+        self._deferred_clips = deque(maxlen=500)  # HIGH clips closed off-ONLINE, oldest dropped past this
+        self._sending = False
+        self._stopping = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._send_loop, daemon=True)
+        self._last_drain = 0.0
+
+        # Worker config
+        self.MAX_OUTBOX = 1000  # Beyond this, allowed events wait in storage for the backlog drain
+        self.DRAIN_INTERVAL_SECONDS = config.BACKLOG_DRAIN_SECONDS
+        self.DRAIN_MAX_BATCHES = 20  # Per idle pass, so fresh events are never held up for long
+        self.IDLE_WAKE_SECONDS = 1.0
+
+        # Backlog drain config
+        self.BATCH_SIZE = {NetworkStatus.ONLINE: 500, NetworkStatus.INTERMITTENT: 50}
+        self.MIN_BATCH_SIZE = 10
+        self.TARGET_BATCH_SECONDS = 5.0  # With a measured link, size batches to take about this long
+        self.DEFAULT_BYTES_PER_EVENT = 60
+        self.MAX_CONSECUTIVE_FAILURES = 5
+        self.RETRY_BASE_SECONDS = 1.0  # Doubles per consecutive failure, jittered, up to RETRY_MAX_SECONDS
+        self.RETRY_MAX_SECONDS = 60.0
         
         self.bus.subscribe("network_status_change", self.update_network_status)
         self.bus.subscribe("risk_assessed_event", self.handle_final_event)
+        self.bus.subscribe("incident_clip_ready", self.handle_incident_clip)
+        self.bus.subscribe("renditions_ready", self.handle_renditions)
+        self.bus.subscribe("link_quality", self.update_link_quality)
+
+    # --- Lifecycle ---
+
+    def start(self):
+        logger.info("Sync worker started.")
+        with self._cond:
+            self._stopping = False
+        self._thread = threading.Thread(target=self._send_loop, name="SyncAgent", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Send what is queued (shutdown); False if the timeout cut it short.
+
+        Anything left stays unsynced in storage for the next run's backlog drain.
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._outbox and not self._sending, timeout)
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._outbox)
 
     def update_network_status(self, payload):
         if isinstance(payload, NetworkStatus):
@@ -25,9 +117,33 @@ class SyncAgent:
         
         logger.info(f"Network Status Updated: {self.network_status.name}")
 
+        if self.evidence_uploader:
+            # Chunked uploads resume where they stopped, so any link is worth using
+            self.evidence_uploader.set_link_available(self.network_status != NetworkStatus.OFFLINE)
+
+    def update_link_quality(self, payload: dict):
+        best = payload.get("best")
+        self.link_bandwidth_bps = payload["links"][best]["bandwidth_bps"] if best else None
+
+    def batch_size(self) -> int:
+        """Events per drain batch: the status cap, shrunk to fit the measured link."""
+        cap = self.BATCH_SIZE.get(self.network_status, self.MIN_BATCH_SIZE)
+        if not self.link_bandwidth_bps:
+            return cap
+        per_event = self.bytes_per_event.value or self.DEFAULT_BYTES_PER_EVENT
+        fits = int(self.link_bandwidth_bps / 8 * self.TARGET_BATCH_SECONDS / per_event)
+        return max(self.MIN_BATCH_SIZE, min(cap, fits))
+
     def handle_final_event(self, event: OceanEvent):
+        # 0. Storage policy: low-value events are neither written nor synced
+        if self.ingest_filter and not self.ingest_filter.admit(event):
+            sync_decisions.labels("FILTERED").inc()
+            logger.debug(f"Event {event.event_id} dropped by storage policy {self.ingest_filter.policy.name}")
+            return
+
         # 1. System Storage (Performed by system/infra, invoked here as the entry point)
         self.storage.save_event(event)
+        self.bus.publish("event_stored", event) # Renditions/clips only for events that were kept
 
         decision = "BLOCKED"
         reason = "Unknown"
@@ -70,20 +186,164 @@ class SyncAgent:
                 reason = "ONLINE - RATE LIMIT EXCEEDED"
                 should_sync = False
 
+        sync_decisions.labels(decision).inc()
         logger.info(f"Sync Decision for {event.event_id}: {decision} ({reason})")
         
         if should_sync:
             self._execute_system_sync(event)
     
     def _execute_system_sync(self, event: OceanEvent):
-        logger.info(f"Initiating System Uplink for Event {event.event_id}...")
-        self.storage.mark_synced(event.event_id)
+        if not self.uplink:
+            self._synced([event])
+            return
+        with self._cond:
+            if len(self._outbox) >= self.MAX_OUTBOX:
+                # Already stored unsynced; the backlog drain ships it later
+                logger.warning(f"Uplink queue full; {event.event_id} left for the backlog drain")
+                return
+            self._outbox.append(event)
+            self._cond.notify_all()
+
+    def _send_loop(self):
+        while True:
+            self.heartbeat = time.monotonic()
+            with self._cond:
+                self._cond.wait_for(lambda: self._stopping or self._outbox, self.IDLE_WAKE_SECONDS)
+                if self._stopping:
+                    return
+                batch = [self._outbox.popleft() for _ in range(min(len(self._outbox), self.batch_size()))]
+                self._sending = True
+            try:
+                if batch:
+                    self._send(batch)
+                elif self.clock.monotonic() - self._last_drain >= self.DRAIN_INTERVAL_SECONDS:
+                    self._last_drain = self.clock.monotonic()
+                    self.drain_backlog(max_batches=self.DRAIN_MAX_BATCHES)
+            except Exception as e:
+                logger.error(f"Sync worker error: {e}")
+            finally:
+                with self._cond:
+                    self._sending = False
+                    self._cond.notify_all()
+
+    def _send(self, batch: List[OceanEvent]):
+        logger.info(f"Initiating System Uplink for {len(batch)} events...")
+        try:
+            acked = set(self.uplink.send_batch(batch, compression=select_compression(
+                self.network_status, self.link_bandwidth_bps)))
+        except (ConnectionError, ValueError) as e:
+            # Stays unsynced locally; picked up by the next backlog drain
+            logger.warning(f"Uplink failed for {len(batch)} events: {e}")
+            return
+        self._synced([e for e in batch if e.event_id in acked])
+
+    def _synced(self, events: List[OceanEvent]):
+        if not events:
+            return
+        self.storage.mark_synced_many([e.event_id for e in events], {e.event_id: e.timestamp for e in events})
+        for event in events:
+            tracer.mark(event.trace_id, "sync", after="risk")
+            if self.evidence_uploader:
+                # Evidence files go out in the background, chunk by chunk
+                if self.network_status == NetworkStatus.INTERMITTENT:
+                    # Thin link: thumbnails only (usually they follow via renditions_ready)
+                    for path in event.evidence.renditions.get("thumbnail", []):
+                        self.evidence_uploader.enqueue(path)
+                else:
+                    self.evidence_uploader.enqueue_evidence(event.evidence)
+
+    def handle_incident_clip(self, payload):
+        # Clips close seconds after their (HIGH risk) event was synced
+        if not self.evidence_uploader or not isinstance(payload, dict):
+            return
+        if self.network_status == NetworkStatus.ONLINE:
+            self.evidence_uploader.enqueue(payload["clip_path"])
+        else:
+            # Too big for a thin link: shipped by the backlog drain once ONLINE
+            self._deferred_clips.append(payload["clip_path"])
+
+    def _enqueue_deferred_clips(self):
+        while self._deferred_clips:
+            self.evidence_uploader.enqueue(self._deferred_clips.popleft())
+
+    def handle_renditions(self, payload):
+        # Only INTERMITTENT ships thumbnails; ONLINE already queued the full evidence
+        if not self.evidence_uploader or self.network_status != NetworkStatus.INTERMITTENT:
+            return
+        if payload.get("risk") != RiskLevel.HIGH.name:
+            return
+        for path in payload["renditions"].get("thumbnail", []):
+            self.evidence_uploader.enqueue(path)
+
+    def drain_backlog(self, max_batches: Optional[int] = None) -> dict:
+        """Ship stored unsynced events in batches under the current network policy.
+
+        ONLINE drains everything (deferred incident clips included),
+        INTERMITTENT only HIGH risk, OFFLINE nothing.
+        Stops early after repeated link failures; unacknowledged events stay
+        pending for the next call.
+        """
+        stats = {"events": 0, "bytes": 0, "batches": 0, "retries": 0}
+        if self.evidence_uploader and self.network_status == NetworkStatus.ONLINE:
+            self._enqueue_deferred_clips()
+        if not self.uplink or self.network_status == NetworkStatus.OFFLINE:
+            return stats
+
+        risk_levels = [RiskLevel.HIGH] if self.network_status == NetworkStatus.INTERMITTENT else None
+        compression = select_compression(self.network_status, self.link_bandwidth_bps)
+        failures = 0
+
+        while max_batches is None or stats["batches"] < max_batches:
+            batch = self.storage.get_pending_sync(limit=self.batch_size(), risk_levels=risk_levels)
+            if not batch:
+                break
+            bytes_before = self.uplink.bytes_sent
+            try:
+                acked = self.uplink.send_batch(batch, compression=compression)
+            except ConnectionError as e:
+                failures += 1
+                stats["retries"] += 1
+                if failures >= self.MAX_CONSECUTIVE_FAILURES:
+                    logger.warning(f"Backlog drain paused after {failures} failures: {e}")
+                    break
+                if not self._wait(self.retry_delay(failures, e)):
+                    break
+                continue
+            except ValueError as e:
+                # Rejected as sent (4xx): resending will not help until the cause is fixed
+                logger.error(f"Backlog drain stopped, shore rejected a batch of {len(batch)}: {e}")
+                break
+            failures = 0
+            if not acked:
+                logger.warning("Shore acknowledged nothing; stopping backlog drain.")
+                break
+            self.storage.mark_synced_many(acked, {e.event_id: e.timestamp for e in batch})
+            sent = self.uplink.bytes_sent - bytes_before
+            self.bytes_per_event.add(sent / len(batch))
+            stats["events"] += len(acked)
+            stats["bytes"] += sent
+            stats["batches"] += 1
+
+        logger.info(f"Backlog drain ({self.network_status.name}): {stats}")
+        return stats
+
+    def retry_delay(self, failures: int, error: Exception) -> float:
+        """Wait before the next attempt: the shore's Retry-After, else jittered exponential backoff."""
+        if isinstance(error, UplinkBusy) and error.retry_after is not None:
+            return error.retry_after
+        delay = min(self.RETRY_MAX_SECONDS, self.RETRY_BASE_SECONDS * 2 ** (failures - 1))
+        return random.uniform(delay / 2, delay)  # Jitter: a reconnecting fleet does not retry in step
+
+    def _wait(self, seconds: float) -> bool:
+        """Sleep unless stop() is called meanwhile; False if it was."""
+        with self._cond:
+            return not self._cond.wait_for(lambda: self._stopping, seconds)
 
     def _check_rate_limit(self, priority: str) -> bool:
         # Simple Sliding Window or Minimum Interval
         # To avoid avalanche, we enforce a minimum gap between syncs.
         
-        now = time.time()
+        now = self.clock.time()
         
         # Init state if needed (using dict for extensibility)
         if not hasattr(self, "_last_sync_times"):
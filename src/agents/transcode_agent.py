@@ -0,0 +1,254 @@
+from src.core.event_bus import EventBus
+from src.core.types import OceanEvent, RiskLevel
+from src.database.evidence_store import EvidenceStore, is_ref
+from src.database.storage import StorageManager, PRUNE_ORDER
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+import config
+import heapq
+import io
+import itertools
+import logging
+import os
+import threading
+
+try:
+    from PIL import Image
+except ImportError:  # Optional: without Pillow renditions are simulated
+    Image = None
+
+logger = logging.getLogger("TranscodeAgent")
+
+# Tier -> (max edge in pixels, JPEG quality). "full" is the original evidence.
+RENDITIONS = {
+    "thumbnail": (config.THUMBNAIL_MAX_EDGE, 60),
+    "preview": (config.PREVIEW_MAX_EDGE, 75),
+}
+
+REFERENCE_EDGE = 1920  # Sensor width the simulated renditions scale against
+
+
+def _init_worker(niceness: int):
+    try:
+        os.nice(niceness)
+    except (AttributeError, OSError):
+        pass
+
+
+def transcode(data: bytes, max_edge: int, quality: int) -> bytes:
+    """Downscale one encoded frame (runs in a pool worker)."""
+    if Image is not None:
+        try:
+            img = Image.open(io.BytesIO(data))
+            img.thumbnail((max_edge, max_edge))
+            out = io.BytesIO()
+            img.convert("RGB").save(out, format="JPEG", quality=quality)
+            return out.getvalue()
+        except OSError:
+            pass  # Not a decodable image (e.g. simulated frame)
+    # SIMULATION ONLY: keep a share of the bytes proportional to the pixel count
+    stride = max(1, round((REFERENCE_EDGE / max_edge) ** 2))
+    return data[::stride]
+
+
+class TranscodeAgent:
+    """Background transcoding of evidence into uplink-sized renditions.
+
+    Stored events (event_stored, published once the storage policy has kept
+    them) are queued (HIGH first) and their frames are
+    downscaled to every tier in RENDITIONS by a niced process pool, so
+    encoding never runs on the inference thread. The number of jobs in
+    flight follows the strategy mode: paused in CRITICAL_POWER, one at a
+    time while conserving, the full pool otherwise. Finished renditions are
+    recorded on the event and announced as renditions_ready; if the event
+    was deleted meanwhile they are discarded.
+    """
+
+    def __init__(self, event_bus: EventBus, evidence_store: Optional[EvidenceStore] = None,
+                 storage: Optional[StorageManager] = None,
+                 max_workers: int = config.TRANSCODE_WORKERS,
+                 niceness: int = config.TRANSCODE_NICENESS):
+        self.bus = event_bus
+        self.evidence_store = evidence_store
+        self.storage = storage
+        self.max_workers = max_workers
+        self.niceness = niceness
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._cond = threading.Condition()
+        self._pending = []  # heap of (priority, seq, event)
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._stopping = False
+        self._thread = threading.Thread(target=self._dispatch_loop, daemon=True)
+
+        # Config
+        self.MODE_WORKERS = {
+            "CRITICAL_POWER": 0,
+            "OFFLINE_CONSERVATIVE": 1,
+            "HIGH_UNCERTAINTY": 1,
+        }
+        self.MAX_PENDING = 1000
+        self.worker_limit = max_workers
+
+        # Stats
+        self.completed = 0
+        self.dropped = 0
+
+        self.bus.subscribe("event_stored", self.on_event_stored)
+        self.bus.subscribe("system_strategy_update", self.on_strategy_update)
+
+    # --- Lifecycle ---
+
+    def start(self):
+        self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                         initargs=(self.niceness,))
+        logger.info(f"Transcode pool started ({self.max_workers} workers, nice {self.niceness}).")
+        with self._cond:
+            self._stopping = False
+        self._thread = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self, wait: bool = True):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread.is_alive():
+            self._thread.join()
+        if self._pool:
+            self._pool.shutdown(wait=wait, cancel_futures=not wait)
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Finish queued renditions (shutdown); False if the timeout cut it short."""
+        return self.wait_idle(timeout)
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._in_flight and
+                                       (not self._pending or self.worker_limit == 0), timeout)
+
+    # --- Inputs ---
+
+    def on_strategy_update(self, strategy: dict):
+        limit = self.MODE_WORKERS.get(strategy.get("mode"), self.max_workers)
+        limit = min(limit, self.max_workers)
+        with self._cond:
+            if limit != self.worker_limit:
+                logger.info(f"Transcode concurrency: {self.worker_limit} -> {limit}")
+                self.worker_limit = limit
+                self._cond.notify_all()
+
+    def on_event_stored(self, event: OceanEvent):
+        if not event.evidence.image_paths:
+            return
+        priority = -PRUNE_ORDER.index(event.risk_level)  # HIGH first
+        with self._cond:
+            if len(self._pending) >= self.MAX_PENDING:
+                # Full: the least important job (largest key) makes room, or the newcomer is dropped
+                worst = max(self._pending)
+                if worst[0] <= priority:
+                    self.dropped += 1
+                    return
+                self._pending.remove(worst)
+                heapq.heapify(self._pending)
+                self.dropped += 1
+            heapq.heappush(self._pending, (priority, next(self._seq), event))
+            self._cond.notify_all()
+
+    # --- Dispatch ---
+
+    def _dispatch_loop(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._stopping or
+                                    (self._pending and self._in_flight < self.worker_limit))
+                if self._stopping:
+                    return
+                _, _, event = heapq.heappop(self._pending)
+                self._in_flight += 1
+            try:
+                self._submit(event)
+            except Exception as e:
+                logger.error(f"Transcode submit failed for {event.event_id}: {e}")
+                self._job_done()
+
+    def _submit(self, event: OceanEvent):
+        sources = [(path, self._read(path)) for path in event.evidence.image_paths]
+        futures = {tier: [(path, self._pool.submit(transcode, data, edge, quality))
+                          for path, data in sources if data is not None]
+                   for tier, (edge, quality) in RENDITIONS.items()}
+
+        remaining = [sum(len(f) for f in futures.values())]
+        if not remaining[0]:
+            self._job_done()
+            return
+
+        def on_done(_):
+            with self._cond:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                try:
+                    self._finish(event, futures)
+                finally:
+                    self._job_done()
+
+        for tier_futures in futures.values():
+            for _, f in tier_futures:
+                f.add_done_callback(on_done)
+
+    def _job_done(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def _read(self, path: str) -> Optional[bytes]:
+        try:
+            if is_ref(path):
+                return self.evidence_store.get(path) if self.evidence_store else None
+            with open(path, "rb") as f:
+                return f.read()
+        except (OSError, KeyError):
+            logger.warning(f"Evidence unavailable for transcoding: {path}")
+            return None
+
+    def _write(self, data: bytes, source: str, tier: str, risk: RiskLevel) -> str:
+        if self.evidence_store:
+            return self.evidence_store.put(data, risk)
+        root, _ = os.path.splitext(source)
+        path = f"{root}.{tier}.jpg"
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def _finish(self, event: OceanEvent, futures: Dict[str, list]):
+        renditions: Dict[str, List[str]] = {}
+        for tier, tier_futures in futures.items():
+            paths = []
+            for source, f in tier_futures:
+                if f.exception():
+                    logger.error(f"Transcode {tier} failed for {event.event_id}: {f.exception()}")
+                    continue
+                paths.append(self._write(f.result(), source, tier, event.risk_level))
+            renditions[tier] = paths
+
+        if self.storage and not self.storage.set_renditions(event.event_id, renditions, event.timestamp):
+            # Deleted by retention while transcoding: nothing will reference these
+            logger.info(f"Event {event.event_id} gone; discarding its renditions")
+            if self.evidence_store:
+                for paths in renditions.values():
+                    for path in paths:
+                        self.evidence_store.discard(path)
+            return
+        event.evidence.renditions.update(renditions)
+        self.completed += 1
+        self.bus.publish("renditions_ready", {"event_id": event.event_id,
+                                              "risk": event.risk_level.name,
+                                              "renditions": renditions})
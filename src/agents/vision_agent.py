@@ -1,28 +1,69 @@
 from src.core.event_bus import EventBus
 from src.core.types import OceanEvent, RiskLevel, EventType, Evidence, VisionLabel
+from src.database.evidence_store import EvidenceStore
+from src.core.tracing import tracer
+from src.core.metrics import registry
+from src.core.clock import Clock, SYSTEM_CLOCK
 import threading
 import time
-import datetime
 import uuid
+import os
 import logging
 import random
-import json
+import config
+from typing import Optional
 
 logger = logging.getLogger("VisionAgent")
 
+frames_processed = registry.counter("frames_processed_total", "Frames run through inference")
+frames_late = registry.counter("frames_late_total", "Frames skipped because the loop fell behind")
+detections_total = registry.counter("detections_total", "Raw detections published")
+
+def build_detection_event(detection: dict, frame_id: int, image_path: str, timestamp,
+                          camera_id: Optional[str] = None) -> OceanEvent:
+    """Internal packaging of a raw model detection for the bus."""
+    return OceanEvent(
+        event_id=f"DET_{uuid.uuid4().hex[:8]}",
+        timestamp=timestamp,
+        event_type=EventType.UNKNOWN, 
+        risk_level=RiskLevel.UNKNOWN,
+        confidence=detection["confidence"],
+        evidence=Evidence(image_paths=[image_path],
+                          feature_vectors=detection.get("embedding")),
+        label=detection["category"],
+        box=detection["bbox"],
+        motion=detection["motion"],
+        frame_id=frame_id,
+        camera_id=camera_id,
+        trace_id=f"{camera_id}:F{frame_id}" if camera_id else f"F{frame_id}" # Frame ids are per camera
+    )
+
 class VisionAgent:
-    def __init__(self, event_bus: EventBus):
+    def __init__(self, event_bus: EventBus, evidence_store: Optional[EvidenceStore] = None,
+                 frame_sink=None, clock: Clock = SYSTEM_CLOCK, camera_id: Optional[str] = None):
         self.bus = event_bus
+        self.clock = clock
+        self.camera_id = camera_id # Set when several cameras feed the pipeline
+        self.evidence_store = evidence_store
+        self.frame_sink = frame_sink # e.g. IncidentRecorder: receives every encoded frame
         self._stop_event = threading.Event()
-        self._thread = threading.Thread(target=self._inference_loop)
+        self._thread = threading.Thread(target=self._inference_loop, daemon=True)
+        self.heartbeat = None # time.monotonic() of the last frame, for the supervisor
         self.fps = 3 # Default start FPS
         self.model_type = "medium"
         self.frame_id = 100000 
+        self._next_due = None # Fixed frame schedule, on self.clock
+        self._window = None
+        self.METRICS_INTERVAL = 2.0 # Seconds between pipeline_metrics reports
+        # SIMULATION ONLY: per-model inference time of the mock model
+        self.SIM_MODEL_LATENCY = {"tiny": 0.008, "medium": 0.025, "large": 0.07}
         
         # Subscribe
         self.bus.subscribe("system_strategy_update", self.on_strategy_update)
 
     def on_strategy_update(self, strategy: dict):
+        # Per-camera budget when StrategyAgent plans for several cameras
+        strategy = {**strategy, **strategy.get("cameras", {}).get(self.camera_id, {})}
         new_fps = strategy.get("fps", 15)
         new_model = strategy.get("model_type", "medium")
         
@@ -36,38 +77,98 @@ class VisionAgent:
 
     def start(self):
         logger.info("Vision Model Loaded. Starting Inference (Local Only)...")
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._inference_loop, daemon=True)
         self._thread.start()
 
     def stop(self):
         self._stop_event.set()
-        self._thread.join()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
 
     def _inference_loop(self):
         while not self._stop_event.is_set():
-            # 1. Capture Frame (Dynamic Rate)
-            current_sleep = 1.0 / max(self.fps, 1) # Prevent div by zero
-            time.sleep(current_sleep)
-            self.frame_id += 1
-            
-            # 2. Run Inference
-            detections = self._mock_model_inference()
+            self.heartbeat = time.monotonic()
+            self.clock.sleep(self.step())
+
+    def step(self) -> float:
+        """Capture and process one frame; returns seconds until the next is due."""
+        # 1. Capture Frame (Dynamic Rate): fixed schedule, so processing time does not stretch the period
+        period = 1.0 / max(self.fps, 1) # Prevent div by zero
+        now = self.clock.monotonic()
+        if self._next_due is None:
+            self._next_due = now
+            self._window = self._new_window(now)
+        elif now - self._next_due > period:
+            # Fell more than a frame behind: those frames are lost, resync to now
+            late = int((now - self._next_due) / period)
+            self._window["late"] += late
+            frames_late.inc(late)
+            self._next_due = now
+        self._next_due += period
+        self.frame_id += 1
+        frames_processed.inc()
+        started = self.clock.monotonic()
+        captured_at = time.monotonic() # Tracing measures real processing latency
+
+        # 2. Run Inference
+        detections = self._mock_model_inference()
+        frame = None
+        if self.frame_sink or (detections and self.evidence_store):
+            frame = self._capture_frame(detections)
+        if self.frame_sink:
+            self.frame_sink.add_frame(self.frame_id, frame, ts=self.clock.time())
+
+        # 3. Output logic (Always log if there's a detection, or maybe structured log for every frame? 
+        # User request showed a specific format for "Output". Usually implies when something is found.)
+        if detections:
+            output_payload = {
+                # Embeddings stay out of the log (64 floats per detection)
+                "detections": [{k: v for k, v in d.items() if k != "embedding"} for d in detections],
+                "frame_id": self.frame_id
+            }
+            if self.camera_id:
+                output_payload["camera_id"] = self.camera_id
+            logger.info("detection", extra={"fields": output_payload})
             
-            # 3. Output logic (Always log if there's a detection, or maybe structured log for every frame? 
-            # User request showed a specific format for "Output". Usually implies when something is found.)
-            if detections:
-                output_payload = {
-                    "detections": detections,
-                    "frame_id": self.frame_id
-                }
-                logger.info(json.dumps(output_payload))
-                
-                # Publish event for internal system (mapping back to internal types)
-                # We take the primary/highest confidence detection for the event bus for now
-                if len(detections) > 0:
-                     self._publish_internal_event(detections[0])
+            # Publish event for internal system (mapping back to internal types)
+            # We take the primary/highest confidence detection for the event bus for now
+            detections_total.inc(len(detections))
+            self._publish_internal_event(detections[0], frame, captured_at=captured_at)
+
+        window = self._window
+        window["frames"] += 1
+        window["busy"] += self.clock.monotonic() - started
+        if self.clock.monotonic() - window["start"] >= self.METRICS_INTERVAL:
+            self._publish_metrics(window)
+            self._window = self._new_window(self.clock.monotonic())
+        return max(self._next_due - self.clock.monotonic(), 0.0)
+
+    @staticmethod
+    def _new_window(start: float) -> dict:
+        return {"start": start, "cpu": time.process_time(), "frames": 0, "busy": 0.0, "late": 0}
+
+    def _publish_metrics(self, window):
+        # Measured load for StrategyAgent's FPS controller
+        elapsed = max(self.clock.monotonic() - window["start"], 1e-9)
+        frames = max(window["frames"], 1)
+        self.bus.publish("pipeline_metrics", {
+            "camera_id": self.camera_id,
+            "model_type": self.model_type,
+            "fps_target": self.fps,
+            "fps_achieved": round(window["frames"] / elapsed, 2),
+            "frames": window["frames"],
+            "latency_ms": round(1000.0 * window["busy"] / frames, 2),
+            "backlog": window["late"],
+            "cpu_util": round((time.process_time() - window["cpu"]) / (elapsed * (os.cpu_count() or 1)), 3),
+        })
 
     def _mock_model_inference(self):
         # SIMULATION ONLY: mimicking a local model
+        self.clock.sleep(self.SIM_MODEL_LATENCY.get(self.model_type, 0.025))
         
         # To test BioConfirm, we need COHERENCE.
         # Let's simulate:
@@ -76,6 +177,9 @@ class VisionAgent:
         
         if not hasattr(self, 'sim_target'):
             self.sim_target = None
+            # A few recurring individuals, so the same animal resurfaces
+            self.sim_population = [[random.gauss(0, 1) for _ in range(config.EMBEDDING_DIM)]
+                                   for _ in range(5)]
             
         if self.sim_target is None:
             # Maybe spawn a new target
@@ -83,7 +187,8 @@ class VisionAgent:
                 self.sim_target = {
                     "cat": VisionLabel.LARGE_MARINE_LIFE,
                     "box": [100, 100, 260, 260], # Width 160 > 150
-                    "life": 15 # Lasts longer
+                    "life": 15, # Lasts longer
+                    "identity": random.choice(self.sim_population)
                 }
         
         if self.sim_target:
@@ -100,7 +205,9 @@ class VisionAgent:
                 "category": self.sim_target["cat"].value,
                 "confidence": 0.9,
                 "bbox": self.sim_target["box"],
-                "motion": [float(dx), float(dy)]
+                "motion": [float(dx), float(dy)],
+                # Appearance embedding: the individual's signature plus per-frame noise
+                "embedding": [x + random.gauss(0, 0.2) for x in self.sim_target["identity"]]
             }]
             
             if self.sim_target["life"] <= 0:
@@ -110,20 +217,21 @@ class VisionAgent:
             
         return []
 
-    def _publish_internal_event(self, primary_detection):
-        # Internal packaging for other agents
-        event = OceanEvent(
-            event_id=f"DET_{uuid.uuid4().hex[:8]}",
-            timestamp=datetime.datetime.now(),
-            event_type=EventType.UNKNOWN, 
-            risk_level=RiskLevel.UNKNOWN,
-            confidence=primary_detection["confidence"],
-            evidence=Evidence(image_paths=["/tmp/mock_det.jpg"]),
-            metadata={
-                "raw_label": primary_detection["category"],
-                "box": primary_detection["bbox"],
-                "motion": primary_detection["motion"],
-                "frame_id": self.frame_id
-            }
-        )
+    def _capture_frame(self, detections) -> bytes:
+        # SIMULATION ONLY: stand-in for the encoded camera frame.
+        # An unchanged scene encodes to identical bytes, which the store deduplicates.
+        scene = [(d["category"], d["bbox"]) for d in detections]
+        return f"MOCK_JPEG {scene}".encode("utf-8")
+
+    def _publish_internal_event(self, primary_detection, frame: Optional[bytes] = None,
+                                captured_at: Optional[float] = None):
+        if self.evidence_store:
+            image_path = self.evidence_store.put(frame or self._capture_frame([primary_detection]))
+        else:
+            image_path = "/tmp/mock_det.jpg"
+
+        event = build_detection_event(primary_detection, self.frame_id, image_path,
+                                      self.clock.now(), self.camera_id)
+        tracer.start(event.trace_id, at=captured_at)
+        tracer.mark(event.trace_id, "vision")
         self.bus.publish("vision_detection", event)
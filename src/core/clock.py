@@ -0,0 +1,103 @@
+import heapq
+import itertools
+import time
+from datetime import datetime
+from typing import Callable, Optional, Protocol
+
+
+class Clock(Protocol):
+    """Where agents read the time and wait.
+
+    SystemClock is the wall clock. VirtualClock replaces it for headless runs,
+    so every timing rule (dropout windows, cooldowns, rate limits, retention
+    ages) holds while simulated days pass in minutes.
+    """
+
+    def time(self) -> float: ...
+
+    def monotonic(self) -> float: ...
+
+    def sleep(self, seconds: float): ...
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self.time())
+
+
+class SystemClock(Clock):
+    def time(self) -> float:
+        return time.time()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+SYSTEM_CLOCK = SystemClock()
+
+
+class VirtualClock(Clock):
+    """Discrete-event scheduler whose time only moves when told to.
+
+    Callbacks run in due order; one that returns a number is rescheduled that
+    many seconds later. sleep() advances the clock without waiting, so work
+    modelled as taking time (e.g. mock inference) pushes later callbacks back
+    the way a busy thread would. Single-threaded: drive it from one thread.
+    """
+
+    def __init__(self, start: Optional[float] = None):
+        self._now = time.time() if start is None else start
+        self._queue = []  # (due, seq, callback)
+        self._seq = itertools.count()
+
+        # Stats
+        self.callbacks_run = 0
+
+    def time(self) -> float:
+        return self._now
+
+    def monotonic(self) -> float:
+        return self._now
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            self._now += seconds
+
+    def advance(self, seconds: float):
+        self.run_until(self._now + seconds)
+
+    def call_at(self, when: float, callback: Callable[[], Optional[float]]):
+        heapq.heappush(self._queue, (when, next(self._seq), callback))
+
+    def call_later(self, delay: float, callback: Callable[[], Optional[float]]):
+        self.call_at(self._now + max(delay, 0.0), callback)
+
+    def call_every(self, interval: float, callback: Callable[[], object], first: float = 0.0):
+        """Run callback every interval seconds, whatever it returns."""
+        def tick():
+            callback()
+            return interval
+        self.call_later(first, tick)
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def next_due(self) -> Optional[float]:
+        return self._queue[0][0] if self._queue else None
+
+    def run_until(self, deadline: float) -> int:
+        """Run every callback due up to deadline, then leave the clock at deadline."""
+        ran = 0
+        while self._queue and self._queue[0][0] <= deadline:
+            due, _, callback = heapq.heappop(self._queue)
+            self._now = max(self._now, due)
+            delay = callback()
+            ran += 1
+            if delay is not None:
+                self.call_later(delay, callback)
+        self._now = max(self._now, deadline)
+        self.callbacks_run += ran
+        return ran
@@ -0,0 +1,173 @@
+import json
+import logging
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import config
+from src.core.fps_controller import ModeBounds
+from src.core.clock import Clock, SYSTEM_CLOCK
+
+logger = logging.getLogger("Energy")
+
+
+@dataclass
+class BatteryState:
+    level_pct: float
+    capacity_wh: float
+    charging: bool = False
+
+    @property
+    def remaining_wh(self) -> float:
+        return self.capacity_wh * self.level_pct / 100.0
+
+
+class BatterySource(ABC):
+    """Where battery state comes from (BMS, power supply class, ...)."""
+
+    @abstractmethod
+    def read(self) -> Optional[BatteryState]:
+        """Current state, or None if it cannot be read right now."""
+
+
+class FileBatterySource(BatterySource):
+    """Battery state from a small file: a JSON object or a bare percentage.
+
+    {"level_pct": 73, "capacity_wh": 2400, "charging": false}
+    """
+
+    def __init__(self, path: str = config.BATTERY_STATE_FILE,
+                 capacity_wh: float = config.BATTERY_CAPACITY_WH):
+        self.path = path
+        self.capacity_wh = capacity_wh
+
+    def read(self) -> Optional[BatteryState]:
+        try:
+            with open(self.path) as f:
+                raw = f.read().strip()
+        except OSError:
+            return None
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            logger.warning(f"Unreadable battery state in {self.path}")
+            return None
+        if isinstance(data, (int, float)):
+            data = {"level_pct": data}
+        try:
+            return BatteryState(level_pct=float(data["level_pct"]),
+                                capacity_wh=float(data.get("capacity_wh", self.capacity_wh)),
+                                charging=bool(data.get("charging", False)))
+        except (KeyError, TypeError, ValueError):
+            logger.warning(f"Unreadable battery state in {self.path}")
+            return None
+
+
+class EnergyModel:
+    """Estimated energy cost of the pipeline, plus a running account of it."""
+
+    def __init__(self, baseline_w: float = config.ENERGY_BASELINE_W,
+                 j_per_inference: Optional[Dict[str, float]] = None,
+                 j_per_frame: float = config.ENERGY_J_PER_FRAME,
+                 j_per_uplink_byte: float = config.ENERGY_J_PER_UPLINK_BYTE):
+        self.baseline_w = baseline_w
+        self.j_per_inference = dict(j_per_inference or config.ENERGY_J_PER_INFERENCE)
+        self.j_per_frame = j_per_frame
+        self.j_per_uplink_byte = j_per_uplink_byte
+
+        self._lock = threading.Lock()
+        self.joules = {"inference": 0.0, "frames": 0.0, "uplink": 0.0}
+
+    def frame_cost(self, model: str) -> float:
+        return self.j_per_frame + self.j_per_inference.get(model, self.j_per_inference["medium"])
+
+    def power_w(self, fps: float, model: str) -> float:
+        return self.baseline_w + fps * self.frame_cost(model)
+
+    def max_fps(self, power_w: float, model: str) -> float:
+        return max(0.0, (power_w - self.baseline_w) / self.frame_cost(model))
+
+    # --- Accounting ---
+
+    def record_frames(self, frames: int, model: str):
+        with self._lock:
+            self.joules["frames"] += frames * self.j_per_frame
+            self.joules["inference"] += frames * self.j_per_inference.get(model, 0.0)
+
+    def record_uplink(self, nbytes: int):
+        with self._lock:
+            self.joules["uplink"] += nbytes * self.j_per_uplink_byte
+
+    def total_joules(self) -> float:
+        with self._lock:
+            return sum(self.joules.values())
+
+
+class EnergyPlanner:
+    """Fits inference to the energy left for a target endurance.
+
+    The budget is the remaining battery energy spread evenly over the time
+    left until the deadline (default ENDURANCE_TARGET_HOURS from start),
+    minus what the uplink has been drawing recently. Mode bounds are then
+    capped per model to the FPS that budget pays for.
+    """
+
+    def __init__(self, model: EnergyModel, source: BatterySource,
+                 target_hours: float = config.ENDURANCE_TARGET_HOURS,
+                 clock: Clock = SYSTEM_CLOCK):
+        self.model = model
+        self.source = source
+        self.clock = clock
+        self.deadline = clock.time() + target_hours * 3600
+
+        # Config
+        self.MIN_HORIZON_SECONDS = 3600  # Never plan as if the deadline were closer than this
+        self.TIGHT_RATIO = 0.8  # Budget below this share of the mode's nominal draw -> trim storage too
+
+        self.state: Optional[BatteryState] = None
+        self._uplink_w = 0.0
+        self._last_uplink = (clock.monotonic(), 0.0)
+
+    def set_deadline(self, deadline: float):
+        self.deadline = deadline
+
+    def refresh(self, state: Optional[BatteryState] = None) -> Optional[BatteryState]:
+        """Re-read the battery (or take a reading already made elsewhere) and uplink draw."""
+        self.state = state if state is not None else self.source.read()
+        now = self.clock.monotonic()
+        last_t, last_j = self._last_uplink
+        uplink_j = self.model.joules["uplink"]
+        if now > last_t:
+            self._uplink_w = (uplink_j - last_j) / (now - last_t)
+        self._last_uplink = (now, uplink_j)
+        return self.state
+
+    def budget_w(self, now: Optional[float] = None) -> Optional[float]:
+        """Average power affordable from here to the deadline, or None if unconstrained."""
+        if self.state is None or self.state.charging:
+            return None
+        horizon = max(self.deadline - (now or self.clock.time()), self.MIN_HORIZON_SECONDS)
+        return self.state.remaining_wh * 3600.0 / horizon - self._uplink_w
+
+    def cap(self, bounds: ModeBounds, streams: int = 1) -> Optional[ModeBounds]:
+        """Per-stream bounds limited to the budget; None if not even the cheapest setting fits."""
+        budget = self.budget_w()
+        if budget is None:
+            return bounds
+        caps = {m: min(bounds.max_fps, int(self.model.max_fps(budget, m) / streams)) for m in bounds.models}
+        models = tuple(m for m in bounds.models if caps[m] >= bounds.min_fps)
+        if not models:
+            return None
+        return ModeBounds(bounds.min_fps, max(caps[m] for m in models), models,
+                          {m: caps[m] for m in models})
+
+    def is_tight(self, nominal_fps: int, nominal_model: str, streams: int = 1) -> bool:
+        budget = self.budget_w()
+        return budget is not None and \
+            budget < self.TIGHT_RATIO * self.model.power_w(nominal_fps * streams, nominal_model)
+
+    def endurance_hours(self, fps: float, model: str) -> Optional[float]:
+        if self.state is None:
+            return None
+        return self.state.remaining_wh / (self.model.power_w(fps, model) + self._uplink_w)
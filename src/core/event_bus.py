@@ -1,23 +1,113 @@
 from typing import Callable, Dict, List, Any
 import logging
+import threading
+import time
+from src.core.metrics import registry
 
 # Configure logging for the bus
 logger = logging.getLogger("EventBus")
 
+handler_errors = registry.counter("event_bus_handler_errors_total", "Subscriber exceptions caught by publish", ["topic"])
+handler_seconds = registry.counter("event_bus_handler_seconds_total",
+                                   "Time spent in each subscriber, excluding the subscribers it published to",
+                                   ["topic", "handler", "instance"])
+
+# Per-thread stack of child time, one entry per handler call in progress: a
+# handler publishing to another topic is charged only for its own work.
+_nesting = threading.local()
+
+class HandlerStats:
+    """Cumulative cost of one subscriber on one topic.
+
+    `seconds` is exclusive (self) time; `inclusive_seconds` also counts the
+    handlers it triggered by publishing.
+    """
+    __slots__ = ("topic", "name", "instance", "calls", "seconds", "inclusive_seconds", "max_seconds",
+                 "warned", "_metric", "_lock")
+
+    def __init__(self, topic: str, name: str, instance: str = ""):
+        self.topic = topic
+        self.name = name
+        self.instance = instance
+        self.calls = 0
+        self.seconds = 0.0
+        self.inclusive_seconds = 0.0
+        self.max_seconds = 0.0
+        self.warned = False
+        self._metric = handler_seconds.labels(topic, name, instance)
+        self._lock = threading.Lock()
+
+    def to_dict(self):
+        return {
+            "topic": self.topic,
+            "handler": self.name,
+            "instance": self.instance,
+            "calls": self.calls,
+            "total_ms": round(self.seconds * 1000, 2),
+            "inclusive_ms": round(self.inclusive_seconds * 1000, 2),
+            "mean_ms": round(self.seconds * 1000 / self.calls, 3) if self.calls else 0.0,
+            "max_ms": round(self.max_seconds * 1000, 2),
+        }
+
 class EventBus:
     def __init__(self):
         self._subscribers: Dict[str, List[Callable]] = {}
+        self._stats: Dict[str, List[HandlerStats]] = {} # Parallel to _subscribers
+
+        # Config
+        self.SLOW_HANDLER_SECONDS = 0.05 # One call this long gets the handler named in the log
 
-    def subscribe(self, event_type: str, handler: Callable):
+    def subscribe(self, event_type: str, handler: Callable, instance: str = ""):
+        """`instance` tells apart several objects subscribing the same method (e.g. a camera id)."""
         if event_type not in self._subscribers:
             self._subscribers[event_type] = []
+            self._stats[event_type] = []
+        name = getattr(handler, "__qualname__", None) or repr(handler)
+        taken = {s.instance for s in self._stats[event_type] if s.name == name}
+        label, n = instance, 1
+        while label in taken:
+            label, n = f"{instance}#{n}", n + 1
+        self._stats[event_type].append(HandlerStats(event_type, name, label))
         self._subscribers[event_type].append(handler)
-        logger.debug(f"Subscribed to {event_type}: {handler.__name__}")
+        logger.debug(f"Subscribed to {event_type}: {name}")
 
     def publish(self, event_type: str, data: Any = None):
         if event_type in self._subscribers:
-            for handler in self._subscribers[event_type]:
+            stack = getattr(_nesting, "stack", None)
+            if stack is None:
+                stack = _nesting.stack = []
+            for handler, stats in zip(self._subscribers[event_type], self._stats[event_type]):
+                stack.append(0.0)
+                started = time.perf_counter()
                 try:
                     handler(data)
                 except Exception as e:
+                    handler_errors.labels(event_type).inc()
                     logger.error(f"Error handling event {event_type}: {e}")
+                finally:
+                    elapsed = time.perf_counter() - started
+                    child = stack.pop()
+                    if stack:
+                        stack[-1] += elapsed
+                self._account(stats, elapsed - child, elapsed)
+
+    def _account(self, stats: HandlerStats, elapsed: float, inclusive: float):
+        with stats._lock:
+            stats.calls += 1
+            stats.seconds += elapsed
+            stats.inclusive_seconds += inclusive
+            slowest = elapsed > stats.max_seconds
+            if slowest:
+                stats.max_seconds = elapsed
+            warn = slowest and elapsed > self.SLOW_HANDLER_SECONDS and not stats.warned
+            if warn:
+                stats.warned = True
+        stats._metric.inc(elapsed)
+        if warn:
+            logger.warning(f"Slow subscriber {stats.name} on {stats.topic}: {elapsed * 1000:.0f} ms")
+
+    def handler_stats(self, top: int = None) -> List[dict]:
+        """Subscribers by cumulative self time, most expensive first."""
+        stats = [s for per_topic in list(self._stats.values()) for s in per_topic]
+        stats.sort(key=lambda s: s.seconds, reverse=True)
+        return [s.to_dict() for s in stats[:top]]
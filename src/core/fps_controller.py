@@ -0,0 +1,160 @@
+import logging
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional, Sequence, Tuple
+
+logger = logging.getLogger("FpsController")
+
+# Cheapest first
+MODEL_ORDER = ("tiny", "medium", "large")
+
+
+@dataclass(frozen=True)
+class ModeBounds:
+    min_fps: int
+    max_fps: int
+    models: Sequence[str]  # Allowed model sizes, preferred (largest) first
+    model_max_fps: Optional[Mapping[str, int]] = None  # Tighter per-model ceilings (e.g. energy)
+
+    def ceiling(self, model: str) -> int:
+        if self.model_max_fps and model in self.model_max_fps:
+            return min(self.max_fps, self.model_max_fps[model])
+        return self.max_fps
+
+
+class FpsController:
+    """Closed-loop FPS/model selection from measured pipeline load.
+
+    Load is the share of each frame period spent in inference
+    (latency x fps), together with process CPU use and the number of frames
+    the vision loop fell behind. Overload cuts FPS multiplicatively (then
+    drops to a smaller model once at the floor); sustained headroom raises
+    it additively (after first restoring the preferred model) up to the
+    mode's ceiling and the measured capacity. A bigger model whose last
+    measurement ruled it out is re-probed after a while of calm. Separate
+    high/low thresholds, a streak requirement and a hold-off after each
+    change keep it from oscillating.
+    """
+
+    def __init__(self):
+        # Config
+        self.TARGET_LOAD = 0.75  # Capacity estimate leaves this much slack
+        self.HIGH_LOAD = 0.9
+        self.LOW_LOAD = 0.6
+        self.HIGH_CPU = 0.9
+        self.LOW_CPU = 0.7
+        self.DECREASE_FACTOR = 0.75
+        self.INCREASE_STEP = 2
+        self.UPGRADE_STREAK = 3  # Consecutive calm samples before stepping up
+        self.HOLD_SAMPLES = 1  # Samples ignored after a change (they mix old and new settings)
+        self.PROBE_AFTER = 5  # Calm step-ups refused on a stale estimate before retrying the bigger model
+        self.EWMA_ALPHA = 0.5
+
+        self.bounds: Optional[ModeBounds] = None
+        self.fps = 0
+        self.model = ""
+        self._latency_ms: Dict[str, float] = {}  # Per-model latency estimate, survives mode changes
+        self._calm = 0
+        self._hold = 0
+        self._refused = 0
+
+    def reset(self, bounds: ModeBounds, fps: int, model: str):
+        """New mode: start from its nominal setting, clamped to its bounds."""
+        self.bounds = bounds
+        self.model = model if model in bounds.models else bounds.models[0]
+        self.fps = max(bounds.min_fps, min(fps, bounds.ceiling(self.model)))
+        self._calm = 0
+        self._hold = self.HOLD_SAMPLES
+
+    def set_bounds(self, bounds: ModeBounds) -> bool:
+        """Same mode, new limits: clamp the current setting without restarting. True if it changed."""
+        self.bounds = bounds
+        model = self.model if self.model in bounds.models else bounds.models[-1]
+        fps = max(bounds.min_fps, min(self.fps, bounds.ceiling(model)))
+        if (fps, model) == (self.fps, self.model):
+            return False
+        self.fps, self.model = fps, model
+        self._hold = self.HOLD_SAMPLES
+        return True
+
+    def capacity(self, model: Optional[str] = None) -> Optional[float]:
+        """Highest FPS the given model sustains at TARGET_LOAD, if measured."""
+        latency = self._latency_ms.get(model or self.model)
+        if not latency:
+            return None
+        return self.TARGET_LOAD * 1000.0 / latency
+
+    def observe(self, metrics: dict) -> Optional[Tuple[int, str]]:
+        """Feed one pipeline_metrics sample; returns (fps, model) when it should change."""
+        if self.bounds is None:
+            return None
+        model = metrics.get("model_type", self.model)
+        latency = metrics.get("latency_ms")
+        if latency:
+            prev = self._latency_ms.get(model)
+            self._latency_ms[model] = latency if prev is None else \
+                self.EWMA_ALPHA * latency + (1 - self.EWMA_ALPHA) * prev
+
+        if self._hold > 0 or model != self.model:
+            self._hold = max(0, self._hold - 1)
+            return None
+
+        fps = max(metrics.get("fps_target", self.fps), 1)
+        load = (self._latency_ms.get(model, 0.0) / 1000.0) * fps
+        cpu = metrics.get("cpu_util", 0.0)
+        backlog = metrics.get("backlog", 0)
+
+        if load > self.HIGH_LOAD or cpu > self.HIGH_CPU or backlog > 0:
+            self._calm = 0
+            return self._step_down()
+        if load < self.LOW_LOAD and cpu < self.LOW_CPU:
+            self._calm += 1
+            if self._calm >= self.UPGRADE_STREAK:
+                self._calm = 0
+                return self._step_up()
+        else:
+            self._calm = 0
+        return None
+
+    def _apply(self, fps: int, model: str) -> Optional[Tuple[int, str]]:
+        if (fps, model) == (self.fps, self.model):
+            return None
+        logger.info(f"FPS control: {self.fps}@{self.model} -> {fps}@{model}")
+        self.fps, self.model = fps, model
+        self._hold = self.HOLD_SAMPLES
+        return fps, model
+
+    def _step_down(self) -> Optional[Tuple[int, str]]:
+        b = self.bounds
+        target = int(self.fps * self.DECREASE_FACTOR)
+        capacity = self.capacity()
+        if capacity is not None:
+            target = min(target, int(capacity))
+        if target >= b.min_fps:
+            return self._apply(target, self.model)
+        # At the floor: a cheaper model buys the headroom instead
+        smaller = [m for m in b.models if MODEL_ORDER.index(m) < MODEL_ORDER.index(self.model)]
+        if smaller:
+            model = max(smaller, key=MODEL_ORDER.index)
+            cap = self.capacity(model)
+            fps = b.min_fps if cap is None else max(b.min_fps, min(self.fps, int(cap)))
+            return self._apply(fps, model)
+        return self._apply(b.min_fps, self.model)
+
+    def _step_up(self) -> Optional[Tuple[int, str]]:
+        b = self.bounds
+        preferred = b.models[0]
+        if self.model != preferred:
+            cap = self.capacity(preferred)
+            # The estimate for a model not running is stale, so re-measure it now and then
+            affordable = self.fps <= b.ceiling(preferred)
+            if affordable and (cap is None or cap >= self.fps or self._refused >= self.PROBE_AFTER):
+                if cap is not None and cap < self.fps:
+                    del self._latency_ms[preferred]  # Probe: let the new measurement stand alone
+                self._refused = 0
+                return self._apply(self.fps, preferred)
+            self._refused += 1
+        target = min(self.fps + self.INCREASE_STEP, b.ceiling(self.model))
+        capacity = self.capacity()
+        if capacity is not None:
+            target = min(target, max(self.fps, int(capacity)))
+        return self._apply(target, self.model)
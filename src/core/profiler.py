@@ -0,0 +1,184 @@
+import json
+import logging
+import os
+import signal
+import socketserver
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, Optional
+
+import config
+
+logger = logging.getLogger("Profiler")
+
+
+class SamplingProfiler:
+    """Statistical profiler: snapshots every thread's stack at a fixed interval.
+
+    Uses sys._current_frames() from a background thread, so the profiled
+    code is untouched and the cost is one stack walk per thread per sample.
+    Output is collapsed stacks ("thread;outer;...;inner count"), the input
+    format of flamegraph.pl, speedscope and similar tools.
+    """
+
+    def __init__(self, interval: float = config.PROFILE_INTERVAL_MS / 1000.0, max_depth: int = 64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration: Optional[float] = None,
+              on_done: Optional[Callable[["SamplingProfiler"], None]] = None) -> bool:
+        """Begin sampling for `duration` seconds (until stop() if None). False if already running."""
+        if self.running:
+            return False
+        self.samples = Counter()
+        self.sample_count = 0
+        self._stop_event.clear()
+        deadline = time.monotonic() + duration if duration else None
+        self._thread = threading.Thread(target=self._run, args=(deadline, on_done),
+                                        name="SamplingProfiler", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop_event.set()
+        if self.running and threading.current_thread() is not self._thread:
+            self._thread.join()
+
+    def _run(self, deadline: Optional[float], on_done):
+        me = threading.get_ident()
+        names = {}
+        while not self._stop_event.wait(self.interval):
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            frames = sys._current_frames()
+            if any(ident not in names for ident in frames):
+                names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in frames.items():
+                if ident != me:
+                    self.samples[self._collapse(names.get(ident, str(ident)), frame)] += 1
+            self.sample_count += 1
+        if on_done:
+            try:
+                on_done(self)
+            except Exception as e:
+                logger.error(f"Profile output failed: {e}")
+
+    def _collapse(self, thread_name: str, frame) -> str:
+        stack = []
+        while frame is not None and len(stack) < self.max_depth:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        stack.append(thread_name)
+        return ";".join(reversed(stack))
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def write(self, path: str):
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(self.collapsed())
+        os.replace(tmp, path)
+
+
+class _ControlHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        control: "ProfilerControl" = self.server.control
+        line = self.rfile.readline().decode("utf-8", "replace").split()
+        if not line:
+            return
+        command, args = line[0], line[1:]
+        try:
+            if command == "profile":
+                path = control.profile(float(args[0]) if args else None)
+                reply = f"started {path}" if path else "busy"
+            elif command == "handlers":
+                top = int(args[0]) if args else 20
+                reply = json.dumps(control.event_bus.handler_stats(top) if control.event_bus else [])
+            else:
+                reply = "unknown command (profile [seconds] | handlers [top])"
+        except ValueError:
+            reply = f"bad argument: {' '.join(args)}"
+        self.wfile.write((reply + "\n").encode("utf-8"))
+
+
+class _ControlServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class ProfilerControl:
+    """Runtime switch for the profiler: SIGUSR2 or a local control socket.
+
+    Each trigger profiles for a bounded window and writes a .folded file to
+    PROFILE_DIR. The socket also answers "handlers", the EventBus
+    subscribers ranked by cumulative time.
+
+        echo "profile 30" | nc -U oceanviewer.ctl
+    """
+
+    def __init__(self, event_bus=None, directory: str = config.PROFILE_DIR,
+                 socket_path: Optional[str] = config.PROFILER_SOCKET,
+                 seconds: float = config.PROFILE_SECONDS):
+        self.event_bus = event_bus
+        self.directory = directory
+        self.socket_path = socket_path
+        self.profiler = SamplingProfiler()
+
+        # Config
+        self.DEFAULT_SECONDS = seconds
+        self.MAX_SECONDS = 600
+
+        self._server: Optional[_ControlServer] = None
+        self.last_output: Optional[str] = None
+
+    def profile(self, seconds: Optional[float] = None) -> Optional[str]:
+        """Start a bounded profiling window; returns the output path, or None if one is running."""
+        seconds = min(seconds or self.DEFAULT_SECONDS, self.MAX_SECONDS)
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, time.strftime("profile-%Y%m%d-%H%M%S.folded"))
+        if not self.profiler.start(seconds, on_done=lambda p: self._finish(p, path)):
+            return None
+        logger.info(f"Profiling for {seconds:.0f} s -> {path}")
+        return path
+
+    def _finish(self, profiler: SamplingProfiler, path: str):
+        profiler.write(path)
+        self.last_output = path
+        logger.info(f"Profile written: {path} ({profiler.sample_count} samples)")
+        if self.event_bus:
+            logger.info("handler_cost", extra={"fields": {"handlers": self.event_bus.handler_stats(top=10)}})
+
+    def install_signal(self, signum: int = getattr(signal, "SIGUSR2", None)):
+        if signum is None:
+            return
+        signal.signal(signum, lambda *_: self.profile())
+
+    def start(self):
+        if not self.socket_path:
+            return
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)  # Stale socket from a previous run
+        self._server = _ControlServer(self.socket_path, _ControlHandler)
+        self._server.control = self
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        logger.info(f"Profiler control socket: {self.socket_path}")
+
+    def stop(self):
+        self.profiler.stop()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
@@ -0,0 +1,49 @@
+import math
+from collections import deque
+from typing import Optional
+
+
+class RollingWindow:
+    """Mean and standard deviation of the last `size` samples in O(1) per update."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._values = deque()
+        self._sum = 0.0
+        self._sumsq = 0.0
+
+    def __len__(self):
+        return len(self._values)
+
+    def add(self, x: float):
+        if len(self._values) == self.size:
+            old = self._values.popleft()
+            self._sum -= old
+            self._sumsq -= old * old
+        self._values.append(x)
+        self._sum += x
+        self._sumsq += x * x
+
+    @property
+    def mean(self) -> float:
+        return self._sum / len(self._values) if self._values else 0.0
+
+    @property
+    def stddev(self) -> float:
+        n = len(self._values)
+        if n < 2:
+            return 0.0
+        # Clamp: running sums can dip a hair below zero from float cancellation
+        return math.sqrt(max(0.0, self._sumsq / n - (self._sum / n) ** 2))
+
+
+class Ewma:
+    """Exponentially weighted moving average; None until the first sample."""
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.value: Optional[float] = None
+
+    def add(self, x: float) -> float:
+        self.value = x if self.value is None else self.alpha * x + (1 - self.alpha) * self.value
+        return self.value
@@ -0,0 +1,187 @@
+import atexit
+import itertools
+import json
+import logging
+import logging.handlers
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+import config
+
+_STANDARD_FORMAT = "%(asctime)s [%(name)s] %(levelname)s: %(message)s"
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, plus the record's fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            line.update(fields)
+        if record.exc_info:
+            line["exc"] = self.formatException(record.exc_info)
+        return json.dumps(line, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """The usual console line, with structured fields appended as JSON."""
+
+    def __init__(self):
+        super().__init__(_STANDARD_FORMAT)
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        fields = getattr(record, "fields", None)
+        return f"{text} {json.dumps(fields, default=str)}" if fields else text
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps 1 in N structured records per logger (those logged with extra={"fields": ...}).
+
+    Plain messages and anything at WARNING or above always pass.
+    """
+
+    def __init__(self, every: Dict[str, int]):
+        super().__init__()
+        self.every = {name: n for name, n in every.items() if n > 1}
+        self._counters = {name: itertools.count() for name in self.every}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        counter = self._counters.get(record.name)
+        if counter is None or record.levelno >= logging.WARNING or not hasattr(record, "fields"):
+            return True
+        return next(counter) % self.every[record.name] == 0
+
+
+class RingBufferHandler(logging.Handler):
+    """Parks records in a bounded in-memory ring; nothing is formatted or written here.
+
+    The caller's cost is a filter check, a shallow copy of the record's
+    fields (the caller may reuse or change that dict before the writer
+    gets to it) and one deque append (atomic, no handler lock). When the
+    writer falls behind, the oldest records are overwritten and counted in
+    `dropped`.
+    """
+
+    def __init__(self, capacity: int = config.LOG_RING_CAPACITY):
+        super().__init__()
+        self.capacity = capacity
+        self.ring = deque(maxlen=capacity)
+        self.dropped = 0
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        if not self.filter(record):
+            return False
+        fields = getattr(record, "fields", None)
+        if fields:
+            record.fields = dict(fields)
+        if len(self.ring) >= self.capacity:
+            self.dropped += 1
+        self.ring.append(record)
+        return True
+
+    def emit(self, record: logging.LogRecord):
+        self.handle(record)
+
+
+class LogWriter:
+    """Background thread that drains a RingBufferHandler into real handlers."""
+
+    def __init__(self, source: RingBufferHandler, targets: List[logging.Handler],
+                 flush_interval: float = 0.2):
+        self.source = source
+        self.targets = targets
+        self.FLUSH_INTERVAL = flush_interval
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="LogWriter", daemon=True)
+        self._reported_drops = 0
+
+        # Stats
+        self.written = 0
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        """Write out whatever is still buffered and close the targets."""
+        if self._stop_event.is_set():
+            return
+        self._stop_event.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        for target in self.targets:
+            target.close()
+
+    def _run(self):
+        while not self._stop_event.wait(self.FLUSH_INTERVAL):
+            self.drain()
+        self.drain()
+
+    def drain(self) -> int:
+        ring, count = self.source.ring, 0
+        while True:
+            try:
+                record = ring.popleft()
+            except IndexError:
+                break
+            self._write(record)
+            count += 1
+        dropped = self.source.dropped
+        if dropped != self._reported_drops:
+            self._write(logging.LogRecord(
+                "LogWriter", logging.WARNING, __file__, 0,
+                f"Log ring overflowed: {dropped - self._reported_drops} records dropped", None, None))
+            self._reported_drops = dropped
+        if count:
+            for target in self.targets:
+                target.flush()
+        self.written += count
+        return count
+
+    def _write(self, record: logging.LogRecord):
+        for target in self.targets:
+            if record.levelno >= target.level:
+                try:
+                    target.emit(record)
+                except Exception:
+                    target.handleError(record)
+
+
+def setup_logging(path: Optional[str] = config.LOG_FILE, level: int = logging.INFO,
+                  console: bool = True, sample_every: Optional[Dict[str, int]] = None,
+                  capacity: int = config.LOG_RING_CAPACITY) -> LogWriter:
+    """Route the root logger through the ring buffer and start the writer thread.
+
+    File output is JSON lines, rotated at LOG_MAX_BYTES; console output keeps
+    the familiar text format.
+    """
+    targets: List[logging.Handler] = []
+    if path:
+        file_handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=config.LOG_MAX_BYTES, backupCount=config.LOG_BACKUP_COUNT)
+        file_handler.setFormatter(JsonFormatter())
+        targets.append(file_handler)
+    if console:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(TextFormatter())
+        targets.append(stream_handler)
+
+    ring = RingBufferHandler(capacity)
+    ring.addFilter(SamplingFilter(config.LOG_SAMPLE_EVERY if sample_every is None else sample_every))
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(ring)
+    root.setLevel(level)
+
+    writer = LogWriter(ring, targets)
+    writer.start()
+    atexit.register(writer.stop)
+    return writer
@@ -0,0 +1,288 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+import config
+from src.core.event_bus import EventBus
+from src.core.metrics import registry
+
+logger = logging.getLogger("Supervisor")
+
+agent_up = registry.gauge("agent_up", "1 while the agent's worker is alive and its heartbeat fresh", ["agent"])
+agent_restarts = registry.counter("agent_restarts_total", "Workers restarted after dying or stalling", ["agent"])
+
+
+def _spawn_call(fn: Callable, name: str) -> threading.Thread:
+    """Run fn on a daemon helper thread (errors are logged there)."""
+    def run():
+        try:
+            fn()
+        except Exception as e:
+            logger.error(f"{name}: {e}")
+    worker = threading.Thread(target=run, name=f"supervisor-{name}", daemon=True)
+    worker.start()
+    return worker
+
+
+def _call_with_timeout(fn: Callable, timeout: float, name: str) -> bool:
+    """Run fn on a helper thread; False if it is still running after timeout."""
+    worker = _spawn_call(fn, name)
+    worker.join(max(timeout, 0.0))
+    return not worker.is_alive()
+
+
+class _Supervised:
+    def __init__(self, name: str, agent, after: Sequence[str], stale_after: Optional[float],
+                 restart: bool):
+        self.name = name
+        self.agent = agent
+        self.after = tuple(after)
+        self.stale_after = stale_after
+        self.restart = restart
+        self.started = False
+        self.failed = False
+        self.restart_times: List[float] = []
+        self.stopping: Optional[threading.Thread] = None # A restart's stop() that overran its timeout
+        self.stop_requested_at = 0.0
+
+    def alive(self) -> bool:
+        is_alive = getattr(self.agent, "is_alive", None)
+        return is_alive() if is_alive else True
+
+    def heartbeat_age(self, now: float) -> Optional[float]:
+        beat = getattr(self.agent, "heartbeat", None)
+        return now - beat if beat else None
+
+    def healthy(self, now: float) -> bool:
+        if not self.alive():
+            return False
+        age = self.heartbeat_age(now)
+        return self.stale_after is None or age is None or age <= self.stale_after
+
+
+class Supervisor:
+    """Starts, watches and stops the agents.
+
+    Agents start in dependency waves (everything an agent runs `after` is up
+    first), each wave concurrently. A monitor thread checks every agent's
+    is_alive() and, if it keeps one, its `heartbeat` (time.monotonic() of its
+    last loop pass); a dead or stalled worker is stopped and started again,
+    up to MAX_RESTARTS per RESTART_WINDOW_SECONDS.
+
+    shutdown() runs the waves in reverse, so producers stop before the
+    consumers that drain them: each agent's drain(timeout) (if any) and then
+    stop(), followed by the shutdown hooks (index saves, store closes), all
+    within one deadline. SIGTERM and a battery reading at or below
+    SHUTDOWN_BATTERY_PCT while discharging request the same shutdown.
+    """
+
+    def __init__(self, event_bus: Optional[EventBus] = None,
+                 deadline: float = config.SHUTDOWN_DEADLINE_SECONDS):
+        self.bus = event_bus
+        self.deadline = deadline
+        self._agents: Dict[str, _Supervised] = {}
+        self._hooks: List[tuple] = []
+        self._stop_event = threading.Event()
+        self._shutdown_requested = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.shutdown_reason: Optional[str] = None
+
+        # Config
+        self.CHECK_INTERVAL = 1.0
+        self.MAX_RESTARTS = 5
+        self.RESTART_WINDOW_SECONDS = 600
+        self.RESTART_STOP_TIMEOUT = 5.0  # Longer: the restart waits for that stop() before starting again
+        self.RESTART_STOP_GIVE_UP_SECONDS = 60.0  # A stop() still running this long marks the agent failed
+        self.SHUTDOWN_BATTERY_PCT = config.SHUTDOWN_BATTERY_PCT
+
+        if self.bus:
+            self.bus.subscribe("resource_update", self.on_resource_update)
+
+    # --- Registration ---
+
+    def add(self, name: str, agent, after: Sequence[str] = (), stale_after: Optional[float] = None,
+            restart: bool = True):
+        """Supervise agent (start()/stop(), optionally is_alive(), heartbeat, drain())."""
+        if name in self._agents:
+            raise ValueError(f"Agent {name} already supervised")
+        self._agents[name] = _Supervised(name, agent, after, stale_after, restart)
+
+    def on_shutdown(self, name: str, hook: Callable[[], None]):
+        """Run hook after every agent has stopped (flushes, index saves, closes)."""
+        self._hooks.append((name, hook))
+
+    def waves(self) -> List[List[str]]:
+        """Agent names grouped so that each group only runs after earlier groups."""
+        placed, waves = set(), []
+        remaining = dict(self._agents)
+        while remaining:
+            wave = sorted(n for n, s in remaining.items() if all(d in placed for d in s.after))
+            if not wave:
+                missing = {n: [d for d in s.after if d not in placed] for n, s in remaining.items()}
+                raise ValueError(f"Unresolvable agent dependencies: {missing}")
+            waves.append(wave)
+            placed.update(wave)
+            for n in wave:
+                del remaining[n]
+        return waves
+
+    # --- Lifecycle ---
+
+    def start(self):
+        started = time.monotonic()
+        for wave in self.waves():
+            threads = [threading.Thread(target=self._start_one, args=(self._agents[n],), daemon=True)
+                       for n in wave]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        logger.info(f"{len(self._agents)} agents started in {time.monotonic() - started:.2f}s")
+        self._thread = threading.Thread(target=self._monitor_loop, name="Supervisor", daemon=True)
+        self._thread.start()
+
+    def _start_one(self, sup: _Supervised):
+        try:
+            sup.agent.start()
+            sup.started = True
+            agent_up.labels(sup.name).set(1)
+        except Exception as e:
+            logger.error(f"{sup.name} failed to start: {e}")
+            agent_up.labels(sup.name).set(0)
+
+    def request_shutdown(self, reason: str):
+        if not self._shutdown_requested.is_set():
+            self.shutdown_reason = reason
+            logger.warning(f"Shutdown requested: {reason}")
+            self._shutdown_requested.set()
+
+    def wait_for_shutdown(self, timeout: Optional[float] = None) -> bool:
+        return self._shutdown_requested.wait(timeout)
+
+    def on_resource_update(self, payload: dict):
+        battery = payload.get("battery") if isinstance(payload, dict) else None
+        if battery and not battery.charging and battery.level_pct <= self.SHUTDOWN_BATTERY_PCT:
+            self.request_shutdown(f"battery at {battery.level_pct:.0f}%")
+
+    def shutdown(self, deadline: Optional[float] = None) -> List[str]:
+        """Drain and stop everything within deadline seconds; returns what did not finish."""
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+        budget = self.deadline if deadline is None else deadline
+        end = time.monotonic() + budget
+        unfinished = []
+        for wave in reversed(self.waves()):
+            sups = [self._agents[n] for n in wave if self._agents[n].started]
+            drains = [s for s in sups if hasattr(s.agent, "drain")]
+            for s in drains:
+                if not _call_with_timeout(lambda a=s.agent: a.drain(max(end - time.monotonic(), 0.0)),
+                                          end - time.monotonic(), f"{s.name}.drain"):
+                    logger.warning(f"{s.name}: drain cut short by the shutdown deadline")
+            results = self._stop_concurrently(sups, end)
+            unfinished += [n for n, ok in results.items() if not ok]
+        for name, hook in self._hooks:
+            if not _call_with_timeout(hook, end - time.monotonic(), name):
+                unfinished.append(name)
+        elapsed = budget - (end - time.monotonic())
+        if unfinished:
+            logger.error(f"Shutdown deadline ({budget:.0f}s) passed; unfinished: {', '.join(unfinished)}")
+        else:
+            logger.info(f"Shutdown complete in {elapsed:.2f}s")
+        return unfinished
+
+    def _stop_concurrently(self, sups: Sequence[_Supervised], end: float) -> Dict[str, bool]:
+        results = {}
+
+        def stop(s):
+            results[s.name] = _call_with_timeout(s.agent.stop, end - time.monotonic(), s.name)
+            s.started = False
+            agent_up.labels(s.name).set(0)
+        threads = [threading.Thread(target=stop, args=(s,), daemon=True) for s in sups]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results
+
+    # --- Health ---
+
+    def status(self) -> Dict[str, dict]:
+        now = time.monotonic()
+        out = {}
+        for name, s in self._agents.items():
+            age = s.heartbeat_age(now)
+            out[name] = {
+                "alive": s.started and s.alive(),
+                "healthy": s.started and s.healthy(now),
+                "heartbeat_age_s": round(age, 2) if age is not None else None,
+                "restarts": len(s.restart_times),
+                "failed": s.failed,
+            }
+        return out
+
+    def check(self) -> List[str]:
+        """One health pass; returns the agents restarted."""
+        restarted = []
+        now = time.monotonic()
+        for s in list(self._agents.values()):
+            if s.failed or self._stop_event.is_set():
+                continue
+            if s.started and s.healthy(now):
+                agent_up.labels(s.name).set(1)
+                continue
+            agent_up.labels(s.name).set(0)
+            if not s.restart:
+                continue
+            if s.stopping is None:  # Waiting on an overrunning stop() is not a new attempt
+                s.restart_times = [t for t in s.restart_times if now - t < self.RESTART_WINDOW_SECONDS]
+                if len(s.restart_times) >= self.MAX_RESTARTS:
+                    self._fail(s, f"failed {self.MAX_RESTARTS} times in {self.RESTART_WINDOW_SECONDS}s")
+                    continue
+            if self._restart(s, now):
+                restarted.append(s.name)
+        return restarted
+
+    def _restart(self, s: _Supervised, now: float) -> bool:
+        """Stop and start one agent; True once it is running again.
+
+        A stop() overrunning RESTART_STOP_TIMEOUT still counts as an attempt;
+        its helper thread is kept and later checks wait for it rather than
+        calling stop() again.
+        """
+        reason = "not running" if not s.alive() else "heartbeat stale"
+        if s.stopping is not None:
+            if s.stopping.is_alive():
+                if now - s.stop_requested_at > self.RESTART_STOP_GIVE_UP_SECONDS:
+                    self._fail(s, f"stop() has not returned in {self.RESTART_STOP_GIVE_UP_SECONDS:.0f}s")
+                return False
+            s.stopping = None # The late stop finished; this attempt was already counted
+        else:
+            s.restart_times.append(now)
+            if s.started:
+                stopper = _spawn_call(s.agent.stop, f"{s.name}.stop")
+                stopper.join(self.RESTART_STOP_TIMEOUT)
+                if stopper.is_alive():
+                    s.stopping, s.stop_requested_at = stopper, now
+                    logger.warning(f"{s.name} ({reason}) did not stop within {self.RESTART_STOP_TIMEOUT}s; "
+                                   f"restart waits for it")
+                    return False
+        logger.warning(f"Restarting {s.name} ({reason})")
+        agent_restarts.labels(s.name).inc()
+        s.started = False
+        self._start_one(s)
+        return s.started
+
+    def _fail(self, s: _Supervised, why: str):
+        s.failed = True
+        logger.error(f"{s.name} {why}; no more restarts")
+        if self.bus:
+            self.bus.publish("agent_failed", {"agent": s.name})
+
+    def _monitor_loop(self):
+        while not self._stop_event.wait(self.CHECK_INTERVAL):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Health check failed: {e}")
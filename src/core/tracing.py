@@ -0,0 +1,121 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import config
+from src.core.metrics import HistogramValue, escape_label, log_buckets, registry
+
+logger = logging.getLogger("Tracing")
+
+
+class LatencyHistogram(HistogramValue):
+    """metrics.HistogramValue with log-spaced buckets, for latencies.
+
+    Buckets grow by `growth` from `min_s` to `max_s` (about 90 buckets for
+    0.1 ms .. 60 s at 16%), so a quantile is accurate to within one bucket
+    width (~8% relative) no matter how many samples were recorded.
+    """
+
+    def __init__(self, min_s: float = 1e-4, max_s: float = 60.0, growth: float = 1.16):
+        super().__init__(log_buckets(min_s, max_s, growth))
+
+    def summary(self) -> dict:
+        p50, p99 = self.quantile(0.5), self.quantile(0.99)
+        return {
+            "count": self.count,
+            "mean_ms": round(1000 * self.sum / self.count, 2) if self.count else None,
+            "p50_ms": round(1000 * p50, 2) if p50 is not None else None,
+            "p99_ms": round(1000 * p99, 2) if p99 is not None else None,
+            "max_ms": round(1000 * self.max, 2),
+        }
+
+
+class Tracer:
+    """Follows frames through the pipeline by trace id.
+
+    VisionAgent starts a trace at frame capture; each later stage calls
+    mark(), which records two things: time since capture ("<stage>" in
+    `since_capture`) and time since the stage it follows ("<stage>" in
+    `stages`). Plain durations (DB writes, uplink calls) go through record().
+    Live traces are capped at max_live; the oldest are forgotten first.
+    """
+
+    def __init__(self, max_live: int = config.TRACE_MAX_LIVE):
+        self.max_live = max_live
+        self._live: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.since_capture: Dict[str, LatencyHistogram] = {}
+        self.stages: Dict[str, LatencyHistogram] = {}
+
+    def _histogram(self, table: Dict[str, LatencyHistogram], name: str) -> LatencyHistogram:
+        hist = table.get(name)
+        if hist is None:
+            with self._lock:
+                hist = table.setdefault(name, LatencyHistogram())
+        return hist
+
+    def start(self, trace_id: str, at: Optional[float] = None):
+        with self._lock:
+            self._live[trace_id] = {"capture": time.monotonic() if at is None else at}
+            if len(self._live) > self.max_live:
+                self._live.popitem(last=False)
+
+    def mark(self, trace_id: Optional[str], stage: str, after: Optional[str] = None) -> Optional[float]:
+        """Stage reached; `after` names the stage this one follows (default: capture)."""
+        if trace_id is None:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            marks = self._live.get(trace_id)
+            if marks is None:
+                return None
+            marks[stage] = now
+        elapsed = now - marks["capture"]
+        self._histogram(self.since_capture, stage).record(elapsed)
+        self._histogram(self.stages, stage).record(now - marks.get(after or "capture", marks["capture"]))
+        return elapsed
+
+    def record(self, stage: str, seconds: float):
+        self._histogram(self.stages, stage).record(seconds)
+
+    def report(self) -> dict:
+        return {
+            "since_capture": {name: h.summary() for name, h in list(self.since_capture.items())},
+            "stages": {name: h.summary() for name, h in list(self.stages.items())},
+        }
+
+    def log_summary(self, budget_ms: float = config.ALERT_LATENCY_BUDGET_MS):
+        report = self.report()
+        logger.info("latency", extra={"fields": report})
+        alert = report["since_capture"].get("alert")
+        if alert and alert["p99_ms"] is not None and alert["p99_ms"] > budget_ms:
+            worst = max(report["stages"].items(), key=lambda kv: kv[1]["p99_ms"] or 0)
+            logger.warning(f"Alert latency p99 {alert['p99_ms']:.0f} ms over budget ({budget_ms:.0f} ms); "
+                           f"slowest stage: {worst[0]} (p99 {worst[1]['p99_ms']:.0f} ms)")
+
+    def prometheus(self, name: str = "oceanviewer_trace_latency_seconds") -> str:
+        """Per-stage p50/p99 as a Prometheus summary (kind="since_capture" or "stage")."""
+        lines = [f"# HELP {name} Frame latency by pipeline stage", f"# TYPE {name} summary"]
+        for kind, table in (("since_capture", self.since_capture), ("stage", self.stages)):
+            for stage, hist in list(table.items()):
+                labels = f'stage="{escape_label(stage)}",kind="{kind}"'
+                for q in (0.5, 0.99):
+                    value = hist.quantile(q)
+                    if value is not None:
+                        lines.append(f'{name}{{{labels},quantile="{q}"}} {value}')
+                lines.append(f"{name}_sum{{{labels}}} {hist.sum}")
+                lines.append(f"{name}_count{{{labels}}} {hist.count}")
+        return "\n".join(lines)
+
+    def reset(self):
+        with self._lock:
+            self._live.clear()
+            self.since_capture.clear()
+            self.stages.clear()
+
+
+# Process-wide tracer, like logging.getLogger: agents import and use it directly
+tracer = Tracer()
+registry.add_collector(tracer.prometheus)
@@ -1,6 +1,8 @@
+import json
 from enum import Enum, auto
 from dataclasses import dataclass, field
-from typing import Dict, Any, Optional
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional, Sequence
 from datetime import datetime
 
 class NetworkStatus(Enum):
@@ -30,35 +32,206 @@ class VisionLabel(Enum):
     UNKNOWN_LIVING_OBJECT = "unknown_living_object"
     NON_LIVING_OBJECT = "non_living_object"
 
-@dataclass
 class Evidence:
-    image_paths: list[str] = field(default_factory=list)
-    clip_path: Optional[str] = None
-    feature_vectors: Optional[list[float]] = None # For multi-frame confirmation
+    """Evidence references of an event. Mutable: clips and renditions are attached after storage."""
+
+    __slots__ = ("image_paths", "clip_path", "feature_vectors", "renditions")
+
+    def __init__(self, image_paths: Optional[List[str]] = None, clip_path: Optional[str] = None,
+                 feature_vectors: Optional[List[float]] = None,
+                 renditions: Optional[Dict[str, List[str]]] = None):
+        self.image_paths = image_paths if image_paths is not None else []
+        self.clip_path = clip_path
+        self.feature_vectors = feature_vectors # For multi-frame confirmation
+        self.renditions = renditions if renditions is not None else {} # Tier ("thumbnail", "preview") -> paths
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"image_paths": self.image_paths, "clip_path": self.clip_path,
+                "feature_vectors": self.feature_vectors, "renditions": self.renditions}
+
+    def replace(self, **changes) -> "Evidence":
+        return Evidence(**{**self.to_dict(), **changes})
+
+    def __eq__(self, other):
+        if not isinstance(other, Evidence):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "Evidence(" + ", ".join(f"{k}={v!r}" for k, v in self.to_dict().items()) + ")"
+
+
+# Typed per-detection fields and their keys in the metadata dict form
+_META_FIELDS = (("label", "raw_label"), ("box", "box"), ("motion", "motion"), ("frame_id", "frame_id"),
+                ("camera_id", "camera_id"), ("evidence_frames", "evidence_frames"),
+                ("individual_id", "individual_id"))
+_META_KEY_FIELD = {key: name for name, key in _META_FIELDS}
+_EVENT_FIELDS = ("event_id", "timestamp", "event_type", "risk_level", "confidence", "evidence") + \
+    tuple(name for name, _ in _META_FIELDS) + ("extra", "synced", "processed_locally", "trace_id")
+_MUTABLE_FIELDS = frozenset(("synced", "processed_locally"))
+_EMPTY_EXTRA = MappingProxyType({})
+
 
-@dataclass
 class OceanEvent:
-    event_id: str
-    timestamp: datetime
-    event_type: EventType
-    risk_level: RiskLevel
-    confidence: float
-    evidence: Evidence
-    metadata: Dict[str, Any] = field(default_factory=dict)
-    
-    # Status flags
-    synced: bool = False
-    processed_locally: bool = False
+    """One detection on its way through the pipeline.
+
+    Slotted and immutable apart from the sync status flags: a stage that
+    adds to an event publishes replace(...) instead of editing the object
+    other subscribers also hold. What detections carry (label, box, motion,
+    frame_id, camera_id, evidence_frames, individual_id) are typed fields;
+    anything else a producer attaches is kept in `extra`. The `metadata`
+    keyword and property still accept/give the dict form.
+
+    Serialized forms are built on first use and cached (the event does not
+    change afterwards): timestamp_iso, to_dict(), metadata and meta_json,
+    shared by logging, storage, the wire format and the shore store.
+    Evidence is excluded; it stays mutable.
+    """
+
+    __slots__ = _EVENT_FIELDS + ("_iso", "_summary", "_metadata", "_meta_json", "_extra_json")
+
+    def __init__(self, event_id: str, timestamp: datetime, event_type: EventType, risk_level: RiskLevel,
+                 confidence: float, evidence: Evidence, metadata: Optional[Dict[str, Any]] = None,
+                 synced: bool = False, processed_locally: bool = False, trace_id: Optional[str] = None, *,
+                 label: Optional[str] = None, box: Optional[Sequence[float]] = None,
+                 motion: Optional[Sequence[float]] = None, frame_id: Optional[int] = None,
+                 camera_id: Optional[str] = None, evidence_frames: Optional[int] = None,
+                 individual_id: Optional[str] = None, extra: Optional[Dict[str, Any]] = None):
+        if metadata:
+            extra = dict(extra) if extra else {}
+            for key, value in metadata.items():
+                name = _META_KEY_FIELD.get(key)
+                if name is None:
+                    extra[key] = value
+                elif name == "label":
+                    label = label if label is not None else value
+                elif name == "box":
+                    box = box if box is not None else value
+                elif name == "motion":
+                    motion = motion if motion is not None else value
+                elif name == "frame_id":
+                    frame_id = frame_id if frame_id is not None else value
+                elif name == "camera_id":
+                    camera_id = camera_id if camera_id is not None else value
+                elif name == "evidence_frames":
+                    evidence_frames = evidence_frames if evidence_frames is not None else value
+                else:
+                    individual_id = individual_id if individual_id is not None else value
+        _set = object.__setattr__
+        _set(self, "event_id", event_id)
+        _set(self, "timestamp", timestamp)
+        _set(self, "event_type", event_type)
+        _set(self, "risk_level", risk_level)
+        _set(self, "confidence", confidence)
+        _set(self, "evidence", evidence)
+        _set(self, "label", label)
+        _set(self, "box", tuple(box) if box is not None else None)
+        _set(self, "motion", tuple(motion) if motion is not None else None)
+        _set(self, "frame_id", frame_id)
+        _set(self, "camera_id", camera_id)
+        _set(self, "evidence_frames", evidence_frames)
+        _set(self, "individual_id", individual_id)
+        _set(self, "extra", MappingProxyType(extra) if extra else _EMPTY_EXTRA)
+        _set(self, "synced", synced)
+        _set(self, "processed_locally", processed_locally)
+        _set(self, "trace_id", trace_id) # Latency tracing only; not stored or sent
+        _set(self, "_iso", None)
+        _set(self, "_summary", None)
+        _set(self, "_metadata", None)
+        _set(self, "_meta_json", None)
+        _set(self, "_extra_json", None)
+
+    def __setattr__(self, name, value):
+        if name not in _MUTABLE_FIELDS:
+            raise AttributeError(f"OceanEvent.{name} is read-only; use replace()")
+        object.__setattr__(self, name, value)
+        object.__setattr__(self, "_summary", None)
+
+    def _fields(self) -> Dict[str, Any]:
+        fields = {name: getattr(self, name) for name in _EVENT_FIELDS}
+        fields["extra"] = dict(self.extra)
+        return fields
+
+    def replace(self, **changes) -> "OceanEvent":
+        """A copy with some fields changed (caches start empty)."""
+        return OceanEvent(**{**self._fields(), **changes})
+
+    def __reduce__(self):
+        return _event_from_fields, (self._fields(),)
+
+    def __eq__(self, other):
+        if not isinstance(other, OceanEvent):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in _EVENT_FIELDS)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return (f"OceanEvent(event_id={self.event_id!r}, timestamp={self.timestamp!r}, "
+                f"risk_level={self.risk_level.name}, label={self.label!r}, frame_id={self.frame_id!r})")
+
+    # --- Cached forms ---
+
+    @property
+    def timestamp_iso(self) -> str:
+        iso = self._iso
+        if iso is None:
+            iso = self.timestamp.isoformat()
+            object.__setattr__(self, "_iso", iso)
+        return iso
+
+    @property
+    def metadata(self) -> Mapping[str, Any]:
+        """Read-only dict form of the typed fields plus extra (lists for box/motion, as in JSON)."""
+        meta = self._metadata
+        if meta is None:
+            out = {}
+            for name, key in _META_FIELDS:
+                value = getattr(self, name)
+                if value is not None:
+                    out[key] = list(value) if name in ("box", "motion") else value
+            out.update(self.extra)
+            meta = MappingProxyType(out)
+            object.__setattr__(self, "_metadata", meta)
+        return meta
+
+    @property
+    def meta_json(self) -> str:
+        """metadata as JSON (the storage `meta` column)."""
+        raw = self._meta_json
+        if raw is None:
+            raw = json.dumps(dict(self.metadata))
+            object.__setattr__(self, "_meta_json", raw)
+        return raw
+
+    @property
+    def extra_json(self) -> str:
+        """Compact JSON of `extra` alone ("" when empty), as the wire format carries it."""
+        raw = self._extra_json
+        if raw is None:
+            raw = json.dumps(dict(self.extra), separators=(",", ":")) if self.extra else ""
+            object.__setattr__(self, "_extra_json", raw)
+        return raw
 
     def to_dict(self):
-        return {
-            "event_id": self.event_id,
-            "timestamp": self.timestamp.isoformat(),
-            "type": self.event_type.value,
-            "risk": self.risk_level.name,
-            "confidence": self.confidence,
-            "synced": self.synced
-        }
+        summary = self._summary
+        if summary is None:
+            summary = {
+                "event_id": self.event_id,
+                "timestamp": self.timestamp_iso,
+                "type": self.event_type.value,
+                "risk": self.risk_level.name,
+                "confidence": self.confidence,
+                "synced": self.synced
+            }
+            object.__setattr__(self, "_summary", summary)
+        return dict(summary)
+
+
+def _event_from_fields(fields: Dict[str, Any]) -> OceanEvent:
+    return OceanEvent(**fields)
 
 class SystemMode(Enum):
     PASSIVE = "PASSIVE"         # Low power / Passive monitoring
@@ -72,11 +245,15 @@ class SystemStrategy:
     model_type: str # "tiny", "medium", "large"
     confirm_frames: int
     storage_policy: str # "all", "events_only", "critical_only"
+    cameras: Dict[str, dict] = field(default_factory=dict) # Camera id -> {"fps", "model_type"} overrides
 
     def to_dict(self):
-        return {
+        out = {
             "fps": self.fps,
             "model_type": self.model_type,
             "confirm_frames": self.confirm_frames,
             "storage_policy": self.storage_policy
         }
+        if self.cameras:
+            out["cameras"] = self.cameras
+        return out
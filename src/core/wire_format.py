@@ -0,0 +1,492 @@
+import io
+import json
+import lzma
+import struct
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.core.types import OceanEvent, EventType, RiskLevel, Evidence, NetworkStatus
+
+# Compact binary uplink format for batches of OceanEvents.
+#
+# Frame:   MAGIC | version (u8) | codec (u8) | payload (optionally compressed)
+# Payload: columnar. Every field of the batch is written as one contiguous
+#          column so repeated values sit next to each other, which is what
+#          makes the optional zlib/lzma pass effective.
+#
+#   count                 varint
+#   string table          varint n, then n x (varint len, utf-8)
+#   event_id              front-coded against previous id
+#   timestamp             zigzag varint microseconds, delta against previous
+#   event_type / risk /   string table index (varint)
+#   raw_label / paths
+#   confidence            u16, quantized to 1e-4
+#   flags                 u8 bitmap (synced, processed_locally, meta presence)
+#   box                   4 x zigzag varint        (only rows with flag set)
+#   motion                2 x float32              (only rows with flag set)
+#   frame_id              zigzag varint delta      (only rows with flag set)
+#   evidence_frames       varint                   (only rows with flag set)
+#   evidence              paths / clip / feature vectors / renditions (v2+)
+#   extra metadata        compact JSON of keys not covered above ("" if none)
+
+MAGIC = b"OVB"
+SCHEMA_VERSION = 2
+SUPPORTED_VERSIONS = (1, 2)  # v1: no renditions column
+
+CODEC_NONE = 0
+CODEC_ZLIB = 1
+CODEC_LZMA = 2
+
+_CODEC_NAMES = {"none": CODEC_NONE, "zlib": CODEC_ZLIB, "lzma": CODEC_LZMA}
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_CONFIDENCE_SCALE = 10000
+
+# Row flag bits
+_F_SYNCED = 0x01
+_F_PROCESSED = 0x02
+_F_BOX = 0x04
+_F_MOTION = 0x08
+_F_FRAME_ID = 0x10
+_F_EVIDENCE_FRAMES = 0x20
+_F_LABEL = 0x40
+
+# Decoded payload cap: frames come from the network, a compressed one may not inflate past this
+MAX_BATCH_BYTES = 32 * 1024 * 1024
+# Below this many raw bytes compression costs more in headers than it saves
+MIN_COMPRESS_BYTES = 256
+# Links slower than this get the expensive-but-tight codec
+LZMA_BANDWIDTH_BPS = 64_000
+
+
+class WireFormatError(ValueError):
+    pass
+
+
+# --- Primitive writers/readers ---
+
+def _write_varint(buf: io.BytesIO, value: int):
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            buf.write(bytes((byte | 0x80,)))
+        else:
+            buf.write(bytes((byte,)))
+            return
+
+
+def _read_varint(buf: io.BytesIO) -> int:
+    shift = 0
+    result = 0
+    while True:
+        raw = buf.read(1)
+        if not raw:
+            raise WireFormatError("Truncated varint")
+        byte = raw[0]
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result
+        shift += 7
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) if value >= 0 else ((-value << 1) - 1)
+
+
+def _unzigzag(value: int) -> int:
+    return (value >> 1) if not value & 1 else -((value + 1) >> 1)
+
+
+def _write_svarint(buf: io.BytesIO, value: int):
+    _write_varint(buf, _zigzag(value))
+
+
+def _read_svarint(buf: io.BytesIO) -> int:
+    return _unzigzag(_read_varint(buf))
+
+
+def _write_str(buf: io.BytesIO, value: str):
+    raw = value.encode("utf-8")
+    _write_varint(buf, len(raw))
+    buf.write(raw)
+
+
+def _read_str(buf: io.BytesIO) -> str:
+    length = _read_varint(buf)
+    raw = buf.read(length)
+    if len(raw) != length:
+        raise WireFormatError("Truncated string")
+    return raw.decode("utf-8")
+
+
+def _read_exact(buf: io.BytesIO, size: int) -> bytes:
+    raw = buf.read(size)
+    if len(raw) != size:
+        raise WireFormatError("Truncated column")
+    return raw
+
+
+def _is_float32_exact(value) -> bool:
+    if not isinstance(value, float):
+        return False
+    return struct.unpack("<f", struct.pack("<f", value))[0] == value
+
+
+# --- Typed metadata extraction ---
+
+def _split_metadata(event: OceanEvent):
+    """Split an event's metadata into typed columns and a JSON remainder.
+
+    Values only go to a typed column when they round-trip exactly; anything
+    unusual stays in the JSON remainder so decoding is lossless.
+    """
+    typed = {}
+    extras = {}
+    label, box, motion = event.label, event.box, event.motion
+    if label is not None:
+        if isinstance(label, str):
+            typed["raw_label"] = label
+        else:
+            extras["raw_label"] = label
+    if box is not None:
+        if len(box) == 4 and all(type(v) is int for v in box):
+            typed["box"] = box
+        else:
+            extras["box"] = list(box)
+    if motion is not None:
+        if len(motion) == 2 and all(_is_float32_exact(v) for v in motion):
+            typed["motion"] = motion
+        else:
+            extras["motion"] = list(motion)
+    if event.frame_id is not None:
+        if type(event.frame_id) is int:
+            typed["frame_id"] = event.frame_id
+        else:
+            extras["frame_id"] = event.frame_id
+    if event.evidence_frames is not None:
+        if type(event.evidence_frames) is int and event.evidence_frames >= 0:
+            typed["evidence_frames"] = event.evidence_frames
+        else:
+            extras["evidence_frames"] = event.evidence_frames
+    if event.camera_id is not None:
+        extras["camera_id"] = event.camera_id
+    if event.individual_id is not None:
+        extras["individual_id"] = event.individual_id
+    if not extras:
+        return typed, event.extra_json # Cached on the event
+    extras.update(event.extra)
+    return typed, json.dumps(extras, separators=(",", ":"))
+
+
+# --- Encoder ---
+
+class _StringTable:
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def ref(self, value: str) -> int:
+        idx = self.index.get(value)
+        if idx is None:
+            idx = len(self.values)
+            self.index[value] = idx
+            self.values.append(value)
+        return idx
+
+
+def _encode_payload(events: Sequence[OceanEvent]) -> bytes:
+    strings = _StringTable()
+    splits = [_split_metadata(e) for e in events]
+
+    cols = io.BytesIO()
+
+    # event_id (front-coded)
+    prev_id = ""
+    for e in events:
+        common = 0
+        limit = min(len(prev_id), len(e.event_id))
+        while common < limit and prev_id[common] == e.event_id[common]:
+            common += 1
+        _write_varint(cols, common)
+        _write_str(cols, e.event_id[common:])
+        prev_id = e.event_id
+
+    # timestamp (delta)
+    prev_us = 0
+    for e in events:
+        if e.timestamp.tzinfo is not None:
+            raise WireFormatError("Wire format carries naive timestamps only")
+        us = (e.timestamp - _EPOCH) // _MICROSECOND
+        _write_svarint(cols, us - prev_us)
+        prev_us = us
+
+    # enums (dictionary)
+    for e in events:
+        _write_varint(cols, strings.ref(e.event_type.value))
+    for e in events:
+        _write_varint(cols, strings.ref(e.risk_level.name))
+
+    # confidence (quantized)
+    for e in events:
+        q = int(round(min(max(e.confidence, 0.0), 1.0) * _CONFIDENCE_SCALE))
+        cols.write(struct.pack("<H", q))
+
+    # flags
+    for e, (typed, _) in zip(events, splits):
+        flags = 0
+        if e.synced:
+            flags |= _F_SYNCED
+        if e.processed_locally:
+            flags |= _F_PROCESSED
+        if "box" in typed:
+            flags |= _F_BOX
+        if "motion" in typed:
+            flags |= _F_MOTION
+        if "frame_id" in typed:
+            flags |= _F_FRAME_ID
+        if "evidence_frames" in typed:
+            flags |= _F_EVIDENCE_FRAMES
+        if "raw_label" in typed:
+            flags |= _F_LABEL
+        cols.write(bytes((flags,)))
+
+    # typed metadata columns (sparse: only rows that carry the field)
+    for typed, _ in splits:
+        if "raw_label" in typed:
+            _write_varint(cols, strings.ref(typed["raw_label"]))
+    for typed, _ in splits:
+        if "box" in typed:
+            for v in typed["box"]:
+                _write_svarint(cols, v)
+    for typed, _ in splits:
+        if "motion" in typed:
+            cols.write(struct.pack("<2f", *typed["motion"]))
+    prev_frame = 0
+    for typed, _ in splits:
+        if "frame_id" in typed:
+            _write_svarint(cols, typed["frame_id"] - prev_frame)
+            prev_frame = typed["frame_id"]
+    for typed, _ in splits:
+        if "evidence_frames" in typed:
+            _write_varint(cols, typed["evidence_frames"])
+
+    # evidence
+    for e in events:
+        paths = e.evidence.image_paths
+        _write_varint(cols, len(paths))
+        for p in paths:
+            _write_varint(cols, strings.ref(p))
+    for e in events:
+        clip = e.evidence.clip_path
+        _write_varint(cols, 0 if clip is None else strings.ref(clip) + 1)
+    for e in events:
+        vec = e.evidence.feature_vectors
+        if vec is None:
+            _write_varint(cols, 0)
+        else:
+            _write_varint(cols, len(vec) + 1)
+            cols.write(struct.pack(f"<{len(vec)}f", *vec))
+    for e in events:
+        renditions = e.evidence.renditions
+        _write_varint(cols, len(renditions))
+        for tier, refs in renditions.items():
+            _write_varint(cols, strings.ref(tier))
+            _write_varint(cols, len(refs))
+            for p in refs:
+                _write_varint(cols, strings.ref(p))
+
+    # metadata remainder
+    for _, extras in splits:
+        _write_str(cols, extras)
+
+    out = io.BytesIO()
+    _write_varint(out, len(events))
+    _write_varint(out, len(strings.values))
+    for s in strings.values:
+        _write_str(out, s)
+    out.write(cols.getvalue())
+    return out.getvalue()
+
+
+def encode_batch(events: Sequence[OceanEvent], compression: str = "none") -> bytes:
+    """Encode a batch of events into a single binary frame.
+
+    Confidence is quantized to 4 decimal places and feature vectors to
+    float32; every other field round-trips exactly.
+    """
+    if compression not in _CODEC_NAMES:
+        raise ValueError(f"Unknown compression: {compression}")
+
+    payload = _encode_payload(events)
+    codec = _CODEC_NAMES[compression]
+    if codec != CODEC_NONE and len(payload) < MIN_COMPRESS_BYTES:
+        codec = CODEC_NONE
+
+    if codec == CODEC_ZLIB:
+        payload = zlib.compress(payload, 6)
+    elif codec == CODEC_LZMA:
+        payload = lzma.compress(payload, preset=6)
+
+    return MAGIC + bytes((SCHEMA_VERSION, codec)) + payload
+
+
+# --- Decoder ---
+
+def _decode_payload(payload: bytes, version: int = SCHEMA_VERSION) -> List[OceanEvent]:
+    buf = io.BytesIO(payload)
+    count = _read_varint(buf)
+    n_strings = _read_varint(buf)
+    if count > len(payload) or n_strings > len(payload):
+        raise WireFormatError("Count exceeds payload size")
+    strings = [_read_str(buf) for _ in range(n_strings)]
+
+    def lookup(idx):
+        try:
+            return strings[idx]
+        except IndexError:
+            raise WireFormatError(f"String table index out of range: {idx}")
+
+    ids = []
+    prev_id = ""
+    for _ in range(count):
+        common = _read_varint(buf)
+        prev_id = prev_id[:common] + _read_str(buf)
+        ids.append(prev_id)
+
+    timestamps = []
+    prev_us = 0
+    for _ in range(count):
+        prev_us += _read_svarint(buf)
+        timestamps.append(_EPOCH + timedelta(microseconds=prev_us))
+
+    event_types = [EventType(lookup(_read_varint(buf))) for _ in range(count)]
+    risks = [RiskLevel[lookup(_read_varint(buf))] for _ in range(count)]
+    confidences = [
+        round(q / _CONFIDENCE_SCALE, 4)
+        for (q,) in struct.iter_unpack("<H", _read_exact(buf, 2 * count))
+    ]
+    flags = list(_read_exact(buf, count))
+
+    metas: List[Dict[str, Any]] = [{} for _ in range(count)]
+    for i in range(count):
+        if flags[i] & _F_LABEL:
+            metas[i]["raw_label"] = lookup(_read_varint(buf))
+    for i in range(count):
+        if flags[i] & _F_BOX:
+            metas[i]["box"] = [_read_svarint(buf) for _ in range(4)]
+    for i in range(count):
+        if flags[i] & _F_MOTION:
+            metas[i]["motion"] = list(struct.unpack("<2f", _read_exact(buf, 8)))
+    prev_frame = 0
+    for i in range(count):
+        if flags[i] & _F_FRAME_ID:
+            prev_frame += _read_svarint(buf)
+            metas[i]["frame_id"] = prev_frame
+    for i in range(count):
+        if flags[i] & _F_EVIDENCE_FRAMES:
+            metas[i]["evidence_frames"] = _read_varint(buf)
+
+    paths = []
+    for _ in range(count):
+        paths.append([lookup(_read_varint(buf)) for _ in range(_read_varint(buf))])
+    clips = []
+    for _ in range(count):
+        ref = _read_varint(buf)
+        clips.append(None if ref == 0 else lookup(ref - 1))
+    vectors = []
+    for _ in range(count):
+        n = _read_varint(buf)
+        if n == 0:
+            vectors.append(None)
+        else:
+            n -= 1
+            vectors.append(list(struct.unpack(f"<{n}f", _read_exact(buf, 4 * n))))
+    renditions = [{} for _ in range(count)]
+    if version >= 2:
+        for i in range(count):
+            for _ in range(_read_varint(buf)):
+                tier = lookup(_read_varint(buf))
+                renditions[i][tier] = [lookup(_read_varint(buf)) for _ in range(_read_varint(buf))]
+
+    for i in range(count):
+        raw = _read_str(buf)
+        if raw:
+            metas[i].update(json.loads(raw))
+
+    return [
+        OceanEvent(
+            event_id=ids[i],
+            timestamp=timestamps[i],
+            event_type=event_types[i],
+            risk_level=risks[i],
+            confidence=confidences[i],
+            evidence=Evidence(image_paths=paths[i], clip_path=clips[i],
+                              feature_vectors=vectors[i], renditions=renditions[i]),
+            metadata=metas[i],
+            synced=bool(flags[i] & _F_SYNCED),
+            processed_locally=bool(flags[i] & _F_PROCESSED),
+        )
+        for i in range(count)
+    ]
+
+
+def decode_batch(frame: bytes) -> List[OceanEvent]:
+    if len(frame) < len(MAGIC) + 2 or not frame.startswith(MAGIC):
+        raise WireFormatError("Not an OceanViewer batch frame")
+    version = frame[len(MAGIC)]
+    codec = frame[len(MAGIC) + 1]
+    if version not in SUPPORTED_VERSIONS:
+        raise WireFormatError(f"Unsupported schema version: {version}")
+
+    payload = frame[len(MAGIC) + 2:]
+    try:
+        if codec == CODEC_ZLIB:
+            decompressor = zlib.decompressobj()
+            payload = decompressor.decompress(payload, MAX_BATCH_BYTES)
+            exceeded = bool(decompressor.unconsumed_tail)
+        elif codec == CODEC_LZMA:
+            decompressor = lzma.LZMADecompressor()
+            payload = decompressor.decompress(payload, max_length=MAX_BATCH_BYTES)
+            exceeded = not decompressor.eof and not decompressor.needs_input
+        elif codec != CODEC_NONE:
+            raise WireFormatError(f"Unknown codec: {codec}")
+    except (zlib.error, lzma.LZMAError) as e:
+        raise WireFormatError(f"Corrupt payload: {e}")
+    if codec != CODEC_NONE:
+        if exceeded:
+            raise WireFormatError(f"Payload inflates past {MAX_BATCH_BYTES} bytes")
+        if not decompressor.eof:
+            raise WireFormatError("Corrupt payload: truncated stream")
+
+    try:
+        return _decode_payload(payload, version)
+    except WireFormatError:
+        raise
+    except (ValueError, KeyError, TypeError, OverflowError, struct.error) as e:
+        # Bad UTF-8/JSON, unknown enum names, short struct reads...: one error type for callers
+        raise WireFormatError(f"Corrupt payload: {e!r}")
+
+
+# --- Link-aware codec selection ---
+
+def select_compression(status: NetworkStatus, bandwidth_bps: Optional[float] = None) -> str:
+    """Pick a codec for the current link.
+
+    Scarce links are worth lzma's extra CPU; a healthy link gets zlib, which
+    is several times faster for a slightly larger frame.
+    """
+    if bandwidth_bps is not None:
+        return "lzma" if bandwidth_bps < LZMA_BANDWIDTH_BPS else "zlib"
+    if status == NetworkStatus.ONLINE:
+        return "zlib"
+    return "lzma"
+
+
+def json_size(event: OceanEvent) -> int:
+    """Bytes the event currently costs as JSON (to_dict + evidence + meta)."""
+    return (len(json.dumps(event.to_dict()))
+            + len(json.dumps(event.evidence.to_dict()))
+            + len(event.meta_json))
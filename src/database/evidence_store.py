@@ -0,0 +1,378 @@
+import hashlib
+import logging
+import mmap
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+import config
+from src.core.event_bus import EventBus
+from src.core.types import OceanEvent, RiskLevel
+from src.database.storage import PRUNE_ORDER
+
+logger = logging.getLogger("EvidenceStore")
+
+REF_PREFIX = "evs://"
+
+
+def is_ref(path: str) -> bool:
+    return isinstance(path, str) and path.startswith(REF_PREFIX)
+
+
+def _priority(level: RiskLevel) -> int:
+    return PRUNE_ORDER.index(level)
+
+
+class EvidenceStore:
+    """Content-addressed evidence store with a byte budget.
+
+    Objects are keyed by SHA-256, so the same frame stored twice (common for
+    a track that barely moves) costs one copy. Objects up to SMALL_OBJECT_MAX
+    are appended to large segment files and read back through mmap; bigger
+    ones (clips) live as individual blobs.
+
+    put() takes no reference: an object is referenced once StorageManager
+    stores an event pointing at it (retain()) and released when the last
+    such event is deleted. When the store exceeds its budget, unreferenced
+    objects are evicted lowest priority first, oldest first within a
+    priority. Priority starts at the level given to put() and is raised when
+    the owning event is risk-assessed. Segments that become mostly dead are
+    compacted. Every index change commits before the call returns (WAL keeps
+    that cheap); on open, files and index rows that a crash left out of step
+    are reconciled.
+    """
+
+    def __init__(self, root_dir: str, budget_bytes: Optional[int] = None,
+                 keep_critical_forever: bool = config.KEEP_CRITICAL_FOREVER):
+        self.root_dir = root_dir
+        self.segment_dir = os.path.join(root_dir, "segments")
+        self.blob_dir = os.path.join(root_dir, "blobs")
+        os.makedirs(self.segment_dir, exist_ok=True)
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self.db_path = os.path.join(root_dir, "index.db")
+        if budget_bytes is None:
+            budget_bytes = int(config.MAX_STORAGE_GB * config.EVIDENCE_STORE_FRACTION * 1024 ** 3)
+        self.budget_bytes = budget_bytes
+        self.keep_critical_forever = keep_critical_forever
+
+        self._lock = threading.RLock()
+        self._maps = {}  # segment id -> (mmap, mapped length)
+
+        # Config
+        self.SMALL_OBJECT_MAX = 1024 * 1024
+        self.SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+        self.COMPACT_LIVE_RATIO = 0.5
+        self.EVICT_TARGET_RATIO = 0.9  # Evict down to this share of the budget
+        self.EVICT_BATCH = 64
+
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")  # Per-put commits stay off the fsync path
+        self._init_db()
+
+    def _init_db(self):
+        c = self._conn.cursor()
+        c.execute('''CREATE TABLE IF NOT EXISTS objects
+                     (hash TEXT PRIMARY KEY,
+                      segment INTEGER,
+                      offset INTEGER,
+                      length INTEGER,
+                      priority INTEGER,
+                      refs INTEGER,
+                      created REAL)''')
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_objects_evict
+                     ON objects (priority, created)''')
+        c.execute('''CREATE TABLE IF NOT EXISTS segments
+                     (id INTEGER PRIMARY KEY,
+                      size INTEGER,
+                      live INTEGER)''')
+        self._conn.commit()
+        self._recover(c)
+
+        # Usage is tracked incrementally from here on
+        self.live_bytes = c.execute("SELECT COALESCE(SUM(length), 0) FROM objects").fetchone()[0]
+        self.disk_bytes = c.execute("SELECT COALESCE(SUM(size), 0) FROM segments").fetchone()[0] + \
+            c.execute("SELECT COALESCE(SUM(length), 0) FROM objects WHERE segment < 0").fetchone()[0]
+        row = c.execute("SELECT id, size FROM segments ORDER BY id DESC LIMIT 1").fetchone()
+        self._active_segment, self._active_size = row if row else (0, None)
+
+    def _recover(self, c):
+        """Bring files and index back in step after a crash between writing one and committing the other."""
+        segments = dict(c.execute("SELECT id, size FROM segments").fetchall())
+        dropped = 0
+        for name in os.listdir(self.segment_dir):
+            try:
+                segment = int(name[len("seg_"):-len(".dat")])
+            except ValueError:
+                continue
+            path = os.path.join(self.segment_dir, name)
+            if segment not in segments:
+                os.remove(path)  # Its segments row never committed
+                continue
+            actual = os.path.getsize(path)
+            if actual > segments[segment]:
+                # Appends whose index commit was lost: keep them as dead bytes
+                c.execute("UPDATE segments SET size=? WHERE id=?", (actual, segment))
+        for segment in segments:
+            if not os.path.exists(self._segment_path(segment)):
+                dropped += c.execute("DELETE FROM objects WHERE segment=?", (segment,)).rowcount
+                c.execute("DELETE FROM segments WHERE id=?", (segment,))
+
+        blobs = {digest for (digest,) in c.execute("SELECT hash FROM objects WHERE segment < 0")}
+        for digest in list(blobs):
+            if not os.path.exists(self._blob_path(digest)):
+                c.execute("DELETE FROM objects WHERE hash=?", (digest,))
+                blobs.discard(digest)
+                dropped += 1
+        orphans = 0
+        for prefix in os.listdir(self.blob_dir):
+            if not os.path.isdir(os.path.join(self.blob_dir, prefix)):
+                continue
+            for name in os.listdir(os.path.join(self.blob_dir, prefix)):
+                if name not in blobs:
+                    # Written, but its objects row never committed: nothing can reference it
+                    os.remove(os.path.join(self.blob_dir, prefix, name))
+                    orphans += 1
+        self._conn.commit()
+        if dropped or orphans:
+            logger.warning(f"Evidence store recovery: dropped {dropped} rows without files, "
+                           f"removed {orphans} unindexed blobs")
+
+    def reconcile(self, referenced):
+        """Reset reference counts to the evs:// refs stored events hold (one each), e.g. on startup."""
+        digests = [(ref[len(REF_PREFIX):],) for ref in referenced if is_ref(ref)]
+        with self._lock:
+            c = self._conn.cursor()
+            c.execute("CREATE TEMP TABLE IF NOT EXISTS held (hash TEXT PRIMARY KEY)")
+            c.execute("DELETE FROM held")
+            c.executemany("INSERT OR IGNORE INTO held VALUES (?)", digests)
+            c.execute("UPDATE objects SET refs = (hash IN (SELECT hash FROM held))")
+            c.execute("DELETE FROM held")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            for mm, _ in self._maps.values():
+                mm.close()
+            self._maps.clear()
+            self._conn.close()
+
+    # --- Paths ---
+
+    def _segment_path(self, segment_id: int) -> str:
+        return os.path.join(self.segment_dir, f"seg_{segment_id:06d}.dat")
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+    # --- Write ---
+
+    def put(self, data: bytes, priority: RiskLevel = RiskLevel.LOW) -> str:
+        """Store bytes (deduplicated) and return an evs:// reference.
+
+        The object is unreferenced (evictable) until an event holding it is stored.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        prio = _priority(priority)
+        with self._lock:
+            c = self._conn.cursor()
+            row = c.execute("SELECT priority FROM objects WHERE hash=?", (digest,)).fetchone()
+            if row:
+                if row[0] < prio:
+                    c.execute("UPDATE objects SET priority=? WHERE hash=?", (prio, digest))
+                    self._conn.commit()
+                return REF_PREFIX + digest
+
+            if len(data) <= self.SMALL_OBJECT_MAX:
+                segment, offset = self._append(c, data)
+            else:
+                segment, offset = -1, 0
+                path = self._blob_path(digest)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(data)
+                self.disk_bytes += len(data)
+
+            c.execute("INSERT INTO objects VALUES (?,?,?,?,?,0,?)",
+                      (digest, segment, offset, len(data), prio, time.time()))
+            self.live_bytes += len(data)
+            self._conn.commit()
+
+            if self.disk_bytes > self.budget_bytes:
+                self._evict()
+        return REF_PREFIX + digest
+
+    def put_file(self, path: str, priority: RiskLevel = RiskLevel.LOW) -> str:
+        with open(path, "rb") as f:
+            return self.put(f.read(), priority)
+
+    def _append(self, c, data: bytes):
+        if self._active_size is None or self._active_size + len(data) > self.SEGMENT_MAX_BYTES:
+            self._active_segment += 1
+            self._active_size = 0
+            c.execute("INSERT INTO segments VALUES (?, 0, 0)", (self._active_segment,))
+        offset = self._active_size
+        with open(self._segment_path(self._active_segment), "ab") as f:
+            f.write(data)
+        self._active_size += len(data)
+        self.disk_bytes += len(data)
+        c.execute("UPDATE segments SET size=size+?, live=live+? WHERE id=?",
+                  (len(data), len(data), self._active_segment))
+        return self._active_segment, offset
+
+    # --- Read ---
+
+    def get(self, ref: str) -> bytes:
+        digest = ref[len(REF_PREFIX):] if is_ref(ref) else ref
+        with self._lock:
+            row = self._conn.execute("SELECT segment, offset, length FROM objects WHERE hash=?",
+                                     (digest,)).fetchone()
+            if not row:
+                raise KeyError(ref)
+            segment, offset, length = row
+            if segment < 0:
+                with open(self._blob_path(digest), "rb") as f:
+                    return f.read()
+            mm = self._map(segment, offset + length)
+            return mm[offset:offset + length]
+
+    def contains(self, ref: str) -> bool:
+        digest = ref[len(REF_PREFIX):] if is_ref(ref) else ref
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM objects WHERE hash=?", (digest,)).fetchone() is not None
+
+    def _map(self, segment: int, needed: int) -> mmap.mmap:
+        cached = self._maps.get(segment)
+        if cached and cached[1] >= needed:
+            return cached[0]
+        if cached:
+            cached[0].close()
+        # Active segment grew since it was mapped: remap at the current length
+        with open(self._segment_path(segment), "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps[segment] = (mm, len(mm))
+        return mm
+
+    # --- Priority / references ---
+
+    def promote(self, ref: str, priority: RiskLevel):
+        if not is_ref(ref):
+            return
+        with self._lock:
+            self._conn.execute("UPDATE objects SET priority=MAX(priority, ?) WHERE hash=?",
+                               (_priority(priority), ref[len(REF_PREFIX):]))
+            self._conn.commit()
+
+    def retain(self, ref: str):
+        """Take a reference for a stored event; referenced objects are never evicted."""
+        if not is_ref(ref):
+            return
+        with self._lock:
+            self._conn.execute("UPDATE objects SET refs=refs+1 WHERE hash=?", (ref[len(REF_PREFIX):],))
+            self._conn.commit()
+
+    def release(self, ref: str):
+        """Drop one reference; the object is deleted when none remain."""
+        if not is_ref(ref):
+            return
+        digest = ref[len(REF_PREFIX):]
+        with self._lock:
+            c = self._conn.cursor()
+            c.execute("UPDATE objects SET refs=refs-1 WHERE hash=?", (digest,))
+            self._delete_unreferenced(c, digest)
+
+    def discard(self, ref: str):
+        """Delete an object no stored event references (evidence of a dropped event)."""
+        if not is_ref(ref):
+            return
+        with self._lock:
+            self._delete_unreferenced(self._conn.cursor(), ref[len(REF_PREFIX):])
+
+    def _delete_unreferenced(self, c, digest: str):
+        row = c.execute("SELECT refs FROM objects WHERE hash=?", (digest,)).fetchone()
+        if row and row[0] <= 0:
+            self._delete(c, digest)
+            self._compact_segments(c)
+        self._conn.commit()
+
+    def attach(self, event_bus: EventBus):
+        # Risk is only known after assessment: raise evidence priority to match
+        event_bus.subscribe("risk_assessed_event", self.on_risk_assessed_event)
+
+    def on_risk_assessed_event(self, event: OceanEvent):
+        refs = list(event.evidence.image_paths)
+        if event.evidence.clip_path:
+            refs.append(event.evidence.clip_path)
+        for ref in refs:
+            self.promote(ref, event.risk_level)
+
+    # --- Budget ---
+
+    def _delete(self, c, digest: str):
+        segment, length = c.execute("SELECT segment, length FROM objects WHERE hash=?",
+                                    (digest,)).fetchone()
+        c.execute("DELETE FROM objects WHERE hash=?", (digest,))
+        self.live_bytes -= length
+        if segment < 0:
+            try:
+                os.remove(self._blob_path(digest))
+            except FileNotFoundError:
+                pass
+            self.disk_bytes -= length
+        else:
+            c.execute("UPDATE segments SET live=live-? WHERE id=?", (length, segment))
+
+    def _evict(self):
+        c = self._conn.cursor()
+        protected = _priority(RiskLevel.HIGH) if self.keep_critical_forever else len(PRUNE_ORDER)
+        target = self.budget_bytes * self.EVICT_TARGET_RATIO
+        evicted = 0
+        while self.live_bytes > target:
+            rows = c.execute('''SELECT hash FROM objects WHERE priority < ? AND refs <= 0
+                                ORDER BY priority, created LIMIT ?''',
+                             (protected, self.EVICT_BATCH)).fetchall()
+            if not rows:
+                # Referenced objects go when retention deletes their events
+                logger.warning("Evidence store over budget with only protected or referenced objects left.")
+                break
+            for (digest,) in rows:
+                self._delete(c, digest)
+                evicted += 1
+                if self.live_bytes <= target:
+                    break
+
+        if self.disk_bytes > self.budget_bytes:
+            # Packed objects only free disk once their segment is rewritten:
+            # seal the active segment and compact everything carrying dead bytes
+            self._active_size = None
+            self._compact_segments(c, live_ratio=1.0)
+        self._conn.commit()
+        if evicted:
+            logger.info(f"Evicted {evicted} evidence objects (store at {self.disk_bytes} bytes)")
+
+    def _compact_segments(self, c, live_ratio: Optional[float] = None):
+        ratio = self.COMPACT_LIVE_RATIO if live_ratio is None else live_ratio
+        active = self._active_segment if self._active_size is not None else -1
+        rows = c.execute("SELECT id, size, live FROM segments WHERE id != ? AND live < size * ?",
+                         (active, ratio)).fetchall()
+        for segment, size, live in rows:
+            if live > 0:
+                # Move survivors into the active segment
+                survivors = c.execute("SELECT hash, offset, length FROM objects WHERE segment=?",
+                                      (segment,)).fetchall()
+                mm = self._map(segment, size)
+                for digest, offset, length in survivors:
+                    new_segment, new_offset = self._append(c, mm[offset:offset + length])
+                    c.execute("UPDATE objects SET segment=?, offset=? WHERE hash=?",
+                              (new_segment, new_offset, digest))
+            cached = self._maps.pop(segment, None)
+            if cached:
+                cached[0].close()
+            try:
+                os.remove(self._segment_path(segment))
+            except FileNotFoundError:
+                pass
+            c.execute("DELETE FROM segments WHERE id=?", (segment,))
+            self.disk_bytes -= size
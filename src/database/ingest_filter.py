@@ -0,0 +1,89 @@
+import itertools
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Optional
+
+import config
+from src.core.event_bus import EventBus
+from src.core.types import OceanEvent, RiskLevel
+from src.database.evidence_store import EvidenceStore
+
+logger = logging.getLogger("IngestFilter")
+
+
+@dataclass(frozen=True)
+class StoragePolicy:
+    name: str
+    keep_levels: FrozenSet[RiskLevel]
+    sample_every: Dict[RiskLevel, int] = field(default_factory=dict)  # Keep 1 in N of these levels
+
+
+POLICIES = {
+    "all": StoragePolicy("all", frozenset(RiskLevel)),
+    "events_only": StoragePolicy("events_only", frozenset(RiskLevel),
+                                 {RiskLevel.LOW: config.LOW_EVENT_SAMPLE_EVERY}),
+    "critical_only": StoragePolicy("critical_only", frozenset({RiskLevel.HIGH})),
+}
+
+
+class IngestFilter:
+    """Applies SystemStrategy.storage_policy in front of StorageManager.
+
+    "all" stores every event, "events_only" keeps one LOW event in
+    LOW_EVENT_SAMPLE_EVERY per label, "critical_only" stores HIGH only.
+    The active policy is an immutable object swapped by reference on
+    system_strategy_update, so admit() never takes a lock. Evidence held
+    only by dropped events is discarded from the evidence store.
+    """
+
+    def __init__(self, event_bus: Optional[EventBus] = None,
+                 evidence_store: Optional[EvidenceStore] = None,
+                 policy: str = "all"):
+        self.evidence_store = evidence_store
+        self.policy = POLICIES[policy]
+        self._counters = {}  # (level, label) -> itertools.count
+
+        # Stats
+        self.admitted = 0
+        self.dropped = 0
+
+        if event_bus:
+            event_bus.subscribe("system_strategy_update", self.on_strategy_update)
+
+    def on_strategy_update(self, strategy: dict):
+        name = strategy.get("storage_policy")
+        policy = POLICIES.get(name)
+        if policy is None:
+            if name:
+                logger.warning(f"Unknown storage policy {name!r}; keeping {self.policy.name}")
+            return
+        if policy is not self.policy:
+            logger.info(f"Storage policy: {self.policy.name} -> {policy.name}")
+            self.policy = policy
+
+    def admit(self, event: OceanEvent) -> bool:
+        """Whether the event should be written; drops discard its unreferenced evidence."""
+        policy = self.policy  # One read: a concurrent switch applies from the next event
+        keep = event.risk_level in policy.keep_levels
+        every = policy.sample_every.get(event.risk_level)
+        if keep and every and every > 1:
+            key = (event.risk_level, event.label)
+            counter = self._counters.get(key)
+            if counter is None:
+                counter = self._counters.setdefault(key, itertools.count())
+            keep = next(counter) % every == 0
+
+        if keep:
+            self.admitted += 1
+            return True
+        self.dropped += 1
+        if self.evidence_store:
+            evidence = event.evidence
+            refs = list(evidence.image_paths)
+            if evidence.clip_path:
+                refs.append(evidence.clip_path)
+            for paths in evidence.renditions.values():
+                refs.extend(paths)
+            for ref in refs:
+                self.evidence_store.discard(ref)
+        return False
@@ -0,0 +1,151 @@
+import logging
+import os
+import threading
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("ReIdIndex")
+
+
+class ReIdIndex:
+    """Approximate nearest-neighbour index over individual embeddings.
+
+    Vectors are L2-normalised and kept in one contiguous float32 matrix, so
+    similarity is a dot product. Random-hyperplane LSH (num_tables tables of
+    `bits` sign bits each) narrows a query to one bucket per table; only
+    those candidates are scored exactly. With the defaults, a lookup against
+    50k sightings scores under a thousand rows instead of all of them.
+
+    The index lives in memory and is saved as a single .npz file next to the
+    SQLite database; buckets are rebuilt on load.
+    """
+
+    def __init__(self, dim: int, path: Optional[str] = None,
+                 num_tables: int = 16, bits: int = 10, seed: int = 7):
+        self.dim = dim
+        self.path = path
+        self.num_tables = num_tables
+        self.bits = bits
+
+        rng = np.random.default_rng(seed)
+        self._planes = rng.standard_normal((num_tables * bits, dim)).astype(np.float32)
+        self._weights = (1 << np.arange(bits, dtype=np.int64))
+
+        self._lock = threading.Lock()
+        self._vectors = np.zeros((1024, dim), dtype=np.float32)
+        self._last_seen = np.zeros(1024, dtype=np.float64)
+        self._ids: List[str] = []
+        self._buckets = [dict() for _ in range(num_tables)]
+
+    def __len__(self):
+        return len(self._ids)
+
+    # --- Hashing ---
+
+    def _normalise(self, vector: Sequence[float]) -> np.ndarray:
+        v = np.asarray(vector, dtype=np.float32).reshape(-1)
+        if v.shape[0] != self.dim:
+            raise ValueError(f"Embedding has {v.shape[0]} dims, index expects {self.dim}")
+        norm = float(np.linalg.norm(v))
+        return v / norm if norm else v
+
+    def _keys(self, vectors: np.ndarray) -> np.ndarray:
+        # (n, tables) bucket keys from the sign of each hyperplane projection
+        signs = (vectors @ self._planes.T > 0).reshape(-1, self.num_tables, self.bits)
+        return signs.astype(np.int64) @ self._weights
+
+    def _insert_row(self, row: int, keys: List[int]):
+        for table, key in enumerate(keys):
+            self._buckets[table].setdefault(key, []).append(row)
+
+    # --- Write ---
+
+    def add(self, individual_id: str, vector: Sequence[float], timestamp: float) -> int:
+        v = self._normalise(vector)
+        with self._lock:
+            row = len(self._ids)
+            if row == self._vectors.shape[0]:
+                self._vectors = np.concatenate([self._vectors, np.zeros_like(self._vectors)])
+                self._last_seen = np.concatenate([self._last_seen, np.zeros_like(self._last_seen)])
+            self._vectors[row] = v
+            self._last_seen[row] = timestamp
+            self._ids.append(individual_id)
+            self._insert_row(row, self._keys(v[None, :])[0].tolist())
+        return row
+
+    # --- Read ---
+
+    def query(self, vector: Sequence[float], k: int = 1, min_similarity: float = 0.0,
+              since: Optional[float] = None) -> List[Tuple[str, float, float]]:
+        """Best matches as (individual_id, similarity, last_seen), one per individual."""
+        v = self._normalise(vector)
+        keys = self._keys(v[None, :])[0].tolist()
+        with self._lock:
+            candidates = set()
+            for table, key in enumerate(keys):
+                candidates.update(self._buckets[table].get(key, ()))
+            if not candidates:
+                return []
+            rows = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+            if since is not None:
+                rows = rows[self._last_seen[rows] >= since]
+            sims = self._vectors[rows] @ v
+            keep = sims >= min_similarity
+            rows, sims = rows[keep], sims[keep]
+            order = np.argsort(-sims)
+
+            results, seen = [], set()
+            for i in order.tolist():
+                individual = self._ids[rows[i]]
+                if individual in seen:
+                    continue
+                seen.add(individual)
+                results.append((individual, float(sims[i]), float(self._last_seen[rows[i]])))
+                if len(results) >= k:
+                    break
+            return results
+
+    # --- Persistence ---
+
+    def save(self, path: Optional[str] = None):
+        path = path or self.path
+        if not path:
+            return
+        with self._lock:
+            n = len(self._ids)
+            vectors = self._vectors[:n].copy()
+            last_seen = self._last_seen[:n].copy()
+            ids = np.array(self._ids, dtype=str)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, vectors=vectors, last_seen=last_seen, ids=ids)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, dim: int, **kwargs) -> "ReIdIndex":
+        """Open the index at path, or start an empty one if there is none yet."""
+        index = cls(dim, path=path, **kwargs)
+        if not os.path.exists(path):
+            return index
+        try:
+            with np.load(path) as data:
+                vectors, last_seen, ids = data["vectors"], data["last_seen"], data["ids"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Re-id index unreadable, starting empty: {e}")
+            return index
+        if vectors.shape[1:] != (dim,):
+            logger.warning(f"Re-id index has {vectors.shape[1:]} dims, expected {dim}; starting empty")
+            return index
+
+        n = len(ids)
+        capacity = max(1024, 1 << (n - 1).bit_length()) if n else 1024
+        index._vectors = np.zeros((capacity, dim), dtype=np.float32)
+        index._vectors[:n] = vectors
+        index._last_seen = np.zeros(capacity, dtype=np.float64)
+        index._last_seen[:n] = last_seen
+        index._ids = ids.tolist()
+        for row, keys in enumerate(index._keys(vectors).tolist()):
+            index._insert_row(row, keys)
+        logger.info(f"Re-id index loaded: {n} sightings")
+        return index
@@ -0,0 +1,228 @@
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+import config
+from src.core.event_bus import EventBus
+from src.core.types import RiskLevel
+from src.database.storage import StorageManager, PRUNE_ORDER
+from src.database.evidence_store import EvidenceStore, is_ref
+from src.core.clock import Clock, SYSTEM_CLOCK
+
+logger = logging.getLogger("Retention")
+
+
+class RetentionEngine:
+    """Background enforcement of the data-retention section of config.py.
+
+    Each pass:
+      1. expires non-critical events (and their evidence) older than
+         KEEP_EVIDENCE_DAYS: whole partitions are dropped, the partition
+         straddling the cutoff is trimmed lowest risk first;
+      2. if usage is above the MAX_STORAGE_GB high watermark, prunes oldest
+         events lowest risk first until under the low watermark;
+      3. removes rotated log files (LOG_FILE.1, .2, ...) older than
+         KEEP_LOGS_DAYS, aged on the engine's clock like everything else.
+
+    Deletes run in small batches (one short transaction each) with a pause
+    between them, so writers never wait behind a long lock. Usage comes from
+    StorageManager's running evidence total plus SQLite's live page count; the
+    filesystem is never rescanned.
+    """
+
+    def __init__(self, storage: StorageManager, event_bus: Optional[EventBus] = None,
+                 log_dir: Optional[str] = None,
+                 keep_evidence_days: float = config.KEEP_EVIDENCE_DAYS,
+                 keep_logs_days: float = config.KEEP_LOGS_DAYS,
+                 keep_critical_forever: bool = config.KEEP_CRITICAL_FOREVER,
+                 max_storage_gb: float = config.MAX_STORAGE_GB,
+                 evidence_store: Optional[EvidenceStore] = None,
+                 clock: Clock = SYSTEM_CLOCK):
+        self.storage = storage
+        self.clock = clock
+        self.evidence_store = evidence_store
+        self.bus = event_bus
+        self.log_dir = log_dir if log_dir is not None else os.path.dirname(os.path.abspath(config.LOG_FILE))
+        self._log_seen: Dict[Tuple[int, int], float] = {} # (dev, inode) -> first seen, engine clock
+        self.keep_evidence = timedelta(days=keep_evidence_days)
+        self.keep_logs_seconds = keep_logs_days * 86400
+        self.keep_critical_forever = keep_critical_forever
+        self.budget_bytes = int(max_storage_gb * 1024 ** 3)
+
+        self._stop_event = threading.Event()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._retention_loop, daemon=True)
+        self.heartbeat = None
+
+        # Config
+        self.PASS_INTERVAL_SECONDS = 60.0
+        self.BATCH_SIZE = 200
+        self.BATCH_PAUSE_SECONDS = 0.02
+        self.HIGH_WATERMARK = 0.95
+        self.LOW_WATERMARK = 0.90
+        self.LOG_PATTERN = re.escape(os.path.basename(config.LOG_FILE)) + r"\.\d+"  # Rotated files only
+
+        # Stats
+        self.events_deleted = 0
+        self.files_deleted = 0
+
+        if self.bus:
+            # Storage pressure seen by StrategyAgent -> prune now, not at next tick
+            self.bus.subscribe("resource_warning", self.on_resource_warning)
+
+    # --- Lifecycle ---
+
+    def start(self):
+        logger.info(f"Retention engine started (budget {self.budget_bytes / 1024 ** 3:.0f} GB).")
+        self._stop_event.clear()
+        self._wake.clear()
+        self._thread = threading.Thread(target=self._retention_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def on_resource_warning(self, payload):
+        if isinstance(payload, dict) and payload.get("type") == "storage":
+            self._wake.set()
+
+    def _retention_loop(self):
+        while not self._stop_event.is_set():
+            self.heartbeat = time.monotonic()
+            try:
+                self.run_pass()
+            except Exception as e:
+                logger.error(f"Retention pass failed: {e}")
+            self._wake.wait(self.PASS_INTERVAL_SECONDS)
+            self._wake.clear()
+
+    # --- Policy ---
+
+    def used_bytes(self) -> int:
+        used = self.storage.evidence_bytes + self.storage.db_bytes()
+        if self.evidence_store:
+            used += self.evidence_store.disk_bytes
+        return used
+
+    def _prunable_levels(self):
+        if self.keep_critical_forever:
+            return [level for level in PRUNE_ORDER if level != RiskLevel.HIGH]
+        return list(PRUNE_ORDER)
+
+    def run_pass(self, now: Optional[datetime] = None) -> dict:
+        now = now or self.clock.now()
+        before = self.events_deleted
+        expired = self.expire_events(now - self.keep_evidence)
+        pruned = self.enforce_budget()
+        logs = self.expire_logs()
+        report = {"expired": expired, "pruned": pruned, "logs_removed": logs,
+                  "used_bytes": self.used_bytes(), "budget_bytes": self.budget_bytes}
+        if self.events_deleted != before or logs:
+            logger.info(f"Retention pass: {report}")
+        return report
+
+    def expire_events(self, cutoff: datetime) -> int:
+        # Whole partitions past the cutoff are dropped outright (critical rows archived)
+        keep = [] if not self.keep_critical_forever else [RiskLevel.HIGH]
+        total, orphaned = self.storage.drop_partitions_before(cutoff, keep_levels=keep)
+        self._remove_files(orphaned)
+        self.events_deleted += total
+
+        # Only the partition straddling the cutoff needs row-by-row deletes
+        for level in self._prunable_levels():
+            while not self._stop_event.is_set():
+                deleted = self._delete_batch(level, older_than=cutoff)
+                total += deleted
+                if deleted < self.BATCH_SIZE:
+                    break
+                self._stop_event.wait(self.BATCH_PAUSE_SECONDS)
+        return total
+
+    def enforce_budget(self) -> int:
+        if self.used_bytes() <= self.budget_bytes * self.HIGH_WATERMARK:
+            return 0
+        target = self.budget_bytes * self.LOW_WATERMARK
+        total = 0
+        for level in self._prunable_levels():
+            while self.used_bytes() > target and not self._stop_event.is_set():
+                deleted = self._delete_batch(level)
+                total += deleted
+                if deleted == 0:
+                    break
+                self._stop_event.wait(self.BATCH_PAUSE_SECONDS)
+            if self.used_bytes() <= target:
+                break
+        else:
+            if self.used_bytes() > target:
+                logger.warning("Storage budget exceeded by protected (critical) data only.")
+                if self.bus:
+                    self.bus.publish("resource_warning", {"type": "storage_budget", "level": "critical"})
+        return total
+
+    def _delete_batch(self, level: RiskLevel, older_than: Optional[datetime] = None) -> int:
+        deleted, orphaned = self.storage.delete_oldest(level, self.BATCH_SIZE, older_than)
+        self._remove_files(orphaned)
+        self.events_deleted += deleted
+        return deleted
+
+    def _remove_files(self, paths):
+        for path in paths:
+            if is_ref(path):
+                if self.evidence_store:
+                    self.evidence_store.release(path)
+                continue
+            try:
+                os.remove(path)
+                self.files_deleted += 1
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Could not remove evidence file {path}: {e}")
+
+    def _log_born(self, st: os.stat_result) -> float:
+        """When a rotated log was written, on the engine's clock.
+
+        A file is as old as its mtime says when first seen and then ages with
+        self.clock (by inode: rotation renames files). With the system clock
+        this is just the mtime; with a virtual one, logs written in real
+        seconds still age over simulated days.
+        """
+        key = (st.st_dev, st.st_ino)
+        born = self._log_seen.get(key)
+        if born is None:
+            born = self._log_seen[key] = self.clock.time() - max(0.0, time.time() - st.st_mtime)
+        return born
+
+    def expire_logs(self) -> int:
+        now = self.clock.time()
+        removed = 0
+        seen = set()
+        try:
+            names = os.listdir(self.log_dir)
+        except OSError as e:
+            logger.warning(f"Cannot list log directory {self.log_dir}: {e}")
+            return 0
+        for name in names:
+            if not re.fullmatch(self.LOG_PATTERN, name):
+                continue
+            path = os.path.join(self.log_dir, name)
+            try:
+                st = os.stat(path)
+                seen.add((st.st_dev, st.st_ino))
+                if now - self._log_born(st) > self.keep_logs_seconds:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass
+        self._log_seen = {k: v for k, v in self._log_seen.items() if k in seen}
+        return removed
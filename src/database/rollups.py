@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Pre-aggregated event counts, maintained in the same transaction as the
+# event writes that change them. Keyed by time bucket, label, risk level
+# and synced state, so voyage statistics never touch the events partitions.
+#
+# Buckets are ISO prefixes of the event timestamp, so they sort and compare
+# as plain strings: minute "2026-01-06T12:01", hour "2026-01-06T12",
+# day "2026-01-06".
+#
+# Rollups are history: retention expiry does not rewind them.
+
+GRANULARITIES = {"minute": 16, "hour": 13, "day": 10}
+
+GROUP_COLUMNS = ("bucket", "label", "risk", "synced")
+
+# (granularity, bucket, label, risk, synced) -> [count, confidence_sum]
+RollupDelta = Dict[Tuple[str, str, str, str, int], List[float]]
+
+
+def table(granularity: str) -> str:
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown rollup granularity: {granularity}")
+    return f"rollup_{granularity}"
+
+
+def bucket(timestamp_iso: str, granularity: str) -> str:
+    return timestamp_iso[:GRANULARITIES[granularity]]
+
+
+def ensure_tables(c) -> bool:
+    """Create rollup tables; returns True if they did not exist yet."""
+    existed = c.execute("SELECT 1 FROM sqlite_master WHERE name='rollup_day'").fetchone()
+    for granularity in GRANULARITIES:
+        c.execute(f'''CREATE TABLE IF NOT EXISTS {table(granularity)}
+                      (bucket TEXT,
+                       label TEXT,
+                       risk TEXT,
+                       synced INTEGER,
+                       count INTEGER,
+                       confidence_sum REAL,
+                       PRIMARY KEY (bucket, label, risk, synced))''')
+    return not existed
+
+
+def add(delta: RollupDelta, timestamp_iso: str, label: Optional[str], risk: str,
+        synced: int, confidence: float, sign: int = 1):
+    for granularity in GRANULARITIES:
+        key = (granularity, bucket(timestamp_iso, granularity), label or "", risk, synced)
+        acc = delta.setdefault(key, [0, 0.0])
+        acc[0] += sign
+        acc[1] += sign * (confidence or 0.0)
+
+
+def apply(c, delta: RollupDelta):
+    rows = {}
+    for (granularity, b, label, risk, synced), (count, conf) in delta.items():
+        if count or conf:
+            rows.setdefault(granularity, []).append((b, label, risk, synced, count, conf))
+    for granularity, values in rows.items():
+        name = table(granularity)
+        c.executemany(f'''INSERT INTO {name} VALUES (?,?,?,?,?,?)
+                          ON CONFLICT (bucket, label, risk, synced) DO UPDATE SET
+                              count = count + excluded.count,
+                              confidence_sum = confidence_sum + excluded.confidence_sum''', values)
+        c.execute(f"DELETE FROM {name} WHERE count <= 0")
+
+
+def backfill(c, partition: str):
+    """Fold an existing events partition into the rollups (migration only)."""
+    label = "COALESCE(json_extract(meta, '$.raw_label'), '')"
+    for granularity, width in GRANULARITIES.items():
+        c.execute(f'''INSERT INTO {table(granularity)}
+                      SELECT substr(timestamp, 1, {width}), {label}, risk, synced,
+                             COUNT(*), SUM(confidence)
+                      FROM {partition} WHERE 1
+                      GROUP BY 1, 2, 3, 4
+                      ON CONFLICT (bucket, label, risk, synced) DO UPDATE SET
+                          count = count + excluded.count,
+                          confidence_sum = confidence_sum + excluded.confidence_sum''')
+
+
+def query(conn, granularity: str, start: datetime, end: datetime,
+          group_by: Sequence[str] = ("bucket",), label: Optional[str] = None,
+          risk: Optional[str] = None, synced: Optional[bool] = None) -> List[dict]:
+    """Counts for buckets overlapping [start, end), summed over the non-grouped columns."""
+    for col in group_by:
+        if col not in GROUP_COLUMNS:
+            raise ValueError(f"Cannot group rollups by {col}")
+    lo = bucket(start.isoformat(), granularity)
+    hi = bucket((end - timedelta(microseconds=1)).isoformat(), granularity)
+    where = ["bucket >= ?", "bucket <= ?"]
+    params: list = [lo, hi]
+    if label is not None:
+        where.append("label = ?")
+        params.append(label)
+    if risk is not None:
+        where.append("risk = ?")
+        params.append(risk)
+    if synced is not None:
+        where.append("synced = ?")
+        params.append(1 if synced else 0)
+
+    cols = ", ".join(group_by)
+    select = f"{cols}, " if cols else ""
+    group = f"GROUP BY {cols} ORDER BY {cols}" if cols else ""
+    rows = conn.execute(f'''SELECT {select}SUM(count), SUM(confidence_sum)
+                            FROM {table(granularity)} WHERE {' AND '.join(where)} {group}''',
+                        params).fetchall()
+    result = []
+    for row in rows:
+        count, conf = row[-2], row[-1]
+        if not count:
+            continue
+        entry = dict(zip(group_by, row[:-2]))
+        entry["count"] = count
+        entry["avg_confidence"] = round(conf / count, 4)
+        result.append(entry)
+    return result
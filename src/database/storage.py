@@ -1,67 +1,592 @@
 import sqlite3
 import json
-from datetime import datetime
-from src.core.types import OceanEvent, RiskLevel
+from datetime import datetime, timedelta
+from src.core.types import OceanEvent, RiskLevel, EventType, Evidence
+from src.database import rollups
+from src.core.tracing import tracer
+from src.core.metrics import registry
+from typing import Dict, List, Optional, Sequence
 import logging
 import os
+import threading
+import time
 
 logger = logging.getLogger("Storage")
 
+db_write_seconds = registry.histogram("db_write_seconds", "SQLite event write latency", ["op"])
+
+# Pruning order when space is needed: least valuable first
+PRUNE_ORDER = [RiskLevel.LOW, RiskLevel.UNKNOWN, RiskLevel.MEDIUM, RiskLevel.HIGH]
+
+ARCHIVE_PARTITION = "events_archive"
+
+_EVENT_COLUMNS = '''(event_id TEXT PRIMARY KEY,
+                     timestamp TEXT,
+                     type TEXT,
+                     risk TEXT,
+                     confidence REAL,
+                     evidence TEXT,
+                     synced INTEGER,
+                     meta TEXT)'''
+
 class StorageManager:
-    def __init__(self, db_path: str = "ocean_data.db"):
+    """Event store, time-partitioned.
+
+    Events are written to one table per day (or ISO week) named
+    events_dYYYYMMDD / events_wYYYY_WW, listed in the `partitions` catalog
+    with their time bounds. A read-only `events` view unions them all for ad
+    hoc queries. Time-bounded reads only open the partitions that overlap the
+    window, and expiry drops whole partitions instead of deleting rows.
+    Critical events that must outlive their partition are moved into
+    events_archive first.
+
+    Every write also updates the minute/hour/day rollup tables (see
+    rollups.py) in the same transaction. With an evidence store, evs://
+    objects are retained while a stored event references them.
+    """
+
+    def __init__(self, db_path: str = "ocean_data.db", partition_by: str = "day",
+                 evidence_store=None):
+        if partition_by not in ("day", "week"):
+            raise ValueError(f"Unknown partition granularity: {partition_by}")
         self.db_path = db_path
+        self.partition_by = partition_by
+        self.evidence_store = evidence_store  # EvidenceStore (imports this module for PRUNE_ORDER)
+        self._usage_lock = threading.Lock()
+        self._partition_lock = threading.RLock()
+        self._partitions = {}  # name -> (start, end) ISO strings
+        self._evidence_bytes = 0
         self._init_db()
+        if evidence_store:
+            # Retains after our commits can be lost in a crash: resync from what is stored
+            evidence_store.reconcile(self.referenced_evidence())
 
     def _init_db(self):
         conn = sqlite3.connect(self.db_path)
         c = conn.cursor()
-        c.execute('''CREATE TABLE IF NOT EXISTS events
-                     (event_id TEXT PRIMARY KEY,
-                      timestamp TEXT,
-                      type TEXT,
-                      risk TEXT,
-                      confidence REAL,
-                      evidence TEXT, 
-                      synced INTEGER,
-                      meta TEXT)''')
+        c.execute('''CREATE TABLE IF NOT EXISTS partitions
+                     (name TEXT PRIMARY KEY,
+                      start TEXT,
+                      end TEXT)''')
+        # Evidence files referenced by stored events (shared paths are ref-counted)
+        c.execute('''CREATE TABLE IF NOT EXISTS evidence_files
+                     (path TEXT PRIMARY KEY,
+                      bytes INTEGER,
+                      refs INTEGER)''')
+
+        rollups_created = rollups.ensure_tables(c)
+
+        # Pre-partitioning databases: adopt the old single table as a partition
+        row = c.execute("SELECT type FROM sqlite_master WHERE name='events'").fetchone()
+        if row and row[0] == "table":
+            c.execute("ALTER TABLE events RENAME TO events_legacy")
+            start, end = c.execute("SELECT MIN(timestamp), MAX(timestamp) FROM events_legacy").fetchone()
+            self._create_partition(c, "events_legacy", start or "", (end or "") + "~")
+            logger.info("Migrated single events table to partition events_legacy.")
+
+        self._create_partition(c, ARCHIVE_PARTITION, "~", "")
+        self._partitions = {name: (start, end) for name, start, end in
+                            c.execute("SELECT name, start, end FROM partitions")}
+        self._rebuild_view(c)
+
+        if rollups_created:
+            # Rollups are new to this database: fold in what is already stored
+            for name in self._partitions:
+                rollups.backfill(c, name)
         conn.commit()
+        # Seed the running total once; afterwards it is maintained per write/delete
+        self._evidence_bytes = c.execute("SELECT COALESCE(SUM(bytes), 0) FROM evidence_files").fetchone()[0]
         conn.close()
 
+    # --- Partitions ---
+
+    def _partition_for(self, ts: datetime):
+        day = datetime(ts.year, ts.month, ts.day)
+        if self.partition_by == "day":
+            return f"events_d{day:%Y%m%d}", day, day + timedelta(days=1)
+        start = day - timedelta(days=day.weekday())
+        year, week, _ = start.isocalendar()
+        return f"events_w{year}_{week:02d}", start, start + timedelta(days=7)
+
+    @staticmethod
+    def _create_partition(c, name: str, start: str, end: str):
+        c.execute(f"CREATE TABLE IF NOT EXISTS {name} {_EVENT_COLUMNS}")
+        # Backlog drain walks unsynced rows per risk level in time order
+        c.execute(f"CREATE INDEX IF NOT EXISTS idx_{name}_pending ON {name} (synced, risk, timestamp)")
+        # Retention walks each risk level oldest first
+        c.execute(f"CREATE INDEX IF NOT EXISTS idx_{name}_age ON {name} (risk, timestamp)")
+        c.execute("INSERT OR IGNORE INTO partitions VALUES (?,?,?)", (name, start, end))
+
+    def _rebuild_view(self, c):
+        c.execute("DROP VIEW IF EXISTS events")
+        selects = " UNION ALL ".join(f"SELECT * FROM {name}" for name in self._ordered_partitions())
+        c.execute(f"CREATE VIEW events AS {selects}")
+
+    def _ensure_partitions(self, conn, events: Sequence[OceanEvent]):
+        needed = {}
+        for e in events:
+            name, start, end = self._partition_for(e.timestamp)
+            if name not in self._partitions:
+                needed[name] = (start.isoformat(), end.isoformat())
+        if not needed:
+            return
+        with self._partition_lock:
+            c = conn.cursor()
+            for name, (start, end) in needed.items():
+                if name not in self._partitions:
+                    self._create_partition(c, name, start, end)
+                    self._partitions[name] = (start, end)
+                    logger.info(f"Created partition {name}")
+            self._rebuild_view(c)
+
+    def _partition_bounds(self) -> Dict[str, tuple]:
+        """Copy of name -> (start, end); writer threads add partitions concurrently."""
+        with self._partition_lock:
+            return dict(self._partitions)
+
+    def _ordered_partitions(self, start: Optional[datetime] = None,
+                            end: Optional[datetime] = None) -> List[str]:
+        """Partitions overlapping [start, end), oldest first; the archive is always included."""
+        lo = start.isoformat() if start else None
+        hi = end.isoformat() if end else None
+        names = []
+        for name, (p_start, p_end) in sorted(self._partition_bounds().items(), key=lambda kv: kv[1][0]):
+            if name == ARCHIVE_PARTITION:
+                continue
+            if lo and p_end <= lo:
+                continue
+            if hi and p_start >= hi:
+                continue
+            names.append(name)
+        return [ARCHIVE_PARTITION] + names
+
+    def partition_names(self) -> List[str]:
+        return [n for n in self._ordered_partitions() if n != ARCHIVE_PARTITION]
+
+    @staticmethod
+    def _to_row(event: OceanEvent):
+        # Serialize complex objects (metadata JSON and timestamp are cached on the event)
+        evidence_json = json.dumps(event.evidence.to_dict())
+        return (event.event_id,
+                event.timestamp_iso,
+                event.event_type.value,
+                event.risk_level.name,
+                event.confidence,
+                evidence_json,
+                1 if event.synced else 0,
+                event.meta_json)
+
+    @staticmethod
+    def _from_row(row) -> OceanEvent:
+        event_id, timestamp, type_value, risk_name, confidence, evidence_json, synced, meta_json = row
+        return OceanEvent(
+            event_id=event_id,
+            timestamp=datetime.fromisoformat(timestamp),
+            event_type=EventType(type_value),
+            risk_level=RiskLevel[risk_name],
+            confidence=confidence,
+            evidence=Evidence(**json.loads(evidence_json)),
+            metadata=json.loads(meta_json),
+            synced=bool(synced),
+        )
+
+    @staticmethod
+    def _evidence_paths(evidence: dict) -> List[str]:
+        paths = list(evidence.get("image_paths") or [])
+        if evidence.get("clip_path"):
+            paths.append(evidence["clip_path"])
+        for refs in (evidence.get("renditions") or {}).values():
+            paths.extend(refs)
+        return paths
+
+    def _ref_evidence(self, c, paths):
+        """Add references; returns (paths referenced for the first time, bytes they hold)."""
+        new = []
+        added = 0
+        for path in paths:
+            c.execute("UPDATE evidence_files SET refs=refs+1 WHERE path=?", (path,))
+            if c.rowcount == 0:
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    size = 0
+                c.execute("INSERT INTO evidence_files VALUES (?,?,1)", (path, size))
+                new.append(path)
+                added += size
+        return new, added
+
+    def referenced_evidence(self) -> List[str]:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return [path for (path,) in conn.execute("SELECT path FROM evidence_files WHERE refs > 0")]
+        finally:
+            conn.close()
+
+    def _sync_evidence_store(self, retained, released):
+        # After commit: the evidence store follows what the events table now references
+        if self.evidence_store:
+            for ref in retained:
+                self.evidence_store.retain(ref)
+            for ref in released:
+                self.evidence_store.release(ref)
+
+    def _unref_evidence(self, c, paths):
+        """Drop references; returns (paths no longer referenced, bytes they held)."""
+        orphaned = []
+        freed = 0
+        for path in paths:
+            c.execute("UPDATE evidence_files SET refs=refs-1 WHERE path=?", (path,))
+            row = c.execute("SELECT bytes, refs FROM evidence_files WHERE path=?", (path,)).fetchone()
+            if row and row[1] <= 0:
+                c.execute("DELETE FROM evidence_files WHERE path=?", (path,))
+                orphaned.append(path)
+                freed += row[0]
+        return orphaned, freed
+
+    def _write_events(self, conn, events: Sequence[OceanEvent]):
+        self._ensure_partitions(conn, events)
+        c = conn.cursor()
+
+        by_partition = {}
+        for e in events:
+            by_partition.setdefault(self._partition_for(e.timestamp)[0], []).append(self._to_row(e))
+
+        old_paths = []
+        rollup_delta = {}
+        for name, rows in by_partition.items():
+            # Replaced rows release their old evidence references and rollup counts first
+            ids = [r[0] for r in rows]
+            for i in range(0, len(ids), 500):
+                part = ids[i:i + 500]
+                c.execute(f'''SELECT evidence, timestamp, json_extract(meta, '$.raw_label'), risk,
+                                     synced, confidence
+                              FROM {name} WHERE event_id IN ({','.join('?' * len(part))})''', part)
+                for evidence_json, ts, label, risk, synced, conf in c.fetchall():
+                    old_paths.extend(self._evidence_paths(json.loads(evidence_json)))
+                    rollups.add(rollup_delta, ts, label, risk, synced, conf, sign=-1)
+            c.executemany(f"INSERT OR REPLACE INTO {name} VALUES (?,?,?,?,?,?,?,?)", rows)
+
+        for e in events:
+            rollups.add(rollup_delta, e.timestamp_iso, e.label,
+                        e.risk_level.name, 1 if e.synced else 0, e.confidence)
+        rollups.apply(c, rollup_delta)
+
+        # Ref new paths before unref'ing old ones so paths kept by a replacement never hit zero
+        new_paths = []
+        delta = 0
+        for e in events:
+            new, added = self._ref_evidence(c, self._evidence_paths(e.evidence.to_dict()))
+            new_paths.extend(new)
+            delta += added
+        orphaned = []
+        if old_paths:
+            orphaned, freed = self._unref_evidence(c, old_paths)
+            delta -= freed
+        return delta, new_paths, orphaned
+
+    def _apply_usage(self, delta: int):
+        with self._usage_lock:
+            self._evidence_bytes += delta
+
+    @property
+    def evidence_bytes(self) -> int:
+        return self._evidence_bytes
+
+    def db_bytes(self) -> int:
+        # Live pages only: deleted rows are reusable space, not growth
+        conn = sqlite3.connect(self.db_path)
+        try:
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            pages = conn.execute("PRAGMA page_count").fetchone()[0]
+            free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        finally:
+            conn.close()
+        return (pages - free) * page_size
+
     def save_event(self, event: OceanEvent):
         try:
+            started = time.monotonic()
             conn = sqlite3.connect(self.db_path)
-            c = conn.cursor()
-            
-            # Serialize complex objects
-            evidence_json = json.dumps(event.evidence.__dict__)
-            meta_json = json.dumps(event.metadata)
-            
-            c.execute('''INSERT OR REPLACE INTO events VALUES (?,?,?,?,?,?,?,?)''',
-                      (event.event_id, 
-                       event.timestamp.isoformat(),
-                       event.event_type.value,
-                       event.risk_level.name,
-                       event.confidence,
-                       evidence_json,
-                       1 if event.synced else 0,
-                       meta_json))
-            conn.commit()
+            with conn:
+                delta, retained, released = self._write_events(conn, [event])
             conn.close()
+            self._apply_usage(delta)
+            self._sync_evidence_store(retained, released)
+            elapsed = time.monotonic() - started
+            db_write_seconds.labels("event").observe(elapsed)
+            tracer.record("db_write", elapsed)
+            tracer.mark(event.trace_id, "storage", after="risk")
             logger.info(f"Event {event.event_id} saved locally. Risk: {event.risk_level.name}")
         except Exception as e:
             logger.error(f"DB Error: {e}")
 
-    def get_pending_sync(self):
-        # Retrieve events that need syncing
-        pass
+    def save_events(self, events: Sequence[OceanEvent]):
+        # Bulk variant: one transaction for the whole batch
+        try:
+            started = time.monotonic()
+            conn = sqlite3.connect(self.db_path)
+            with conn:
+                delta, retained, released = self._write_events(conn, events)
+            conn.close()
+            self._apply_usage(delta)
+            self._sync_evidence_store(retained, released)
+            db_write_seconds.labels("batch").observe(time.monotonic() - started)
+            logger.debug(f"{len(events)} events saved locally (batch).")
+        except Exception as e:
+            logger.error(f"DB Error (batch): {e}")
 
-    def mark_synced(self, event_id: str):
+    def get_pending_sync(self, limit: int = 500,
+                         risk_levels: Optional[Sequence[RiskLevel]] = None) -> List[OceanEvent]:
+        # Retrieve events that need syncing, highest risk first, oldest first within a level
+        levels = risk_levels or [RiskLevel.HIGH, RiskLevel.MEDIUM, RiskLevel.UNKNOWN, RiskLevel.LOW]
+        events = []
         try:
             conn = sqlite3.connect(self.db_path)
             c = conn.cursor()
-            c.execute("UPDATE events SET synced=1 WHERE event_id=?", (event_id,))
-            conn.commit()
+            partitions = self._ordered_partitions()
+            for level in levels:
+                for name in partitions:
+                    remaining = limit - len(events)
+                    if remaining <= 0:
+                        break
+                    c.execute(f'''SELECT * FROM {name} WHERE synced=0 AND risk=?
+                                  ORDER BY timestamp LIMIT ?''', (level.name, remaining))
+                    events.extend(self._from_row(row) for row in c.fetchall())
+            conn.close()
+        except Exception as e:
+            logger.error(f"DB Error reading sync backlog: {e}")
+        return events
+
+    def count_pending_sync(self, risk_levels: Optional[Sequence[RiskLevel]] = None) -> int:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            if not risk_levels:
+                return conn.execute("SELECT COUNT(*) FROM events WHERE synced=0").fetchone()[0]
+            marks = ",".join("?" * len(risk_levels))
+            return conn.execute(f"SELECT COUNT(*) FROM events WHERE synced=0 AND risk IN ({marks})",
+                                [level.name for level in risk_levels]).fetchone()[0]
+        finally:
+            conn.close()
+
+    def query_rollup(self, granularity: str, start: datetime, end: datetime,
+                     group_by: Sequence[str] = ("bucket",), label: Optional[str] = None,
+                     risk: Optional[RiskLevel] = None, synced: Optional[bool] = None) -> List[dict]:
+        """Event counts per minute/hour/day bucket from the rollup tables.
+
+        e.g. HIGH events per hour:  query_rollup("hour", t0, t1, risk=RiskLevel.HIGH)
+             sightings per species per day:  query_rollup("day", t0, t1, group_by=("bucket", "label"))
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return rollups.query(conn, granularity, start, end, group_by=group_by, label=label,
+                                 risk=risk.name if risk else None, synced=synced)
+        finally:
+            conn.close()
+
+    def query_range(self, start: datetime, end: datetime,
+                    risk_levels: Optional[Sequence[RiskLevel]] = None) -> List[OceanEvent]:
+        """Events with start <= timestamp < end; only overlapping partitions are read."""
+        sql_filter = "timestamp >= ? AND timestamp < ?"
+        params = [start.isoformat(), end.isoformat()]
+        if risk_levels:
+            sql_filter += f" AND risk IN ({','.join('?' * len(risk_levels))})"
+            params += [level.name for level in risk_levels]
+        events = []
+        conn = sqlite3.connect(self.db_path)
+        try:
+            for name in self._ordered_partitions(start, end):
+                rows = conn.execute(f"SELECT * FROM {name} WHERE {sql_filter} ORDER BY timestamp", params)
+                events.extend(self._from_row(row) for row in rows)
+        finally:
+            conn.close()
+        events.sort(key=lambda e: e.timestamp)
+        return events
+
+    def _set_synced(self, conn, event_ids: Sequence[str], timestamps: Optional[dict] = None):
+        c = conn.cursor()
+        rollup_delta = {}
+
+        def mark(name, event_id):
+            row = c.execute(f'''SELECT timestamp, json_extract(meta, '$.raw_label'), risk, synced, confidence
+                               FROM {name} WHERE event_id=?''', (event_id,)).fetchone()
+            if not row:
+                return False
+            ts, label, risk, synced, conf = row
+            if not synced:
+                c.execute(f"UPDATE {name} SET synced=1 WHERE event_id=?", (event_id,))
+                rollups.add(rollup_delta, ts, label, risk, 0, conf, sign=-1)
+                rollups.add(rollup_delta, ts, label, risk, 1, conf)
+            return True
+
+        remaining = []
+        for event_id in event_ids:
+            ts = timestamps.get(event_id) if timestamps else None
+            name = self._partition_for(ts)[0] if ts else None
+            if name in self._partitions and mark(name, event_id):
+                continue
+            remaining.append(event_id)
+        # No timestamp hint: most marks are for recent events, search newest first
+        for name in reversed(self._ordered_partitions()):
+            if not remaining:
+                break
+            remaining = [event_id for event_id in remaining if not mark(name, event_id)]
+
+        rollups.apply(c, rollup_delta)
+
+    def _update_evidence(self, event_id: str, timestamp: Optional[datetime], update) -> bool:
+        """Rewrite one stored event's evidence with update(dict), keeping refs in step."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                c = conn.cursor()
+                names = [self._partition_for(timestamp)[0]] if timestamp else []
+                names += [n for n in reversed(self._ordered_partitions()) if n not in names]
+                for name in names:
+                    if name not in self._partitions:
+                        continue
+                    row = c.execute(f"SELECT evidence FROM {name} WHERE event_id=?", (event_id,)).fetchone()
+                    if not row:
+                        continue
+                    evidence = json.loads(row[0])
+                    old_paths = self._evidence_paths(evidence)
+                    update(evidence)
+                    c.execute(f"UPDATE {name} SET evidence=? WHERE event_id=?",
+                              (json.dumps(evidence), event_id))
+                    # Ref new paths before unref'ing old ones so shared paths never hit zero
+                    retained, delta = self._ref_evidence(c, self._evidence_paths(evidence))
+                    released, freed = self._unref_evidence(c, old_paths)
+                    delta -= freed
+                    break
+                else:
+                    return False
+            self._apply_usage(delta)
+            self._sync_evidence_store(retained, released)
+            return True
+        except Exception as e:
+            logger.error(f"DB Error updating evidence: {e}")
+            return False
+        finally:
+            conn.close()
+
+    def set_clip_path(self, event_id: str, clip_path: str,
+                      timestamp: Optional[datetime] = None) -> bool:
+        """Attach a clip to an already stored event. Returns False if not found."""
+        return self._update_evidence(event_id, timestamp,
+                                     lambda evidence: evidence.update(clip_path=clip_path))
+
+    def set_renditions(self, event_id: str, renditions: Dict[str, List[str]],
+                       timestamp: Optional[datetime] = None) -> bool:
+        """Record transcoded renditions (tier -> paths) for a stored event."""
+        def update(evidence):
+            evidence.setdefault("renditions", {}).update(renditions)
+        return self._update_evidence(event_id, timestamp, update)
+
+    def mark_synced(self, event_id: str, timestamp: Optional[datetime] = None):
+        try:
+            conn = sqlite3.connect(self.db_path)
+            with conn:
+                self._set_synced(conn, [event_id], {event_id: timestamp} if timestamp else None)
             conn.close()
             logger.info(f"Event {event_id} marked as SYNCED in system storage.")
         except Exception as e:
             logger.error(f"DB Error marking synced: {e}")
+
+    def mark_synced_many(self, event_ids: Sequence[str], timestamps: Optional[dict] = None):
+        # timestamps: optional event_id -> datetime hint to address partitions directly
+        try:
+            conn = sqlite3.connect(self.db_path)
+            with conn:
+                self._set_synced(conn, event_ids, timestamps)
+            conn.close()
+            logger.debug(f"{len(event_ids)} events marked as SYNCED in system storage.")
+        except Exception as e:
+            logger.error(f"DB Error marking synced (batch): {e}")
+
+    def delete_oldest(self, risk_level: RiskLevel, limit: int,
+                      older_than: Optional[datetime] = None):
+        """Delete up to `limit` of the oldest events at one risk level.
+
+        Kept to one short transaction per call so writers are never blocked
+        for long. Returns (events deleted, evidence paths now unreferenced);
+        the caller removes those files outside the transaction.
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                c = conn.cursor()
+                rows = []
+                for name in self._ordered_partitions(end=older_than):
+                    if older_than is not None:
+                        c.execute(f'''SELECT event_id, evidence FROM {name}
+                                      WHERE risk=? AND timestamp<? ORDER BY timestamp LIMIT ?''',
+                                  (risk_level.name, older_than.isoformat(), limit))
+                    else:
+                        c.execute(f'''SELECT event_id, evidence FROM {name}
+                                      WHERE risk=? ORDER BY timestamp LIMIT ?''',
+                                  (risk_level.name, limit))
+                    rows = c.fetchall()
+                    if rows:
+                        c.executemany(f"DELETE FROM {name} WHERE event_id=?", [(r[0],) for r in rows])
+                        break
+                if not rows:
+                    return 0, []
+                paths = []
+                for _, evidence_json in rows:
+                    paths.extend(self._evidence_paths(json.loads(evidence_json)))
+                orphaned, freed = self._unref_evidence(c, paths)
+            self._apply_usage(-freed)
+            return len(rows), orphaned
+        finally:
+            conn.close()
+
+    def drop_partitions_before(self, cutoff: datetime,
+                               keep_levels: Sequence[RiskLevel] = ()):
+        """Drop every partition that ends at or before `cutoff`.
+
+        Rows at `keep_levels` are moved to the archive partition first. Returns
+        (events dropped, evidence paths now unreferenced).
+        """
+        cutoff_iso = cutoff.isoformat()
+        partitions = self._partition_bounds()
+        expired = sorted((name for name, (_, p_end) in partitions.items()
+                          if name != ARCHIVE_PARTITION and p_end <= cutoff_iso),
+                         key=lambda name: partitions[name][0])
+        dropped = 0
+        orphaned = []
+        for name in expired:
+            conn = sqlite3.connect(self.db_path)
+            try:
+                with conn:
+                    c = conn.cursor()
+                    if keep_levels:
+                        marks = ",".join("?" * len(keep_levels))
+                        keep = [level.name for level in keep_levels]
+                        c.execute(f"INSERT OR REPLACE INTO {ARCHIVE_PARTITION} "
+                                  f"SELECT * FROM {name} WHERE risk IN ({marks})", keep)
+                        moved = c.rowcount
+                        rows = c.execute(f"SELECT evidence FROM {name} WHERE risk NOT IN ({marks})",
+                                         keep).fetchall()
+                    else:
+                        moved = 0
+                        rows = c.execute(f"SELECT evidence FROM {name}").fetchall()
+                    paths = []
+                    for (evidence_json,) in rows:
+                        paths.extend(self._evidence_paths(json.loads(evidence_json)))
+                    gone, freed = self._unref_evidence(c, paths)
+
+                    with self._partition_lock:
+                        bounds = self._partitions.pop(name)
+                        try:
+                            c.execute("DELETE FROM partitions WHERE name=?", (name,))
+                            self._rebuild_view(c)
+                            c.execute(f"DROP TABLE {name}")
+                        except Exception:
+                            self._partitions[name] = bounds
+                            raise
+                self._apply_usage(-freed)
+                dropped += len(rows)
+                orphaned.extend(gone)
+                logger.info(f"Dropped partition {name} ({len(rows)} events, {moved} archived)")
+            finally:
+                conn.close()
+        return dropped, orphaned
@@ -0,0 +1,129 @@
+import logging
+import os
+import random
+import resource
+import time
+from typing import List, Optional
+
+from src.core.clock import VirtualClock
+from src.core.energy import EnergyModel, EnergyPlanner, FileBatterySource
+from src.core.event_bus import EventBus
+from src.agents.net_status_agent import NetStatusAgent
+from src.agents.vision_agent import VisionAgent
+from src.agents.bioconfirm_agent import BioConfirmAgent
+from src.agents.risk_agent import RiskAgent
+from src.agents.sync_agent import SyncAgent
+from src.agents.strategy_agent import StrategyAgent
+from src.agents.alert_agent import AlertAgent
+from src.agents.resource_monitor import ResourceMonitor
+from src.agents.incident_recorder import IncidentRecorder
+from src.database.storage import StorageManager
+from src.database.retention import RetentionEngine
+from src.database.evidence_store import EvidenceStore
+from src.database.ingest_filter import IngestFilter
+
+logger = logging.getLogger("Headless")
+
+
+def rss_mb() -> float:
+    """Current resident set size (peak where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class HeadlessRun:
+    """The full agent pipeline on a VirtualClock, with no threads.
+
+    Vision frames, net pings, resource polls, incident ticks and retention
+    passes are callbacks on one discrete-event schedule, so simulated time
+    runs as fast as the CPU allows. Left out: the transcoder (a process pool
+    working in wall time), real link probing, the metrics server and the
+    profiler.
+    """
+
+    def __init__(self, workdir: str, seed: Optional[int] = None, start: Optional[float] = None):
+        if seed is not None:
+            random.seed(seed)
+        self.clock = clock = VirtualClock(start)
+        self.bus = bus = EventBus()
+        self.evidence_store = EvidenceStore(os.path.join(workdir, "evidence_store"))
+        self.storage = StorageManager(os.path.join(workdir, "ocean_data.db"), evidence_store=self.evidence_store)
+        self.evidence_store.attach(bus)
+        self.retention = RetentionEngine(self.storage, bus, log_dir=workdir,
+                                         evidence_store=self.evidence_store, clock=clock)
+        self.retention.BATCH_PAUSE_SECONDS = 0  # A real wait; nothing else runs meanwhile
+        self.incident_recorder = IncidentRecorder(bus, self.evidence_store, self.storage, clock=clock)
+
+        self.net_agent = NetStatusAgent(bus, clock=clock)
+        self.vision_agent = VisionAgent(bus, self.evidence_store, frame_sink=self.incident_recorder, clock=clock)
+        self.bio_agent = BioConfirmAgent(bus, clock=clock)
+        self.risk_agent = RiskAgent(bus)
+        self.alert_agent = AlertAgent(bus, clock=clock)
+        self.ingest_filter = IngestFilter(bus, self.evidence_store)
+        self.sync_agent = SyncAgent(bus, self.storage, ingest_filter=self.ingest_filter, clock=clock)
+        battery_source = FileBatterySource()
+        self.energy_planner = EnergyPlanner(EnergyModel(), battery_source, clock=clock)
+        self.strategy_agent = StrategyAgent(bus, storage_path=workdir, energy_planner=self.energy_planner)
+        self.resource_monitor = ResourceMonitor(bus, storage_path=workdir,
+                                                battery_source=battery_source, clock=clock)
+
+        # Stats
+        self.events_assessed = 0
+        self.alerts = 0
+        bus.subscribe("risk_assessed_event", self._count_event)
+        bus.subscribe("alert_event", self._count_alert)
+
+        self.started_at = clock.time()
+        self.reports: List[dict] = []
+        self._schedule()
+
+    def _count_event(self, event):
+        self.events_assessed += 1
+
+    def _count_alert(self, payload):
+        self.alerts += 1
+
+    def _schedule(self):
+        clock = self.clock
+        self.resource_monitor.poll(force=True)
+        clock.call_later(0, self.vision_agent.step)
+        clock.call_later(0, self.net_agent.step)
+        clock.call_later(0, self.incident_recorder.tick)
+        clock.call_every(self.resource_monitor.TICK_SECONDS, self.resource_monitor.poll,
+                         first=self.resource_monitor.TICK_SECONDS)
+        clock.call_every(self.retention.PASS_INTERVAL_SECONDS, self.retention.run_pass)
+
+    def report(self, wall_seconds: float) -> dict:
+        report = {
+            "sim_hours": round((self.clock.time() - self.started_at) / 3600, 2),
+            "wall_s": round(wall_seconds, 1),
+            "rss_mb": round(rss_mb(), 1),
+            "db_bytes": self.storage.db_bytes(),
+            "partitions": len(self.storage.partition_names()),
+            "evidence_bytes": self.evidence_store.disk_bytes,
+            "frames": self.vision_agent.frame_id - 100000,
+            "events": self.events_assessed,
+            "alerts": self.alerts,
+            "events_deleted": self.retention.events_deleted,
+            "tracks": len(self.bio_agent.tracks),
+        }
+        self.reports.append(report)
+        logger.info("soak_report", extra={"fields": report})
+        return report
+
+    def run(self, hours: float, report_every: float = 3600.0) -> List[dict]:
+        """Advance hours of simulated time, reporting every report_every simulated seconds."""
+        started = time.monotonic()
+        end = self.clock.time() + hours * 3600
+        while self.clock.time() < end:
+            self.clock.run_until(min(self.clock.time() + report_every, end))
+            self.report(time.monotonic() - started)
+        return self.reports
+
+    def close(self):
+        self.incident_recorder.stop()
+        self.incident_recorder.tick()
+        self.evidence_store.close()
@@ -0,0 +1,85 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+from typing import List, Set
+
+from src.uplink.evidence_upload import EvidenceTransport
+
+logger = logging.getLogger("EvidenceReceiver")
+
+_SHA256_HEX = re.compile(r"[0-9a-f]{64}")
+
+
+def _checked(digest) -> str:
+    # Hashes arrive from the network and become file names: nothing but hex digests
+    if not isinstance(digest, str) or not _SHA256_HEX.fullmatch(digest):
+        raise ValueError(f"Not a SHA-256 hex digest: {digest!r:.80}")
+    return digest
+
+
+class LocalEvidenceReceiver(EvidenceTransport):
+    """Local stand-in for the shore evidence store.
+
+    Chunks are kept content-addressed under root/chunks; committed files are
+    reassembled under root/files and verified against their SHA-256. Every
+    hash is validated before it is used in a path.
+    """
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        self.chunk_dir = os.path.join(root_dir, "chunks")
+        self.file_dir = os.path.join(root_dir, "files")
+        os.makedirs(self.chunk_dir, exist_ok=True)
+        os.makedirs(self.file_dir, exist_ok=True)
+        self._lock = threading.Lock()
+
+        # Counters for tests/benchmarks
+        self.chunks_received = 0
+        self.bytes_received = 0
+
+    def _chunk_path(self, chunk_hash: str) -> str:
+        chunk_hash = _checked(chunk_hash)
+        return os.path.join(self.chunk_dir, chunk_hash[:2], chunk_hash)
+
+    def missing_chunks(self, chunk_hashes: List[str]) -> Set[str]:
+        return {h for h in chunk_hashes if not os.path.exists(self._chunk_path(h))}
+
+    def put_chunk(self, chunk_hash: str, data: bytes):
+        if hashlib.sha256(data).hexdigest() != chunk_hash:
+            raise ValueError(f"Chunk hash mismatch: {chunk_hash}")
+        path = self._chunk_path(chunk_hash)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.part"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self.chunks_received += 1
+            self.bytes_received += len(data)
+
+    def commit_file(self, file_hash: str, chunk_hashes: List[str], name: str, size: int):
+        chunk_paths = [self._chunk_path(h) for h in chunk_hashes]
+        target = self.file_path(file_hash, name)
+        if os.path.exists(target):
+            return
+        for h, path in zip(chunk_hashes, chunk_paths):
+            if not os.path.exists(path):
+                raise ValueError(f"Chunk not received: {h}")  # The node resends what is missing
+        digest = hashlib.sha256()
+        tmp = f"{target}.part"
+        with open(tmp, "wb") as out:
+            for path in chunk_paths:
+                with open(path, "rb") as f:
+                    data = f.read()
+                digest.update(data)
+                out.write(data)
+        if digest.hexdigest() != file_hash or os.path.getsize(tmp) != size:
+            os.remove(tmp)
+            raise ValueError(f"Reassembled file does not match {file_hash}")
+        os.replace(tmp, target)
+        logger.info(f"Evidence received: {name} ({size} bytes)")
+
+    def file_path(self, file_hash: str, name: str) -> str:
+        return os.path.join(self.file_dir, f"{_checked(file_hash)[:16]}_{os.path.basename(name)}")
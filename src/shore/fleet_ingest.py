@@ -0,0 +1,415 @@
+import argparse
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import config
+from src.core.metrics import registry
+from src.core.types import OceanEvent
+from src.core.wire_format import decode_batch, WireFormatError
+from src.shore.evidence_receiver import LocalEvidenceReceiver
+
+logger = logging.getLogger("FleetIngest")
+
+# Uplink request header naming the sending node (config.SYSTEM_ID on the vessel)
+NODE_HEADER = "X-OceanViewer-Node"
+
+fleet_events = registry.counter("fleet_events_total", "Events stored from all nodes")
+fleet_duplicates = registry.counter("fleet_duplicates_total", "Retransmitted events already stored")
+fleet_commit_seconds = registry.histogram("fleet_commit_seconds", "Group commit latency")
+
+_FLEET_COLUMNS = '''(node_id TEXT,
+                     event_id TEXT,
+                     timestamp TEXT,
+                     type TEXT,
+                     risk TEXT,
+                     confidence REAL,
+                     evidence TEXT,
+                     meta TEXT,
+                     received_at REAL,
+                     PRIMARY KEY (node_id, event_id)) WITHOUT ROWID'''
+
+
+class FleetStoreBusy(Exception):
+    """The write queue is full; the node should retry later."""
+
+
+class _Pending:
+    __slots__ = ("node_id", "events", "done", "inserted", "duplicates", "error")
+
+    def __init__(self, node_id: str, events: Sequence[OceanEvent]):
+        self.node_id = node_id
+        self.events = events
+        self.done = threading.Event()
+        self.inserted = 0
+        self.duplicates = 0
+        self.error: Optional[Exception] = None
+
+
+class FleetStore:
+    """Shore-side event store for the whole fleet.
+
+    One table per day (fleet_dYYYYMMDD, by event time) keyed on
+    (node_id, event_id): event ids are only unique per node, and a batch
+    resent after a lost acknowledgement is absorbed by INSERT OR IGNORE.
+    All writes go through one writer thread that commits whatever has
+    queued up meanwhile as a single transaction, so a fleet reconnecting at
+    once pays one commit per group rather than per batch. submit() returns
+    only once the batch is committed: an acknowledgement means stored.
+    """
+
+    def __init__(self, db_path: str = "fleet_events.db"):
+        self.db_path = db_path
+        self._queue: "queue.Queue[Optional[_Pending]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._queued_events = 0
+        self._partitions = set()
+        self._thread: Optional[threading.Thread] = None
+
+        # Config
+        self.MAX_GROUP_EVENTS = 20000 # Per transaction
+        self.MAX_QUEUED_EVENTS = 200000 # Beyond this uploads are refused (FleetStoreBusy)
+        self.SUBMIT_TIMEOUT = 30.0
+
+        # Stats
+        self.events_stored = 0
+        self.duplicates = 0
+        self.commits = 0
+
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL") # Readers never block the writer
+        conn.execute('''CREATE TABLE IF NOT EXISTS partitions
+                        (name TEXT PRIMARY KEY, start TEXT, end TEXT)''')
+        conn.execute('''CREATE TABLE IF NOT EXISTS nodes
+                        (node_id TEXT PRIMARY KEY,
+                         events INTEGER,
+                         duplicates INTEGER,
+                         last_event TEXT,
+                         last_seen REAL)''')
+        conn.commit()
+        self._partitions = {name for (name,) in conn.execute("SELECT name FROM partitions")}
+        conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    # --- Lifecycle ---
+
+    def start(self):
+        self._thread = threading.Thread(target=self._writer_loop, name="FleetStore", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Commit everything already queued, then stop the writer."""
+        if self._thread and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    # --- Writes ---
+
+    def submit(self, node_id: str, events: Sequence[OceanEvent]) -> Tuple[int, int]:
+        """Store a node's batch; returns (inserted, duplicates) once committed."""
+        with self._lock:
+            if self._queued_events and self._queued_events + len(events) > self.MAX_QUEUED_EVENTS:
+                raise FleetStoreBusy(f"{self._queued_events} events waiting to be written")
+            self._queued_events += len(events)
+        pending = _Pending(node_id, events)
+        self._queue.put(pending)
+        if not pending.done.wait(self.SUBMIT_TIMEOUT):
+            raise TimeoutError(f"Batch from {node_id} not committed within {self.SUBMIT_TIMEOUT}s")
+        if pending.error:
+            raise pending.error
+        return pending.inserted, pending.duplicates
+
+    def _writer_loop(self):
+        conn = self._connect()
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                break
+            group, size = [first], len(first.events)
+            while size < self.MAX_GROUP_EVENTS:
+                try:
+                    nxt = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    stopping = True
+                    break
+                group.append(nxt)
+                size += len(nxt.events)
+
+            started = time.monotonic()
+            try:
+                self._commit(conn, group)
+            except Exception as e:
+                conn.rollback()
+                if len(group) == 1:
+                    logger.error(f"Fleet write from {first.node_id} failed: {e}")
+                    first.error = e
+                else:
+                    # One bad batch must not fail the others: redo the group batch by batch
+                    logger.warning(f"Fleet write of {len(group)} batches failed ({e}); retrying one by one")
+                    for p in group:
+                        try:
+                            self._commit(conn, [p])
+                        except Exception as e:
+                            conn.rollback()
+                            logger.error(f"Fleet write from {p.node_id} failed: {e}")
+                            p.error = e
+            fleet_commit_seconds.observe(time.monotonic() - started)
+            with self._lock:
+                self._queued_events -= size
+            for p in group:
+                p.done.set()
+        conn.close()
+
+    @staticmethod
+    def _partition_for(ts: datetime):
+        day = datetime(ts.year, ts.month, ts.day)
+        return f"fleet_d{day:%Y%m%d}", day, day + timedelta(days=1)
+
+    def _commit(self, conn: sqlite3.Connection, group: List[_Pending]):
+        created = self._write_group(conn, group)
+        conn.commit()
+        self.commits += 1
+        # Only now are the new partitions and the counts real
+        if created:
+            self._partitions = self._partitions | created
+            logger.info(f"Created partitions {', '.join(sorted(created))}")
+        for p in group:
+            self.events_stored += p.inserted
+            self.duplicates += p.duplicates
+            fleet_events.inc(p.inserted)
+            fleet_duplicates.inc(p.duplicates)
+
+    def _ensure_partitions(self, c, events: Sequence[OceanEvent], created: set):
+        for e in events:
+            name, start, end = self._partition_for(e.timestamp)
+            if name not in self._partitions and name not in created:
+                c.execute(f"CREATE TABLE IF NOT EXISTS {name} {_FLEET_COLUMNS}")
+                c.execute(f"CREATE INDEX IF NOT EXISTS idx_{name}_time ON {name} (timestamp)")
+                c.execute("INSERT OR IGNORE INTO partitions VALUES (?,?,?)",
+                          (name, start.isoformat(), end.isoformat()))
+                created.add(name)
+
+    def _write_group(self, conn: sqlite3.Connection, group: List[_Pending]) -> set:
+        """Write the group uncommitted; returns the partitions it created."""
+        c = conn.cursor()
+        now = time.time()
+        created = set()
+        for p in group:
+            self._ensure_partitions(c, p.events, created)
+            by_partition: Dict[str, list] = {}
+            for e in p.events:
+                by_partition.setdefault(self._partition_for(e.timestamp)[0], []).append((
+                    p.node_id, e.event_id, e.timestamp_iso, e.event_type.value,
+                    e.risk_level.name, e.confidence, json.dumps(e.evidence.to_dict()),
+                    e.meta_json, now))
+            before = conn.total_changes
+            for name, rows in by_partition.items():
+                c.executemany(f"INSERT OR IGNORE INTO {name} VALUES (?,?,?,?,?,?,?,?,?)", rows)
+            p.inserted = conn.total_changes - before
+            p.duplicates = len(p.events) - p.inserted
+            last_event = max((e.timestamp for e in p.events), default=None)
+            c.execute('''INSERT INTO nodes VALUES (?,?,?,?,?)
+                         ON CONFLICT(node_id) DO UPDATE SET
+                             events = events + excluded.events,
+                             duplicates = duplicates + excluded.duplicates,
+                             last_event = MAX(COALESCE(last_event, ''), COALESCE(excluded.last_event, '')),
+                             last_seen = excluded.last_seen''',
+                      (p.node_id, p.inserted, p.duplicates,
+                       last_event.isoformat() if last_event else None, now))
+        return created
+
+    # --- Reads ---
+
+    def partition_names(self) -> List[str]:
+        return sorted(self._partitions)
+
+    def count(self, node_id: Optional[str] = None) -> int:
+        conn = self._connect()
+        try:
+            total = 0
+            for name in self.partition_names():
+                if node_id is None:
+                    total += conn.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+                else:
+                    total += conn.execute(f"SELECT COUNT(*) FROM {name} WHERE node_id=?",
+                                          (node_id,)).fetchone()[0]
+            return total
+        finally:
+            conn.close()
+
+    def nodes(self) -> Dict[str, dict]:
+        conn = self._connect()
+        try:
+            return {node_id: {"events": events, "duplicates": dups, "last_event": last_event,
+                              "last_seen": last_seen}
+                    for node_id, events, dups, last_event, last_seen in
+                    conn.execute("SELECT node_id, events, duplicates, last_event, last_seen FROM nodes")}
+        finally:
+            conn.close()
+
+
+class _FleetHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _reply(self, status: int, payload: dict, headers: Optional[dict] = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        store: FleetStore = self.server.store
+        if self.path != "/nodes":
+            self.send_error(404)
+            return
+        self._reply(200, store.nodes())
+
+    def _evidence(self, body: bytes):
+        # Chunked evidence uploads (HttpEvidenceTransport on the node)
+        receiver: Optional[LocalEvidenceReceiver] = self.server.evidence
+        if receiver is None:
+            self.send_error(404)
+            return
+        try:
+            if self.command == "PUT" and self.path.startswith("/evidence/chunk/"):
+                receiver.put_chunk(self.path[len("/evidence/chunk/"):], body)
+                self._reply(200, {})
+            elif self.command == "POST" and self.path == "/evidence/missing":
+                self._reply(200, {"missing": sorted(receiver.missing_chunks(json.loads(body)["chunks"]))})
+            elif self.command == "POST" and self.path == "/evidence/commit":
+                req = json.loads(body)
+                receiver.commit_file(req["file_hash"], req["chunks"], os.path.basename(req["name"]),
+                                     req["size"])
+                self._reply(200, {})
+            else:
+                self.send_error(404)
+        except OSError as e:
+            # Shore-side storage trouble (disk full, chunk lost): transient for the node
+            logger.error(f"Evidence request {self.command} {self.path} failed: {e}")
+            self._reply(503, {"error": str(e)})
+        except (ValueError, KeyError, TypeError) as e:
+            self._reply(400, {"error": str(e)})
+
+    def do_PUT(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._evidence(body)
+
+    def do_POST(self):
+        store: FleetStore = self.server.store
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        if self.path.startswith("/evidence/"):
+            self._evidence(body)
+            return
+        if self.path != "/ingest":
+            self.send_error(404)
+            return
+        node_id = self.headers.get(NODE_HEADER)
+        if not node_id:
+            self.send_error(400, f"Missing {NODE_HEADER} header")
+            return
+        try:
+            events = decode_batch(body)
+        except WireFormatError as e:
+            self.send_error(400, str(e))
+            return
+        try:
+            inserted, duplicates = store.submit(node_id, events)
+        except (FleetStoreBusy, TimeoutError) as e:
+            # The node keeps the batch and retries; nothing was acknowledged
+            self._reply(503, {"error": str(e)}, {"Retry-After": str(self.server.retry_after)})
+            return
+        except Exception as e:
+            self._reply(500, {"error": str(e)})
+            return
+        self._reply(200, {"accepted": [e.event_id for e in events], "duplicates": duplicates})
+
+
+class _FleetHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024 # A whole fleet reconnecting at once must not overflow the accept backlog
+
+
+class FleetIngestServer:
+    """Shore ingest endpoint for many nodes.
+
+    POST /ingest takes the same wire-format batches as the single-node
+    stand-in, with the sending node named in the X-OceanViewer-Node header.
+    Each connection is served on its own thread (decoding runs there); the
+    acknowledgement lists every event of the batch once it is stored,
+    duplicates included. When the store's queue is full the reply is 503
+    with Retry-After, which the node's uplink treats as a transient
+    failure. GET /nodes returns per-node totals. With an evidence receiver,
+    /evidence/* takes the nodes' chunked evidence uploads.
+    """
+
+    def __init__(self, store: FleetStore, host: str = "127.0.0.1", port: int = 0,
+                 evidence: Optional[LocalEvidenceReceiver] = None):
+        self.store = store
+        self._httpd = _FleetHTTPServer((host, port), _FleetHandler)
+        self._httpd.store = store
+        self._httpd.evidence = evidence
+        self._httpd.retry_after = 1
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/ingest"
+
+    def start(self):
+        self.store.start()
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="FleetIngest", daemon=True)
+        self._thread.start()
+        logger.info(f"Fleet ingest listening on {self.url}")
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self.store.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shore-side fleet ingest service")
+    parser.add_argument("--db", default=config.FLEET_DB_PATH)
+    parser.add_argument("--host", default=config.FLEET_INGEST_HOST)
+    parser.add_argument("--port", type=int, default=config.FLEET_INGEST_PORT)
+    parser.add_argument("--evidence-dir", default=config.FLEET_EVIDENCE_DIR)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(name)s] %(levelname)s: %(message)s")
+
+    server = FleetIngestServer(FleetStore(args.db), args.host, args.port,
+                               evidence=LocalEvidenceReceiver(args.evidence_dir))
+    server.start()
+    try:
+        while True:
+            time.sleep(60)
+            logger.info(f"{server.store.events_stored} events stored, {server.store.duplicates} duplicates, "
+                        f"{len(server.store.partition_names())} partitions")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import json
+import logging
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+from src.core.wire_format import decode_batch, WireFormatError
+
+logger = logging.getLogger("IngestServer")
+
+
+class LinkProfile:
+    """Link impairments applied by the stand-in server to every request."""
+
+    def __init__(self, bandwidth_bps: Optional[float] = None, latency_s: float = 0.0,
+                 loss_rate: float = 0.0):
+        self.bandwidth_bps = bandwidth_bps
+        self.latency_s = latency_s
+        self.loss_rate = loss_rate
+
+
+class _IngestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def do_GET(self):
+        # Link probe: /probe?bytes=N answers with N filler bytes through the shaped link
+        server: "IngestServer" = self.server.ingest
+        parts = urlsplit(self.path)
+        if parts.path != "/probe":
+            self.send_error(404)
+            return
+        try:
+            size = min(int(parse_qs(parts.query).get("bytes", ["0"])[0]), server.MAX_PROBE_BYTES)
+        except ValueError:
+            self.send_error(400)
+            return
+
+        server.simulate_link(size)
+        if server.should_drop():
+            server.dropped_requests += 1
+            self.close_connection = True
+            self.connection.close()
+            return
+
+        server.probes_received += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(size))
+        self.end_headers()
+        self.wfile.write(b"\0" * size)
+
+    def do_POST(self):
+        server: "IngestServer" = self.server.ingest
+        if self.path != "/ingest":
+            self.send_error(404)
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        server.simulate_link(len(body))
+
+        if server.should_drop():
+            # Lost on the way back: the node never sees an acknowledgement
+            server.dropped_requests += 1
+            self.close_connection = True
+            self.connection.close()
+            return
+
+        try:
+            events = decode_batch(body)
+        except WireFormatError as e:
+            self.send_error(400, str(e))
+            return
+
+        accepted = server.accept(events, len(body))
+        reply = json.dumps({"accepted": accepted}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+
+class IngestServer:
+    """Loopback stand-in for the shore ingest endpoint.
+
+    Accepts wire-format batches on POST /ingest, applies the configured
+    bandwidth cap, latency and loss, and deduplicates on event_id so
+    retransmissions are counted once. GET /probe?bytes=N serves link probes
+    through the same impairments.
+    """
+
+    MAX_PROBE_BYTES = 1024 * 1024
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 profile: Optional[LinkProfile] = None, seed: Optional[int] = None):
+        self.profile = profile or LinkProfile()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._link_lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _IngestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.ingest = self
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+        # Counters
+        self.event_ids = set()
+        self.events_received = 0
+        self.duplicates = 0
+        self.bytes_received = 0
+        self.batches_received = 0
+        self.dropped_requests = 0
+        self.probes_received = 0
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/ingest"
+
+    @property
+    def probe_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/probe"
+
+    def start(self):
+        self._thread.start()
+        logger.info(f"Ingest stand-in listening on {self.url}")
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def simulate_link(self, size: int):
+        if self.profile.bandwidth_bps:
+            # One shared pipe: concurrent uploads queue behind each other
+            with self._link_lock:
+                time.sleep(size * 8 / self.profile.bandwidth_bps)
+        if self.profile.latency_s:
+            time.sleep(self.profile.latency_s)
+
+    def should_drop(self) -> bool:
+        with self._lock:
+            return self._rng.random() < self.profile.loss_rate
+
+    def accept(self, events, size: int):
+        accepted = []
+        with self._lock:
+            self.batches_received += 1
+            self.bytes_received += size
+            for event in events:
+                if event.event_id in self.event_ids:
+                    self.duplicates += 1
+                else:
+                    self.event_ids.add(event.event_id)
+                    self.events_received += 1
+                accepted.append(event.event_id)
+        return accepted
@@ -0,0 +1,439 @@
+import hashlib
+import http.client
+import io
+import json
+import logging
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import List, Optional, Set
+from urllib.parse import urlsplit
+
+import config
+from src.core.energy import EnergyModel
+from src.core.types import Evidence
+from src.database.evidence_store import EvidenceStore, is_ref
+
+logger = logging.getLogger("EvidenceUpload")
+
+DEFAULT_CHUNK_SIZE = 256 * 1024
+
+
+class EvidenceTransport(ABC):
+    """Shore-side interface used by ChunkedUploader.
+
+    Implementations raise ConnectionError when the link drops mid-call; the
+    uploader treats that as "stop for now", never as a failed file. A
+    ValueError means the shore rejected the request: if the file no longer
+    hashes to its plan it changed since it was hashed and is planned again,
+    otherwise it stays pending and is retried after a backoff.
+    """
+
+    @abstractmethod
+    def missing_chunks(self, chunk_hashes: List[str]) -> Set[str]:
+        """The subset of chunk_hashes the shore does not hold yet."""
+
+    @abstractmethod
+    def put_chunk(self, chunk_hash: str, data: bytes):
+        """Store one chunk under its SHA-256."""
+
+    @abstractmethod
+    def commit_file(self, file_hash: str, chunk_hashes: List[str], name: str, size: int):
+        """Reassemble a file from stored chunks and verify it."""
+
+
+class HttpEvidenceTransport(EvidenceTransport):
+    """EvidenceTransport over HTTP to the shore fleet ingest (/evidence/*).
+
+    Talks to the host and port of `url` (the uplink URL), one persistent
+    connection. Transport failures and 5xx raise ConnectionError; a request
+    the shore rejects (4xx, e.g. a chunk whose hash does not match) raises
+    ValueError.
+    """
+
+    def __init__(self, url: str, timeout: float = 30.0, energy: Optional[EnergyModel] = None,
+                 node_id: str = config.SYSTEM_ID):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self.energy = energy # Transmit energy is accounted per byte
+        self.node_id = node_id
+        self._conn = None
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _request(self, method: str, path: str, body: bytes, content_type: str) -> bytes:
+        try:
+            if self._conn is None:
+                self._conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._conn.request(method, path, body=body,
+                               headers={"Content-Type": content_type, "X-OceanViewer-Node": self.node_id})
+            response = self._conn.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            self.close()
+            raise ConnectionError(f"Evidence upload failed: {e}") from e
+        if response.status >= 500:
+            raise ConnectionError(f"Shore evidence store unavailable: HTTP {response.status}")
+        if response.status != 200:
+            raise ValueError(f"Shore rejected {method} {path}: HTTP {response.status}")
+        return data
+
+    def _post_json(self, path: str, payload: dict) -> dict:
+        body = self._request("POST", path, json.dumps(payload).encode("utf-8"), "application/json")
+        return json.loads(body) if body else {}
+
+    def missing_chunks(self, chunk_hashes: List[str]) -> Set[str]:
+        return set(self._post_json("/evidence/missing", {"chunks": chunk_hashes}).get("missing", []))
+
+    def put_chunk(self, chunk_hash: str, data: bytes):
+        if self.energy:
+            self.energy.record_uplink(len(data))
+        self._request("PUT", f"/evidence/chunk/{chunk_hash}", data, "application/octet-stream")
+
+    def commit_file(self, file_hash: str, chunk_hashes: List[str], name: str, size: int):
+        self._post_json("/evidence/commit", {"file_hash": file_hash, "chunks": chunk_hashes,
+                                             "name": name, "size": size})
+
+
+class ChunkedUploader:
+    """Resumable, content-addressed evidence upload.
+
+    enqueue() only records the path; the upload thread splits the file into
+    fixed-size chunks hashed with SHA-256 (the plan). The queue, the plan
+    and per-chunk progress live in SQLite, so a dropout or reboot resumes at
+    the first unsent chunk. Before sending, the shore is asked which chunks
+    it already holds and those are skipped (dedup across files and nodes).
+    """
+
+    def __init__(self, db_path: str, transport: EvidenceTransport,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 evidence_store: Optional[EvidenceStore] = None):
+        self.db_path = db_path
+        self.transport = transport
+        self.chunk_size = chunk_size
+        self.evidence_store = evidence_store
+
+        self._link_available = threading.Event()
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._upload_loop, daemon=True)
+
+        # Config
+        self.IDLE_WAIT_SECONDS = 5.0
+        self.RETRY_BACKOFF_SECONDS = 2.0
+        self.CHUNKS_PER_PASS = 64
+
+        self.link_errors = 0
+        self.rejections = 0  # Rejected uploads whose content had not changed
+
+        self._init_db()
+
+    def _init_db(self):
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute('''CREATE TABLE IF NOT EXISTS upload_files
+                     (file_hash TEXT PRIMARY KEY,
+                      path TEXT,
+                      size INTEGER,
+                      mtime REAL,
+                      chunk_size INTEGER,
+                      status TEXT)''')
+        c.execute('''CREATE TABLE IF NOT EXISTS upload_chunks
+                     (file_hash TEXT,
+                      idx INTEGER,
+                      chunk_hash TEXT,
+                      done INTEGER,
+                      PRIMARY KEY (file_hash, idx))''')
+        c.execute('''CREATE TABLE IF NOT EXISTS upload_queue
+                     (path TEXT PRIMARY KEY)''')
+        conn.commit()
+        conn.close()
+
+    # --- Lifecycle ---
+
+    def start(self):
+        logger.info("Evidence uploader started.")
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._upload_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def set_link_available(self, available: bool):
+        if available:
+            self._link_available.set()
+            self._wake.set()
+        else:
+            self._link_available.clear()
+
+    # --- Queueing ---
+
+    def enqueue_evidence(self, evidence: Evidence):
+        paths = list(evidence.image_paths)
+        if evidence.clip_path:
+            paths.append(evidence.clip_path)
+        for p in paths:
+            self.enqueue(p)
+
+    def enqueue(self, path: str):
+        """Queue a file for upload; it is read and hashed later, on the upload thread."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                conn.execute("INSERT OR IGNORE INTO upload_queue VALUES (?)", (path,))
+        finally:
+            conn.close()
+        self._wake.set()
+
+    def queued_paths(self) -> List[str]:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return [r[0] for r in conn.execute("SELECT path FROM upload_queue ORDER BY rowid")]
+        finally:
+            conn.close()
+
+    def _plan_queued(self):
+        for path in self.queued_paths():
+            self.plan(path)
+            conn = sqlite3.connect(self.db_path)
+            try:
+                with conn:
+                    conn.execute("DELETE FROM upload_queue WHERE path=?", (path,))
+            finally:
+                conn.close()
+
+    def plan(self, path: str) -> Optional[str]:
+        """Hash a file into its chunk plan. Returns its content hash, or None if unreadable."""
+        return self._plan(path, reuse=True)
+
+    def _plan(self, path: str, reuse: bool) -> Optional[str]:
+        try:
+            size, mtime = self._stat(path)
+        except (OSError, KeyError):
+            logger.warning(f"Evidence file missing, not queued: {path}")
+            return None
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            # Unchanged file already planned -> reuse the plan (and its progress)
+            row = reuse and conn.execute(
+                "SELECT file_hash FROM upload_files WHERE path=? AND size=? AND mtime=? AND status!='stale'",
+                (path, size, mtime)).fetchone()
+            if row:
+                return row[0]
+
+            try:
+                file_hash, chunk_hashes = self._hash_file(path)
+            except OSError:
+                logger.warning(f"Evidence file unreadable, not queued: {path}")
+                return None
+            with conn:
+                # Content seen before: a retired plan (stale, lost) is pending again, at this path
+                conn.execute('''INSERT INTO upload_files VALUES (?,?,?,?,?,'pending')
+                                ON CONFLICT(file_hash) DO UPDATE
+                                SET path=excluded.path, size=excluded.size, mtime=excluded.mtime,
+                                    status='pending'
+                                WHERE status IN ('stale', 'lost')''',
+                             (file_hash, path, size, mtime, self.chunk_size))
+                conn.executemany("INSERT OR IGNORE INTO upload_chunks VALUES (?,?,?,0)",
+                                 [(file_hash, i, h) for i, h in enumerate(chunk_hashes)])
+        finally:
+            conn.close()
+        return file_hash
+
+    def _stat(self, path: str):
+        if is_ref(path):
+            # Store objects are immutable: size alone identifies the version
+            if not self.evidence_store or not self.evidence_store.contains(path):
+                raise KeyError(path)
+            return len(self.evidence_store.get(path)), 0.0
+        st = os.stat(path)
+        return st.st_size, st.st_mtime
+
+    def _open(self, path: str):
+        if is_ref(path):
+            if not self.evidence_store:
+                raise OSError(f"No evidence store for {path}")
+            try:
+                return io.BytesIO(self.evidence_store.get(path))
+            except KeyError:
+                raise OSError(f"Evicted from evidence store: {path}")
+        return open(path, "rb")
+
+    def _hash_file(self, path: str):
+        file_digest = hashlib.sha256()
+        chunk_hashes = []
+        with self._open(path) as f:
+            while True:
+                data = f.read(self.chunk_size)
+                if not data:
+                    break
+                file_digest.update(data)
+                chunk_hashes.append(hashlib.sha256(data).hexdigest())
+        return file_digest.hexdigest(), chunk_hashes
+
+    # --- Transfer ---
+
+    def pending_files(self) -> List[str]:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = conn.execute(
+                "SELECT file_hash FROM upload_files WHERE status='pending' ORDER BY rowid").fetchall()
+        finally:
+            conn.close()
+        return [r[0] for r in rows]
+
+    def progress(self, file_hash: str):
+        """(chunks_done, chunks_total) for a planned file."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            done, total = conn.execute(
+                "SELECT COALESCE(SUM(done), 0), COUNT(*) FROM upload_chunks WHERE file_hash=?",
+                (file_hash,)).fetchone()
+        finally:
+            conn.close()
+        return done, total
+
+    def run_pending(self, max_chunks: Optional[int] = None) -> bool:
+        """Push pending files until done, the link drops or max_chunks is spent.
+
+        Returns True when nothing is left pending.
+        """
+        self._plan_queued()
+        budget = max_chunks
+        rejected = False
+        for file_hash in self.pending_files():
+            try:
+                finished, sent = self._upload_file(file_hash, budget)
+            except ConnectionError as e:
+                self.link_errors += 1
+                logger.info(f"Evidence upload paused (link lost): {e}")
+                return False
+            except ValueError as e:
+                self._replan(file_hash, e)
+                rejected = True
+                continue
+            if budget is not None:
+                budget -= sent
+            if not finished:
+                return False
+        return not rejected
+
+    def _replan(self, file_hash: str, error: Exception):
+        """Shore rejected an upload: hash the file again to see whether its content changed.
+
+        Changed: the old plan goes stale and the new one is sent on the next
+        pass. Unchanged: the rejection was not about the content, so the plan
+        stays pending and is retried, re-checking which chunks the shore holds.
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            path = conn.execute("SELECT path FROM upload_files WHERE file_hash=?", (file_hash,)).fetchone()[0]
+        finally:
+            conn.close()
+        new_hash = self._plan(path, reuse=False)
+        if new_hash == file_hash:
+            self.rejections += 1
+            logger.warning(f"Evidence upload of {path} rejected, will retry: {error}")
+            conn = sqlite3.connect(self.db_path)
+            try:
+                with conn:
+                    # The shore may have lost chunks marked sent: ask it again on the retry
+                    conn.execute("UPDATE upload_chunks SET done=0 WHERE file_hash=?", (file_hash,))
+            finally:
+                conn.close()
+            return
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                conn.execute("UPDATE upload_files SET status=? WHERE file_hash=?",
+                             ("lost" if new_hash is None else "stale", file_hash))
+        finally:
+            conn.close()
+        if new_hash is not None:
+            logger.warning(f"Evidence file {path} changed since it was hashed; planned again ({error})")
+
+    def _upload_file(self, file_hash: str, budget: Optional[int]):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            path, size, chunk_size = conn.execute(
+                "SELECT path, size, chunk_size FROM upload_files WHERE file_hash=?",
+                (file_hash,)).fetchone()
+            chunks = conn.execute(
+                "SELECT idx, chunk_hash, done FROM upload_chunks WHERE file_hash=? ORDER BY idx",
+                (file_hash,)).fetchall()
+
+            todo = [(idx, h) for idx, h, done in chunks if not done]
+            if todo:
+                # Dedup: shore already holds these (earlier partial upload, other file, other node)
+                missing = self.transport.missing_chunks([h for _, h in todo])
+                present = [(file_hash, idx) for idx, h in todo if h not in missing]
+                if present:
+                    with conn:
+                        conn.executemany("UPDATE upload_chunks SET done=1 WHERE file_hash=? AND idx=?",
+                                         present)
+                todo = [(idx, h) for idx, h in todo if h in missing]
+
+            sent = 0
+            if todo:
+                try:
+                    f = self._open(path)
+                except OSError:
+                    logger.warning(f"Evidence file vanished before upload: {path}")
+                    with conn:
+                        conn.execute("UPDATE upload_files SET status='lost' WHERE file_hash=?",
+                                     (file_hash,))
+                    return True, 0
+                with f:
+                    for idx, chunk_hash in todo:
+                        if budget is not None and sent >= budget:
+                            return False, sent
+                        f.seek(idx * chunk_size)
+                        self.transport.put_chunk(chunk_hash, f.read(chunk_size))
+                        # Persist per chunk so a reboot never resends it
+                        with conn:
+                            conn.execute("UPDATE upload_chunks SET done=1 WHERE file_hash=? AND idx=?",
+                                         (file_hash, idx))
+                        sent += 1
+
+            name = path[len("evs://"):] if is_ref(path) else os.path.basename(path)
+            self.transport.commit_file(file_hash, [h for _, h, _ in chunks], name, size)
+            with conn:
+                conn.execute("UPDATE upload_files SET status='done' WHERE file_hash=?", (file_hash,))
+            logger.info(f"Evidence uploaded: {name} ({len(chunks)} chunks, {sent} sent)")
+            return True, sent
+        finally:
+            conn.close()
+
+    def _upload_loop(self):
+        while not self._stop_event.is_set():
+            self._wake.wait(self.IDLE_WAIT_SECONDS)
+            self._wake.clear()
+            if self._stop_event.is_set():
+                break
+            if not self._link_available.is_set():
+                continue
+            try:
+                failures_before = self.link_errors + self.rejections
+                if not self.run_pending(self.CHUNKS_PER_PASS):
+                    # Link dropped mid-transfer or shore refused: back off before trying again
+                    if self.link_errors + self.rejections != failures_before:
+                        self._stop_event.wait(self.RETRY_BACKOFF_SECONDS)
+                    self._wake.set()
+            except Exception as e:
+                logger.error(f"Evidence upload error: {e}")
+                self._stop_event.wait(self.IDLE_WAIT_SECONDS)
+
@@ -0,0 +1,200 @@
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+import config
+from src.core.event_bus import EventBus
+from src.core.rolling_stats import Ewma, RollingWindow
+
+logger = logging.getLogger("LinkProbe")
+
+
+@dataclass
+class LinkConfig:
+    name: str
+    url: str  # Probe endpoint, e.g. http://shore:8080/probe
+    cost: int = 1  # Lower is preferred (Wi-Fi in port < LTE < satellite)
+
+
+class LinkStats:
+    """Rolling RTT, loss and bandwidth for one link."""
+
+    def __init__(self, link: LinkConfig, window: int = 20):
+        self.link = link
+        self.rtt = RollingWindow(window)  # Seconds, successful probes only
+        self.loss = RollingWindow(window)  # 1 = probe lost
+        self.bandwidth = Ewma(0.3)  # bits/s from the periodic bulk probe
+        self.up = False
+        self.last_ok: Optional[float] = None
+
+    def record(self, elapsed: Optional[float]):
+        self.loss.add(0.0 if elapsed is not None else 1.0)
+        self.up = elapsed is not None
+        if elapsed is not None:
+            self.rtt.add(elapsed)
+            self.last_ok = time.time()
+
+    def record_transfer(self, nbytes: int, elapsed: Optional[float]):
+        # Bulk probe time minus the usual round trip is the time spent on the payload
+        if elapsed is None or not len(self.rtt):
+            return
+        transfer = elapsed - self.rtt.mean
+        if transfer > 0:
+            self.bandwidth.add(nbytes * 8 / transfer)
+
+    def snapshot(self) -> dict:
+        measured = len(self.rtt) > 0
+        return {
+            "up": self.up,
+            "rtt_ms": self.rtt.mean * 1000 if measured else None,
+            "jitter_ms": self.rtt.stddev * 1000 if measured else None,
+            "loss": self.loss.mean,
+            "bandwidth_bps": self.bandwidth.value,
+            "last_ok": self.last_ok,
+            "cost": self.link.cost,
+        }
+
+
+class ProbeEngine:
+    """Probes several uplinks concurrently from one asyncio loop.
+
+    Every round sends a small HTTP GET down each link at once; every
+    BANDWIDTH_PROBE_EVERY rounds the request asks for BANDWIDTH_PROBE_BYTES
+    instead, and the extra time over the mean RTT gives a bandwidth sample.
+    After each round a link_quality snapshot is published with per-link
+    stats and the best usable link (cheapest, then fastest).
+    """
+
+    def __init__(self, event_bus: EventBus, links: Sequence[LinkConfig],
+                 on_round: Optional[Callable[[bool], None]] = None,
+                 interval: float = config.PROBE_INTERVAL_SECONDS,
+                 timeout: float = config.PROBE_TIMEOUT_SECONDS):
+        self.bus = event_bus
+        self.links = list(links)
+        self.on_round = on_round  # Called with True if any link answered this round
+        self.stats: Dict[str, LinkStats] = {link.name: LinkStats(link) for link in self.links}
+
+        # Config
+        self.INTERVAL = interval
+        self.TIMEOUT = timeout
+        self.BANDWIDTH_PROBE_EVERY = config.BANDWIDTH_PROBE_EVERY
+        self.BANDWIDTH_PROBE_BYTES = config.BANDWIDTH_PROBE_BYTES
+
+        self.rounds = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._thread = threading.Thread(target=self._run_thread, daemon=True)
+
+    def start(self):
+        logger.info(f"Probing {len(self.links)} links: {', '.join(l.name for l in self.links)}")
+        self._thread = threading.Thread(target=self._run_thread, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._loop and self._stop:
+            self._loop.call_soon_threadsafe(self._stop.set)
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def _run_thread(self):
+        asyncio.run(self._run())
+
+    async def _run(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        while not self._stop.is_set():
+            try:
+                await self.probe_round()
+            except Exception as e:
+                logger.error(f"Probe round failed: {e}")
+            try:
+                await asyncio.wait_for(self._stop.wait(), self.INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    def run_once(self) -> dict:
+        """One synchronous probe round (tests, tooling)."""
+        return asyncio.run(self.probe_round())
+
+    # --- Probing ---
+
+    async def probe_round(self) -> dict:
+        self.rounds += 1
+        bulk = self.BANDWIDTH_PROBE_EVERY and (self.rounds - 1) % self.BANDWIDTH_PROBE_EVERY == 0
+        # Latency first so the bulk sample has an RTT to subtract
+        results = await asyncio.gather(*(self._probe(link, 0) for link in self.links))
+        for link, elapsed in zip(self.links, results):
+            self.stats[link.name].record(elapsed)
+        if bulk:
+            up = [link for link in self.links if self.stats[link.name].up]
+            results = await asyncio.gather(*(self._probe(link, self.BANDWIDTH_PROBE_BYTES) for link in up))
+            for link, elapsed in zip(up, results):
+                self.stats[link.name].record_transfer(self.BANDWIDTH_PROBE_BYTES, elapsed)
+
+        snapshot = self.snapshot()
+        self.bus.publish("link_quality", snapshot)
+        if self.on_round:
+            self.on_round(snapshot["best"] is not None)
+        return snapshot
+
+    async def _probe(self, link: LinkConfig, nbytes: int) -> Optional[float]:
+        """Seconds for a GET of nbytes to complete, or None if it failed."""
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(self._fetch(link.url, nbytes), self.TIMEOUT)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+            logger.debug(f"Probe {link.name} failed: {e!r}")
+            return None
+        return time.monotonic() - start
+
+    async def _fetch(self, url: str, nbytes: int):
+        parts = urlsplit(url)
+        host, port = parts.hostname, parts.port or 80
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            request = (f"GET {parts.path or '/probe'}?bytes={nbytes} HTTP/1.1\r\n"
+                       f"Host: {host}\r\nConnection: close\r\n\r\n")
+            writer.write(request.encode("ascii"))
+            await writer.drain()
+
+            status = (await reader.readline()).split()
+            if len(status) < 2 or status[1] != b"200":
+                raise ConnectionError(f"Probe answered {status[1:2] or 'nothing'}")
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.partition(b":")
+                if name.strip().lower() == b"content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+        finally:
+            writer.close()
+
+    # --- Snapshot ---
+
+    def best_link(self) -> Optional[str]:
+        up = [s for s in self.stats.values() if s.up]
+        if not up:
+            return None
+        best = min(up, key=lambda s: (s.link.cost, s.rtt.mean))
+        return best.link.name
+
+    def snapshot(self) -> dict:
+        return {
+            "links": {name: s.snapshot() for name, s in self.stats.items()},
+            "best": self.best_link(),
+        }
+
+
+def parse_links(entries: List) -> List[LinkConfig]:
+    """LinkConfigs from config.PROBE_LINKS entries (dicts or LinkConfig)."""
+    return [e if isinstance(e, LinkConfig) else LinkConfig(**e) for e in entries]
@@ -0,0 +1,92 @@
+import http.client
+import json
+import logging
+from typing import List, Optional, Sequence
+from urllib.parse import urlsplit
+
+import config
+from src.core.energy import EnergyModel
+from src.core.types import OceanEvent
+from src.core.wire_format import encode_batch
+
+logger = logging.getLogger("UplinkClient")
+
+
+class UplinkBusy(ConnectionError):
+    """Shore answered 503: transient, retry after `retry_after` seconds (None if unsaid)."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class UplinkClient:
+    """Sends wire-format event batches to the shore ingest endpoint.
+
+    Keeps one persistent HTTP connection; any transport failure surfaces as
+    ConnectionError so callers can keep the batch for a later retry. Every
+    request names the node (SYSTEM_ID) so the shore can tell vessels apart.
+    """
+
+    def __init__(self, url: str, timeout: float = 30.0, energy: Optional[EnergyModel] = None,
+                 node_id: str = config.SYSTEM_ID):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.path = parts.path or "/ingest"
+        self.timeout = timeout
+        self.energy = energy # Transmit energy is accounted per byte
+        self.node_id = node_id
+        self._conn = None
+
+        # Counters
+        self.bytes_sent = 0
+        self.batches_sent = 0
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self._conn is None:
+            self._conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def send_batch(self, events: Sequence[OceanEvent], compression: str = "none") -> List[str]:
+        """Upload a batch and return the event ids the shore acknowledged."""
+        return self.send_frame(encode_batch(events, compression=compression)).get("accepted", [])
+
+    def send_frame(self, frame: bytes) -> dict:
+        """Upload an already encoded batch; returns the shore's reply."""
+        if self.energy:
+            self.energy.record_uplink(len(frame))
+        try:
+            conn = self._connection()
+            conn.request("POST", self.path, body=frame,
+                         headers={"Content-Type": "application/x-oceanviewer-batch",
+                                  "X-OceanViewer-Node": self.node_id})
+            response = conn.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            self.close()
+            raise ConnectionError(f"Uplink failed: {e}") from e
+
+        if response.status == 503:
+            raise UplinkBusy("Shore ingest busy: HTTP 503", _retry_after(response.getheader("Retry-After")))
+        if response.status >= 500:
+            raise ConnectionError(f"Shore ingest unavailable: HTTP {response.status}")
+        if response.status != 200:
+            raise ValueError(f"Uplink rejected batch: HTTP {response.status}")
+
+        self.bytes_sent += len(frame)
+        self.batches_sent += 1
+        return json.loads(body)
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    # Seconds only; the HTTP-date form is not used by the shore services
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
@@ -0,0 +1,51 @@
+
+import unittest
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+
+import baseline
+import bench_pipeline
+
+class TestPipelineBenchmark(unittest.TestCase):
+    def test_baseline_round_trip_and_regression_check(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "baselines", "pipeline.json")
+            argv = ["--events", "200", "--objects", "4", "--frames", "20", "--repeat", "1",
+                    "--alloc-sample", "50", "--network", "OFFLINE"]
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(bench_pipeline.main(argv + ["--save-baseline", path]), 0)
+            saved = baseline.load(path)
+            self.assertEqual(set(saved["stages"]), {"bioconfirm", "risk", "storage", "sync"})
+            for stage in saved["stages"].values():
+                self.assertGreater(stage["events_per_s"], 0)
+                self.assertIsNotNone(stage["p99_ms"])
+                self.assertIsNotNone(stage["alloc_kb_per_1k"])
+
+            # A baseline that was 10x faster makes the run fail
+            for stage in saved["stages"].values():
+                stage["events_per_s"] *= 10
+            baseline.save(saved, path)
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                self.assertEqual(bench_pipeline.main(argv + ["--stages", "risk", "--compare", path]), 1)
+            self.assertIn("risk.events_per_s", out.getvalue())
+
+    def test_compare_respects_direction_tolerance_and_noise_floor(self):
+        base = {"storage": {"events_per_s": 1000, "p50_ms": 1.0, "p99_ms": 3.0, "peak_rss_mb": 40}}
+        ok = {"storage": {"events_per_s": 900, "p50_ms": 1.1, "p99_ms": 4.0, "peak_rss_mb": 41}}
+        self.assertEqual(baseline.compare(ok, base, 0.2), [])
+
+        bad = {"storage": {"events_per_s": 700, "p50_ms": 1.5, "p99_ms": 4.1, "peak_rss_mb": 60}}
+        flagged = {line.split(":")[0] for line in baseline.compare(bad, base, 0.2)}
+        self.assertEqual(flagged, {"storage.events_per_s", "storage.p50_ms", "storage.peak_rss_mb"})
+
+        tiny = {"risk": {"p50_ms": 0.004}}
+        self.assertEqual(baseline.compare({"risk": {"p50_ms": 0.008}}, tiny, 0.2), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+import random
+import threading
+from datetime import datetime
+from src.core.clock import VirtualClock
+from src.core.event_bus import EventBus
+from src.core.types import OceanEvent, EventType, RiskLevel, Evidence
+from src.agents.alert_agent import AlertAgent
+from src.agents.bioconfirm_agent import BioConfirmAgent
+from src.agents.risk_agent import RiskAgent
+from src.agents.camera_manager import CameraConfig, CameraManager, assign_cpus, parse_cameras
+from src.agents.strategy_agent import StrategyAgent
+
+START = datetime(2026, 3, 1).timestamp()
+
+def detection(box, camera_id, embedding):
+    return OceanEvent(event_id="DET_x", timestamp=None, event_type=EventType.UNKNOWN,
+                      risk_level=RiskLevel.UNKNOWN, confidence=0.9,
+                      evidence=Evidence(feature_vectors=list(embedding)),
+                      metadata={"raw_label": "large_marine_life", "box": box, "motion": [2.0, 2.0],
+                                "camera_id": camera_id})
+
+class TestCameraConfig(unittest.TestCase):
+    def test_parse_and_assign(self):
+        cameras = parse_cameras(["bow", {"id": "port"}, {"id": "thermal", "cpus": [7]}])
+        self.assertEqual([c.id for c in cameras], ["bow", "port", "thermal"])
+        self.assertEqual(cameras[2].cpus, (7,))
+        # CPU 0 stays with the main process when there are enough
+        self.assertEqual(assign_cpus(cameras, [0, 1, 2, 3]), {"bow": (1,), "port": (2,), "thermal": (7,)})
+        self.assertEqual(assign_cpus([CameraConfig("a"), CameraConfig("b")], [0]), {"a": (0,), "b": (0,)})
+
+class TestCameraManager(unittest.TestCase):
+    def test_workers_publish_tagged_detections(self):
+        bus = EventBus()
+        seen = {}
+        both = threading.Event()
+        def on_detection(event):
+            seen.setdefault(event.metadata["camera_id"], event)
+            if len(seen) == 2:
+                both.set()
+        bus.subscribe("vision_detection", on_detection)
+        manager = CameraManager(bus, ["bow", "port"])
+        manager.start()
+        try:
+            bus.publish("system_strategy_update", {"fps": 30, "model_type": "tiny"})
+            self.assertTrue(both.wait(20))
+            self.assertTrue(manager.is_alive())
+        finally:
+            manager.stop()
+        self.assertFalse(manager.is_alive())
+        self.assertTrue(seen["bow"].trace_id.startswith("bow:F"))
+        self.assertEqual(seen["port"].metadata["raw_label"], "large_marine_life")
+
+class TestPerCameraTracking(unittest.TestCase):
+    def setUp(self):
+        random.seed(1)
+        self.clock = VirtualClock(start=START)
+        self.bus = EventBus()
+        self.confirmed = []
+        self.bus.subscribe("confirmed_event", self.confirmed.append)
+        self.agent = BioConfirmAgent(self.bus, clock=self.clock)
+        self.identity = [random.gauss(0, 1) for _ in range(16)]
+
+    def feed(self, camera_id, frames, box=(100, 100, 260, 260)):
+        for i in range(frames):
+            b = [box[0] + 2 * i, box[1] + 2 * i, box[2] + 2 * i, box[3] + 2 * i]
+            self.agent.on_vision_detection(detection(b, camera_id, self.identity))
+            self.clock.advance(0.1)
+
+    def test_same_box_on_two_cameras_is_two_tracks(self):
+        self.agent.on_vision_detection(detection([100, 100, 260, 260], "bow", self.identity))
+        self.agent.on_vision_detection(detection([100, 100, 260, 260], "port", self.identity))
+        self.assertEqual(sorted(t.camera_id for t in self.agent.tracks), ["bow", "port"])
+
+    def test_confirmed_target_hands_off_to_next_camera(self):
+        self.feed("bow", 4)
+        self.assertEqual(len(self.confirmed), 1)
+        self.clock.advance(3.0)  # Left the bow camera's view; bow track has ended
+        self.feed("port", 1, box=(500, 100, 660, 260))
+        self.assertEqual(self.agent.handoffs, 1)
+        self.assertTrue(self.agent.tracks[-1].confirmed)
+        # The port track's box and motion go on to risk assessment, as the same individual
+        self.assertEqual([e.camera_id for e in self.confirmed], ["bow", "port"])
+        self.assertIsNotNone(self.confirmed[0].individual_id)
+        self.assertEqual(self.confirmed[1].individual_id, self.confirmed[0].individual_id)
+
+    def test_handed_off_target_is_alerted_once(self):
+        alerts = []
+        self.bus.subscribe("alert_event", alerts.append)
+        RiskAgent(self.bus)
+        AlertAgent(self.bus, clock=self.clock)
+        self.feed("bow", 4)
+        self.clock.advance(3.0)
+        self.feed("port", 1, box=(500, 100, 660, 260))
+        self.assertEqual(len(self.confirmed), 2)
+        self.assertEqual(len(alerts), 1)
+
+    def test_no_handoff_after_the_window(self):
+        self.feed("bow", 4)
+        self.clock.advance(self.agent.HANDOFF_SECONDS + 1)
+        self.feed("port", 1)
+        self.assertEqual(self.agent.handoffs, 0)
+        self.assertFalse(self.agent.tracks[-1].confirmed)
+
+class TestPerCameraBudget(unittest.TestCase):
+    def test_high_risk_focuses_on_one_camera(self):
+        bus = EventBus()
+        strategies = []
+        bus.subscribe("system_strategy_update", strategies.append)
+        agent = StrategyAgent(bus, cameras=["bow", "port"])
+        self.assertEqual(set(strategies[-1]["cameras"]), {"bow", "port"})
+
+        agent.on_risk_assessment({"risk_level": "HIGH", "uncertainty": 0.1, "camera_id": "port"})
+        cameras = strategies[-1]["cameras"]
+        self.assertEqual(strategies[-1]["mode"], "HIGH_RISK")
+        self.assertEqual(cameras["port"], {"fps": 30, "model_type": "large"})
+        self.assertEqual(cameras["bow"], {"fps": 10, "model_type": "medium"})
+        self.assertEqual(strategies[-1]["fps"], 30)
+
+    def test_metrics_drive_only_their_camera(self):
+        agent = StrategyAgent(EventBus(), cameras=["bow", "port"])
+        before = agent.camera_controllers["port"].fps
+        for _ in range(4):
+            agent.on_pipeline_metrics({"camera_id": "bow", "model_type": "medium", "fps_target": 15,
+                                       "latency_ms": 200, "cpu_util": 0.5, "backlog": 3})
+        self.assertLess(agent.camera_controllers["bow"].fps, before)
+        self.assertEqual(agent.camera_controllers["port"].fps, before)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+
+import unittest
+import json
+import os
+import tempfile
+import time
+from src.core.event_bus import EventBus
+from src.core.energy import EnergyModel, EnergyPlanner, FileBatterySource
+from src.core.fps_controller import ModeBounds
+from src.agents.strategy_agent import StrategyAgent
+
+class TestEnergy(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.battery_file = os.path.join(self.tmp.name, "battery_state.json")
+        self.model = EnergyModel(baseline_w=12.0, j_per_inference={"tiny": 0.4, "medium": 1.5, "large": 5.0},
+                                 j_per_frame=0.2, j_per_uplink_byte=5e-6)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_battery(self, level, capacity_wh=2400, charging=False):
+        with open(self.battery_file, "w") as f:
+            json.dump({"level_pct": level, "capacity_wh": capacity_wh, "charging": charging}, f)
+
+    def planner(self, hours=36):
+        return EnergyPlanner(self.model, FileBatterySource(self.battery_file), target_hours=hours)
+
+    def test_file_source_formats(self):
+        source = FileBatterySource(self.battery_file, capacity_wh=1000)
+        self.assertIsNone(source.read(), "Missing file -> no reading")
+        with open(self.battery_file, "w") as f:
+            f.write("42\n")
+        state = source.read()
+        self.assertEqual((state.level_pct, state.remaining_wh), (42.0, 420.0))
+
+    def test_accounting(self):
+        self.model.record_frames(100, "large")
+        self.model.record_uplink(1_000_000)
+        self.assertAlmostEqual(self.model.joules["inference"], 500.0)
+        self.assertAlmostEqual(self.model.joules["frames"], 20.0)
+        self.assertAlmostEqual(self.model.joules["uplink"], 5.0)
+        self.assertAlmostEqual(self.model.power_w(10, "medium"), 12.0 + 10 * 1.7)
+
+    def test_cap_bounds_to_endurance(self):
+        self.write_battery(100)
+        planner = self.planner(36)
+        planner.refresh()
+        # 2400 Wh over 36 h = 66.7 W -> large ~10 FPS, medium ~32 FPS
+        capped = planner.cap(ModeBounds(10, 30, ("large", "medium")))
+        self.assertEqual(capped.ceiling("large"), 10)
+        self.assertEqual(capped.ceiling("medium"), 30)
+
+        self.write_battery(50)
+        planner.refresh()
+        capped = planner.cap(ModeBounds(10, 30, ("large", "medium")))
+        self.assertEqual(capped.models, ("medium",))
+
+        self.write_battery(20)
+        planner.refresh()
+        self.assertIsNone(planner.cap(ModeBounds(10, 30, ("large", "medium"))))
+
+        self.write_battery(20, charging=True)
+        planner.refresh()
+        self.assertEqual(planner.cap(ModeBounds(10, 30, ("large",))).max_fps, 30)
+
+    def test_strategy_plans_for_endurance(self):
+        bus = EventBus()
+        self.write_battery(60)
+        agent = StrategyAgent(bus, storage_path=self.tmp.name, energy_planner=self.planner(36))
+        agent.check_resources()
+        self.assertEqual(agent.battery_level, 60)
+
+        agent.on_risk_assessment({"risk_level": "HIGH"})
+        # 1440 Wh / 36 h = 40 W: large would need >= 10 FPS * 5.2 J + 12 W = 64 W
+        self.assertEqual(agent.current_strategy.model_type, "medium")
+        self.assertLessEqual(self.model.power_w(agent.current_strategy.fps, "medium"), 40.0)
+        self.assertEqual(agent.current_strategy.storage_policy, "events_only")
+
+        self.write_battery(25)  # Above the 20% cutoff, but 600 Wh cannot run 10 FPS for 36 h
+        agent.check_resources()
+        # HIGH_RISK holds its floor instead of dropping to CRITICAL_POWER
+        self.assertEqual(agent.current_mode, "HIGH_RISK")
+        self.assertEqual((agent.current_strategy.fps, agent.current_strategy.model_type), (10, "medium"))
+        self.assertEqual(agent.current_strategy.storage_policy, "events_only")
+
+        agent.on_risk_assessment({"risk_level": "LOW"})
+        self.assertEqual(agent.current_mode, "OFFLINE_CONSERVATIVE")
+        self.assertLess(agent.current_strategy.fps, 10)
+
+if __name__ == '__main__':
+    unittest.main()
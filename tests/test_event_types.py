@@ -0,0 +1,68 @@
+import unittest
+import copy
+import datetime
+import json
+import pickle
+from src.core.types import OceanEvent, EventType, RiskLevel, Evidence
+
+def make_event(**kwargs):
+    fields = dict(event_id="DET_0001", timestamp=datetime.datetime(2026, 1, 6, 12, 0, 0),
+                  event_type=EventType.UNKNOWN, risk_level=RiskLevel.UNKNOWN, confidence=0.9,
+                  evidence=Evidence(image_paths=["/tmp/mock_det.jpg"]),
+                  label="large_marine_life", box=[100, 100, 260, 260], motion=[2.0, 2.0],
+                  frame_id=42, camera_id="bow")
+    fields.update(kwargs)
+    return OceanEvent(**fields)
+
+class TestOceanEvent(unittest.TestCase):
+    def test_fields_are_read_only(self):
+        event = make_event()
+        with self.assertRaises(AttributeError):
+            event.risk_level = RiskLevel.HIGH
+        with self.assertRaises(AttributeError):
+            event.new_field = 1
+        with self.assertRaises(TypeError):
+            event.metadata["box"] = [0, 0, 1, 1]
+        self.assertEqual(event.box, (100, 100, 260, 260))
+
+    def test_sync_flags_stay_settable(self):
+        event = make_event()
+        self.assertFalse(event.to_dict()["synced"])
+        event.synced = True
+        self.assertTrue(event.to_dict()["synced"])
+
+    def test_replace_keeps_other_fields(self):
+        event = make_event(extra={"note": "x"})
+        event.meta_json  # Fill the caches
+        high = event.replace(risk_level=RiskLevel.HIGH, individual_id="IND_1")
+        self.assertEqual(event.risk_level, RiskLevel.UNKNOWN)
+        self.assertEqual(high.risk_level, RiskLevel.HIGH)
+        self.assertEqual(high.label, event.label)
+        self.assertEqual(high.extra, {"note": "x"})
+        self.assertEqual(json.loads(high.meta_json)["individual_id"], "IND_1")
+        self.assertNotIn("individual_id", json.loads(event.meta_json))
+
+    def test_metadata_dict_form(self):
+        meta = {"raw_label": "small_marine_life", "box": [1, 2, 3, 4], "frame_id": 7, "note": [1]}
+        event = OceanEvent("DET_2", datetime.datetime(2026, 1, 6), EventType.UNKNOWN, RiskLevel.LOW,
+                           0.5, Evidence(), metadata=meta)
+        self.assertEqual(event.label, "small_marine_life")
+        self.assertEqual(event.box, (1, 2, 3, 4))
+        self.assertEqual(event.extra, {"note": [1]})
+        self.assertEqual(event.metadata, meta)
+        self.assertEqual(json.loads(event.meta_json), meta)
+
+    def test_serialized_forms_are_cached(self):
+        event = make_event()
+        self.assertIs(event.meta_json, event.meta_json)
+        self.assertIs(event.timestamp_iso, event.timestamp_iso)
+        self.assertEqual(event.to_dict()["timestamp"], "2026-01-06T12:00:00")
+
+    def test_pickle_and_copy(self):
+        event = make_event(extra={"note": "x"})
+        for clone in (pickle.loads(pickle.dumps(event)), copy.deepcopy(event)):
+            self.assertEqual(clone, event)
+            self.assertEqual(clone.extra, {"note": "x"})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+
+import unittest
+import datetime
+import os
+import tempfile
+from src.core.types import Evidence, EventType, OceanEvent, RiskLevel
+from src.database.evidence_store import EvidenceStore
+from src.database.storage import StorageManager
+
+class TestEvidenceStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_dedup_and_mmap_roundtrip(self):
+        store = EvidenceStore(self.tmp.name, budget_bytes=10 * 1024 * 1024)
+        frame = b"\xff\xd8" + os.urandom(2000) + b"\xff\xd9"
+        ref1 = store.put(frame)
+        ref2 = store.put(frame)
+        self.assertEqual(ref1, ref2)
+        self.assertEqual(store.live_bytes, len(frame))
+
+        clip = os.urandom(store.SMALL_OBJECT_MAX + 10)
+        clip_ref = store.put(clip)
+        self.assertEqual(store.get(ref1), frame)
+        self.assertEqual(store.get(clip_ref), clip)
+
+        # Two stored events hold the frame
+        store.retain(ref1)
+        store.retain(ref1)
+        store.discard(ref1)
+        self.assertTrue(store.contains(ref1), "Dropping an event keeps referenced evidence")
+        store.release(ref1)
+        self.assertTrue(store.contains(ref1), "Still referenced once")
+        store.release(ref1)
+        self.assertFalse(store.contains(ref1))
+        store.close()
+
+    def test_eviction_skips_referenced_objects(self):
+        store = EvidenceStore(self.tmp.name, budget_bytes=5_000)
+        kept = store.put(os.urandom(1000))
+        store.retain(kept)
+        frames = [store.put(os.urandom(1000)) for _ in range(10)]
+        self.assertTrue(store.contains(kept), "A stored event still points at it")
+        self.assertFalse(store.contains(frames[0]))
+        store.release(kept)
+        self.assertFalse(store.contains(kept))
+        store.close()
+
+    def test_storage_retains_evidence_of_stored_events(self):
+        store = EvidenceStore(os.path.join(self.tmp.name, "evs"), budget_bytes=1_000_000)
+        storage = StorageManager(os.path.join(self.tmp.name, "events.db"), evidence_store=store)
+        frame = store.put(b"frame")
+        save = lambda i: storage.save_event(OceanEvent(
+            event_id=f"evt_{i}", timestamp=datetime.datetime(2026, 1, 5, 12, i),
+            event_type=EventType.UNKNOWN, risk_level=RiskLevel.LOW,
+            confidence=0.9, evidence=Evidence(image_paths=[frame])))
+        refs = lambda: store._conn.execute("SELECT refs FROM objects").fetchone()[0]
+        save(0)
+        save(1)
+        self.assertEqual(refs(), 1, "One reference per path, as storage counts them")
+        save(0)
+        self.assertEqual(refs(), 1, "Rewriting an event keeps its reference")
+        store.close()
+
+    def test_budget_evicts_lowest_priority_first(self):
+        store = EvidenceStore(self.tmp.name, budget_bytes=50_000)
+        store.SEGMENT_MAX_BYTES = 16_000
+        high = [store.put(os.urandom(1000), RiskLevel.HIGH) for _ in range(10)]
+        medium = [store.put(os.urandom(1000), RiskLevel.MEDIUM) for _ in range(10)]
+        low = [store.put(os.urandom(1000)) for _ in range(40)]
+
+        self.assertLessEqual(store.disk_bytes, store.budget_bytes)
+        self.assertTrue(all(store.contains(r) for r in high + medium))
+        self.assertFalse(all(store.contains(r) for r in low))
+        # Oldest low-priority objects go first
+        self.assertFalse(store.contains(low[0]))
+        self.assertTrue(store.contains(low[-1]))
+        for r in high:
+            self.assertEqual(len(store.get(r)), 1000)
+        store.close()
+
+    def test_promote_protects_evidence(self):
+        store = EvidenceStore(self.tmp.name, budget_bytes=5_000)
+        first = store.put(os.urandom(1000))
+        store.promote(first, RiskLevel.HIGH)
+        for _ in range(10):
+            store.put(os.urandom(1000))
+        self.assertTrue(store.contains(first))
+        store.close()
+
+    def test_reopen_keeps_index(self):
+        store = EvidenceStore(self.tmp.name, budget_bytes=1_000_000)
+        ref = store.put(b"frame-bytes")
+        disk = store.disk_bytes
+        store.close()
+        reopened = EvidenceStore(self.tmp.name, budget_bytes=1_000_000)
+        self.assertEqual(reopened.get(ref), b"frame-bytes")
+        self.assertEqual(reopened.disk_bytes, disk)
+        reopened.close()
+
+    def test_reopen_recovers_files_out_of_step_with_index(self):
+        store = EvidenceStore(self.tmp.name, budget_bytes=10 * 1024 * 1024)
+        lost = store.put(os.urandom(store.SMALL_OBJECT_MAX + 10))
+        kept = store.put(os.urandom(store.SMALL_OBJECT_MAX + 20))
+        store.close()
+        # Crash windows: a blob deleted before its row's delete committed, one written before its insert did
+        os.remove(os.path.join(self.tmp.name, "blobs", lost[6:8], lost[6:]))
+        orphan = os.path.join(self.tmp.name, "blobs", "ab", "ab" * 32)
+        os.makedirs(os.path.dirname(orphan), exist_ok=True)
+        with open(orphan, "wb") as f:
+            f.write(b"never indexed")
+
+        reopened = EvidenceStore(self.tmp.name, budget_bytes=10 * 1024 * 1024)
+        self.assertFalse(reopened.contains(lost))
+        self.assertTrue(reopened.contains(kept))
+        self.assertFalse(os.path.exists(orphan))
+        self.assertEqual(reopened.disk_bytes, reopened.SMALL_OBJECT_MAX + 20)
+        reopened.close()
+
+    def test_storage_reconciles_refs_on_open(self):
+        store = EvidenceStore(os.path.join(self.tmp.name, "evs"), budget_bytes=1_000_000)
+        db = os.path.join(self.tmp.name, "events.db")
+        storage = StorageManager(db, evidence_store=store)
+        frame = store.put(b"frame")
+        storage.save_event(OceanEvent(
+            event_id="evt_0", timestamp=datetime.datetime(2026, 1, 5, 12, 0),
+            event_type=EventType.UNKNOWN, risk_level=RiskLevel.LOW,
+            confidence=0.9, evidence=Evidence(image_paths=[frame])))
+        stray = store.put(b"stray")
+        store._conn.execute("UPDATE objects SET refs=0")  # The retain was lost
+        store._conn.execute("UPDATE objects SET refs=3 WHERE hash=?", (stray[6:],))
+        store._conn.commit()
+
+        StorageManager(db, evidence_store=store)
+        refs = dict(store._conn.execute("SELECT hash, refs FROM objects").fetchall())
+        self.assertEqual(refs, {frame[6:]: 1, stray[6:]: 0})
+        store.close()
+
+if __name__ == "__main__":
+    unittest.main()
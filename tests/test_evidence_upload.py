@@ -0,0 +1,142 @@
+
+import unittest
+import os
+import shutil
+import tempfile
+from src.uplink.evidence_upload import ChunkedUploader
+from src.shore.evidence_receiver import LocalEvidenceReceiver
+
+class FlakyTransport:
+    """Wraps the receiver and drops the link after N chunks."""
+    def __init__(self, receiver, drop_after):
+        self.receiver = receiver
+        self.drop_after = drop_after
+        self.sent = 0
+
+    def missing_chunks(self, hashes):
+        return self.receiver.missing_chunks(hashes)
+
+    def put_chunk(self, chunk_hash, data):
+        if self.drop_after is not None and self.sent >= self.drop_after:
+            raise ConnectionError("satellite link lost")
+        self.receiver.put_chunk(chunk_hash, data)
+        self.sent += 1
+
+    def commit_file(self, *args):
+        self.receiver.commit_file(*args)
+
+class TestEvidenceUpload(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.db = os.path.join(self.tmp, "upload.db")
+        self.receiver = LocalEvidenceReceiver(os.path.join(self.tmp, "shore"))
+        self.clip = os.path.join(self.tmp, "clip.mp4")
+        with open(self.clip, "wb") as f:
+            f.write(os.urandom(10 * 1024 + 17))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_resume_after_dropout_and_restart(self):
+        flaky = FlakyTransport(self.receiver, drop_after=4)
+        uploader = ChunkedUploader(self.db, flaky, chunk_size=1024)
+        file_hash = uploader.plan(self.clip)
+
+        self.assertFalse(uploader.run_pending())
+        self.assertEqual(uploader.progress(file_hash), (4, 11))
+
+        # "Reboot": fresh uploader over the same progress DB
+        flaky.drop_after = None
+        resumed = ChunkedUploader(self.db, flaky, chunk_size=1024)
+        self.assertTrue(resumed.run_pending())
+        self.assertEqual(flaky.sent, 11, "No chunk should be sent twice")
+
+        with open(self.receiver.file_path(file_hash, "clip.mp4"), "rb") as f, open(self.clip, "rb") as g:
+            self.assertEqual(f.read(), g.read())
+
+    def test_skips_chunks_shore_already_has(self):
+        first = ChunkedUploader(self.db, self.receiver, chunk_size=1024)
+        first.enqueue(self.clip)
+        self.assertTrue(first.run_pending())
+
+        copy = os.path.join(self.tmp, "copy.mp4")
+        shutil.copy(self.clip, copy)
+        other = ChunkedUploader(os.path.join(self.tmp, "other.db"), self.receiver, chunk_size=1024)
+        other.enqueue(copy)
+        before = self.receiver.chunks_received
+        self.assertTrue(other.run_pending())
+        self.assertEqual(self.receiver.chunks_received, before)
+
+    def test_missing_file_not_queued(self):
+        uploader = ChunkedUploader(self.db, self.receiver)
+        self.assertIsNone(uploader.plan("/tmp/does_not_exist.jpg"))
+        uploader.enqueue("/tmp/does_not_exist.jpg")
+        self.assertTrue(uploader.run_pending())
+        self.assertEqual(uploader.queued_paths(), [])
+
+    def test_enqueue_defers_hashing_to_the_upload_pass(self):
+        uploader = ChunkedUploader(self.db, self.receiver, chunk_size=1024)
+        uploader.enqueue(self.clip)
+        self.assertEqual(uploader.queued_paths(), [self.clip])
+        self.assertEqual(uploader.pending_files(), [])
+
+        self.assertTrue(uploader.run_pending())
+        self.assertEqual(uploader.queued_paths(), [])
+        self.assertEqual(self.receiver.chunks_received, 11)
+
+    def test_file_changed_after_hashing_is_planned_again(self):
+        uploader = ChunkedUploader(self.db, self.receiver, chunk_size=1024)
+        old_hash = uploader.plan(self.clip)
+        with open(self.clip, "r+b") as f:  # Same size, new content: the shore rejects the chunks
+            f.write(b"\0" * 1024)
+
+        self.assertFalse(uploader.run_pending())  # Rejected, not a link failure: planned again
+        self.assertEqual(uploader.link_errors, 0)
+        new_hash = uploader.pending_files()[0]
+        self.assertNotEqual(new_hash, old_hash)
+        self.assertTrue(uploader.run_pending())
+        with open(self.receiver.file_path(new_hash, "clip.mp4"), "rb") as f, open(self.clip, "rb") as g:
+            self.assertEqual(f.read(), g.read())
+
+    def test_retired_content_is_uploaded_when_enqueued_again(self):
+        uploader = ChunkedUploader(self.db, self.receiver, chunk_size=1024)
+        with open(self.clip, "rb") as f:
+            original = f.read()
+        old_hash = uploader.plan(self.clip)
+        with open(self.clip, "r+b") as f:
+            f.write(b"\0" * 1024)
+        uploader.run_pending()  # Rejected and re-planned: old_hash goes stale
+        self.assertTrue(uploader.run_pending())
+
+        copy = os.path.join(self.tmp, "copy.mp4")
+        with open(copy, "wb") as f:
+            f.write(original)
+        uploader.enqueue(copy)
+        self.assertTrue(uploader.run_pending())
+        with open(self.receiver.file_path(old_hash, "copy.mp4"), "rb") as f:
+            self.assertEqual(f.read(), original)
+
+    def test_rejection_of_unchanged_content_is_retried(self):
+        receiver = self.receiver
+
+        class LosingTransport(FlakyTransport):
+            def commit_file(self, *args):
+                if not self.sent_commits:
+                    shutil.rmtree(receiver.chunk_dir)  # Shore lost the chunks it acknowledged
+                self.sent_commits += 1
+                super().commit_file(*args)
+
+        transport = LosingTransport(receiver, drop_after=None)
+        transport.sent_commits = 0
+        uploader = ChunkedUploader(self.db, transport, chunk_size=1024)
+        file_hash = uploader.plan(self.clip)
+        self.assertFalse(uploader.run_pending())
+        self.assertEqual(uploader.rejections, 1)
+        self.assertEqual(uploader.pending_files(), [file_hash], "Not given up on")
+
+        self.assertTrue(uploader.run_pending())
+        self.assertEqual(transport.sent, 22, "Every chunk sent again")
+        self.assertTrue(os.path.exists(receiver.file_path(file_hash, "clip.mp4")))
+
+if __name__ == "__main__":
+    unittest.main()
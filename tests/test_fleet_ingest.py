@@ -0,0 +1,194 @@
+import unittest
+import contextlib
+import datetime
+import hashlib
+import io
+import os
+import sys
+import tempfile
+import sqlite3
+import threading
+import time
+from src.agents.sync_agent import SyncAgent
+from src.core.event_bus import EventBus
+from src.core.types import OceanEvent, EventType, RiskLevel, Evidence, NetworkStatus
+from src.database.storage import StorageManager
+from src.shore.fleet_ingest import FleetIngestServer, FleetStore, FleetStoreBusy
+from src.shore.evidence_receiver import LocalEvidenceReceiver
+from src.uplink.evidence_upload import ChunkedUploader, HttpEvidenceTransport
+from src.uplink.uplink_client import UplinkBusy, UplinkClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+
+import bench_fleet_ingest
+
+def make_events(count, day=6):
+    return [OceanEvent(
+        event_id=f"evt_{i:04d}",
+        timestamp=datetime.datetime(2026, 1, day) + datetime.timedelta(hours=i),
+        event_type=EventType.UNKNOWN,
+        risk_level=RiskLevel.HIGH,
+        confidence=0.9,
+        evidence=Evidence(),
+        metadata={"frame_id": i}
+    ) for i in range(count)]
+
+class TestFleetIngest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = FleetStore(os.path.join(self.tmp.name, "fleet.db"))
+        self.receiver = LocalEvidenceReceiver(os.path.join(self.tmp.name, "evidence"))
+        self.server = FleetIngestServer(self.store, evidence=self.receiver)
+        self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+        self.tmp.cleanup()
+
+    def client(self, node_id):
+        client = UplinkClient(self.server.url, timeout=10, node_id=node_id)
+        self.addCleanup(client.close)
+        return client
+
+    def test_dedup_is_per_node_and_partitioned_by_day(self):
+        events = make_events(30)  # 30 hours: two days
+        a, b = self.client("OV_NODE_001"), self.client("OV_NODE_002")
+        self.assertEqual(len(a.send_batch(events)), 30)
+        self.assertEqual(len(a.send_batch(events[:10])), 10)  # Lost ack, resent: acked, not stored again
+        b.send_batch(events)  # Same ids from another vessel are other events
+
+        self.assertEqual(self.store.count(), 60)
+        self.assertEqual(self.store.count("OV_NODE_001"), 30)
+        self.assertEqual(self.store.partition_names(), ["fleet_d20260106", "fleet_d20260107"])
+        nodes = self.store.nodes()
+        self.assertEqual(nodes["OV_NODE_001"]["events"], 30)
+        self.assertEqual(nodes["OV_NODE_001"]["duplicates"], 10)
+
+    def test_concurrent_nodes_are_group_committed(self):
+        errors = []
+        def upload(i):
+            try:
+                client = UplinkClient(self.server.url, timeout=10, node_id=f"N{i}")
+                for day in (6, 7, 8):
+                    client.send_batch(make_events(20, day=day), compression="zlib")
+                client.close()
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=upload, args=(i,)) for i in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(self.store.count(), 20 * 60)
+        self.assertLessEqual(self.store.commits, 20 * 3)
+
+    def test_batch_without_node_is_rejected(self):
+        client = UplinkClient(self.server.url, timeout=10, node_id="")
+        self.addCleanup(client.close)
+        with self.assertRaises(ValueError):
+            client.send_batch(make_events(2))
+
+    def test_full_queue_is_a_transient_failure(self):
+        self.store.MAX_QUEUED_EVENTS = 5
+        self.store._queued_events = 5  # As if the writer were behind
+        with self.assertRaises(FleetStoreBusy):
+            self.store.submit("N1", make_events(1))
+        with self.assertRaises(UplinkBusy) as cm:  # 503: the node keeps the batch for later
+            self.client("N1").send_batch(make_events(1))
+        self.assertEqual(cm.exception.retry_after, 1)
+        self.store._queued_events = 0
+
+    def test_drain_stops_on_rejected_batch(self):
+        storage = StorageManager(os.path.join(self.tmp.name, "node.db"))
+        storage.save_events(make_events(5))
+        agent = SyncAgent(EventBus(), storage, uplink=self.client(""))  # No node id: HTTP 400
+        agent.update_network_status(NetworkStatus.ONLINE)
+        stats = agent.drain_backlog()
+        self.assertEqual(stats["events"], 0)
+        self.assertEqual(storage.count_pending_sync(), 5)
+
+    def test_failed_batch_does_not_fail_its_group(self):
+        store = FleetStore(os.path.join(self.tmp.name, "group.db"))
+        original = store._write_group
+
+        def write(conn, group):
+            created = original(conn, group)
+            if any(p.node_id == "BAD" for p in group):
+                raise sqlite3.OperationalError("disk I/O error")
+            return created
+        store._write_group = write
+
+        results = {}
+        def submit(node_id, events):
+            try:
+                results[node_id] = store.submit(node_id, events)
+            except Exception as e:
+                results[node_id] = e
+        threads = [threading.Thread(target=submit, args=("GOOD", make_events(3))),
+                   threading.Thread(target=submit, args=("BAD", make_events(3, day=9)))]
+        for t in threads:
+            t.start()
+        while store._queue.qsize() < 2:  # Both queued before the writer runs: one group
+            time.sleep(0.01)
+        store.start()
+        for t in threads:
+            t.join()
+        store.stop()
+
+        self.assertEqual(results["GOOD"], (3, 0))
+        self.assertIsInstance(results["BAD"], sqlite3.OperationalError)
+        self.assertEqual(store.count(), 3)
+        self.assertEqual(store.events_stored, 3)
+        self.assertEqual(store.partition_names(), ["fleet_d20260106"])  # BAD's partition rolled back
+
+    def test_chunked_evidence_upload_over_http(self):
+        clip = os.path.join(self.tmp.name, "clip.mp4")
+        with open(clip, "wb") as f:
+            f.write(os.urandom(5000))
+        transport = HttpEvidenceTransport(self.server.url, timeout=10, node_id="N1")
+        self.addCleanup(transport.close)
+        uploader = ChunkedUploader(os.path.join(self.tmp.name, "upload.db"), transport, chunk_size=1024)
+        file_hash = uploader.plan(clip)
+
+        self.assertTrue(uploader.run_pending())
+        self.assertEqual(self.receiver.chunks_received, 5)
+        with open(self.receiver.file_path(file_hash, "clip.mp4"), "rb") as f, open(clip, "rb") as g:
+            self.assertEqual(f.read(), g.read())
+        with self.assertRaises(ValueError):  # Corrupt chunk: rejected, not a link failure
+            transport.put_chunk("0" * 64, b"data")
+
+    def test_evidence_hashes_cannot_escape_the_store(self):
+        transport = HttpEvidenceTransport(self.server.url, timeout=10, node_id="N1")
+        self.addCleanup(transport.close)
+        secret = os.path.join(self.tmp.name, "fleet.db")
+        for bad in (secret, "../" * 8 + "etc/passwd", "A" * 64):
+            with self.assertRaises(ValueError):
+                transport.missing_chunks([bad])
+        with self.assertRaises(ValueError):
+            transport.commit_file("0" * 64, [secret], "stolen", os.path.getsize(secret))
+        with self.assertRaises(ValueError):
+            transport.commit_file("../../../../tmp/x", ["0" * 64], "clip.mp4", 1)
+        self.assertEqual(os.listdir(self.receiver.file_dir), [])
+
+    def test_shore_storage_failure_is_transient(self):
+        transport = HttpEvidenceTransport(self.server.url, timeout=10, node_id="N1")
+        self.addCleanup(transport.close)
+        os.rmdir(self.receiver.chunk_dir)
+        with open(self.receiver.chunk_dir, "wb"):  # Chunk writes now fail with OSError
+            pass
+        data = b"chunk"
+        with self.assertRaises(ConnectionError):
+            transport.put_chunk(hashlib.sha256(data).hexdigest(), data)
+
+class TestFleetLoadGenerator(unittest.TestCase):
+    def test_reconnect_storm_stores_every_event_once(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            status = bench_fleet_ingest.main(["--nodes", "8", "--events-per-node", "300", "--batch", "50",
+                                              "--retransmit", "0.3"])
+        self.assertEqual(status, 0, out.getvalue())
+        self.assertIn("Stored 2400 in 3 partitions", out.getvalue())
+
+if __name__ == "__main__":
+    unittest.main()
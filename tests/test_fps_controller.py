@@ -0,0 +1,69 @@
+
+import unittest
+from src.core.event_bus import EventBus
+from src.core.fps_controller import FpsController, ModeBounds
+from src.agents.strategy_agent import StrategyAgent
+
+class TestFpsController(unittest.TestCase):
+    def sample(self, ctl, latency_ms, cpu=0.3, backlog=0):
+        return ctl.observe({"model_type": ctl.model, "fps_target": ctl.fps,
+                            "latency_ms": latency_ms, "cpu_util": cpu, "backlog": backlog})
+
+    def run_plant(self, ctl, latency_by_model, samples=40):
+        for _ in range(samples):
+            self.sample(ctl, latency_by_model[ctl.model])
+
+    def test_overload_settles_at_sustainable_rate(self):
+        ctl = FpsController()
+        ctl.reset(ModeBounds(10, 30, ("large", "medium")), 30, "large")
+        # large: 40 ms/frame -> 25 FPS saturates; ~18 FPS at the target load
+        self.run_plant(ctl, {"large": 40.0, "medium": 15.0})
+        self.assertEqual(ctl.model, "large")
+        self.assertLessEqual(ctl.fps * 0.040, ctl.HIGH_LOAD)
+        self.assertGreaterEqual(ctl.fps, 14)
+
+        history = set()
+        for _ in range(20):
+            self.sample(ctl, 40.0)
+            history.add(ctl.fps)
+        self.assertEqual(len(history), 1, "No oscillation once settled")
+
+    def test_floor_switches_to_smaller_model_and_back(self):
+        ctl = FpsController()
+        ctl.reset(ModeBounds(10, 30, ("large", "medium")), 30, "large")
+        self.run_plant(ctl, {"large": 150.0, "medium": 20.0})
+        self.assertEqual(ctl.model, "medium", "large cannot hold 10 FPS")
+        self.assertGreaterEqual(ctl.fps, 10)
+
+        # Hardware freed up (e.g. other load gone): large becomes affordable again
+        self.run_plant(ctl, {"large": 20.0, "medium": 8.0}, samples=60)
+        self.assertEqual(ctl.model, "large")
+        self.assertEqual(ctl.fps, 30)
+
+    def test_backlog_and_cpu_force_step_down(self):
+        ctl = FpsController()
+        ctl.reset(ModeBounds(5, 15, ("medium", "tiny")), 15, "medium")
+        ctl.observe({"model_type": "medium", "fps_target": 15, "latency_ms": 5})  # Hold-off sample
+        self.assertIsNotNone(self.sample(ctl, 5.0, backlog=3))
+        self.assertLess(ctl.fps, 15)
+
+    def test_strategy_agent_applies_controller_within_mode(self):
+        bus = EventBus()
+        published = []
+        bus.subscribe("system_strategy_update", published.append)
+        agent = StrategyAgent(bus)
+        agent.on_risk_assessment({"risk_level": "HIGH"})
+        self.assertEqual((agent.current_strategy.fps, agent.current_strategy.model_type), (30, "large"))
+
+        for _ in range(5):
+            bus.publish("pipeline_metrics", {"model_type": agent.current_strategy.model_type,
+                                             "fps_target": agent.current_strategy.fps,
+                                             "latency_ms": 60.0, "cpu_util": 0.5, "backlog": 0})
+        self.assertLess(agent.current_strategy.fps, 30)
+        self.assertGreaterEqual(agent.current_strategy.fps, 10)
+
+        agent.check_resources()  # Periodic republish keeps the controller's choice
+        self.assertLess(published[-1]["fps"], 30)
+
+if __name__ == '__main__':
+    unittest.main()
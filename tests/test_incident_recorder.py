@@ -0,0 +1,110 @@
+
+import unittest
+import datetime
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from src.core.event_bus import EventBus
+from src.core.types import OceanEvent, EventType, RiskLevel, Evidence
+from src.database.storage import StorageManager
+from src.database.evidence_store import EvidenceStore
+from src.agents.incident_recorder import IncidentRecorder, FrameRing, decode_clip
+
+class TestIncidentRecorder(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.bus = EventBus()
+        self.storage = StorageManager(os.path.join(self.tmp.name, "events.db"))
+        self.store = EvidenceStore(os.path.join(self.tmp.name, "evs"), budget_bytes=10 * 1024 * 1024)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def make_event(self, event_id, risk=RiskLevel.HIGH):
+        return OceanEvent(event_id=event_id, timestamp=datetime.datetime.now(),
+                          event_type=EventType.UNKNOWN, risk_level=risk,
+                          confidence=0.9, evidence=Evidence())
+
+    def test_ring_bounded_by_age_and_bytes(self):
+        ring = FrameRing(max_seconds=5, max_bytes=1000)
+        for i in range(20):
+            ring.append(float(i), i, b"x" * 100)
+        self.assertEqual([f[1] for f in ring.since(0)], [14, 15, 16, 17, 18, 19])
+        for i in range(20, 40):
+            ring.append(20.0, i, b"x" * 300)
+        self.assertLessEqual(ring.bytes, 1000)
+        self.assertEqual(len(ring), 3)
+
+    def test_clip_spans_pre_and_post_window(self):
+        recorder = IncidentRecorder(self.bus, self.store, self.storage,
+                                    seconds_before=10, seconds_after=5)
+        ready = []
+        self.bus.subscribe("incident_clip_ready", ready.append)
+        recorder.start()
+
+        now = time.time()
+        for i in range(-20, 1):
+            recorder.add_frame(100 + i, f"frame{i}".encode(), ts=now + i)
+        event = self.make_event("evt_high")
+        self.storage.save_event(event)
+        self.bus.publish("event_stored", self.make_event("evt_low", RiskLevel.LOW))
+        self.bus.publish("event_stored", event)
+        for i in range(1, 8):
+            recorder.add_frame(100 + i, f"frame{i}".encode(), ts=now + i)
+        recorder.stop()
+
+        self.assertEqual(len(ready), 1)
+        clip_ref = ready[0]["clip_path"]
+        self.assertEqual(event.evidence.clip_path, clip_ref)
+        frames = decode_clip(self.store.get(clip_ref))
+        offsets = [f[1] - 100 for f in frames]
+        self.assertIn(offsets[0], (-10, -9))  # Trigger lands just after the last pre-event frame
+        self.assertGreaterEqual(offsets[-1], 5)
+        self.assertEqual(offsets, sorted(offsets))
+
+        conn = sqlite3.connect(self.storage.db_path)
+        evidence = json.loads(conn.execute("SELECT evidence FROM events WHERE event_id='evt_high'").fetchone()[0])
+        conn.close()
+        self.assertEqual(evidence["clip_path"], clip_ref)
+
+    def test_overlapping_incidents_share_one_clip(self):
+        recorder = IncidentRecorder(self.bus, self.store, self.storage,
+                                    seconds_before=2, seconds_after=1)
+        ready = []
+        self.bus.subscribe("incident_clip_ready", ready.append)
+        recorder.start()
+        now = time.time()
+        recorder.add_frame(1, b"a", ts=now - 1)
+        for event_id in ("evt_1", "evt_2"):
+            event = self.make_event(event_id)
+            self.storage.save_event(event)
+            self.bus.publish("event_stored", event)
+        recorder.add_frame(2, b"b", ts=now + 5)
+        recorder.stop()
+
+        self.assertEqual(sorted(p["event_id"] for p in ready), ["evt_1", "evt_2"])
+        self.assertEqual(ready[0]["clip_path"], ready[1]["clip_path"])
+
+    def test_open_incident_closes_at_byte_cap(self):
+        recorder = IncidentRecorder(self.bus, self.store, self.storage,
+                                    seconds_before=2, seconds_after=60, max_clip_bytes=1000)
+        ready = []
+        self.bus.subscribe("incident_clip_ready", ready.append)
+        recorder.start()
+        now = time.time()
+        event = self.make_event("evt_big")
+        self.storage.save_event(event)
+        self.bus.publish("event_stored", event)
+        for i in range(20):
+            recorder.add_frame(i, b"x" * 100, ts=now + i * 0.1)
+        recorder.stop()
+
+        self.assertEqual(len(ready), 1)
+        frames = decode_clip(self.store.get(ready[0]["clip_path"]))
+        self.assertEqual(len(frames), 10, "Closed at 1000 bytes, long before the deadline")
+
+if __name__ == '__main__':
+    unittest.main()
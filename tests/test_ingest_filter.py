@@ -0,0 +1,81 @@
+
+import unittest
+import datetime
+import os
+import tempfile
+from src.core.event_bus import EventBus
+from src.core.types import OceanEvent, EventType, RiskLevel, Evidence
+from src.agents.sync_agent import SyncAgent
+from src.agents.strategy_agent import StrategyAgent
+from src.database.storage import StorageManager
+from src.database.evidence_store import EvidenceStore
+from src.database.ingest_filter import IngestFilter
+
+class TestIngestFilter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.bus = EventBus()
+        self.storage = StorageManager(os.path.join(self.tmp.name, "events.db"))
+        self.store = EvidenceStore(os.path.join(self.tmp.name, "evs"), budget_bytes=10 * 1024 * 1024)
+        self.filter = IngestFilter(self.bus, self.store)
+        self.sync = SyncAgent(self.bus, self.storage, ingest_filter=self.filter)
+        self.n = 0
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def publish(self, risk, count=1):
+        refs = []
+        for _ in range(count):
+            self.n += 1
+            ref = self.store.put(f"frame {self.n}".encode())
+            refs.append(ref)
+            self.bus.publish("risk_assessed_event", OceanEvent(
+                event_id=f"evt_{self.n}", timestamp=datetime.datetime.now(),
+                event_type=EventType.UNKNOWN, risk_level=risk, confidence=0.9,
+                evidence=Evidence(image_paths=[ref]), metadata={"raw_label": "small_marine_life"}))
+        return refs
+
+    def stored(self):
+        return self.storage.count_pending_sync()
+
+    def test_policies_follow_strategy(self):
+        self.publish(RiskLevel.LOW, 10)
+        self.assertEqual(self.stored(), 10, "Default policy stores everything")
+
+        self.bus.publish("system_strategy_update", {"storage_policy": "events_only"})
+        self.publish(RiskLevel.LOW, 10)
+        self.publish(RiskLevel.MEDIUM, 3)
+        self.assertEqual(self.stored(), 10 + 2 + 3, "1 in 5 LOW events kept, MEDIUM untouched")
+
+        self.bus.publish("system_strategy_update", {"storage_policy": "critical_only"})
+        dropped = self.publish(RiskLevel.MEDIUM, 4)
+        self.publish(RiskLevel.HIGH, 2)
+        self.assertEqual(self.stored(), 15 + 2)
+        self.assertFalse(any(self.store.contains(ref) for ref in dropped), "Dropped evidence released")
+
+    def test_drop_discards_clip_and_renditions(self):
+        self.bus.publish("system_strategy_update", {"storage_policy": "critical_only"})
+        stored = []
+        self.bus.subscribe("event_stored", stored.append)
+        refs = [self.store.put(data) for data in (b"frame", b"clip", b"thumb")]
+        self.bus.publish("risk_assessed_event", OceanEvent(
+            event_id="evt_replayed", timestamp=datetime.datetime.now(),
+            event_type=EventType.UNKNOWN, risk_level=RiskLevel.LOW, confidence=0.9,
+            evidence=Evidence(image_paths=[refs[0]], clip_path=refs[1], renditions={"thumbnail": [refs[2]]})))
+        self.assertFalse(any(self.store.contains(ref) for ref in refs))
+        self.assertEqual(stored, [], "Transcoder and incident recorder never see the event")
+
+    def test_critical_power_mode_drops_low_value_writes(self):
+        strategy = StrategyAgent(self.bus)
+        strategy.battery_level = 15
+        strategy.update_strategy()
+        self.assertEqual(self.filter.policy.name, "critical_only")
+        self.publish(RiskLevel.LOW, 5)
+        self.publish(RiskLevel.HIGH)
+        self.assertEqual(self.stored(), 1)
+        self.assertEqual(self.filter.dropped, 5)
+
+if __name__ == '__main__':
+    unittest.main()
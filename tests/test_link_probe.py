@@ -0,0 +1,121 @@
+
+import unittest
+import random
+import statistics
+import time
+from src.core.event_bus import EventBus
+from src.core.rolling_stats import RollingWindow, Ewma
+from src.core.types import NetworkStatus
+from src.agents.net_status_agent import NetStatusAgent
+from src.agents.sync_agent import SyncAgent
+from src.shore.ingest_server import IngestServer, LinkProfile
+from src.uplink.link_probe import LinkConfig, ProbeEngine
+
+class TestRollingStats(unittest.TestCase):
+    def test_window_matches_recomputation(self):
+        rng = random.Random(1)
+        window = RollingWindow(10)
+        values = []
+        for _ in range(200):
+            x = rng.uniform(0, 5)
+            window.add(x)
+            values = (values + [x])[-10:]
+            self.assertAlmostEqual(window.mean, statistics.fmean(values), places=9)
+            if len(values) > 1:
+                self.assertAlmostEqual(window.stddev, statistics.pstdev(values), places=6)
+        self.assertEqual(len(window), 10)
+
+    def test_ewma(self):
+        avg = Ewma(0.5)
+        self.assertIsNone(avg.value)
+        avg.add(10)
+        avg.add(20)
+        self.assertEqual(avg.value, 15)
+
+
+class TestLinkProbe(unittest.TestCase):
+    def serve(self, profile, seed=5):
+        server = IngestServer(profile=profile, seed=seed)
+        server.start()
+        self.addCleanup(server.stop)
+        return server
+
+    def setUp(self):
+        self.satellite = self.serve(LinkProfile(bandwidth_bps=400_000, latency_s=0.15))
+        self.wifi = self.serve(LinkProfile(bandwidth_bps=20_000_000))
+        dead = self.serve(LinkProfile())
+        dead.stop()
+        self.bus = EventBus()
+        self.snapshots = []
+        self.bus.subscribe("link_quality", self.snapshots.append)
+        self.links = [
+            LinkConfig("wifi", self.wifi.probe_url, cost=1),
+            LinkConfig("satellite", self.satellite.probe_url, cost=3),
+            LinkConfig("lte", dead.probe_url, cost=2),
+        ]
+
+    def test_rtt_loss_and_bandwidth(self):
+        engine = ProbeEngine(self.bus, self.links, timeout=2.0)
+        engine.BANDWIDTH_PROBE_EVERY = 1
+        engine.BANDWIDTH_PROBE_BYTES = 16 * 1024
+        for _ in range(3):
+            snapshot = engine.run_once()
+
+        links = snapshot["links"]
+        self.assertEqual(snapshot["best"], "wifi")
+        self.assertTrue(links["satellite"]["up"])
+        self.assertFalse(links["lte"]["up"])
+        self.assertEqual(links["lte"]["loss"], 1.0)
+        self.assertEqual(links["wifi"]["loss"], 0.0)
+        self.assertGreater(links["satellite"]["rtt_ms"], 140)
+        self.assertLess(links["wifi"]["rtt_ms"], links["satellite"]["rtt_ms"])
+
+        # 16 KiB over a 400 kbit/s pipe: the estimate should land near the cap
+        self.assertAlmostEqual(links["satellite"]["bandwidth_bps"], 400_000, delta=120_000)
+        self.assertGreater(links["wifi"]["bandwidth_bps"], links["satellite"]["bandwidth_bps"])
+        self.assertEqual(len(self.snapshots), 3)
+
+    def test_probes_run_concurrently(self):
+        slow = [self.serve(LinkProfile(latency_s=0.3)) for _ in range(3)]
+        engine = ProbeEngine(self.bus, [LinkConfig(f"link{i}", s.probe_url) for i, s in enumerate(slow)])
+        engine.BANDWIDTH_PROBE_EVERY = 0
+        start = time.monotonic()
+        engine.run_once()
+        self.assertLess(time.monotonic() - start, 0.8)
+
+    def test_best_falls_back_when_preferred_link_drops(self):
+        engine = ProbeEngine(self.bus, self.links, timeout=1.0)
+        engine.BANDWIDTH_PROBE_EVERY = 0
+        self.assertEqual(engine.run_once()["best"], "wifi")
+        self.wifi.stop()
+        self.assertEqual(engine.run_once()["best"], "satellite")
+
+    def test_net_status_agent_driven_by_probes(self):
+        agent = NetStatusAgent(self.bus, links=self.links[:1])
+        agent.probe_engine.INTERVAL = 0.01
+        agent.probe_engine.BANDWIDTH_PROBE_EVERY = 0
+        changes = []
+        self.bus.subscribe("network_status_change", changes.append)
+        agent.start()
+        deadline = time.time() + 5
+        while agent.current_status != NetworkStatus.ONLINE and time.time() < deadline:
+            time.sleep(0.02)
+        agent.stop()
+        self.assertEqual(changes[:1], [NetworkStatus.ONLINE])
+
+    def test_sync_sizes_batches_to_link(self):
+        sync = SyncAgent(self.bus, storage=None)
+        sync.network_status = NetworkStatus.ONLINE
+        self.assertEqual(sync.batch_size(), 500)
+
+        self.bus.publish("link_quality", {"best": "sat", "links": {"sat": {"bandwidth_bps": 9600}}})
+        # 9600 bit/s * 5 s / 60 B per event = 100 events
+        self.assertEqual(sync.batch_size(), 100)
+        sync.bytes_per_event.add(600)
+        self.assertEqual(sync.batch_size(), sync.MIN_BATCH_SIZE)
+
+        self.bus.publish("link_quality", {"best": None, "links": {}})
+        self.assertEqual(sync.batch_size(), 500)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+
+import unittest
+import urllib.error
+import urllib.request
+from src.core.event_bus import EventBus
+from src.core.metrics import MetricsRegistry, MetricsServer, _Metric, registry
+from src.agents.alert_agent import AlertAgent
+
+class TestMetrics(unittest.TestCase):
+    def test_text_format(self):
+        reg = MetricsRegistry()
+        frames = reg.counter("frames_processed_total", "Frames")
+        decisions = reg.counter("sync_decisions_total", "Decisions", ["decision"])
+        tracks = reg.gauge("tracks_alive", "Tracks")
+        writes = reg.histogram("db_write_seconds", "DB writes", buckets=(0.01, 0.1))
+        frames.inc(3)
+        decisions.labels("ALLOWED").inc()
+        decisions.labels(decision="BLOCKED").inc(2)
+        live = [1, 2]
+        tracks.set_function(lambda: len(live))
+        for v in (0.005, 0.05, 0.5):
+            writes.observe(v)
+
+        text = reg.render()
+        self.assertIn("# TYPE oceanviewer_frames_processed_total counter", text)
+        self.assertIn("oceanviewer_frames_processed_total 3\n", text)
+        self.assertIn('oceanviewer_sync_decisions_total{decision="BLOCKED"} 2', text)
+        self.assertIn("oceanviewer_tracks_alive 2", text)
+        self.assertIn('oceanviewer_db_write_seconds_bucket{le="0.01"} 1', text)
+        self.assertIn('oceanviewer_db_write_seconds_bucket{le="0.1"} 2', text)
+        self.assertIn('oceanviewer_db_write_seconds_bucket{le="+Inf"} 3', text)
+        self.assertIn("oceanviewer_db_write_seconds_count 3", text)
+
+    def test_registry_is_get_or_create(self):
+        reg = MetricsRegistry()
+        self.assertIs(reg.counter("x_total", "X"), reg.counter("x_total", "X"))
+        with self.assertRaises(ValueError):
+            reg.gauge("x_total", "X")
+        with self.assertRaises(ValueError):
+            reg.counter("x", "missing suffix")
+
+    def test_histogram_series_give_quantiles(self):
+        reg = MetricsRegistry()
+        hist = reg.histogram("uplink_seconds", "Uplink", ["codec"], buckets=(0.1, 1.0, 10.0))
+        for v in (0.05, 0.5, 0.7, 5.0):
+            hist.labels("zlib").observe(v)
+        series = hist.labels("zlib")
+        self.assertEqual(series.quantile(0.5), 1.0)
+        self.assertEqual(series.quantile(1.0), 5.0)  # Capped at the observed max
+        with self.assertRaises(TypeError):
+            _Metric("abstract", "Not a metric")
+
+    def test_label_values_are_escaped(self):
+        reg = MetricsRegistry()
+        reg.counter("errors_total", "E", ["topic"]).labels('a"b\\c').inc()
+        self.assertIn('{topic="a\\"b\\\\c"}', reg.render())
+
+    def test_event_bus_handler_errors_are_counted(self):
+        bus = EventBus()
+        bus.subscribe("boom", lambda data: 1 / 0)
+        errors = registry.counter("event_bus_handler_errors_total", "", ["topic"]).labels("boom")
+        before = errors.value
+        bus.publish("boom", None)
+        self.assertEqual(errors.value, before + 1)
+
+    def test_alert_suppression_is_counted(self):
+        alert = AlertAgent(EventBus())
+        suppressed = registry.counter("alerts_suppressed_total", "")
+        before = suppressed.value
+        for _ in range(3):
+            alert.process_risk({"risk_level": "HIGH", "reason": "Close target."})
+        self.assertEqual(suppressed.value, before + 2)
+
+    def test_endpoint_serves_prometheus_text(self):
+        reg = MetricsRegistry()
+        reg.counter("frames_processed_total", "Frames").inc()
+        server = MetricsServer(reg, host="127.0.0.1", port=0)
+        server.start()
+        self.addCleanup(server.stop)
+        with urllib.request.urlopen(server.url, timeout=5) as response:
+            self.assertTrue(response.headers["Content-Type"].startswith("text/plain"))
+            self.assertIn(b"oceanviewer_frames_processed_total 1", response.read())
+        with self.assertRaises(urllib.error.HTTPError):
+            urllib.request.urlopen(server.url.replace("/metrics", "/other"), timeout=5)
+
+    def test_tracer_quantiles_are_exported(self):
+        from src.core.tracing import tracer
+        self.addCleanup(tracer.reset)
+        tracer.record("db_write", 0.002)
+        self.assertIn('oceanviewer_trace_latency_seconds{stage="db_write",kind="stage",quantile="0.99"}',
+                      registry.render())
+
+if __name__ == '__main__':
+    unittest.main()
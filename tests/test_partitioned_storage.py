@@ -0,0 +1,101 @@
+
+import unittest
+import datetime
+import os
+import sqlite3
+import tempfile
+import threading
+from src.core.types import OceanEvent, EventType, RiskLevel, Evidence
+from src.database.storage import StorageManager
+
+class TestPartitionedStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmp.name, "part.db")
+        self.day0 = datetime.datetime(2026, 1, 5, 6, 0, 0)  # Monday
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_events(self, days, per_day=4):
+        events = []
+        for d in range(days):
+            for i in range(per_day):
+                events.append(OceanEvent(
+                    event_id=f"evt_{d}_{i}",
+                    timestamp=self.day0 + datetime.timedelta(days=d, hours=i),
+                    event_type=EventType.UNKNOWN,
+                    risk_level=RiskLevel.HIGH if i == 0 else RiskLevel.LOW,
+                    confidence=0.9,
+                    evidence=Evidence()
+                ))
+        return events
+
+    def test_daily_partitions_and_unified_view(self):
+        storage = StorageManager(self.db)
+        storage.save_events(self.make_events(3))
+        self.assertEqual(storage.partition_names(),
+                         ["events_d20260105", "events_d20260106", "events_d20260107"])
+
+        conn = sqlite3.connect(self.db)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM events").fetchone()[0], 12)
+        conn.close()
+
+        storage.mark_synced("evt_1_2")
+        recent = storage.query_range(self.day0 + datetime.timedelta(days=1),
+                                     self.day0 + datetime.timedelta(days=2))
+        self.assertEqual([e.event_id for e in recent], [f"evt_1_{i}" for i in range(4)])
+        self.assertTrue(recent[2].synced)
+
+    def test_weekly_partitions(self):
+        storage = StorageManager(self.db, partition_by="week")
+        storage.save_events(self.make_events(9))
+        self.assertEqual(storage.partition_names(), ["events_w2026_02", "events_w2026_03"])
+
+    def test_drop_archives_critical_rows(self):
+        storage = StorageManager(self.db)
+        storage.save_events(self.make_events(3))
+
+        dropped, _ = storage.drop_partitions_before(self.day0 + datetime.timedelta(days=2),
+                                                    keep_levels=[RiskLevel.HIGH])
+
+        self.assertEqual(dropped, 6)
+        self.assertEqual(storage.partition_names(), ["events_d20260107"])
+        ids = {e.event_id for e in storage.query_range(self.day0, self.day0 + datetime.timedelta(days=3))}
+        self.assertEqual(ids, {"evt_0_0", "evt_1_0", "evt_2_0", "evt_2_1", "evt_2_2", "evt_2_3"})
+
+        # Survives reopen
+        reopened = StorageManager(self.db)
+        self.assertEqual(reopened.partition_names(), ["events_d20260107"])
+
+    def test_reads_while_partitions_are_created(self):
+        storage = StorageManager(self.db)
+        errors = []
+        def read():
+            try:
+                for _ in range(2000):
+                    storage.partition_names()
+            except Exception as e:
+                errors.append(e)
+        reader = threading.Thread(target=read)
+        reader.start()
+        for event in self.make_events(40, per_day=1):
+            storage.save_events([event])
+        reader.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(storage.partition_names()), 40)
+
+    def test_migrates_single_table_database(self):
+        conn = sqlite3.connect(self.db)
+        conn.execute('''CREATE TABLE events (event_id TEXT PRIMARY KEY, timestamp TEXT, type TEXT,
+                        risk TEXT, confidence REAL, evidence TEXT, synced INTEGER, meta TEXT)''')
+        conn.execute("INSERT INTO events VALUES ('old_1','2025-12-01T10:00:00','unknown','LOW',0.9,"
+                     "'{\"image_paths\": [], \"clip_path\": null, \"feature_vectors\": null}',0,'{}')")
+        conn.commit()
+        conn.close()
+
+        storage = StorageManager(self.db)
+        self.assertEqual([e.event_id for e in storage.get_pending_sync()], ["old_1"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+
+import unittest
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+from src.core.event_bus import EventBus
+from src.core.profiler import ProfilerControl, SamplingProfiler
+
+def spin_in_hot_function(stop):
+    while not stop.is_set():
+        sum(i * i for i in range(200))
+
+class TestSamplingProfiler(unittest.TestCase):
+    def test_collapsed_stacks_show_hot_function(self):
+        stop = threading.Event()
+        worker = threading.Thread(target=spin_in_hot_function, args=(stop,), name="HotWorker")
+        worker.start()
+        profiler = SamplingProfiler(interval=0.002)
+        done = threading.Event()
+        profiler.start(duration=0.3, on_done=lambda p: done.set())
+        self.assertFalse(profiler.start(duration=1))  # One window at a time
+        self.assertTrue(done.wait(5))
+        stop.set()
+        worker.join()
+
+        self.assertGreater(profiler.sample_count, 10)
+        lines = profiler.collapsed().splitlines()
+        hot = [l for l in lines if l.startswith("HotWorker;") and "spin_in_hot_function" in l]
+        self.assertTrue(hot)
+        stack, count = hot[0].rsplit(" ", 1)
+        self.assertGreater(int(count), 0)
+        self.assertNotIn("SamplingProfiler", profiler.collapsed())
+
+
+class TestHandlerAccounting(unittest.TestCase):
+    def test_expensive_subscriber_ranks_first(self):
+        bus = EventBus()
+        bus.SLOW_HANDLER_SECONDS = 0.01
+        bus.subscribe("frame", lambda data: None)
+        def slow_handler(data):
+            time.sleep(0.02)
+        bus.subscribe("frame", slow_handler)
+        bus.subscribe("other", lambda data: 1 / 0)
+
+        with self.assertLogs("EventBus", level="WARNING") as logs:
+            for _ in range(3):
+                bus.publish("frame", 1)
+            bus.publish("other")
+        self.assertEqual(sum("Slow subscriber" in m for m in logs.output), 1)  # Warned once
+
+        stats = bus.handler_stats()
+        self.assertTrue(stats[0]["handler"].endswith("slow_handler"))
+        self.assertEqual(stats[0]["calls"], 3)
+        self.assertGreaterEqual(stats[0]["total_ms"], 60)
+        self.assertEqual(len(bus.handler_stats(top=1)), 1)
+        self.assertEqual({s["topic"] for s in stats}, {"frame", "other"})
+
+    def test_nested_publish_is_charged_to_the_inner_handler(self):
+        bus = EventBus()
+        def outer(data):
+            bus.publish("inner", data)
+        def inner(data):
+            time.sleep(0.03)
+        bus.subscribe("outer", outer)
+        bus.subscribe("inner", inner)
+        bus.publish("outer", 1)
+
+        stats = {s["handler"].rsplit(".", 1)[-1]: s for s in bus.handler_stats()}
+        self.assertEqual(bus.handler_stats(top=1)[0]["topic"], "inner")
+        self.assertLess(stats["outer"]["total_ms"], 10)
+        self.assertGreaterEqual(stats["outer"]["inclusive_ms"], 30)
+
+    def test_instances_of_one_handler_are_kept_apart(self):
+        class Recorder:
+            def on_event(self, data):
+                pass
+        bus = EventBus()
+        bus.subscribe("risk_assessed_event", Recorder().on_event, instance="bow")
+        bus.subscribe("risk_assessed_event", Recorder().on_event, instance="port")
+        bus.subscribe("risk_assessed_event", Recorder().on_event)
+        bus.subscribe("risk_assessed_event", Recorder().on_event)
+        instances = [s["instance"] for s in bus.handler_stats()]
+        self.assertEqual(sorted(instances), ["", "#1", "bow", "port"])
+
+
+class TestProfilerControl(unittest.TestCase):
+    def test_control_socket(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        bus = EventBus()
+        bus.subscribe("x", lambda data: None)
+        bus.publish("x")
+        control = ProfilerControl(bus, directory=os.path.join(tmp.name, "profiles"),
+                                  socket_path=os.path.join(tmp.name, "ov.ctl"))
+        control.profiler.interval = 0.002
+        control.start()
+        self.addCleanup(control.stop)
+
+        def ask(line):
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+                s.connect(control.socket_path)
+                s.sendall(line.encode() + b"\n")
+                return s.makefile().readline().strip()
+
+        reply = ask("profile 0.2")
+        self.assertTrue(reply.startswith("started "))
+        self.assertEqual(ask("profile 1"), "busy")
+        path = reply.split(" ", 1)[1]
+        deadline = time.time() + 5
+        while control.last_output != path and time.time() < deadline:
+            time.sleep(0.02)
+        self.assertTrue(os.path.getsize(path) > 0)
+
+        handlers = json.loads(ask("handlers 5"))
+        self.assertEqual(handlers[0]["topic"], "x")
+        self.assertIn("unknown command", ask("bogus"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+
+import unittest
+import os
+import tempfile
+import time
+import numpy as np
+from src.core.clock import VirtualClock
+from src.core.event_bus import EventBus
+from src.core.types import OceanEvent, EventType, RiskLevel, Evidence
+from src.database.reid_index import ReIdIndex
+from src.agents.bioconfirm_agent import BioConfirmAgent
+
+DIM = 64
+
+class TestReIdIndex(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(3)
+
+    def test_recall_and_lookup_latency(self):
+        index = ReIdIndex(DIM)
+        base = self.rng.standard_normal((20_000, DIM)).astype(np.float32)
+        for i, v in enumerate(base):
+            index.add(f"IND_{i}", v, timestamp=1000.0)
+
+        probes = self.rng.choice(len(base), 200, replace=False)
+        noisy = base[probes] + 0.2 * self.rng.standard_normal((len(probes), DIM)).astype(np.float32)
+        start = time.perf_counter()
+        hits = sum(1 for i, q in zip(probes, noisy)
+                   if (m := index.query(q, min_similarity=0.85)) and m[0][0] == f"IND_{i}")
+        per_query = (time.perf_counter() - start) / len(probes)
+
+        self.assertGreaterEqual(hits / len(probes), 0.95)
+        self.assertLess(per_query, 0.002)  # Sub-millisecond on real hardware; loose for CI
+        self.assertEqual(index.query(self.rng.standard_normal(DIM), min_similarity=0.85), [])
+
+    def test_since_filter_and_persistence(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "ocean_data.reid.npz")
+            index = ReIdIndex.load(path, DIM)
+            whale = self.rng.standard_normal(DIM)
+            index.add("IND_whale", whale, timestamp=100.0)
+            self.assertEqual(index.query(whale, since=200.0), [])
+            index.save()
+
+            reloaded = ReIdIndex.load(path, DIM)
+            self.assertEqual(len(reloaded), 1)
+            match = reloaded.query(whale)[0]
+            self.assertEqual(match[0], "IND_whale")
+            self.assertAlmostEqual(match[1], 1.0, places=4)
+
+class TestBioConfirmReId(unittest.TestCase):
+    def detection(self, box, embedding):
+        return OceanEvent(event_id="DET_x", timestamp=None, event_type=EventType.UNKNOWN,
+                          risk_level=RiskLevel.UNKNOWN, confidence=0.9,
+                          evidence=Evidence(feature_vectors=list(embedding)),
+                          metadata={"raw_label": "large_marine_life", "box": box, "motion": [2.0, 2.0]})
+
+    def test_resurfacing_individual_is_merged_not_reconfirmed(self):
+        bus = EventBus()
+        clock = VirtualClock(start=1000.0)
+        index = ReIdIndex(DIM)
+        agent = BioConfirmAgent(bus, index, clock=clock)
+        confirmed = []
+        bus.subscribe("confirmed_event", confirmed.append)
+        rng = np.random.default_rng(5)
+        whale = rng.standard_normal(DIM)
+
+        def surface(x0):
+            for i in range(6):
+                b = [x0 + 2 * i, 100 + 2 * i, x0 + 160 + 2 * i, 260 + 2 * i]
+                agent.on_vision_detection(self.detection(b, whale + 0.2 * rng.standard_normal(DIM)))
+                clock.advance(0.1)
+
+        surface(100)
+        self.assertEqual(len(confirmed), 1)
+        first_id = confirmed[0].metadata["individual_id"]
+        self.assertEqual(len(confirmed[0].evidence.feature_vectors), DIM)
+
+        clock.advance(agent.MAX_DROPOUT + 1)  # Dived; the next detection ends its track
+        agent.on_vision_detection(self.detection([900, 900, 960, 960], rng.standard_normal(DIM)))
+        self.assertEqual(len(index), 2, "Ended track should be remembered")
+
+        surface(600)
+        self.assertEqual(agent.merged_tracks, 1)
+        self.assertEqual(agent.tracks[-1].individual_id, first_id)
+        # Published for risk assessment again, but as the same individual (not re-confirmed)
+        self.assertEqual(len(confirmed), 2)
+        self.assertEqual(confirmed[1].individual_id, first_id)
+
+if __name__ == '__main__':
+    unittest.main()
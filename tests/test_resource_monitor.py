@@ -0,0 +1,93 @@
+
+import unittest
+import json
+import os
+import tempfile
+import time
+from src.core.event_bus import EventBus
+from src.core.energy import FileBatterySource
+from src.agents.resource_monitor import ResourceMonitor
+from src.agents.strategy_agent import StrategyAgent
+
+class TestResourceMonitor(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.battery_file = os.path.join(self.tmp.name, "battery.json")
+        self.thermal_file = os.path.join(self.tmp.name, "temp")
+        self.bus = EventBus()
+        self.updates, self.warnings, self.strategies = [], [], []
+        self.bus.subscribe("resource_update", self.updates.append)
+        self.bus.subscribe("resource_warning", self.warnings.append)
+        self.bus.subscribe("system_strategy_update", self.strategies.append)
+        self.monitor = ResourceMonitor(self.bus, self.tmp.name, FileBatterySource(self.battery_file),
+                                       thermal_path=self.thermal_file)
+        self.set_battery(80)
+        self.set_temp(50.0)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def set_battery(self, level):
+        with open(self.battery_file, "w") as f:
+            json.dump({"level_pct": level}, f)
+
+    def set_temp(self, celsius):
+        with open(self.thermal_file, "w") as f:
+            f.write(str(int(celsius * 1000)))
+
+    def test_steady_state_is_silent_and_cached(self):
+        StrategyAgent(self.bus, storage_path=self.tmp.name)
+        self.monitor.poll(now=0.0, force=True)
+        published = len(self.strategies)
+        for t in range(1, 120):
+            self.monitor.poll(now=float(t))
+        self.assertEqual(len(self.updates), 1)
+        self.assertEqual(len(self.strategies), published, "No strategy republish without change")
+        self.assertEqual(self.monitor.probes["disk_free_pct"].reads, 4)  # TTL 30 s over 2 minutes
+        self.assertEqual(self.monitor.probes["battery"].reads, 12)
+
+    def test_change_beyond_deadband_replans(self):
+        agent = StrategyAgent(self.bus, storage_path=self.tmp.name)
+        self.monitor.poll(now=0.0, force=True)
+        self.set_battery(79.5)
+        self.monitor.poll(now=10.0)
+        self.assertEqual(len(self.updates), 1, "Half a percent is inside the deadband")
+
+        self.set_battery(15)
+        self.monitor.poll(now=20.0)
+        self.assertEqual(len(self.updates), 2)
+        self.assertEqual(agent.battery_level, 15)
+        self.assertEqual(self.strategies[-1]["fps"], 1, "Critical battery reaches strategy without polling")
+
+    def test_small_step_across_battery_threshold_is_published(self):
+        agent = StrategyAgent(self.bus, storage_path=self.tmp.name)
+        self.set_battery(20.3)
+        self.monitor.poll(now=0.0, force=True)
+        self.set_battery(19.5)
+        self.monitor.poll(now=10.0)
+        self.assertEqual(len(self.updates), 2)
+        self.assertEqual(agent.battery_level, 19.5)
+
+    def test_failing_first_poll_does_not_kill_the_thread(self):
+        calls = []
+        def poll(force=False):
+            calls.append(force)
+            raise OSError("disk gone")
+        self.monitor.poll = poll
+        self.monitor.TICK_SECONDS = 0.01
+        self.monitor.start()
+        time.sleep(0.1)
+        self.assertTrue(self.monitor.is_alive())
+        self.monitor.stop()
+        self.assertTrue(calls[0])
+        self.assertGreater(len(calls), 1)
+
+    def test_thermal_warning_hysteresis(self):
+        self.monitor.poll(now=0.0, force=True)
+        for t, temp in enumerate([85, 79, 84, 74, 81], start=1):
+            self.set_temp(temp)
+            self.monitor.poll(now=t * 5.0)
+        self.assertEqual([w["value"] for w in self.warnings if w["type"] == "thermal"], [85.0, 81.0])
+
+if __name__ == '__main__':
+    unittest.main()
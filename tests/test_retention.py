@@ -0,0 +1,111 @@
+
+import unittest
+import datetime
+import os
+import tempfile
+import config
+from src.core.clock import VirtualClock
+from src.core.types import OceanEvent, EventType, RiskLevel, Evidence
+from src.database.storage import StorageManager
+from src.database.retention import RetentionEngine
+
+class TestRetention(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = StorageManager(os.path.join(self.tmp.name, "ret.db"))
+        self.now = datetime.datetime(2026, 3, 1, 12, 0, 0)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def add_event(self, i, risk, age_days, size=1000):
+        path = os.path.join(self.tmp.name, f"frame_{i}.jpg")
+        with open(path, "wb") as f:
+            f.write(b"\0" * size)
+        self.storage.save_event(OceanEvent(
+            event_id=f"evt_{i}",
+            timestamp=self.now - datetime.timedelta(days=age_days),
+            event_type=EventType.UNKNOWN,
+            risk_level=risk,
+            confidence=0.9,
+            evidence=Evidence(image_paths=[path])
+        ))
+        return path
+
+    def remaining_ids(self):
+        import sqlite3
+        conn = sqlite3.connect(self.storage.db_path)
+        ids = {r[0] for r in conn.execute("SELECT event_id FROM events")}
+        conn.close()
+        return ids
+
+    def test_expires_old_non_critical_and_keeps_critical(self):
+        old_low = self.add_event(1, RiskLevel.LOW, 10)
+        self.add_event(2, RiskLevel.HIGH, 10)
+        self.add_event(3, RiskLevel.LOW, 1)
+        engine = RetentionEngine(self.storage, log_dir=self.tmp.name, keep_evidence_days=7)
+        engine.BATCH_PAUSE_SECONDS = 0
+
+        engine.run_pass(now=self.now)
+
+        self.assertEqual(self.remaining_ids(), {"evt_2", "evt_3"})
+        self.assertFalse(os.path.exists(old_low))
+        self.assertEqual(self.storage.evidence_bytes, 2000)
+
+    def test_budget_prunes_lowest_priority_first(self):
+        for i in range(10):
+            self.add_event(i, RiskLevel.MEDIUM, 1, size=100_000)
+        for i in range(10, 20):
+            self.add_event(i, RiskLevel.LOW, 0, size=100_000)
+        engine = RetentionEngine(self.storage, log_dir=self.tmp.name,
+                                 max_storage_gb=1_600_000 / 1024 ** 3)
+        engine.BATCH_SIZE = 2
+        engine.BATCH_PAUSE_SECONDS = 0
+
+        engine.run_pass(now=self.now)
+
+        remaining = self.remaining_ids()
+        self.assertLessEqual(engine.used_bytes(), engine.budget_bytes * engine.LOW_WATERMARK)
+        # All MEDIUM survive; only LOW were sacrificed
+        self.assertTrue({f"evt_{i}" for i in range(10)} <= remaining)
+        self.assertLess(len(remaining), 20)
+
+    def test_shared_evidence_removed_with_last_reference(self):
+        shared = os.path.join(self.tmp.name, "shared.jpg")
+        with open(shared, "wb") as f:
+            f.write(b"\0" * 500)
+        for i, age in ((1, 10), (2, 1)):
+            self.storage.save_event(OceanEvent(
+                event_id=f"s_{i}", timestamp=self.now - datetime.timedelta(days=age),
+                event_type=EventType.UNKNOWN, risk_level=RiskLevel.LOW,
+                confidence=0.9, evidence=Evidence(image_paths=[shared])))
+        self.assertEqual(self.storage.evidence_bytes, 500)
+
+        engine = RetentionEngine(self.storage, log_dir=self.tmp.name)
+        engine.run_pass(now=self.now)
+        self.assertTrue(os.path.exists(shared))
+
+        engine.run_pass(now=self.now + datetime.timedelta(days=30))
+        self.assertFalse(os.path.exists(shared))
+        self.assertEqual(self.storage.evidence_bytes, 0)
+
+    def test_rotated_logs_age_on_the_engine_clock(self):
+        clock = VirtualClock(start=self.now.timestamp())
+        for name in ("oceanviewer.log", "oceanviewer.log.1", "oceanviewer.log.old", "notes.log.1"):
+            with open(os.path.join(self.tmp.name, name), "w") as f:
+                f.write("x")
+        engine = RetentionEngine(self.storage, log_dir=self.tmp.name, keep_logs_days=7, clock=clock)
+        self.assertEqual(engine.expire_logs(), 0)  # Written a moment ago (real time)
+        clock.advance(6 * 86400)
+        self.assertEqual(engine.expire_logs(), 0)
+        clock.advance(2 * 86400)
+        self.assertEqual(engine.expire_logs(), 1)
+        self.assertEqual(sorted(os.listdir(self.tmp.name)),
+                         ["notes.log.1", "oceanviewer.log", "oceanviewer.log.old", "ret.db"])
+
+    def test_log_dir_defaults_to_the_log_file_directory(self):
+        engine = RetentionEngine(self.storage)
+        self.assertEqual(engine.log_dir, os.path.dirname(os.path.abspath(config.LOG_FILE)))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+
+import unittest
+import datetime
+import os
+import sqlite3
+import tempfile
+from src.core.types import OceanEvent, EventType, RiskLevel, Evidence
+from src.database.storage import StorageManager
+
+class TestRollups(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmp.name, "rollup.db")
+        self.t0 = datetime.datetime(2026, 1, 6, 12, 0, 0)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def event(self, i, minutes, risk, label):
+        return OceanEvent(
+            event_id=f"evt_{i}",
+            timestamp=self.t0 + datetime.timedelta(minutes=minutes),
+            event_type=EventType.UNKNOWN,
+            risk_level=risk,
+            confidence=0.8,
+            evidence=Evidence(),
+            metadata={"raw_label": label}
+        )
+
+    def test_counts_by_hour_label_and_sync_state(self):
+        storage = StorageManager(self.db)
+        storage.save_events([
+            self.event(1, 5, RiskLevel.HIGH, "large_marine_life"),
+            self.event(2, 10, RiskLevel.HIGH, "large_marine_life"),
+            self.event(3, 70, RiskLevel.HIGH, "small_marine_life"),
+            self.event(4, 80, RiskLevel.LOW, "small_marine_life"),
+        ])
+        storage.save_event(self.event(5, 1500, RiskLevel.LOW, "large_marine_life"))
+        t1 = self.t0 + datetime.timedelta(days=2)
+
+        high_per_hour = storage.query_rollup("hour", self.t0, t1, risk=RiskLevel.HIGH)
+        self.assertEqual([(r["bucket"], r["count"]) for r in high_per_hour],
+                         [("2026-01-06T12", 2), ("2026-01-06T13", 1)])
+
+        per_label_day = storage.query_rollup("day", self.t0, t1, group_by=("bucket", "label"))
+        self.assertEqual([(r["bucket"], r["label"], r["count"]) for r in per_label_day],
+                         [("2026-01-06", "large_marine_life", 2),
+                          ("2026-01-06", "small_marine_life", 2),
+                          ("2026-01-07", "large_marine_life", 1)])
+
+        storage.mark_synced("evt_1")
+        storage.mark_synced_many(["evt_2", "evt_1"])
+        synced = storage.query_rollup("minute", self.t0, t1, group_by=(), synced=True)
+        self.assertEqual(synced[0]["count"], 2)
+        self.assertAlmostEqual(synced[0]["avg_confidence"], 0.8)
+
+        # Replacing an event moves its count instead of double counting
+        storage.save_event(self.event(4, 80, RiskLevel.HIGH, "small_marine_life"))
+        total = storage.query_rollup("day", self.t0, t1, group_by=("risk",))
+        self.assertEqual({r["risk"]: r["count"] for r in total}, {"HIGH": 4, "LOW": 1})
+
+    def test_backfill_existing_database(self):
+        storage = StorageManager(self.db)
+        storage.save_events([self.event(i, i, RiskLevel.LOW, "large_marine_life") for i in range(6)])
+        conn = sqlite3.connect(self.db)
+        for g in ("minute", "hour", "day"):
+            conn.execute(f"DROP TABLE rollup_{g}")
+        conn.commit()
+        conn.close()
+
+        reopened = StorageManager(self.db)
+        rows = reopened.query_rollup("hour", self.t0, self.t0 + datetime.timedelta(hours=1))
+        self.assertEqual(rows[0]["count"], 6)
+
+if __name__ == "__main__":
+    unittest.main()
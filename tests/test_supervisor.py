@@ -0,0 +1,182 @@
+import unittest
+import os
+import tempfile
+import time
+from src.core.energy import BatteryState
+from src.core.event_bus import EventBus
+from src.core.supervisor import Supervisor
+from src.agents.resource_monitor import ResourceMonitor
+
+class FakeAgent:
+    def __init__(self, log, name, start_delay=0.0, stop_delay=0.0):
+        self.log = log
+        self.name = name
+        self.start_delay = start_delay
+        self.stop_delay = stop_delay
+        self.running = False
+        self.starts = 0
+        self.heartbeat = None
+
+    def start(self):
+        time.sleep(self.start_delay)
+        self.log.append(("start", self.name))
+        self.running = True
+        self.starts += 1
+        self.heartbeat = time.monotonic()
+
+    def stop(self):
+        time.sleep(self.stop_delay)
+        self.log.append(("stop", self.name))
+        self.running = False
+
+    def is_alive(self):
+        return self.running
+
+class DrainingAgent(FakeAgent):
+    def drain(self, timeout):
+        self.log.append(("drain", self.name))
+        return True
+
+class TestSupervisor(unittest.TestCase):
+    def setUp(self):
+        self.log = []
+        self.bus = EventBus()
+        self.sup = Supervisor(self.bus, deadline=2.0)
+
+    def tearDown(self):
+        self.sup.shutdown(deadline=0.5)
+
+    def test_waves_start_concurrently_in_dependency_order(self):
+        a = FakeAgent(self.log, "a", start_delay=0.3)
+        b = FakeAgent(self.log, "b", start_delay=0.3)
+        c = FakeAgent(self.log, "c")
+        self.sup.add("c", c, after=("a", "b"))
+        self.sup.add("a", a)
+        self.sup.add("b", b)
+        self.assertEqual(self.sup.waves(), [["a", "b"], ["c"]])
+        started = time.monotonic()
+        self.sup.start()
+        self.assertLess(time.monotonic() - started, 0.55)  # a and b overlapped
+        self.assertEqual(self.log[-1], ("start", "c"))
+
+    def test_unknown_dependency_is_rejected(self):
+        sup = Supervisor()
+        sup.add("a", FakeAgent(self.log, "a"), after=("missing",))
+        with self.assertRaises(ValueError):
+            sup.waves()
+
+    def test_dead_worker_is_restarted_until_the_limit(self):
+        agent = FakeAgent(self.log, "a")
+        failed = []
+        self.bus.subscribe("agent_failed", failed.append)
+        self.sup.add("a", agent)
+        self.sup.CHECK_INTERVAL = 60  # Drive checks by hand
+        self.sup.MAX_RESTARTS = 2
+        self.sup.start()
+
+        self.assertEqual(self.sup.check(), [])
+        agent.running = False  # Worker thread died
+        self.assertEqual(self.sup.check(), ["a"])
+        self.assertEqual(agent.starts, 2)
+        agent.running = False
+        self.assertEqual(self.sup.check(), ["a"])
+        agent.running = False
+        self.assertEqual(self.sup.check(), [])
+        self.assertEqual(failed, [{"agent": "a"}])
+        self.assertTrue(self.sup.status()["a"]["failed"])
+
+    def test_overrunning_stop_counts_and_is_not_repeated(self):
+        agent = FakeAgent(self.log, "a", stop_delay=0.3)
+        failed = []
+        self.bus.subscribe("agent_failed", failed.append)
+        self.sup.add("a", agent, stale_after=5)
+        self.sup.CHECK_INTERVAL = 60
+        self.sup.RESTART_STOP_TIMEOUT = 0.05
+        self.sup.MAX_RESTARTS = 1
+        self.sup.start()
+
+        agent.heartbeat -= 10  # Stalled, and stop() is slow
+        self.assertEqual(self.sup.check(), [])
+        self.assertEqual(self.sup.check(), [])  # Stop still pending: no second stop() call
+        self.assertEqual(self.sup.status()["a"]["restarts"], 1)
+        time.sleep(0.4)
+        self.assertEqual(self.sup.check(), ["a"])  # Late stop done: the same attempt completes
+        self.assertEqual([e for e in self.log if e == ("stop", "a")], [("stop", "a")])
+        self.assertEqual(agent.starts, 2)
+
+        agent.running = False
+        self.assertEqual(self.sup.check(), [])  # Limit reached by the attempt above
+        self.assertEqual(failed, [{"agent": "a"}])
+
+    def test_stop_that_never_returns_marks_failed(self):
+        agent = FakeAgent(self.log, "a", stop_delay=0.5)
+        self.sup.add("a", agent)
+        self.sup.CHECK_INTERVAL = 60
+        self.sup.RESTART_STOP_TIMEOUT = 0.01
+        self.sup.RESTART_STOP_GIVE_UP_SECONDS = 0.1
+        self.sup.start()
+        agent.running = False
+        self.sup.check()
+        time.sleep(0.15)
+        self.sup.check()
+        self.assertTrue(self.sup.status()["a"]["failed"])
+
+    def test_stale_heartbeat_triggers_restart(self):
+        agent = FakeAgent(self.log, "a")
+        self.sup.add("a", agent, stale_after=5)
+        self.sup.CHECK_INTERVAL = 60
+        self.sup.start()
+        agent.heartbeat -= 10
+        self.assertFalse(self.sup.status()["a"]["healthy"])
+        self.assertEqual(self.sup.check(), ["a"])
+        self.assertIn(("stop", "a"), self.log)
+        self.assertTrue(self.sup.status()["a"]["healthy"])
+
+    def test_shutdown_stops_producers_first_and_drains_consumers(self):
+        consumer = DrainingAgent(self.log, "consumer")
+        producer = FakeAgent(self.log, "producer")
+        flushed = []
+        self.sup.add("consumer", consumer)
+        self.sup.add("producer", producer, after=("consumer",))
+        self.sup.on_shutdown("flush", lambda: flushed.append(True))
+        self.sup.start()
+        self.log.clear()
+        self.assertEqual(self.sup.shutdown(), [])
+        self.assertEqual(self.log, [("stop", "producer"), ("drain", "consumer"), ("stop", "consumer")])
+        self.assertEqual(flushed, [True])
+
+    def test_shutdown_is_bounded_by_the_deadline(self):
+        self.sup.add("hung", FakeAgent(self.log, "hung", stop_delay=5.0))
+        self.sup.add("quick", FakeAgent(self.log, "quick"))
+        self.sup.start()
+        started = time.monotonic()
+        unfinished = self.sup.shutdown(deadline=0.3)
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(unfinished, ["hung"])
+        self.assertIn(("stop", "quick"), self.log)
+
+    def test_low_battery_requests_shutdown(self):
+        self.assertFalse(self.sup.wait_for_shutdown(0))
+        self.bus.publish("resource_update", {"battery": BatteryState(50, 2400)})
+        self.bus.publish("resource_update", {"battery": BatteryState(2, 2400, charging=True)})
+        self.assertFalse(self.sup.wait_for_shutdown(0))
+        self.bus.publish("resource_update", {"battery": BatteryState(2, 2400)})
+        self.assertTrue(self.sup.wait_for_shutdown(0))
+        self.assertIn("battery", self.sup.shutdown_reason)
+
+class TestRestartableAgent(unittest.TestCase):
+    def test_resource_monitor_restarts_in_place(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            monitor = ResourceMonitor(EventBus(), tmp, thermal_path=os.path.join(tmp, "none"))
+            monitor.TICK_SECONDS = 0.01
+            monitor.start()
+            monitor.stop()
+            self.assertFalse(monitor.is_alive())
+            monitor.start()
+            time.sleep(0.05)
+            self.assertTrue(monitor.is_alive())
+            self.assertIsNotNone(monitor.heartbeat)
+            monitor.stop()
+
+if __name__ == "__main__":
+    unittest.main()
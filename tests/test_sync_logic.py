@@ -10,6 +10,16 @@ from src.agents.sync_agent import SyncAgent
 from src.core.types import NetworkStatus, RiskLevel, OceanEvent, EventType, Evidence
 from src.database.storage import StorageManager
 
+class RecordingUploader:
+    def __init__(self):
+        self.paths = []
+
+    def enqueue(self, path):
+        self.paths.append(path)
+
+    def set_link_available(self, available):
+        pass
+
 # Configure logging to stdout
 logging.basicConfig(level=logging.DEBUG)
 
@@ -89,5 +99,18 @@ class TestSyncLogic(unittest.TestCase):
             traceback.print_exc()
             raise
 
+    def test_intermittent_clips_wait_for_backlog_drain(self):
+        uploader = RecordingUploader()
+        agent = SyncAgent(EventBus(), self.storage, evidence_uploader=uploader)
+        agent.update_network_status(NetworkStatus.INTERMITTENT)
+        agent.handle_incident_clip({"event_id": "test_evt_clip", "clip_path": "evs://clip"})
+        self.assertEqual(uploader.paths, [], "No clips over a thin link")
+
+        agent.update_network_status(NetworkStatus.ONLINE)
+        agent.drain_backlog()
+        self.assertEqual(uploader.paths, ["evs://clip"])
+        agent.drain_backlog()
+        self.assertEqual(uploader.paths, ["evs://clip"], "Queued once")
+
 if __name__ == "__main__":
     unittest.main()
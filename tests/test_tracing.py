@@ -0,0 +1,92 @@
+
+import unittest
+import datetime
+import os
+import random
+import tempfile
+import time
+from src.core.event_bus import EventBus
+from src.core.tracing import LatencyHistogram, Tracer, tracer
+from src.core.types import OceanEvent, EventType, RiskLevel, Evidence, NetworkStatus
+from src.agents.bioconfirm_agent import BioConfirmAgent
+from src.agents.risk_agent import RiskAgent
+from src.agents.alert_agent import AlertAgent
+from src.agents.sync_agent import SyncAgent
+from src.database.storage import StorageManager
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_quantiles_within_bucket_error(self):
+        rng = random.Random(4)
+        hist = LatencyHistogram()
+        samples = sorted(rng.lognormvariate(-4, 1) for _ in range(20000))
+        for s in samples:
+            hist.record(s)
+        for q in (0.5, 0.99):
+            exact = samples[int(q * len(samples)) - 1]
+            self.assertAlmostEqual(hist.quantile(q) / exact, 1.0, delta=0.17)
+        self.assertEqual(hist.count, 20000)
+
+    def test_memory_is_fixed(self):
+        hist = LatencyHistogram()
+        buckets = len(hist.counts)
+        for i in range(50000):
+            hist.record(i * 1e-5)
+        hist.record(3600)  # Beyond the top bucket: overflow, max still exact
+        self.assertEqual(len(hist.counts), buckets)
+        self.assertEqual(hist.quantile(1.0), 3600)
+
+    def test_empty(self):
+        self.assertIsNone(LatencyHistogram().quantile(0.5))
+
+
+class TestTracer(unittest.TestCase):
+    def test_marks_record_since_capture_and_stage(self):
+        t = Tracer(max_live=2)
+        t.start("a", at=time.monotonic() - 0.2)
+        t.mark("a", "vision")
+        t.mark("a", "risk", after="vision")
+        report = t.report()
+        self.assertGreaterEqual(report["since_capture"]["risk"]["p50_ms"], 150)
+        self.assertLess(report["stages"]["risk"]["p50_ms"], 50)
+
+        # Oldest traces are forgotten beyond max_live; marks on them are ignored
+        t.start("b")
+        t.start("c")
+        self.assertIsNone(t.mark("a", "alert"))
+        self.assertIsNone(t.mark(None, "alert"))
+        self.assertIsNotNone(t.mark("c", "alert"))
+
+    def test_pipeline_stages_are_traced(self):
+        tracer.reset()
+        self.addCleanup(tracer.reset)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+
+        bus = EventBus()
+        bio = BioConfirmAgent(bus)
+        RiskAgent(bus)
+        AlertAgent(bus)
+        sync = SyncAgent(bus, StorageManager(os.path.join(tmp.name, "trace.db")))
+        sync.update_network_status(NetworkStatus.ONLINE)
+
+        for i in range(bio.required_consecutive_frames + 1):
+            trace_id = f"F{i}"
+            tracer.start(trace_id)
+            tracer.mark(trace_id, "vision")
+            bus.publish("vision_detection", OceanEvent(
+                event_id=f"DET_{i}", timestamp=datetime.datetime.now(),
+                event_type=EventType.UNKNOWN, risk_level=RiskLevel.UNKNOWN, confidence=0.9,
+                evidence=Evidence(),
+                metadata={"raw_label": "large_marine_life", "box": [100, 100, 400, 300],
+                          "motion": [0, 1], "frame_id": i},
+                trace_id=trace_id))
+
+        report = tracer.report()
+        for stage in ("vision", "bioconfirm", "risk", "alert", "storage", "sync"):
+            self.assertIn(stage, report["since_capture"], stage)
+        self.assertGreater(report["stages"]["db_write"]["count"], 0)
+        alert = report["since_capture"]["alert"]
+        self.assertGreaterEqual(alert["p99_ms"], report["stages"]["alert"]["p99_ms"])
+
+if __name__ == '__main__':
+    unittest.main()
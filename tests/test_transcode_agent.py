@@ -0,0 +1,112 @@
+
+import unittest
+import datetime
+import json
+import os
+import sqlite3
+import tempfile
+from src.core.event_bus import EventBus
+from src.core.types import OceanEvent, EventType, RiskLevel, Evidence, NetworkStatus
+from src.database.storage import StorageManager
+from src.database.evidence_store import EvidenceStore
+from src.database.ingest_filter import IngestFilter
+from src.agents.transcode_agent import TranscodeAgent, transcode
+from src.agents.sync_agent import SyncAgent
+
+class RecordingUploader:
+    def __init__(self):
+        self.paths = []
+
+    def enqueue(self, path):
+        self.paths.append(path)
+
+    def enqueue_evidence(self, evidence):
+        self.paths.extend(evidence.image_paths)
+
+    def set_link_available(self, available):
+        pass
+
+class TestTranscodeAgent(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.bus = EventBus()
+        self.storage = StorageManager(os.path.join(self.tmp.name, "events.db"))
+        self.store = EvidenceStore(os.path.join(self.tmp.name, "evs"), budget_bytes=10 * 1024 * 1024)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def make_event(self, event_id, risk=RiskLevel.HIGH):
+        frame = self.store.put(os.urandom(200_000))
+        return OceanEvent(event_id=event_id, timestamp=datetime.datetime.now(),
+                          event_type=EventType.UNKNOWN, risk_level=risk,
+                          confidence=0.9, evidence=Evidence(image_paths=[frame]))
+
+    def test_transcode_shrinks_by_tier(self):
+        data = os.urandom(100_000)
+        thumb = transcode(data, 160, 60)
+        preview = transcode(data, 640, 75)
+        self.assertLess(len(thumb), len(preview))
+        self.assertLess(len(preview), len(data))
+
+    def test_renditions_recorded_and_thumbnails_shipped_on_intermittent(self):
+        uploader = RecordingUploader()
+        sync = SyncAgent(self.bus, self.storage, evidence_uploader=uploader)
+        sync.update_network_status(NetworkStatus.INTERMITTENT)
+        agent = TranscodeAgent(self.bus, self.store, self.storage, max_workers=1)
+        ready = []
+        self.bus.subscribe("renditions_ready", ready.append)
+        agent.start()
+        try:
+            event = self.make_event("evt_high")
+            self.bus.publish("risk_assessed_event", event)
+            self.assertTrue(agent.wait_idle(timeout=30))
+        finally:
+            agent.stop()
+
+        self.assertEqual(len(ready), 1)
+        thumbs = event.evidence.renditions["thumbnail"]
+        self.assertEqual(len(thumbs), 1)
+        self.assertLess(len(self.store.get(thumbs[0])), len(self.store.get(event.evidence.image_paths[0])))
+        self.assertEqual(uploader.paths, thumbs, "Only the thumbnail goes out on INTERMITTENT")
+
+        conn = sqlite3.connect(self.storage.db_path)
+        evidence = json.loads(conn.execute("SELECT evidence FROM events WHERE event_id='evt_high'").fetchone()[0])
+        conn.close()
+        self.assertEqual(evidence["renditions"]["thumbnail"], thumbs)
+
+    def test_only_stored_events_are_transcoded(self):
+        sync = SyncAgent(self.bus, self.storage, ingest_filter=IngestFilter(policy="critical_only"))
+        agent = TranscodeAgent(self.bus, self.store, self.storage, max_workers=1)
+        agent.start()
+        try:
+            self.bus.publish("risk_assessed_event", self.make_event("evt_low", RiskLevel.LOW))
+            self.bus.publish("risk_assessed_event", self.make_event("evt_high"))
+            self.assertTrue(agent.wait_idle(timeout=30))
+        finally:
+            agent.stop()
+        self.assertEqual(agent.completed, 1, "The filtered LOW event is never queued")
+
+    def test_critical_power_pauses_pool(self):
+        agent = TranscodeAgent(self.bus, self.store, max_workers=2)
+        agent.start()
+        try:
+            self.bus.publish("system_strategy_update", {"fps": 1, "mode": "CRITICAL_POWER"})
+            self.assertEqual(agent.worker_limit, 0)
+            for i in range(3):
+                self.bus.publish("event_stored", self.make_event(f"evt_{i}"))
+            self.assertTrue(agent.wait_idle(timeout=5))
+            self.assertEqual(agent.pending(), 3)
+            self.assertEqual(agent.completed, 0)
+
+            self.bus.publish("system_strategy_update", {"fps": 15, "mode": "ONLINE_BALANCED"})
+            self.assertEqual(agent.worker_limit, 2)
+            agent.wait_idle(timeout=30)
+            self.assertEqual(agent.pending(), 0)
+            self.assertEqual(agent.completed, 3)
+        finally:
+            agent.stop()
+
+if __name__ == '__main__':
+    unittest.main()
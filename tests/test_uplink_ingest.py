@@ -0,0 +1,101 @@
+
+import unittest
+import datetime
+import os
+import tempfile
+import time
+from src.core.event_bus import EventBus
+from src.core.types import NetworkStatus, RiskLevel, OceanEvent, EventType, Evidence
+from src.database.storage import StorageManager
+from src.agents.sync_agent import SyncAgent
+from src.shore.ingest_server import IngestServer, LinkProfile
+from src.uplink.uplink_client import UplinkBusy, UplinkClient
+
+class TestUplinkIngest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = StorageManager(os.path.join(self.tmp.name, "sync.db"))
+        events = []
+        for i in range(120):
+            events.append(OceanEvent(
+                event_id=f"evt_{i:04d}",
+                timestamp=datetime.datetime(2026, 1, 6) + datetime.timedelta(seconds=i),
+                event_type=EventType.UNKNOWN,
+                risk_level=RiskLevel.HIGH if i % 4 == 0 else RiskLevel.LOW,
+                confidence=0.9,
+                evidence=Evidence(),
+                metadata={"frame_id": i}
+            ))
+        self.storage.save_events(events)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_agent(self, profile):
+        server = IngestServer(profile=profile, seed=3)
+        server.start()
+        self.addCleanup(server.stop)
+        client = UplinkClient(server.url, timeout=5)
+        self.addCleanup(client.close)
+        return server, SyncAgent(EventBus(), self.storage, uplink=client)
+
+    def test_online_drains_everything_despite_loss(self):
+        server, agent = self.make_agent(LinkProfile(loss_rate=0.3))
+        agent.update_network_status(NetworkStatus.ONLINE)
+        agent.BATCH_SIZE[NetworkStatus.ONLINE] = 10
+        agent.MAX_CONSECUTIVE_FAILURES = 50
+        agent.RETRY_BASE_SECONDS = 0.01
+
+        agent.drain_backlog()
+
+        self.assertEqual(self.storage.count_pending_sync(), 0)
+        self.assertEqual(server.events_received, 120)
+        self.assertGreater(server.dropped_requests, 0)
+
+    def test_intermittent_drains_high_only(self):
+        server, agent = self.make_agent(LinkProfile())
+        agent.update_network_status(NetworkStatus.INTERMITTENT)
+
+        stats = agent.drain_backlog()
+
+        self.assertEqual(stats["events"], 30)
+        self.assertEqual(self.storage.count_pending_sync([RiskLevel.HIGH]), 0)
+        self.assertEqual(self.storage.count_pending_sync(), 90)
+
+    def test_worker_sends_live_events_and_drains_backlog(self):
+        server, agent = self.make_agent(LinkProfile())
+        agent.update_network_status(NetworkStatus.ONLINE)
+        live = OceanEvent(event_id="evt_live", timestamp=datetime.datetime(2026, 1, 7),
+                          event_type=EventType.UNKNOWN, risk_level=RiskLevel.HIGH,
+                          confidence=0.9, evidence=Evidence())
+
+        agent.handle_final_event(live)
+        self.assertEqual(server.batches_received, 0)  # The bus handler only queues
+        self.assertEqual(agent.pending(), 1)
+
+        agent.start()
+        self.addCleanup(agent.stop)
+        self.assertTrue(agent.drain(5))
+        for _ in range(50):
+            if not self.storage.count_pending_sync():
+                break
+            time.sleep(0.1)
+        self.assertEqual(self.storage.count_pending_sync(), 0)
+        self.assertEqual(server.events_received, 121)
+
+    def test_retry_delay_honours_retry_after_and_backs_off(self):
+        _, agent = self.make_agent(LinkProfile())
+        self.assertEqual(agent.retry_delay(1, UplinkBusy("busy", retry_after=7)), 7)
+        for failures in range(1, 12):
+            delay = agent.retry_delay(failures, ConnectionError("lost"))
+            cap = min(agent.RETRY_MAX_SECONDS, agent.RETRY_BASE_SECONDS * 2 ** (failures - 1))
+            self.assertTrue(cap / 2 <= delay <= cap)
+
+    def test_offline_sends_nothing(self):
+        server, agent = self.make_agent(LinkProfile())
+        agent.update_network_status(NetworkStatus.OFFLINE)
+        self.assertEqual(agent.drain_backlog()["events"], 0)
+        self.assertEqual(server.batches_received, 0)
+
+if __name__ == "__main__":
+    unittest.main()
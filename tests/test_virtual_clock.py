@@ -0,0 +1,114 @@
+import unittest
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from src.core.clock import VirtualClock
+from src.core.event_bus import EventBus
+from src.core.types import OceanEvent, EventType, RiskLevel, Evidence
+from src.agents.alert_agent import AlertAgent
+from src.agents.bioconfirm_agent import BioConfirmAgent
+from src.agents.sync_agent import SyncAgent
+from src.headless import HeadlessRun
+
+START = datetime(2026, 3, 1).timestamp()
+
+def detection(box):
+    return OceanEvent(event_id="DET_x", timestamp=None, event_type=EventType.UNKNOWN,
+                      risk_level=RiskLevel.UNKNOWN, confidence=0.9, evidence=Evidence(),
+                      metadata={"raw_label": "large_marine_life", "box": box, "motion": [2.0, 2.0]})
+
+class TestVirtualClock(unittest.TestCase):
+    def test_callbacks_run_in_due_order_and_reschedule(self):
+        clock = VirtualClock(start=START)
+        seen = []
+        clock.call_later(2.0, lambda: seen.append(("b", clock.time() - START)))
+        clock.call_later(1.0, lambda: seen.append(("a", clock.time() - START)))
+        ticks = []
+        def every_three():
+            ticks.append(clock.time() - START)
+            return 3.0
+        clock.call_later(0, every_three)
+
+        ran = clock.run_until(START + 7)
+        self.assertEqual(seen, [("a", 1.0), ("b", 2.0)])
+        self.assertEqual(ticks, [0.0, 3.0, 6.0])
+        self.assertEqual(ran, 5)
+        self.assertEqual(clock.time(), START + 7)
+        self.assertEqual(clock.next_due(), START + 9)
+
+    def test_sleep_advances_without_waiting_and_delays_later_callbacks(self):
+        clock = VirtualClock(start=START)
+        seen = []
+        clock.call_later(0, lambda: clock.sleep(5.0))  # Busy for 5 s
+        clock.call_later(1.0, lambda: seen.append(clock.time() - START))
+        wall = time.monotonic()
+        clock.advance(3600)
+        self.assertLess(time.monotonic() - wall, 1.0)
+        self.assertEqual(seen, [5.0])  # Ran late, as behind a busy thread
+        self.assertEqual(clock.now(), datetime.fromtimestamp(START + 3600))
+
+class TestTimingRulesOnVirtualTime(unittest.TestCase):
+    def test_bioconfirm_dropout(self):
+        clock = VirtualClock(start=START)
+        agent = BioConfirmAgent(EventBus(), clock=clock)
+        agent.on_vision_detection(detection([100, 100, 260, 260]))
+        clock.advance(agent.MAX_DROPOUT - 0.5)
+        agent.on_vision_detection(detection([400, 400, 560, 560]))
+        self.assertEqual(len(agent.tracks), 2)
+        clock.advance(1.0)  # First track now unseen for longer than MAX_DROPOUT
+        agent.on_vision_detection(detection([400, 400, 560, 560]))
+        self.assertEqual(len(agent.tracks), 1)
+
+    def test_alert_cooldown(self):
+        clock = VirtualClock(start=START)
+        bus = EventBus()
+        agent = AlertAgent(bus, clock=clock)
+        alerts = []
+        bus.subscribe("alert_event", alerts.append)
+        payload = {"risk_level": "HIGH", "reason": "Large marine life detected ahead."}
+        agent.process_risk(payload)
+        clock.advance(agent.COOLDOWN_SECONDS - 1)
+        agent.process_risk(payload)
+        self.assertEqual(len(alerts), 1)
+        clock.advance(2)
+        agent.process_risk(payload)
+        self.assertEqual(len(alerts), 2)
+        self.assertEqual(alerts[1]["timestamp"], START + agent.COOLDOWN_SECONDS + 1)
+
+    def test_sync_rate_limit(self):
+        clock = VirtualClock(start=START)
+        agent = SyncAgent(EventBus(), storage=None, clock=clock)
+        self.assertTrue(agent._check_rate_limit("HIGH"))
+        clock.advance(1.0)
+        self.assertFalse(agent._check_rate_limit("HIGH"))
+        clock.advance(1.5)
+        self.assertTrue(agent._check_rate_limit("HIGH"))
+
+class TestHeadlessRun(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def test_simulated_time_runs_faster_than_wall_time(self):
+        run = HeadlessRun(self.workdir, seed=3, start=START)
+        try:
+            wall = time.monotonic()
+            reports = run.run(hours=0.05, report_every=90)
+            elapsed = time.monotonic() - wall
+        finally:
+            run.close()
+
+        self.assertEqual([r["sim_hours"] for r in reports], [0.03, 0.05])
+        self.assertLess(elapsed, 0.05 * 3600 / 5)
+        last = reports[-1]
+        # 3 fps or more for three simulated minutes
+        self.assertGreaterEqual(last["frames"], 3 * 180 - 5)
+        self.assertGreater(last["events"], 0)
+        self.assertGreater(last["db_bytes"], 0)
+        self.assertEqual(run.storage.partition_names()[0][-8:], "20260301")
+
+if __name__ == "__main__":
+    unittest.main()
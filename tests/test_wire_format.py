@@ -0,0 +1,99 @@
+
+import unittest
+import datetime
+import lzma
+import random
+import zlib
+from src.core.types import OceanEvent, EventType, RiskLevel, Evidence, NetworkStatus
+from src.core.wire_format import (
+    encode_batch, decode_batch, select_compression, json_size, WireFormatError,
+    MAX_BATCH_BYTES, SCHEMA_VERSION
+)
+
+class TestWireFormat(unittest.TestCase):
+    def make_event(self, i, **meta):
+        metadata = {
+            "raw_label": "large_marine_life",
+            "box": [100 + i, 100 + i, 260 + i, 260 + i],
+            "motion": [2.0, 2.0],
+            "frame_id": 100000 + i,
+        }
+        metadata.update(meta)
+        return OceanEvent(
+            event_id=f"DET_{i:08x}",
+            timestamp=datetime.datetime(2026, 1, 6, 12, 0, 0) + datetime.timedelta(milliseconds=333 * i),
+            event_type=EventType.UNKNOWN,
+            risk_level=RiskLevel.HIGH if i % 3 == 0 else RiskLevel.LOW,
+            confidence=0.9,
+            evidence=Evidence(image_paths=["/tmp/mock_det.jpg"]),
+            metadata=metadata,
+        )
+
+    def test_roundtrip_all_codecs(self):
+        events = [self.make_event(i) for i in range(50)]
+        events[5] = events[5].replace(extra={"note": {"nested": [1, "x"]}})
+        events[7] = events[7].replace(motion=(0.1, -3.3))  # not float32-exact -> extras
+        events[9].evidence.clip_path = "/data/clip.mp4"
+        events[9].evidence.renditions = {"thumbnail": ["evs://ab"], "preview": ["evs://cd"]}
+        events[9].synced = True
+
+        for codec in ("none", "zlib", "lzma"):
+            decoded = decode_batch(encode_batch(events, compression=codec))
+            self.assertEqual(len(decoded), len(events))
+            for a, b in zip(events, decoded):
+                self.assertEqual(a.event_id, b.event_id)
+                self.assertEqual(a.timestamp, b.timestamp)
+                self.assertEqual(a.risk_level, b.risk_level)
+                self.assertEqual(a.event_type, b.event_type)
+                self.assertEqual(a.confidence, b.confidence)
+                self.assertEqual(a.metadata, b.metadata)
+                self.assertEqual(a.evidence, b.evidence)
+                self.assertEqual(a.synced, b.synced)
+
+    def test_smaller_than_json(self):
+        events = [self.make_event(i) for i in range(200)]
+        json_bytes = sum(json_size(e) for e in events)
+        self.assertLess(len(encode_batch(events)), json_bytes / 3)
+        self.assertLess(len(encode_batch(events, "zlib")), len(encode_batch(events)))
+
+    def test_rejects_foreign_frames(self):
+        with self.assertRaises(WireFormatError):
+            decode_batch(b"{\"event_id\": 1}")
+        frame = bytearray(encode_batch([self.make_event(1)]))
+        frame[3] = 99
+        with self.assertRaises(WireFormatError):
+            decode_batch(bytes(frame))
+
+    def test_corrupt_payload_raises_wire_format_error(self):
+        rng = random.Random(3)
+        events = [self.make_event(i, note="x") for i in range(5)]
+        frame = encode_batch(events)
+        for _ in range(300):
+            corrupt = bytearray(frame)
+            for _ in range(rng.randint(1, 4)):
+                pos = rng.randrange(5, len(corrupt))
+                corrupt[pos] = rng.randrange(256)
+            try:
+                decode_batch(bytes(corrupt))
+            except WireFormatError:
+                pass
+        with self.assertRaises(WireFormatError):
+            decode_batch(frame[:len(frame) // 2])
+
+    def test_compression_bomb_is_rejected(self):
+        bomb = bytes(MAX_BATCH_BYTES + 1)
+        for codec, compress in ((1, zlib.compress), (2, lzma.compress)):
+            frame = b"OVB" + bytes((SCHEMA_VERSION, codec)) + compress(bomb)
+            with self.assertRaises(WireFormatError):
+                decode_batch(frame)
+            truncated = b"OVB" + bytes((SCHEMA_VERSION, codec)) + compress(b"x" * 1000)[:-8]
+            with self.assertRaises(WireFormatError):
+                decode_batch(truncated)
+
+    def test_codec_selection(self):
+        self.assertEqual(select_compression(NetworkStatus.ONLINE), "zlib")
+        self.assertEqual(select_compression(NetworkStatus.INTERMITTENT), "lzma")
+        self.assertEqual(select_compression(NetworkStatus.ONLINE, bandwidth_bps=9600), "lzma")
+
+if __name__ == "__main__":
+    unittest.main()